@@ -38,11 +38,33 @@ Two modes
        used. Use this to build a synthetic ``RasterStack`` (see the example printed
        by ``--print-example``), since a datacube can't be expressed in JSON.
 
+Profiling
+=========
+
+``--profile`` runs the graph under the same per-process profiler the server uses
+when ``TITILER_OPENEO_PROFILING_ENABLED`` is set (see
+``titiler.openeo.profiling``) and prints the timings table after the result.
+``--render-trace`` prints a trace fetched from a server's
+``GET /debug/traces/{trace_id}`` (the id is in the ``X-OpenEO-Trace-Id``
+response header) without running anything.
+
+Replay
+======
+
+``--replay BUNDLE`` re-executes a request captured by the server (see
+``titiler.openeo.capture``; the bundle id is in the ``X-OpenEO-Capture-Id``
+response header) offline: the process graph and parameters come from the
+bundle, and STAC searches, asset byte ranges and annotation files are served
+from it. No backend env vars are needed. The run is always profiled.
+
 Examples
 --------
     uv run python scripts/debug_graph.py --print-example          # writes a sample params.py to stdout
     uv run python scripts/debug_graph.py mygraph.json             # full graph (needs backend env)
     uv run python scripts/debug_graph.py subgraph.json -p params.py
+    uv run python scripts/debug_graph.py mygraph.json --profile   # + per-process timings
+    uv run python scripts/debug_graph.py --render-trace trace.json
+    uv run python scripts/debug_graph.py --replay /tmp/captures/<capture-id>
 """
 
 from __future__ import annotations
@@ -57,7 +79,11 @@ from typing import Any, Dict
 from openeo_pg_parser_networkx.graph import OpenEOProcessGraph
 from openeo_pg_parser_networkx.process_registry import Process
 
+from titiler.openeo.capture import replay
 from titiler.openeo.processes import PROCESS_SPECIFICATIONS, process_registry
+from titiler.openeo.profiling import render_trace, request_profile
+from titiler.openeo.reader_requirements import plan_process_registry
+from titiler.openeo.results_cache import make_results_cache
 
 EXAMPLE_PARAMS = '''\
 """Example params.py for scripts/debug_graph.py (isolated sub-graph mode).
@@ -121,6 +147,52 @@ def maybe_register_loaders() -> None:
     )
 
 
+def register_replay_loaders() -> None:
+    """Register load_collection against the replayed STAC responses.
+
+    The backend's client is never opened: every search is answered from the
+    capture bundle, so the URL is a placeholder.
+    """
+    from titiler.openeo.stacapi import LoadCollection, stacApiBackend
+
+    process_registry["load_collection"] = Process(
+        spec=PROCESS_SPECIFICATIONS["load_collection"],
+        implementation=LoadCollection(
+            stacApiBackend("http://replay.invalid")
+        ).load_collection,
+    )
+
+
+def run_replay(bundle: str) -> None:
+    """Re-execute a captured request, the way the server ran it, with profiling."""
+    with replay(bundle) as session:
+        register_replay_loaders()
+        request = session.request
+        print(
+            f"[debug_graph] replaying {request['endpoint']} captured "
+            f"{request['created']}",
+            file=sys.stderr,
+        )
+        if request["skipped_parameters"]:
+            print(
+                "[debug_graph] parameters not captured: "
+                + ", ".join(request["skipped_parameters"]),
+                file=sys.stderr,
+            )
+
+        process = session.process
+        with request_profile(enabled=True) as profile:
+            parsed_graph = OpenEOProcessGraph(pg_data=process)
+            callable_ = parsed_graph.to_callable(
+                process_registry=plan_process_registry(parsed_graph, process_registry),
+                parameters=process.get("parameters"),
+                results_cache=make_results_cache(parsed_graph),
+            )
+            result = callable_(named_parameters=session.parameters)
+    print(describe(result))
+    print(render_trace(profile.to_dict()))
+
+
 def load_named_parameters(path: str) -> Dict[str, Any]:
     if path.endswith(".py"):
         ns = runpy.run_path(path)
@@ -137,6 +209,9 @@ def describe(result: Any) -> str:
     """Human-readable summary of a graph result (RasterStack / ImageData / array)."""
     import numpy as np
 
+    if isinstance(getattr(result, "data", None), bytes):
+        # save_result output (SaveResultData): already encoded.
+        return f"{result.media_type} {len(result.data)} bytes"
     if hasattr(result, "items") and not isinstance(result, dict):
         result = dict(result.items())
 
@@ -178,11 +253,33 @@ def main() -> None:
         action="store_true",
         help="print an example params.py and exit",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the run and print per-process timings",
+    )
+    parser.add_argument(
+        "--render-trace",
+        metavar="TRACE_JSON",
+        help="print a trace from GET /debug/traces/{trace_id} and exit",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="BUNDLE",
+        help="re-execute a captured request offline, with profiling",
+    )
     args = parser.parse_args()
 
     if args.print_example:
         print(EXAMPLE_PARAMS)
         return
+    if args.render_trace:
+        with open(args.render_trace) as f:
+            print(render_trace(json.load(f)))
+        return
+    if args.replay:
+        run_replay(args.replay)
+        return
     if not args.graph:
         parser.error("graph is required (or use --print-example)")
 
@@ -197,8 +294,11 @@ def main() -> None:
     callable_ = OpenEOProcessGraph(pg_data=pg).to_callable(
         process_registry=process_registry
     )
-    result = callable_(named_parameters=named_parameters)
+    with request_profile(enabled=args.profile) as profile:
+        result = callable_(named_parameters=named_parameters)
     print(describe(result))
+    if profile is not None:
+        print(render_trace(profile.to_dict()))
 
 
 if __name__ == "__main__":
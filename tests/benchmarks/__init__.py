@@ -0,0 +1,17 @@
+"""Offline end-to-end benchmark suite.
+
+A synthetic STAC catalogue (multi-date optical COGs with overviews, SAR-like
+GCP-referenced rasters and their calibration/noise annotation XML) is generated
+locally and served by a stand-in STAC API, so representative process graphs run
+through the real ``load_collection`` -> process -> ``save_result`` path with no
+network access.
+
+Run the suite, recording wall time and peak RSS per graph against the current
+commit::
+
+    python -m tests.benchmarks.run
+    python -m tests.benchmarks.run --compare main       # vs. a previous run
+
+``tests/test_benchmarks.py`` runs every scenario once at the ``tiny`` scale so
+the suite cannot silently rot.
+"""
@@ -0,0 +1,462 @@
+"""Synthetic STAC catalogue for the benchmark suite.
+
+Two collections are generated under one directory:
+
+* ``synthetic-s2``: two overlapping UTM tiles per acquisition date, each with a
+  red (``B04``) and near-infrared (``B08``) uint16 COG with internal overviews,
+  ``raster:scale`` set (so scale/offset is applied on read) and a nodata corner.
+* ``sentinel-1-grd``: one GCP-referenced (no geotransform) uint16 "measurement"
+  COG per date, with calibration and noise annotation XML (modern, IPF >= 2.90
+  noise schema) sized to the raster. The collection id and asset keys follow
+  the Sentinel-1 GRD convention, so the shipped band sources apply unchanged.
+
+Items are written to ``catalogue.json`` with asset hrefs relative to the
+catalogue root; :mod:`.stac_server` resolves them when serving.
+
+Generation is deterministic and skipped when the directory already holds a
+catalogue for the same scale and :data:`CATALOGUE_VERSION`.
+"""
+
+import json
+import math
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy
+import rasterio
+from rasterio.control import GroundControlPoint
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+from rasterio.warp import transform_bounds
+
+#: Bump when the generated data changes, so cached catalogues are rebuilt.
+CATALOGUE_VERSION = 1
+
+CATALOGUE_FILE = "catalogue.json"
+
+OPTICAL_COLLECTION = "synthetic-s2"
+SAR_COLLECTION = "sentinel-1-grd"
+
+_OPTICAL_CRS = CRS.from_epsg(32631)
+_OPTICAL_ORIGIN = (500_000.0, 4_830_000.0)  # upper-left, ~43.6N 3E
+_OPTICAL_RES = 20.0
+_OPTICAL_BANDS = {"B04": "red", "B08": "nir"}
+_TILE_OVERLAP = 0.1
+
+# Corner-anchored mapping from (u, v) = (col / width, row / height) to lon/lat
+# for the SAR rasters: rotated and slightly curved, so an affine is not exact.
+_SAR_LON0, _SAR_LAT0 = 10.0, 45.5
+
+_STAC_EXTENSIONS = [
+    "https://stac-extensions.github.io/eo/v1.1.0/schema.json",
+    "https://stac-extensions.github.io/raster/v1.1.0/schema.json",
+    "https://stac-extensions.github.io/projection/v1.1.0/schema.json",
+    "https://stac-extensions.github.io/sar/v1.0.0/schema.json",
+]
+_COG = "image/tiff; application=geotiff; profile=cloud-optimized"
+_XML = "application/xml"
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of a generated catalogue and of the outputs the graphs request."""
+
+    name: str
+    #: Optical COG width/height, in pixels.
+    tile_size: int
+    #: Optical acquisition dates over 2023, two tiles each.
+    n_dates: int
+    sar_width: int
+    sar_height: int
+    sar_dates: int
+    #: Polygons passed to ``aggregate_spatial``.
+    n_polygons: int
+    #: width/height requested by the non-tile graphs.
+    output_size: int
+
+
+SCALES: Dict[str, Scale] = {
+    # Smoke-test size: every code path, in seconds.
+    "tiny": Scale("tiny", 64, 3, 96, 64, 2, 25, 64),
+    "default": Scale("default", 1024, 24, 2048, 1536, 4, 1000, 512),
+}
+
+
+def generate_catalogue(root: Path, scale: Scale) -> Dict[str, Any]:
+    """Generate (or reuse) the synthetic catalogue under ``root``."""
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / CATALOGUE_FILE
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("version") == CATALOGUE_VERSION and manifest.get(
+            "scale"
+        ) == asdict(scale):
+            return manifest
+
+    optical_items, optical_bbox = _optical_items(root, scale)
+    sar_items, sar_bbox = _sar_items(root, scale)
+    manifest = {
+        "version": CATALOGUE_VERSION,
+        "scale": asdict(scale),
+        "collections": [
+            _collection(OPTICAL_COLLECTION, optical_items, list(_OPTICAL_BANDS)),
+            _collection(SAR_COLLECTION, sar_items, ["vv"]),
+        ],
+        "items": optical_items + sar_items,
+        # Areas fully covered by every date of each collection (EPSG:4326).
+        "optical_bbox": optical_bbox,
+        "sar_bbox": sar_bbox,
+    }
+    manifest_path.write_text(json.dumps(manifest))
+    return manifest
+
+
+def load_catalogue(root: Path) -> Dict[str, Any]:
+    """Read a catalogue written by :func:`generate_catalogue`."""
+    return json.loads((root / CATALOGUE_FILE).read_text())
+
+
+def _dates(n: int, hour: int) -> List[datetime]:
+    start = datetime(2023, 1, 1, hour, 30, tzinfo=timezone.utc)
+    step = 365 / n
+    return [start + timedelta(days=int(i * step)) for i in range(n)]
+
+
+def _write_cog(path: Path, data: numpy.ndarray, **profile: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with rasterio.open(
+        path,
+        "w",
+        driver="COG",
+        width=data.shape[-1],
+        height=data.shape[-2],
+        count=1,
+        dtype=data.dtype,
+        blocksize=256,
+        overview_resampling="average",
+        compress="deflate",
+        **profile,
+    ) as dst:
+        dst.write(data[numpy.newaxis])
+
+
+def _optical_band(
+    size: int, date_index: int, tile_index: int, band: str
+) -> numpy.ndarray:
+    rng = numpy.random.default_rng([date_index, tile_index, int(band[1:])])
+    yy, xx = numpy.mgrid[0:size, 0:size] / size
+    field = 0.5 + 0.5 * numpy.sin(2 * math.pi * (xx + tile_index * 0.9)) * numpy.cos(
+        math.pi * yy
+    )
+    season = 0.6 + 0.4 * math.sin(2 * math.pi * (date_index + 1) / 12)
+    if band == "B04":
+        values = 800 + 600 * field
+    else:
+        values = 2500 + 1500 * (1 - field) * season
+    values = values + rng.normal(0, 50, (size, size))
+    data = numpy.clip(values, 1, 10000).astype("uint16")
+    # Nodata corner, as at the edge of a swath.
+    data[xx + yy < 0.15] = 0
+    return data
+
+
+def _optical_items(
+    root: Path, scale: Scale
+) -> Tuple[List[Dict[str, Any]], List[float]]:
+    size = scale.tile_size
+    step = size * _OPTICAL_RES * (1 - _TILE_OVERLAP)
+    items = []
+    tile_bounds = []
+    for tile_index in range(2):
+        west = _OPTICAL_ORIGIN[0] + tile_index * step
+        north = _OPTICAL_ORIGIN[1]
+        transform = from_origin(west, north, _OPTICAL_RES, _OPTICAL_RES)
+        bounds = (west, north - size * _OPTICAL_RES, west + size * _OPTICAL_RES, north)
+        tile_bounds.append(bounds)
+
+        for date_index, date in enumerate(_dates(scale.n_dates, hour=10)):
+            item_id = f"S2_T{tile_index}_{date:%Y%m%d}"
+            assets = {}
+            for band, common_name in _OPTICAL_BANDS.items():
+                href = f"optical/{item_id}_{band}.tif"
+                _write_cog(
+                    root / href,
+                    _optical_band(size, date_index, tile_index, band),
+                    crs=_OPTICAL_CRS,
+                    transform=transform,
+                    nodata=0,
+                )
+                assets[band] = {
+                    "href": href,
+                    "type": _COG,
+                    "roles": ["data"],
+                    "eo:bands": [{"name": band, "common_name": common_name}],
+                    "raster:bands": [
+                        {
+                            "nodata": 0,
+                            "data_type": "uint16",
+                            "scale": 0.0001,
+                            "offset": 0,
+                            "statistics": {"minimum": 1, "maximum": 10000},
+                        }
+                    ],
+                }
+            items.append(
+                _item(
+                    item_id,
+                    OPTICAL_COLLECTION,
+                    date,
+                    transform_bounds(_OPTICAL_CRS, "epsg:4326", *bounds),
+                    assets,
+                    {
+                        "proj:epsg": 32631,
+                        "proj:shape": [size, size],
+                        "proj:transform": list(transform)[:6],
+                        "proj:bbox": list(bounds),
+                        "eo:cloud_cover": (date_index * 7) % 30,
+                    },
+                )
+            )
+
+    # Both tiles intersect over the overlap; the union is the benchmark AOI,
+    # shrunk a little so it stays inside the data after reprojection.
+    union = (
+        tile_bounds[0][0],
+        tile_bounds[0][1],
+        tile_bounds[-1][2],
+        tile_bounds[0][3],
+    )
+    inset = size * _OPTICAL_RES * 0.05
+    aoi = transform_bounds(
+        _OPTICAL_CRS,
+        "epsg:4326",
+        union[0] + inset,
+        union[1] + inset,
+        union[2] - inset,
+        union[3] - inset,
+    )
+    return items, list(aoi)
+
+
+def _sar_lonlat(u: numpy.ndarray, v: numpy.ndarray) -> Tuple[Any, Any]:
+    lon = _SAR_LON0 + 0.7 * u + 0.1 * v
+    lat = _SAR_LAT0 - 0.45 * v + 0.03 * u + 0.02 * u * u
+    return lon, lat
+
+
+def _sar_items(root: Path, scale: Scale) -> Tuple[List[Dict[str, Any]], List[float]]:
+    width, height = scale.sar_width, scale.sar_height
+
+    gcps = []
+    for v in numpy.linspace(0, 1, 6):
+        for u in numpy.linspace(0, 1, 6):
+            lon, lat = _sar_lonlat(u, v)
+            gcps.append(
+                GroundControlPoint(
+                    row=float(v * height), col=float(u * width), x=lon, y=lat
+                )
+            )
+
+    corners = [_sar_lonlat(u, v) for u, v in ((0, 0), (1, 0), (1, 1), (0, 1))]
+    lons = [lon for lon, _ in corners]
+    lats = [lat for _, lat in corners]
+
+    items = []
+    for date_index, date in enumerate(_dates(scale.sar_dates, hour=17)):
+        item_id = f"S1_IW_GRDH_{date:%Y%m%dT%H%M%S}"
+        measurement = f"sar/{item_id}_vv.tif"
+        rng = numpy.random.default_rng(date_index)
+        # Speckle-like DN with a zero (invalid) border in range, as in GRD.
+        dn = rng.gamma(4.0, 60.0, (height, width)).clip(1, 65535).astype("uint16")
+        border = max(width // 50, 1)
+        dn[:, :border] = 0
+        dn[:, -border:] = 0
+        _write_cog(root / measurement, dn, gcps=gcps, crs=CRS.from_epsg(4326))
+
+        calibration = f"sar/{item_id}_calibration-vv.xml"
+        noise = f"sar/{item_id}_noise-vv.xml"
+        (root / calibration).write_text(_calibration_xml(width, height))
+        (root / noise).write_text(_noise_xml(width, height, date_index))
+
+        items.append(
+            _item(
+                item_id,
+                SAR_COLLECTION,
+                date,
+                (min(lons), min(lats), max(lons), max(lats)),
+                {
+                    "vv": {"href": measurement, "type": _COG, "roles": ["data"]},
+                    "schema-calibration-vv": {
+                        "href": calibration,
+                        "type": _XML,
+                        "roles": ["metadata"],
+                    },
+                    "schema-noise-vv": {
+                        "href": noise,
+                        "type": _XML,
+                        "roles": ["metadata"],
+                    },
+                },
+                {
+                    "sar:product_type": "GRD",
+                    "sar:instrument_mode": "IW",
+                    "sar:polarizations": ["VV"],
+                },
+                geometry=[[lon, lat] for lon, lat in corners + corners[:1]],
+            )
+        )
+
+    # The central part of the footprint, clear of the rotated edges.
+    inner = [_sar_lonlat(u, v) for u, v in ((0.25, 0.7), (0.75, 0.3))]
+    bbox = [inner[0][0], inner[0][1], inner[1][0], inner[1][1]]
+    return items, bbox
+
+
+def _floats(values: numpy.ndarray, fmt: str = "%.6e") -> str:
+    return " ".join(fmt % value for value in values)
+
+
+def _calibration_xml(width: int, height: int) -> str:
+    lines = numpy.linspace(0, height - 1, max(4, height // 200)).round()
+    pixels = numpy.linspace(0, width - 1, max(8, width // 40)).round()
+    incidence = numpy.radians(30 + 16 * pixels / max(width - 1, 1))
+    vectors = []
+    for line in lines:
+        sigma = 600 - 200 * pixels / max(width - 1, 1) + 5 * line / max(height, 1)
+        gamma = sigma * numpy.sqrt(numpy.cos(incidence))
+        beta = numpy.full_like(sigma, 237.5)
+        vectors.append(
+            f"""    <calibrationVector>
+      <line>{int(line)}</line>
+      <pixel count="{len(pixels)}">{_floats(pixels, "%d")}</pixel>
+      <sigmaNought count="{len(pixels)}">{_floats(sigma)}</sigmaNought>
+      <betaNought count="{len(pixels)}">{_floats(beta)}</betaNought>
+      <gamma count="{len(pixels)}">{_floats(gamma)}</gamma>
+      <dn count="{len(pixels)}">{_floats(beta)}</dn>
+    </calibrationVector>"""
+        )
+    body = "\n".join(vectors)
+    return f"""<?xml version='1.0' encoding='UTF-8'?>
+<calibration>
+  <calibrationInformation>
+    <absoluteCalibrationConstant>1.0</absoluteCalibrationConstant>
+  </calibrationInformation>
+  <calibrationVectorList count="{len(lines)}">
+{body}
+  </calibrationVectorList>
+</calibration>
+"""
+
+
+def _noise_xml(width: int, height: int, seed: int) -> str:
+    rng = numpy.random.default_rng(seed)
+    lines = numpy.linspace(0, height - 1, max(4, height // 200)).round()
+    pixels = numpy.linspace(0, width - 1, max(8, width // 40)).round()
+    range_vectors = []
+    for line in lines:
+        lut = 150 + 100 * numpy.cos(4 * math.pi * pixels / max(width - 1, 1))
+        range_vectors.append(
+            f"""    <noiseRangeVector>
+      <line>{int(line)}</line>
+      <pixel count="{len(pixels)}">{_floats(pixels, "%d")}</pixel>
+      <noiseRangeLut count="{len(pixels)}">{_floats(lut)}</noiseRangeLut>
+    </noiseRangeVector>"""
+        )
+
+    # Three sub-swaths, each with its own azimuth descalloping vector.
+    edges = numpy.linspace(0, width, 4).round().astype(int)
+    azimuth_vectors = []
+    for first, last in zip(edges[:-1], edges[1:]):
+        az_lines = numpy.linspace(0, height - 1, 8).round()
+        lut = 1 + 0.05 * rng.standard_normal(len(az_lines))
+        azimuth_vectors.append(
+            f"""    <noiseAzimuthVector>
+      <firstAzimuthLine>0</firstAzimuthLine>
+      <firstRangeSample>{first}</firstRangeSample>
+      <lastAzimuthLine>{height - 1}</lastAzimuthLine>
+      <lastRangeSample>{last - 1}</lastRangeSample>
+      <line count="{len(az_lines)}">{_floats(az_lines, "%d")}</line>
+      <noiseAzimuthLut count="{len(az_lines)}">{_floats(lut)}</noiseAzimuthLut>
+    </noiseAzimuthVector>"""
+        )
+    range_body = "\n".join(range_vectors)
+    azimuth_body = "\n".join(azimuth_vectors)
+    return f"""<?xml version='1.0' encoding='UTF-8'?>
+<noise>
+  <noiseRangeVectorList count="{len(lines)}">
+{range_body}
+  </noiseRangeVectorList>
+  <noiseAzimuthVectorList count="{len(azimuth_vectors)}">
+{azimuth_body}
+  </noiseAzimuthVectorList>
+</noise>
+"""
+
+
+def _item(
+    item_id: str,
+    collection: str,
+    date: datetime,
+    bbox: Tuple[float, float, float, float],
+    assets: Dict[str, Any],
+    properties: Dict[str, Any],
+    geometry: Any = None,
+) -> Dict[str, Any]:
+    west, south, east, north = bbox
+    ring = geometry or [
+        [west, south],
+        [east, south],
+        [east, north],
+        [west, north],
+        [west, south],
+    ]
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "stac_extensions": _STAC_EXTENSIONS,
+        "id": item_id,
+        "collection": collection,
+        "bbox": [west, south, east, north],
+        "geometry": {"type": "Polygon", "coordinates": [ring]},
+        "properties": {"datetime": date.isoformat(), **properties},
+        "assets": assets,
+        "links": [],
+    }
+
+
+def _collection(
+    collection_id: str, items: List[Dict[str, Any]], bands: List[str]
+) -> Dict[str, Any]:
+    bboxes = numpy.array([item["bbox"] for item in items])
+    dates = sorted(item["properties"]["datetime"] for item in items)
+    first_item = items[0]
+    return {
+        "type": "Collection",
+        "stac_version": "1.0.0",
+        "stac_extensions": _STAC_EXTENSIONS,
+        "id": collection_id,
+        "title": collection_id,
+        "description": f"Synthetic {collection_id} for the benchmark suite",
+        "license": "proprietary",
+        "extent": {
+            "spatial": {
+                "bbox": [
+                    [
+                        float(bboxes[:, 0].min()),
+                        float(bboxes[:, 1].min()),
+                        float(bboxes[:, 2].max()),
+                        float(bboxes[:, 3].max()),
+                    ]
+                ]
+            },
+            "temporal": {"interval": [[dates[0], dates[-1]]]},
+        },
+        "summaries": {"eo:bands": [{"name": band} for band in bands]},
+        "item_assets": {
+            key: {k: v for k, v in asset.items() if k != "href"}
+            for key, asset in first_item["assets"].items()
+        },
+        "links": [],
+    }
@@ -0,0 +1,115 @@
+"""Micro-benchmark of the DuckDB stores' hot lookups.
+
+Times `get_service`, `get_udp` and `track_user_login` with the stores'
+long-lived, per-thread connections against the earlier behaviour of opening
+the database for every call (``keep_open=False``), and prints lookups per
+second and the speed-up. ``--threads`` spreads the lookups over threads::
+
+    python -m tests.benchmarks.duckdb_lookups [--services N] [--lookups N]
+                                              [--threads N]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from titiler.openeo.models.auth import User
+from titiler.openeo.services.duckdb import DuckDBStore, DuckDBUdpStore
+
+SERVICE = {
+    "title": "NDVI",
+    "type": "XYZ",
+    "configuration": {"tile_size": 256, "minzoom": 0, "maxzoom": 18},
+    "process": {
+        "process_graph": {
+            f"node{i}": {
+                "process_id": "add",
+                "arguments": {"x": {"from_node": f"node{i - 1}"}, "y": i},
+            }
+            for i in range(20)
+        }
+    },
+}
+
+
+def seed(db: str, services: int) -> List[str]:
+    """Add `services` services and UDPs to `db`, returning the service ids."""
+    store = DuckDBStore(store=db)
+    udp_store = DuckDBUdpStore(store=db)
+    service_ids = [store.add_service("user", SERVICE) for _ in range(services)]
+    for i in range(services):
+        udp_store.upsert_udp("user", f"udp-{i}", SERVICE["process"]["process_graph"])
+    store._connections.close()
+    udp_store._connections.close()
+    return service_ids
+
+
+def lookups(
+    db: str, keep_open: bool, service_ids: List[str]
+) -> Dict[str, Callable[[int], None]]:
+    """The lookups to time, on stores over `db`, given the lookup index."""
+    store = DuckDBStore(store=db, keep_open=keep_open)
+    udp_store = DuckDBUdpStore(store=db, keep_open=keep_open)
+    users = [User(user_id=f"user-{i}", email=None, name=None) for i in range(100)]
+    count = len(service_ids)
+
+    return {
+        "get_service": lambda i: store.get_service(service_ids[i % count]),
+        "get_udp": lambda i: udp_store.get_udp("user", f"udp-{i % count}"),
+        "track_user_login": lambda i: store.track_user_login(users[i % 100], "basic"),
+    }
+
+
+def time_lookup(lookup: Callable[[int], None], count: int, threads: int) -> float:
+    """Lookups per second of `lookup`, made `count` times over `threads`."""
+    per_thread = max(count // threads, 1)
+
+    def run(offset: int) -> None:
+        for i in range(per_thread):
+            lookup(offset + i)
+
+    workers = [
+        threading.Thread(target=run, args=(n * per_thread,)) for n in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.duckdb_lookups")
+    parser.add_argument("--services", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = str(Path(tmp) / "services.db")
+        service_ids = seed(db, args.services)
+        rates: Dict[str, Dict[str, float]] = {}
+        for variant, keep_open in (("reference", False), ("pooled", True)):
+            for name, lookup in lookups(db, keep_open, service_ids).items():
+                rates.setdefault(name, {})[variant] = time_lookup(
+                    lookup, args.lookups, args.threads
+                )
+
+    for name, variants in rates.items():
+        for variant, rate in variants.items():
+            speedup = rate / variants["reference"]
+            print(
+                f"{name:<17} {variant:<10} {rate:10.1f} lookups/s  x{speedup:.2f}",
+                flush=True,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
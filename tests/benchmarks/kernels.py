@@ -0,0 +1,210 @@
+"""Micro-benchmarks of numeric hot paths, against the code they replaced.
+
+Each kernel builds its inputs for a destination grid of ``size`` x ``size``
+pixels and returns the variants to time, ``reference`` being the earlier
+implementation kept here for comparison. Prints the median time per variant
+and its speed-up over ``reference``::
+
+    python -m tests.benchmarks.kernels [--only NAME ...] [--size N ...]
+                                       [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from titiler.openeo.sar.annotation import Grid2D, NoiseLUT, _AzimuthBlock, parse_noise
+from titiler.openeo.sar.calibration import calibrate
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "sar"
+
+Variants = Dict[str, Callable[[], Any]]
+
+
+def reference_interp(
+    grid: Grid2D, name: str, line: np.ndarray, pixel: np.ndarray
+) -> np.ndarray:
+    """`Grid2D.interp` before the fused fast path: searchsorted + full blend."""
+    v = grid.values[name]
+    li = np.clip(np.searchsorted(grid.lines, line) - 1, 0, len(grid.lines) - 2)
+    pi = np.clip(np.searchsorted(grid.pixels, pixel) - 1, 0, len(grid.pixels) - 2)
+
+    l0, l1 = grid.lines[li], grid.lines[li + 1]
+    p0, p1 = grid.pixels[pi], grid.pixels[pi + 1]
+    tl = np.clip((line - l0) / np.maximum(l1 - l0, 1e-9), 0, 1)
+    tp = np.clip((pixel - p0) / np.maximum(p1 - p0, 1e-9), 0, 1)
+
+    v00, v01 = v[li, pi], v[li, pi + 1]
+    v10, v11 = v[li + 1, pi], v[li + 1, pi + 1]
+    return (
+        v00 * (1 - tl) * (1 - tp)
+        + v01 * (1 - tl) * tp
+        + v10 * tl * (1 - tp)
+        + v11 * tl * tp
+    )
+
+
+def reference_noise(noise: NoiseLUT, line: np.ndarray, pixel: np.ndarray) -> np.ndarray:
+    """`NoiseLUT.evaluate` before vectorisation: one masked pass per azimuth block."""
+    values = noise.range_grid.interp("noiseRangeLut", line, pixel)
+    scale = np.ones_like(values)
+    for blk in noise.azimuth_blocks:
+        sel = (
+            (line >= blk.first_line)
+            & (line <= blk.last_line)
+            & (pixel >= blk.first_sample)
+            & (pixel <= blk.last_sample)
+        )
+        if not sel.any():
+            continue
+        scale[sel] = np.interp(line[sel], blk.lines, blk.lut)
+    return values * scale
+
+
+def reference_calibrate(
+    dn: np.ndarray, a: np.ndarray, eta: np.ndarray
+) -> Tuple[np.ndarray, int]:
+    """`calibrate` before the in-place path: float64 with a temporary per step."""
+    valid_mask = dn > 0
+    power = dn.astype("f8") ** 2
+    negative = (power - eta) < 0
+    power = np.maximum(power - eta, 0.0)
+    negative_count = int(np.count_nonzero(negative & valid_mask))
+    return power / (a.astype("f8") ** 2), negative_count
+
+
+def calibration_grid(seed: int = 0) -> Grid2D:
+    """An IW GRDH-shaped calibration grid: 27 azimuth lines x 626 range samples."""
+    rng = np.random.default_rng(seed)
+    lines = np.r_[0.0, np.sort(rng.uniform(1, 16000, 25)), 16700.0]
+    pixels = np.r_[np.arange(0.0, 25000.0, 40.0), 25012.0]
+    values = 500 + 200 * np.sin(pixels / 4000)[np.newaxis, :] + lines[:, None] / 400
+    return Grid2D(lines, pixels, {"sigmaNought": values})
+
+
+def inverse_map(size: int) -> Dict[str, np.ndarray]:
+    """A smooth, slightly rotated inverse map covering a quarter of the scene."""
+    rows, cols = np.mgrid[0:size, 0:size] * (4096 / size)
+    return {
+        "line": 6000 + rows * 1.9 + cols * 0.3,
+        "pixel": 9000 + cols * 2.4 - rows * 0.2,
+    }
+
+
+def grid2d_interp(size: int) -> Variants:
+    grid = calibration_grid()
+    coords = inverse_map(size)
+    line32 = coords["line"].astype("float32")
+    pixel32 = coords["pixel"].astype("float32")
+    return {
+        "reference": lambda: reference_interp(grid, "sigmaNought", **coords),
+        "float64": lambda: grid.interp("sigmaNought", **coords),
+        "float32": lambda: grid.interp("sigmaNought", line32, pixel32),
+    }
+
+
+def noise_lut(swaths: int = 5, bursts: int = 10, seed: int = 0) -> NoiseLUT:
+    """An EW-shaped noise annotation: `swaths` x `bursts` azimuth blocks."""
+    rng = np.random.default_rng(seed)
+    template = parse_noise((FIXTURES / "noise_ipf290.xml").read_bytes())
+    line_edges = np.linspace(0, 21000, bursts + 1).round()
+    sample_edges = np.linspace(0, 25000, swaths + 1).round()
+    blocks = []
+    for s in range(swaths):
+        for b in range(bursts):
+            lines = np.linspace(line_edges[b], line_edges[b + 1], 8)
+            blocks.append(
+                _AzimuthBlock(
+                    first_line=line_edges[b],
+                    last_line=line_edges[b + 1] - 1,
+                    first_sample=sample_edges[s],
+                    last_sample=sample_edges[s + 1] - 1,
+                    lines=lines,
+                    lut=rng.uniform(0.8, 1.2, lines.size),
+                )
+            )
+    return NoiseLUT(template.range_grid, blocks)
+
+
+def noise_evaluate(size: int) -> Variants:
+    # The IPF 2.90 fixture's five overlapping IW blocks, and 50 EW-like
+    # ones, over the whole scene.
+    iw = parse_noise((FIXTURES / "noise_ipf290.xml").read_bytes())
+    ew = noise_lut()
+    rows, cols = np.mgrid[0:size, 0:size] * (1 / size)
+    line = rows * 21681 + cols * 100
+    pixel = cols * 25506 - rows * 100
+    return {
+        "reference": lambda: reference_noise(iw, line, pixel),
+        "vectorised": lambda: iw.evaluate(line, pixel),
+        "reference_50": lambda: reference_noise(ew, line, pixel),
+        "vectorised_50": lambda: ew.evaluate(line, pixel),
+    }
+
+
+def sar_calibrate(size: int) -> Variants:
+    rng = np.random.default_rng(0)
+    dn = rng.integers(0, 4000, (size, size), dtype="uint16")
+    a = rng.uniform(200, 700, (size, size)).astype("f4")
+    eta = rng.uniform(0, 1e5, (size, size)).astype("f4")
+    return {
+        "reference": lambda: reference_calibrate(dn, a, eta),
+        "float64": lambda: calibrate(dn, a=a, eta=eta),
+        "float32": lambda: calibrate(dn, a=a, eta=eta, dtype="f4"),
+    }
+
+
+KERNELS: Dict[str, Callable[[int], Variants]] = {
+    "grid2d_interp": grid2d_interp,
+    "noise_evaluate": noise_evaluate,
+    "sar_calibrate": sar_calibrate,
+}
+
+
+def time_kernel(variants: Variants, repeat: int) -> Dict[str, float]:
+    """Median seconds per variant, after one warm-up call each."""
+    medians = {}
+    for name, func in variants.items():
+        func()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        medians[name] = statistics.median(times)
+    return medians
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.kernels")
+    parser.add_argument("--only", nargs="+", metavar="NAME", choices=sorted(KERNELS))
+    parser.add_argument("--size", nargs="+", type=int, default=[256, 2048])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name in args.only or list(KERNELS):
+        for size in args.size:
+            medians = time_kernel(KERNELS[name](size), args.repeat)
+            for variant, seconds in medians.items():
+                # "vectorised_50" compares against "reference_50", and so on.
+                suffix = variant.partition("_")[2]
+                reference = medians.get(
+                    f"reference_{suffix}" if suffix else "reference"
+                )
+                speedup = f"  x{reference / seconds:.2f}" if reference else ""
+                print(
+                    f"{name:<16} {size:>5}² {variant:<10}"
+                    f" {seconds * 1000:9.2f} ms{speedup}",
+                    flush=True,
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Micro-benchmark of writes to the local JSON stores.
+
+A store file is seeded with ``--services`` services, then ``--writes``
+services are updated through `LocalServiceStore`, which appends each change
+to the journal, and through the earlier behaviour of re-reading and
+rewriting the whole file on every change. Prints writes per second of both,
+and how long loading the store (replaying the journal) takes::
+
+    python -m tests.benchmarks.local_writes [--services N] [--writes N]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from titiler.openeo.services.local import LocalServiceStore, _json_default
+
+from .duckdb_lookups import SERVICE
+
+
+def seed(path: str, services: int) -> List[str]:
+    """Write a store file with `services` services, returning their ids."""
+    data = {
+        str(uuid.uuid4()): {"user_id": "user", "service": dict(SERVICE)}
+        for _ in range(services)
+    }
+    Path(path).write_text(json.dumps({"services": data, "udp_definitions": {}}))
+    return list(data)
+
+
+def reference_update(path: str) -> Callable[[str, int], None]:
+    """`update_service` before the journal: rewrite the whole file."""
+
+    def update(service_id: str, value: int) -> None:
+        with open(path) as f:
+            data = json.load(f)
+        data["services"][service_id]["service"]["title"] = f"NDVI {value}"
+        with open(path, "w") as f:
+            json.dump(data, f, default=_json_default)
+
+    return update
+
+
+def journal_update(path: str) -> Callable[[str, int], None]:
+    """`update_service` of a `LocalServiceStore` over `path`."""
+    store = LocalServiceStore(store={}, path=path)
+
+    def update(service_id: str, value: int) -> None:
+        store.update_service("user", service_id, {"title": f"NDVI {value}"})
+
+    return update
+
+
+def time_writes(
+    update: Callable[[str, int], None], service_ids: List[str], writes: int
+) -> float:
+    """Writes per second of `update`, made `writes` times."""
+    start = time.perf_counter()
+    for i in range(writes):
+        update(service_ids[i % len(service_ids)], i)
+    return writes / (time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.local_writes")
+    parser.add_argument("--services", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rates: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, variant in (
+            ("reference", reference_update),
+            ("journal", journal_update),
+        ):
+            path = str(Path(tmp) / f"{name}.json")
+            service_ids = seed(path, args.services)
+            rates[name] = time_writes(variant(path), service_ids, args.writes)
+
+        start = time.perf_counter()
+        LocalServiceStore(store={}, path=str(Path(tmp) / "journal.json"))
+        load = time.perf_counter() - start
+
+    for name, rate in rates.items():
+        speedup = rate / rates["reference"]
+        print(f"{name:<10} {rate:10.1f} writes/s  x{speedup:.2f}", flush=True)
+    print(f"load       {1000 * load:10.1f} ms", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
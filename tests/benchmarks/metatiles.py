@@ -0,0 +1,118 @@
+"""Micro-benchmark of metatile rendering against tile-by-tile rendering.
+
+Renders the NDVI tile graph of :mod:`.scenarios` over a block of
+``--size`` x ``--size`` web-mercator tiles of the synthetic catalogue, once
+tile by tile and once as one metatile split into its tiles by
+``save_result``, and prints tiles per second of both::
+
+    python -m tests.benchmarks.metatiles [--scale tiny|default] [--size N ...]
+"""
+
+import argparse
+import copy
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import morecantile
+from openeo_pg_parser_networkx.process_registry import ProcessRegistry
+
+from titiler.openeo.metatile import Metatile, split_registry
+
+from .catalogue import SCALES, generate_catalogue
+from .run import BENCHMARK_DIR
+from .scenarios import build_registry, ndvi_tile, run_graph
+from .stac_server import StacServer
+
+TMS = morecantile.tms.get("WebMercatorQuad")
+
+
+def block_within(bbox: List[float], size: int) -> Metatile:
+    """The lowest-zoom block of `size` x `size` tiles at the centre of `bbox`
+    inside it."""
+    lon = (bbox[0] + bbox[2]) / 2
+    lat = (bbox[1] + bbox[3]) / 2
+    for zoom in range(6, 20):
+        metatile = Metatile.around(TMS, TMS.tile(lon, lat, zoom), size, 256)
+        if metatile.cols < size or metatile.rows < size:
+            continue
+        west, south = TMS.lnglat(*metatile.bounds[:2])
+        east, north = TMS.lnglat(*metatile.bounds[2:])
+        if (
+            west >= bbox[0]
+            and south >= bbox[1]
+            and east <= bbox[2]
+            and north <= bbox[3]
+        ):
+            return metatile
+    raise ValueError(f"No block of {size}x{size} tiles fits within {bbox}")
+
+
+def graph_over(
+    template: Dict[str, Any], bounds: Any, width: int, height: int
+) -> Dict[str, Any]:
+    """`template` loading `bounds` (EPSG:3857) at `width` x `height`."""
+    graph = copy.deepcopy(template)
+    west, south, east, north = bounds
+    graph["load"]["arguments"].update(
+        spatial_extent={
+            "west": west,
+            "south": south,
+            "east": east,
+            "north": north,
+            "crs": 3857,
+        },
+        width=width,
+        height=height,
+    )
+    return graph
+
+
+def renderers(
+    template: Dict[str, Any], registry: ProcessRegistry, metatile: Metatile
+) -> Dict[str, Callable[[], int]]:
+    """Ways of rendering every tile of `metatile`, returning the tile count."""
+
+    def tile_by_tile() -> int:
+        for tile in metatile.tiles:
+            run_graph(graph_over(template, TMS.xy_bounds(tile), 256, 256), registry)
+        return len(metatile.tiles)
+
+    def block() -> int:
+        graph = graph_over(template, metatile.bounds, metatile.width, metatile.height)
+        return len(run_graph(graph, split_registry(registry, metatile)))
+
+    return {"tile by tile": tile_by_tile, "metatile": block}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.metatiles")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+    parser.add_argument("--size", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    root = BENCHMARK_DIR / "data" / args.scale
+    catalogue = generate_catalogue(root, SCALES[args.scale])
+    template = ndvi_tile(catalogue)
+    with StacServer(root) as server:
+        registry = build_registry(server.url)
+        for size in args.size:
+            metatile = block_within(catalogue["optical_bbox"], size)
+            for name, render in renderers(template, registry, metatile).items():
+                rates = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    tiles = render()
+                    rates.append(tiles / (time.perf_counter() - start))
+                print(
+                    f"{size}x{size} {name:<13} {statistics.median(rates):8.1f} tiles/s",
+                    flush=True,
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
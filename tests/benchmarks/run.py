@@ -0,0 +1,235 @@
+"""Run the benchmark suite and compare against earlier commits.
+
+Each scenario runs in a fresh (spawned) interpreter so its peak RSS is its own,
+and is evaluated ``--repeat`` times after one warm-up run. Results are written
+to ``.benchmarks/results/<commit>.json``; ``--compare REF`` loads the results
+recorded for ``REF`` (any git revision; ``REF-dirty`` for a run made from an
+uncommitted tree) and exits non-zero when a scenario got
+slower, or grew its peak RSS, by more than ``--threshold``.
+
+::
+
+    python -m tests.benchmarks.run [--scale tiny|default] [--only NAME ...]
+                                   [--repeat N] [--compare REF] [--threshold 0.2]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .catalogue import SCALES, generate_catalogue
+from .stac_server import StacServer
+
+BENCHMARK_DIR = Path(".benchmarks")
+
+# The catalogue can hold more items per query than the production default.
+_WORKER_ENV = {"TITILER_OPENEO_PROCESSING_MAX_ITEMS": "1000"}
+
+
+def _max_rss() -> int:
+    """Peak resident set size of this process, in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _run_scenario(
+    name: str, catalogue: Dict[str, Any], stac_url: str, repeat: int
+) -> Dict[str, Any]:
+    """Time one scenario; runs in a spawned worker process."""
+    os.environ.update(_WORKER_ENV)
+    # Imported here: settings are read at import time, after the env above.
+    from .scenarios import SCENARIOS, build_registry, run_graph
+
+    registry = build_registry(stac_url)
+    process_graph = SCENARIOS[name](catalogue)
+    baseline_rss = _max_rss()
+
+    start = time.perf_counter()
+    result = run_graph(process_graph, registry)
+    first = time.perf_counter() - start
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_graph(process_graph, registry)
+        times.append(time.perf_counter() - start)
+
+    peak_rss = _max_rss()
+    return {
+        "first_seconds": first,
+        "seconds": times,
+        "median_seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "peak_rss_bytes": peak_rss,
+        "peak_rss_delta_bytes": peak_rss - baseline_rss,
+        "output_bytes": len(getattr(result, "data", b"")),
+    }
+
+
+def run_suite(
+    scale: str,
+    names: List[str],
+    repeat: int,
+    data_dir: Path,
+) -> Dict[str, Dict[str, Any]]:
+    """Run ``names`` against a catalogue of ``scale``; one worker per scenario."""
+    root = data_dir / scale
+    catalogue = generate_catalogue(root, SCALES[scale])
+    results = {}
+    with StacServer(root) as server:
+        for name in names:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                results[name] = pool.submit(
+                    _run_scenario, name, catalogue, server.url, repeat
+                ).result()
+            print(_format_result(name, results[name]), flush=True)
+    return results
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[Dict[str, Any]]:
+    """Per-scenario ratios (current / baseline) of median time and RSS growth.
+
+    RSS is compared on ``peak_rss_delta_bytes`` -- the growth while running the
+    graph -- as the absolute peak is dominated by the interpreter and imports.
+    Scenarios missing from either run are skipped. A row is a regression when
+    either ratio exceeds ``1 + threshold``.
+    """
+    rows = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        time_ratio = result["median_seconds"] / baseline[name]["median_seconds"]
+        rss_ratio = result["peak_rss_delta_bytes"] / max(
+            baseline[name]["peak_rss_delta_bytes"], 1
+        )
+        rows.append(
+            {
+                "name": name,
+                "time_ratio": time_ratio,
+                "rss_ratio": rss_ratio,
+                "regression": max(time_ratio, rss_ratio) > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def _format_result(name: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{name:<20} median {result['median_seconds'] * 1000:9.1f} ms"
+        f"  min {result['min_seconds'] * 1000:9.1f} ms"
+        f"  first {result['first_seconds'] * 1000:9.1f} ms"
+        f"  peak RSS {result['peak_rss_bytes'] / 2**20:8.1f} MiB"
+        f" (+{result['peak_rss_delta_bytes'] / 2**20:.1f})"
+    )
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _results_name(commit: str, dirty: bool) -> str:
+    return f"{commit}-dirty" if dirty else commit
+
+
+def _baseline_path(results_dir: Path, ref: str) -> Optional[Path]:
+    """Results recorded for git revision ``ref``.
+
+    A ``REF-dirty`` suffix selects the run recorded from an uncommitted tree on
+    top of ``REF``; a clean run is otherwise preferred over a dirty one.
+    """
+    dirty = ref.endswith("-dirty")
+    commit = _git("rev-parse", ref[: -len("-dirty")] if dirty else ref)
+    if commit is None:
+        return None
+    candidates = [_results_name(commit, True)] if dirty else [commit, f"{commit}-dirty"]
+    for name in candidates:
+        path = results_dir / f"{name}.json"
+        if path.exists():
+            return path
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.run")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+    parser.add_argument("--only", nargs="+", metavar="NAME")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compare", metavar="REF")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--output-dir", type=Path, default=BENCHMARK_DIR)
+    args = parser.parse_args(argv)
+
+    from .scenarios import SCENARIOS
+
+    names = args.only or list(SCENARIOS)
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    commit = _git("rev-parse", "HEAD") or "unknown"
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    results = run_suite(args.scale, names, args.repeat, args.output_dir / "data")
+
+    results_dir = args.output_dir / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    record = {
+        "commit": commit,
+        "dirty": dirty,
+        "scale": args.scale,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    output = results_dir / f"{_results_name(commit, dirty)}.json"
+    output.write_text(json.dumps(record, indent=2))
+    print(f"results written to {output}")
+
+    if not args.compare:
+        return 0
+
+    baseline_path = _baseline_path(results_dir, args.compare)
+    if baseline_path is None:
+        print(f"no recorded results for {args.compare!r}", file=sys.stderr)
+        return 2
+    print(f"comparing against {baseline_path}")
+    baseline = json.loads(baseline_path.read_text())
+    if baseline["scale"] != args.scale:
+        print(
+            f"{args.compare!r} was recorded at scale {baseline['scale']!r}",
+            file=sys.stderr,
+        )
+        return 2
+
+    rows = compare(baseline["results"], results, args.threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<20} time x{row['time_ratio']:.2f}"
+            f"  RSS growth x{row['rss_ratio']:.2f}{flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Benchmarked process graphs.
+
+Each scenario builds an openEO process graph over the synthetic catalogue
+(:mod:`.catalogue`) and evaluates it the way ``EndpointsFactory`` does --
+reader-requirement planning, the reference-counted results cache and the
+per-request memory budget -- down to the encoded ``save_result`` bytes.
+
+========================== ==================================================
+``ndvi_tile``              one 256x256 XYZ tile: NDVI over a two-item mosaic,
+                           scaled to bytes, PNG
+``aggregate_temporal``     a year of NDVI aggregated to monthly means, GTiff
+``median_composite``       per-pixel median over a year of red/NIR, GTiff
+``aggregate_spatial``      mean NDVI per polygon for ``n_polygons`` polygons
+                           (1000 at the default scale), CSV
+``sar_backscatter``        sigma0 with thermal noise removal over GCP-warped
+                           SAR rasters and HTTP-fetched annotations, GTiff
+========================== ==================================================
+"""
+
+import copy
+import math
+from typing import Any, Callable, Dict, List
+
+import morecantile
+from openeo_pg_parser_networkx.graph import OpenEOProcessGraph
+from openeo_pg_parser_networkx.process_registry import Process, ProcessRegistry
+
+from titiler.openeo.memory_budget import request_memory_budget
+from titiler.openeo.processes import PROCESS_SPECIFICATIONS, process_registry
+from titiler.openeo.reader_requirements import plan_process_registry
+from titiler.openeo.results_cache import make_results_cache
+from titiler.openeo.stacapi import LoadCollection, stacApiBackend
+
+from .catalogue import OPTICAL_COLLECTION, SAR_COLLECTION
+
+_YEAR = ["2023-01-01T00:00:00Z", "2024-01-01T00:00:00Z"]
+
+
+def build_registry(stac_url: str) -> ProcessRegistry:
+    """The app's process registry, with ``load_collection`` bound to ``stac_url``.
+
+    A copy: the module-level registry the app (and the test suite) uses is left
+    untouched.
+    """
+    registry = copy.copy(process_registry)
+    registry.store = {ns: dict(procs) for ns, procs in process_registry.store.items()}
+    registry["load_collection"] = Process(
+        spec=PROCESS_SPECIFICATIONS["load_collection"],
+        implementation=LoadCollection(stacApiBackend(stac_url)).load_collection,
+    )
+    return registry
+
+
+def run_graph(process_graph: Dict[str, Any], registry: ProcessRegistry) -> Any:
+    """Evaluate ``process_graph`` as the /result endpoint does."""
+    with request_memory_budget():
+        parsed_graph = OpenEOProcessGraph(pg_data={"process_graph": process_graph})
+        results_cache = make_results_cache(parsed_graph)
+        per_request = plan_process_registry(parsed_graph, registry)
+        pg_callable = parsed_graph.to_callable(
+            process_registry=per_request, results_cache=results_cache
+        )
+        return pg_callable(named_parameters={})
+
+
+def _extent(bbox: List[float], crs: int = 4326) -> Dict[str, Any]:
+    west, south, east, north = bbox
+    return {"west": west, "south": south, "east": east, "north": north, "crs": crs}
+
+
+def _load(
+    collection: str,
+    spatial_extent: Dict[str, Any],
+    temporal_extent: List[str],
+    bands: List[str],
+    size: int,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    return {
+        "process_id": "load_collection",
+        "arguments": {
+            "id": collection,
+            "spatial_extent": spatial_extent,
+            "temporal_extent": temporal_extent,
+            "bands": bands,
+            "width": size,
+            "height": size,
+            **kwargs,
+        },
+    }
+
+
+def _reducer(process_id: str) -> Dict[str, Any]:
+    return {
+        "process_graph": {
+            "r": {
+                "process_id": process_id,
+                "arguments": {"data": {"from_parameter": "data"}},
+                "result": True,
+            }
+        }
+    }
+
+
+def _ndvi(source: str) -> Dict[str, Any]:
+    return {
+        "process_id": "ndvi",
+        "arguments": {"data": {"from_node": source}, "nir": "B08", "red": "B04"},
+    }
+
+
+def _save(source: str, format: str) -> Dict[str, Any]:
+    return {
+        "process_id": "save_result",
+        "arguments": {"data": {"from_node": source}, "format": format},
+        "result": True,
+    }
+
+
+def _tile_within(bbox: List[float]) -> morecantile.Tile:
+    """The lowest-zoom web-mercator tile at the centre of ``bbox`` inside it."""
+    tms = morecantile.tms.get("WebMercatorQuad")
+    lon = (bbox[0] + bbox[2]) / 2
+    lat = (bbox[1] + bbox[3]) / 2
+    for zoom in range(6, 20):
+        tile = tms.tile(lon, lat, zoom)
+        west, south, east, north = tms.bounds(tile)
+        if (
+            west >= bbox[0]
+            and south >= bbox[1]
+            and east <= bbox[2]
+            and north <= bbox[3]
+        ):
+            return tile
+    raise ValueError(f"No tile fits within {bbox}")
+
+
+def ndvi_tile(catalogue: Dict[str, Any]) -> Dict[str, Any]:
+    """One XYZ tile, shaped as the tile endpoint rewrites a service graph."""
+    tms = morecantile.tms.get("WebMercatorQuad")
+    tile = _tile_within(catalogue["optical_bbox"])
+    first_date = min(
+        item["properties"]["datetime"][:10]
+        for item in catalogue["items"]
+        if item["collection"] == OPTICAL_COLLECTION
+    )
+    return {
+        "load": _load(
+            OPTICAL_COLLECTION,
+            _extent(list(tms.xy_bounds(tile)), crs=3857),
+            [first_date, f"{first_date}T23:59:59Z"],
+            ["B04", "B08"],
+            256,
+            target_crs=3857,
+        ),
+        "ndvi": _ndvi("load"),
+        "scale": {
+            "process_id": "apply",
+            "arguments": {
+                "data": {"from_node": "ndvi"},
+                "process": {
+                    "process_graph": {
+                        "lsr": {
+                            "process_id": "linear_scale_range",
+                            "arguments": {
+                                "x": {"from_parameter": "x"},
+                                "inputMin": -1,
+                                "inputMax": 1,
+                                "outputMin": 0,
+                                "outputMax": 255,
+                            },
+                            "result": True,
+                        }
+                    }
+                },
+            },
+        },
+        "save": _save("scale", "PNG"),
+    }
+
+
+def aggregate_temporal(catalogue: Dict[str, Any]) -> Dict[str, Any]:
+    """A year of NDVI aggregated to monthly means."""
+    intervals = [
+        [f"2023-{month:02d}-01", f"{2023 + month // 12}-{month % 12 + 1:02d}-01"]
+        for month in range(1, 13)
+    ]
+    return {
+        "load": _load(
+            OPTICAL_COLLECTION,
+            _extent(catalogue["optical_bbox"]),
+            _YEAR,
+            ["B04", "B08"],
+            catalogue["scale"]["output_size"],
+        ),
+        "ndvi": _ndvi("load"),
+        "monthly": {
+            "process_id": "aggregate_temporal",
+            "arguments": {
+                "data": {"from_node": "ndvi"},
+                "intervals": intervals,
+                "reducer": _reducer("mean"),
+            },
+        },
+        "save": _save("monthly", "GTiff"),
+    }
+
+
+def median_composite(catalogue: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-pixel median of a year of red/NIR."""
+    return {
+        "load": _load(
+            OPTICAL_COLLECTION,
+            _extent(catalogue["optical_bbox"]),
+            _YEAR,
+            ["B04", "B08"],
+            catalogue["scale"]["output_size"],
+        ),
+        "median": {
+            "process_id": "reduce_dimension",
+            "arguments": {
+                "data": {"from_node": "load"},
+                "dimension": "t",
+                "reducer": _reducer("median"),
+            },
+        },
+        "save": _save("median", "GTiff"),
+    }
+
+
+def polygons(bbox: List[float], count: int) -> Dict[str, Any]:
+    """``count`` small square polygons on a regular grid over ``bbox``."""
+    west, south, east, north = bbox
+    cols = math.ceil(math.sqrt(count * (east - west) / (north - south)))
+    rows = math.ceil(count / cols)
+    dx, dy = (east - west) / cols, (north - south) / rows
+    features = []
+    for index in range(count):
+        row, col = divmod(index, cols)
+        x0, y0 = west + col * dx + dx / 4, south + row * dy + dy / 4
+        x1, y1 = x0 + dx / 2, y0 + dy / 2
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {"id": index},
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]],
+                },
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def aggregate_spatial(catalogue: Dict[str, Any]) -> Dict[str, Any]:
+    """Mean NDVI of a quarter per polygon."""
+    return {
+        "load": _load(
+            OPTICAL_COLLECTION,
+            _extent(catalogue["optical_bbox"]),
+            ["2023-01-01T00:00:00Z", "2023-04-01T00:00:00Z"],
+            ["B04", "B08"],
+            catalogue["scale"]["output_size"],
+        ),
+        "ndvi": _ndvi("load"),
+        "mean": {
+            "process_id": "reduce_dimension",
+            "arguments": {
+                "data": {"from_node": "ndvi"},
+                "dimension": "t",
+                "reducer": _reducer("mean"),
+            },
+        },
+        "stats": {
+            "process_id": "aggregate_spatial",
+            "arguments": {
+                "data": {"from_node": "mean"},
+                "geometries": polygons(
+                    catalogue["optical_bbox"], catalogue["scale"]["n_polygons"]
+                ),
+                "reducer": _reducer("mean"),
+            },
+        },
+        "save": _save("stats", "CSV"),
+    }
+
+
+def sar_backscatter(catalogue: Dict[str, Any]) -> Dict[str, Any]:
+    """Mean sigma0 (noise removed) over every SAR acquisition."""
+    return {
+        "load": _load(
+            SAR_COLLECTION,
+            _extent(catalogue["sar_bbox"]),
+            _YEAR,
+            ["vv"],
+            catalogue["scale"]["output_size"],
+        ),
+        "sigma0": {
+            "process_id": "sar_backscatter",
+            "arguments": {
+                "data": {"from_node": "load"},
+                "coefficient": "sigma0-ellipsoid",
+                "noise_removal": True,
+            },
+        },
+        "mean": {
+            "process_id": "reduce_dimension",
+            "arguments": {
+                "data": {"from_node": "sigma0"},
+                "dimension": "t",
+                "reducer": _reducer("mean"),
+            },
+        },
+        "save": _save("mean", "GTiff"),
+    }
+
+
+SCENARIOS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "ndvi_tile": ndvi_tile,
+    "aggregate_temporal": aggregate_temporal,
+    "median_composite": median_composite,
+    "aggregate_spatial": aggregate_spatial,
+    "sar_backscatter": sar_backscatter,
+}
@@ -0,0 +1,111 @@
+"""Micro-benchmark of service listings on each store backend.
+
+Seeds ``--services`` services of one user into a DuckDB, a SQLite
+(SQLAlchemy) and a local JSON store, then times listing all of them with
+their process graphs, as `GET /services` did, against one page of
+``--limit`` summaries from the start and from the middle of the listing::
+
+    python -m tests.benchmarks.service_listing [--services N] [--limit N]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from titiler.openeo.services.base import ServicesStore
+from titiler.openeo.services.duckdb import DuckDBStore
+from titiler.openeo.services.local import LocalServiceStore
+from titiler.openeo.services.sqlalchemy import Service, SQLAlchemyStore
+
+from .duckdb_lookups import SERVICE
+
+
+def seed(directory: Path, services: int) -> Dict[str, ServicesStore]:
+    """Create a store of each backend holding `services` services."""
+    rows = [(str(uuid.uuid4()), "user", SERVICE) for _ in range(services)]
+
+    duckdb_store = DuckDBStore(store=str(directory / "services.db"))
+    with duckdb_store._connections.cursor(write=True) as con:
+        con.executemany(
+            "INSERT INTO services VALUES (?, ?, ?)",
+            [(id_, user, json.dumps(service)) for id_, user, service in rows],
+        )
+
+    sqlalchemy_store = SQLAlchemyStore(
+        store=f"sqlite:///{directory / 'services.sqlite'}"
+    )
+    with sqlalchemy_store._engine.begin() as con:
+        con.execute(
+            insert(Service),
+            [
+                {"service_id": id_, "user_id": user, "service": service}
+                for id_, user, service in rows
+            ],
+        )
+
+    path = directory / "services.json"
+    path.write_text(
+        json.dumps(
+            {
+                "services": {
+                    id_: {"user_id": user, "service": service}
+                    for id_, user, service in rows
+                },
+                "udp_definitions": {},
+            }
+        )
+    )
+    local_store = LocalServiceStore(store={}, path=str(path))
+
+    return {
+        "duckdb": duckdb_store,
+        "sqlalchemy": sqlalchemy_store,
+        "local": local_store,
+    }
+
+
+def listings(store: ServicesStore, limit: int) -> Dict[str, Callable[[], List]]:
+    """The listings to time on `store`."""
+    ids = sorted(service["id"] for service in store.get_user_services("user"))
+    middle = store.page_token({"id": ids[len(ids) // 2]})
+    return {
+        "full": lambda: store.get_user_services("user"),
+        "first page": lambda: store.get_user_services(
+            "user", limit=limit, summary=True
+        ),
+        "middle page": lambda: store.get_user_services(
+            "user", limit=limit, after=middle, summary=True
+        ),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.service_listing")
+    parser.add_argument("--services", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend, store in seed(Path(tmp), args.services).items():
+            for name, listing in listings(store, args.limit).items():
+                start = time.perf_counter()
+                count = len(listing())
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{backend:<11} {name:<12} {count:>7} services"
+                    f"  {1000 * elapsed:10.1f} ms",
+                    flush=True,
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
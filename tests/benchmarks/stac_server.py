@@ -0,0 +1,281 @@
+"""Local stand-in STAC API for the benchmark suite.
+
+Serves a catalogue written by :mod:`.catalogue` over HTTP, with just enough of
+the STAC API for ``pystac_client`` and ``stacApiBackend``: the landing page,
+``/conformance``, ``/collections[/{id}]`` and ``/search`` (GET and POST, with
+``collections``/``ids``/``bbox``/``datetime``/``limit`` and token paging).
+``filter`` and ``fields`` are accepted and ignored.
+
+Annotation XML is served from ``/files/`` and fetched over HTTP like in
+production; raster assets are handed out as local paths, so read timings are
+not dominated by this server.
+"""
+
+import copy
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .catalogue import load_catalogue
+
+_CONFORMANCE = [
+    "https://api.stacspec.org/v1.0.0/core",
+    "https://api.stacspec.org/v1.0.0/collections",
+    "https://api.stacspec.org/v1.0.0/item-search",
+    "https://api.stacspec.org/v1.0.0/item-search#fields",
+    "https://api.stacspec.org/v1.0.0/item-search#filter",
+    "http://www.opengis.net/spec/ogcapi-features-1/1.0/conf/core",
+    "http://www.opengis.net/spec/ogcapi-features-3/1.0/conf/filtering",
+    "http://www.opengis.net/spec/cql2/1.0/conf/cql2-json",
+]
+
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    if value in ("", ".."):
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _datetime_range(
+    value: Optional[str],
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    if not value:
+        return None, None
+    if "/" not in value:
+        instant = _parse_datetime(value)
+        return instant, instant
+    start, end = value.split("/", 1)
+    return _parse_datetime(start), _parse_datetime(end)
+
+
+class StacServer:
+    """A threaded HTTP server over one synthetic catalogue."""
+
+    def __init__(self, root: Path, host: str = "127.0.0.1", port: int = 0):
+        """Load the catalogue under ``root`` and bind (port 0: any free port)."""
+        self.root = Path(root).resolve()
+        catalogue = load_catalogue(self.root)
+        self.collections = {c["id"]: c for c in catalogue["collections"]}
+        # Newest first, like most STAC APIs.
+        self.items = sorted(
+            catalogue["items"],
+            key=lambda item: item["properties"]["datetime"],
+            reverse=True,
+        )
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.stac = self  # type: ignore[attr-defined]
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the API."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StacServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StacServer":
+        """Start serving."""
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        """Stop serving."""
+        self.stop()
+
+    def search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an item search; ``params`` as in a POST /search body."""
+        collections = params.get("collections")
+        ids = params.get("ids")
+        bbox = params.get("bbox")
+        start, end = _datetime_range(params.get("datetime"))
+        limit = int(params.get("limit") or 10)
+        offset = int(params.get("token") or 0)
+
+        matched = []
+        for item in self.items:
+            if collections and item["collection"] not in collections:
+                continue
+            if ids and item["id"] not in ids:
+                continue
+            if bbox and not _intersects(item["bbox"], bbox):
+                continue
+            date = _parse_datetime(item["properties"]["datetime"])
+            if start and date < start:
+                continue
+            if end and date > end:
+                continue
+            matched.append(item)
+
+        page = matched[offset : offset + limit]
+        links = []
+        if offset + limit < len(matched):
+            links.append(
+                {
+                    "rel": "next",
+                    "href": f"{self.url}/search",
+                    "method": "POST",
+                    "type": "application/geo+json",
+                    "body": {**params, "token": str(offset + limit)},
+                }
+            )
+        return {
+            "type": "FeatureCollection",
+            "features": [self._resolve(item) for item in page],
+            "numberMatched": len(matched),
+            "numberReturned": len(page),
+            "links": links,
+        }
+
+    def _resolve(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        item = copy.deepcopy(item)
+        for asset in item["assets"].values():
+            if asset.get("type") == "application/xml":
+                asset["href"] = f"{self.url}/files/{asset['href']}"
+            else:
+                # No `self` link on items: pystac would resolve these absolute
+                # paths against it, turning them into URLs on this server.
+                asset["href"] = str(self.root / asset["href"])
+        return item
+
+    def _landing(self) -> Dict[str, Any]:
+        return {
+            "type": "Catalog",
+            "stac_version": "1.0.0",
+            "id": "titiler-openeo-benchmarks",
+            "description": "Synthetic catalogue for the benchmark suite",
+            "conformsTo": _CONFORMANCE,
+            "links": [
+                {"rel": "self", "href": self.url, "type": "application/json"},
+                {"rel": "root", "href": self.url, "type": "application/json"},
+                {
+                    "rel": "data",
+                    "href": f"{self.url}/collections",
+                    "type": "application/json",
+                },
+                {
+                    "rel": "search",
+                    "href": f"{self.url}/search",
+                    "type": "application/geo+json",
+                    "method": "POST",
+                },
+                {
+                    "rel": "search",
+                    "href": f"{self.url}/search",
+                    "type": "application/geo+json",
+                    "method": "GET",
+                },
+            ],
+        }
+
+    def _collection(self, collection_id: str) -> Optional[Dict[str, Any]]:
+        collection = self.collections.get(collection_id)
+        if collection is None:
+            return None
+        collection = copy.deepcopy(collection)
+        collection["links"] = [
+            {"rel": "self", "href": f"{self.url}/collections/{collection_id}"},
+            {"rel": "root", "href": self.url},
+            {"rel": "items", "href": f"{self.url}/collections/{collection_id}/items"},
+        ]
+        return collection
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; ``self.server.stac`` is the owning :class:`StacServer`."""
+
+    @property
+    def stac(self) -> StacServer:
+        """The server's catalogue."""
+        return self.server.stac  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip("/")
+        if path == "":
+            return self._json(self.stac._landing())
+        if path == "/conformance":
+            return self._json({"conformsTo": _CONFORMANCE})
+        if path == "/collections":
+            return self._json(
+                {
+                    "collections": [
+                        self.stac._collection(cid) for cid in self.stac.collections
+                    ],
+                    "links": [],
+                }
+            )
+        if path.startswith("/collections/"):
+            collection = self.stac._collection(path.split("/")[2])
+            if collection is None:
+                return self._error(404)
+            return self._json(collection)
+        if path == "/search":
+            params = _search_params(parsed.query)
+            return self._json(self.stac.search(params), "application/geo+json")
+        if path.startswith("/files/"):
+            return self._file(path[len("/files/") :])
+        return self._error(404)
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path.rstrip("/") != "/search":
+            return self._error(404)
+        length = int(self.headers.get("Content-Length") or 0)
+        params = json.loads(self.rfile.read(length) or b"{}")
+        return self._json(self.stac.search(params), "application/geo+json")
+
+    def _file(self, relative: str) -> None:
+        path = (self.stac.root / relative).resolve()
+        if self.stac.root not in path.parents or not path.is_file():
+            return self._error(404)
+        self._send(path.read_bytes(), "application/xml")
+
+    def _json(self, body: Any, media_type: str = "application/json") -> None:
+        self._send(json.dumps(body).encode(), media_type)
+
+    def _error(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send(self, payload: bytes, media_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", media_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _search_params(query_string: str) -> Dict[str, Any]:
+    """GET /search query parameters, shaped as a POST body."""
+    query = {k: v[0] for k, v in parse_qs(query_string).items()}
+    params: Dict[str, Any] = dict(query)
+    for key in ("collections", "ids"):
+        if key in query:
+            params[key] = query[key].split(",")
+    if "bbox" in query:
+        params["bbox"] = [float(v) for v in query["bbox"].split(",")]
+    return params
+
+
+def _intersects(a: List[float], b: List[float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
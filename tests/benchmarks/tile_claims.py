@@ -0,0 +1,171 @@
+"""Benchmark of SQLAlchemyTileStore.claim_tile on large campaigns.
+
+A campaign of ``--tiles`` tiles (a square x/y range at one zoom) is claimed
+by ``--claimers`` concurrent threads, each making ``--claims`` claims as a
+distinct user. Reports the one-off inventory fill, claim throughput and
+latency, and checks that no tile was handed out twice. ``--reference`` also
+times the earlier implementation, which loaded every assigned tile of the
+range into Python on each claim, on the same campaign::
+
+    python -m tests.benchmarks.tile_claims [--tiles N] [--claimers N]
+                                           [--claims N] [--url URL]
+                                           [--reference]
+
+``--url`` defaults to a SQLite file in a temporary directory. Point it at a
+PostgreSQL database (``postgresql://...``) to measure ``SKIP LOCKED`` claims;
+the benchmark's service id is unique per run, so an existing database is
+left usable.
+"""
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from titiler.openeo.services.base import NoTileAvailableError
+from titiler.openeo.services.sqlalchemy_tile import SQLAlchemyTileStore, TileAssignment
+
+Claim = Callable[[str, str, int, Tuple[int, int], Tuple[int, int]], Dict[str, Any]]
+
+
+def reference_claim(
+    store: SQLAlchemyTileStore,
+    service_id: str,
+    user_id: str,
+    zoom: int,
+    x_range: Tuple[int, int],
+    y_range: Tuple[int, int],
+) -> Dict[str, Any]:
+    """`claim_tile` before the tile inventory: pick a free tile in Python."""
+    with Session(store._engine) as session:
+        assigned = session.execute(
+            select(TileAssignment.x, TileAssignment.y).where(
+                TileAssignment.service_id == service_id,
+                TileAssignment.z == zoom,
+                TileAssignment.x.between(*x_range),
+                TileAssignment.y.between(*y_range),
+            )
+        ).all()
+        assigned_coords = set(map(tuple, assigned))
+        available = [
+            (x, y)
+            for x in range(x_range[0], x_range[1] + 1)
+            for y in range(y_range[0], y_range[1] + 1)
+            if (x, y) not in assigned_coords
+        ]
+        if not available:
+            raise NoTileAvailableError(service_id, user_id)
+        x, y = random.choice(available)
+        session.add(
+            TileAssignment(
+                service_id=service_id,
+                user_id=user_id,
+                x=x,
+                y=y,
+                z=zoom,
+                stage="claimed",
+            )
+        )
+        session.commit()
+    return {"x": x, "y": y, "z": zoom}
+
+
+def run_campaign(
+    claim: Claim, tiles: int, claimers: int, claims: int
+) -> Dict[str, Any]:
+    """Claim `claimers` x `claims` tiles of a `tiles`-tile campaign."""
+    side = math.isqrt(tiles)
+    service_id = f"benchmark-{uuid.uuid4()}"
+    ranges = ((0, side - 1), (0, side - 1))
+    zoom = 18
+
+    start = time.perf_counter()
+    claim(service_id, "warm-up", zoom, *ranges)
+    first = time.perf_counter() - start
+
+    latencies: List[float] = []
+    claimed: List[Tuple[int, int]] = []
+    errors: List[BaseException] = []
+    lock = threading.Lock()
+
+    def claimer(index: int) -> None:
+        for i in range(claims):
+            start = time.perf_counter()
+            try:
+                tile = claim(service_id, f"user-{index}-{i}", zoom, *ranges)
+            except Exception as exc:  # noqa: BLE001 - reported below
+                with lock:
+                    errors.append(exc)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                claimed.append((tile["x"], tile["y"]))
+
+    threads = [threading.Thread(target=claimer, args=(i,)) for i in range(claimers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "tiles": side * side,
+        "first_claim_seconds": first,
+        "claims": len(claimed),
+        "claims_per_second": len(claimed) / elapsed if elapsed else 0.0,
+        "p50_ms": 1000 * statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": 1000 * latencies[int(0.99 * (len(latencies) - 1))]
+        if latencies
+        else 0.0,
+        "duplicates": len(claimed) - len(set(claimed)),
+        "errors": len(errors),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.tile_claims")
+    parser.add_argument("--tiles", type=int, default=1_000_000)
+    parser.add_argument("--claimers", type=int, default=8)
+    parser.add_argument("--claims", type=int, default=100)
+    parser.add_argument("--url")
+    parser.add_argument("--reference", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{Path(tmp) / 'tiles.db'}"
+        store = SQLAlchemyTileStore(url)
+        variants: Dict[str, Claim] = {"inventory": store.claim_tile}
+        if args.reference:
+            variants["reference"] = lambda *a: reference_claim(store, *a)
+
+        failed = False
+        for name, claim in variants.items():
+            result = run_campaign(claim, args.tiles, args.claimers, args.claims)
+            print(
+                f"{name:<10} {result['tiles']:>9} tiles"
+                f"  first claim {result['first_claim_seconds']:7.2f} s"
+                f"  {result['claims_per_second']:8.1f} claims/s"
+                f"  p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+                f"  duplicates {result['duplicates']}  errors {result['errors']}",
+                flush=True,
+            )
+            failed |= bool(result["duplicates"] or result["errors"])
+        store._engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
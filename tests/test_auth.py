@@ -2,9 +2,15 @@
 
 import base64
 import json
+import time
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+from fastapi.exceptions import HTTPException
 from pydantic import ValidationError
 
 from titiler.openeo.auth import AuthToken, OIDCAuth, OIDCConfig
@@ -115,3 +121,121 @@ def test_auth_token_from_token():
     assert token.method == "oidc"
     assert token.provider == "realm"
     assert token.token == "my_access_token"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _jwk(private_key, kid: str) -> dict:
+    numbers = private_key.public_key().public_numbers()
+    return {
+        "kid": kid,
+        "kty": "RSA",
+        "e": _b64(numbers.e.to_bytes(3, "big")),
+        "n": _b64(numbers.n.to_bytes(256, "big")),
+    }
+
+
+def _signed_token(private_key, kid: str, payload: dict) -> str:
+    header = _b64(json.dumps({"alg": "RS256", "kid": kid}).encode())
+    body = _b64(json.dumps(payload).encode())
+    signature = private_key.sign(
+        f"{header}.{body}".encode(), padding.PKCS1v15(), hashes.SHA256()
+    )
+    return f"{header}.{body}.{_b64(signature)}"
+
+
+@pytest.fixture(scope="module")
+def rsa_keys():
+    return [
+        rsa.generate_private_key(public_exponent=65537, key_size=2048) for _ in range(2)
+    ]
+
+
+@pytest.fixture
+def provider(rsa_keys):
+    """The JWKS an OIDC provider serves, and how often it was fetched."""
+    return SimpleNamespace(jwks={"keys": [_jwk(rsa_keys[0], "key-1")]}, fetches=0)
+
+
+@pytest.fixture
+def oidc_auth(oidc_config, provider):
+    """An OIDCAuth fetching its JWKS from `provider`."""
+    settings = Mock()
+    settings.oidc = oidc_config
+
+    def fetch_jwks(self):
+        provider.fetches += 1
+        return provider.jwks
+
+    with patch.object(OIDCAuth, "_fetch_jwks", fetch_jwks):
+        yield OIDCAuth(settings=settings, store=Mock())
+
+
+def _claims(**extra) -> dict:
+    return {"sub": "user-1", "aud": "test-client-id", **extra}
+
+
+def test_oidc_verified_tokens_are_cached_until_exp(oidc_auth, provider, rsa_keys):
+    token = _signed_token(rsa_keys[0], "key-1", _claims(exp=time.time() + 3600))
+
+    with patch.object(
+        OIDCAuth, "_verify_token", autospec=True, side_effect=OIDCAuth._verify_token
+    ) as verify:
+        for _ in range(10):
+            user = oidc_auth.validate(f"Bearer oidc/oidc/{token}")
+        assert verify.call_count == 1
+    assert user.user_id == "user-1"
+    assert provider.fetches == 1
+
+
+def test_oidc_cached_token_expires(oidc_auth, rsa_keys):
+    token = _signed_token(rsa_keys[0], "key-1", _claims(exp=time.time() + 1))
+    oidc_auth.validate(f"Bearer oidc/oidc/{token}")
+    time.sleep(1.1)
+
+    with pytest.raises(HTTPException, match="Token expired"):
+        oidc_auth.validate(f"Bearer oidc/oidc/{token}")
+
+
+def test_oidc_tampered_token_is_not_served_from_cache(oidc_auth, rsa_keys):
+    token = _signed_token(rsa_keys[0], "key-1", _claims(exp=time.time() + 3600))
+    oidc_auth.validate(f"Bearer oidc/oidc/{token}")
+
+    header, body, signature = token.split(".")
+    forged = _b64(json.dumps(_claims(sub="admin", exp=time.time() + 3600)).encode())
+    with pytest.raises(HTTPException):
+        oidc_auth.validate(f"Bearer oidc/oidc/{header}.{forged}.{signature}")
+
+
+def test_oidc_jwks_is_parsed_once(oidc_auth, provider, rsa_keys):
+    with patch("titiler.openeo.auth.RSAPublicNumbers", wraps=RSAPublicNumbers) as parse:
+        for i in range(5):
+            token = _signed_token(
+                rsa_keys[0], "key-1", _claims(exp=time.time() + 3600, jti=str(i))
+            )
+            oidc_auth.validate(f"Bearer oidc/oidc/{token}")
+    assert parse.call_count == 1
+    assert provider.fetches == 1
+
+
+def test_oidc_unknown_kid_refreshes_jwks_rate_limited(
+    oidc_auth, oidc_config, provider, rsa_keys
+):
+    oidc_auth.validate(
+        f"Bearer oidc/oidc/{_signed_token(rsa_keys[0], 'key-1', _claims())}"
+    )
+    rotated = _signed_token(rsa_keys[1], "key-2", _claims())
+
+    # The JWKS was just fetched: unknown key ids are rejected without fetching
+    # it again until the refresh interval has passed.
+    for _ in range(3):
+        with pytest.raises(HTTPException, match="Unable to find appropriate key"):
+            oidc_auth.validate(f"Bearer oidc/oidc/{rotated}")
+    assert provider.fetches == 1
+
+    provider.jwks = {"keys": [_jwk(rsa_keys[0], "key-1"), _jwk(rsa_keys[1], "key-2")]}
+    oidc_auth._jwks_fetched_at -= oidc_config.jwks_refresh_interval
+    assert oidc_auth.validate(f"Bearer oidc/oidc/{rotated}").user_id == "user-1"
+    assert provider.fetches == 2
@@ -18,6 +18,8 @@ that file uses is exactly as valid here.
 """
 
 import re
+import threading
+import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -34,11 +36,13 @@ from rio_tiler.models import ImageData
 from titiler.openeo.bandsources.readers import NoiseBandReader
 from titiler.openeo.bandsources.registry import ResolvedBand
 from titiler.openeo.errors import OutputLimitExceeded
+from titiler.openeo.processes.implementations.data_model import RasterStack
 from titiler.openeo.reader import (
     SimpleSTACReader,
     _estimate_output_dimensions,
     _get_assets_resolutions,
     _inherit_derived_band_masks,
+    prefetch_band_sources,
 )
 from titiler.openeo.sar import annotation, geocode
 
@@ -526,3 +530,71 @@ def test_two_item_slice_mosaics_band_sources_without_rejection(tmp_path):
             assert img.array.shape[0] == 2
 
     assert sorted(fetcher.calls) == sorted([noise_href_1, noise_href_2])
+
+
+# --------------------------------------------------------------------------- prefetch
+
+
+class _BarrierFetcher(_FixtureFetcher):
+    """A `_FixtureFetcher` whose fetches only return once `parties` are in flight."""
+
+    def __init__(self, mapping: Dict[str, bytes], parties: int):
+        super().__init__(mapping)
+        self._barrier = threading.Barrier(parties, timeout=10)
+
+    def fetch(self, href: str) -> bytes:
+        """Wait for every other expected fetch to start, then return."""
+        self._barrier.wait()
+        return super().fetch(href)
+
+
+def _stack(date_items: List[List[pystac.Item]], band_names: List[str]) -> RasterStack:
+    tasks = [
+        (lambda: None, {"datetime": datetime(2024, 1, day + 1), "items": items})
+        for day, items in enumerate(date_items)
+    ]
+    return RasterStack(
+        tasks=tasks,
+        timestamp_fn=lambda asset: asset["datetime"],
+        band_names=band_names,
+    )
+
+
+def test_prefetch_fetches_every_items_annotations_concurrently():
+    hrefs = {
+        f"fixture://{uuid.uuid4()}/{kind}": (FIXTURES / f"{kind}_ipf290.xml")
+        for kind in ("noise", "calibration") * 2
+    }
+    noise_a, cal_a, noise_b, cal_b = hrefs
+    fetcher = _BarrierFetcher(
+        {href: path.read_bytes() for href, path in hrefs.items()}, parties=4
+    )
+    stack = _stack(
+        [
+            [_s1_item("a.tif", noise_href=noise_a, calibration_href=cal_a)],
+            [_s1_item("b.tif", noise_href=noise_b, calibration_href=cal_b)],
+        ],
+        # Two bands from one calibration annotation: fetched once.
+        ["vv", "vv_noise_lut", "vv_sigma0_lut", "vv_dn_lut"],
+    )
+
+    futures = prefetch_band_sources(stack, fetcher=fetcher)
+    for future in futures:
+        # Raises BrokenBarrierError unless all four fetches ran at once.
+        future.result(timeout=10)
+
+    assert sorted(fetcher.calls) == sorted(hrefs)
+    annotation.get_noise(noise_a, fetcher=fetcher)
+    annotation.get_calibration(cal_b, fetcher=fetcher)
+    assert len(fetcher.calls) == 4
+
+
+def test_prefetch_skips_bands_without_a_band_source():
+    stack = _stack([[_s1_item("a.tif")]], ["vv"])
+    assert prefetch_band_sources(stack) == []
+
+
+def test_prefetch_disabled_without_workers(monkeypatch):
+    monkeypatch.setattr("titiler.openeo.reader._prefetch_executor", None)
+    stack = _stack([[_s1_item("a.tif")]], ["vv", "vv_noise_lut"])
+    assert prefetch_band_sources(stack) == []
@@ -0,0 +1,144 @@
+"""Smoke tests for the offline benchmark suite (tests/benchmarks)."""
+
+import pytest
+
+from tests.benchmarks import run
+from tests.benchmarks.catalogue import SCALES, generate_catalogue
+from tests.benchmarks.duckdb_lookups import main as duckdb_lookups
+from tests.benchmarks.kernels import KERNELS, time_kernel
+from tests.benchmarks.local_writes import main as local_writes
+from tests.benchmarks.metatiles import block_within, renderers
+from tests.benchmarks.run import compare
+from tests.benchmarks.scenarios import SCENARIOS, build_registry, ndvi_tile, run_graph
+from tests.benchmarks.service_listing import main as service_listing
+from tests.benchmarks.stac_server import StacServer
+from tests.benchmarks.tile_claims import main as tile_claims
+from titiler.openeo.processes.implementations.io import SaveResultData
+
+EXPECTED_MEDIA_TYPES = {
+    "ndvi_tile": "image/png",
+    "aggregate_temporal": "image/tiff",
+    "median_composite": "image/tiff",
+    "aggregate_spatial": "text/csv",
+    "sar_backscatter": "image/tiff",
+}
+
+
+@pytest.fixture(scope="module")
+def tiny_catalogue(tmp_path_factory):
+    """A tiny synthetic catalogue served by the stand-in STAC API."""
+    root = tmp_path_factory.mktemp("benchmark-catalogue")
+    catalogue = generate_catalogue(root, SCALES["tiny"])
+    with StacServer(root) as server:
+        yield catalogue, build_registry(server.url)
+
+
+def test_every_scenario_has_an_expectation():
+    assert set(SCENARIOS) == set(EXPECTED_MEDIA_TYPES)
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_scenario_runs(tiny_catalogue, name):
+    catalogue, registry = tiny_catalogue
+    result = run_graph(SCENARIOS[name](catalogue), registry)
+    assert isinstance(result, SaveResultData)
+    assert result.media_type == EXPECTED_MEDIA_TYPES[name]
+    assert result.data
+
+
+@pytest.mark.parametrize("name", sorted(KERNELS))
+def test_kernel_runs(name):
+    medians = time_kernel(KERNELS[name](16), repeat=1)
+    assert "reference" in medians
+
+
+def test_catalogue_generation_is_reused(tmp_path):
+    first = generate_catalogue(tmp_path, SCALES["tiny"])
+    cog = next(tmp_path.glob("optical/*.tif"))
+    mtime = cog.stat().st_mtime_ns
+    assert generate_catalogue(tmp_path, SCALES["tiny"]) == first
+    assert cog.stat().st_mtime_ns == mtime
+
+
+def test_stac_server_pages_search(tmp_path):
+    generate_catalogue(tmp_path, SCALES["tiny"])
+    with StacServer(tmp_path) as server:
+        page = server.search({"collections": ["synthetic-s2"], "limit": 4})
+        assert page["numberMatched"] == 2 * SCALES["tiny"].n_dates
+        assert page["numberReturned"] == 4
+        (next_link,) = page["links"]
+        rest = server.search(next_link["body"])
+        assert rest["numberReturned"] == page["numberMatched"] - 4
+        assert rest["links"] == []
+
+
+def test_compare_flags_regressions():
+    def result(seconds, peak, delta):
+        return {
+            "median_seconds": seconds,
+            "peak_rss_bytes": peak,
+            "peak_rss_delta_bytes": delta,
+        }
+
+    baseline = {
+        "a": result(1.0, 1000, 100),
+        "b": result(1.0, 1000, 100),
+        "gone": result(1.0, 1000, 100),
+    }
+    current = {
+        # Same absolute peak, but the graph itself now uses 50% more memory.
+        "a": result(1.1, 1000, 100),
+        "b": result(0.9, 1050, 150),
+        "new": result(1.0, 1000, 100),
+    }
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=0.2)}
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
+    assert rows["b"]["rss_ratio"] == pytest.approx(1.5)
+
+
+def test_baseline_lookup_prefers_clean_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(run, "_git", lambda *args: "abc123")
+    assert run._baseline_path(tmp_path, "main") is None
+
+    (tmp_path / "abc123-dirty.json").write_text("{}")
+    assert run._baseline_path(tmp_path, "main") == tmp_path / "abc123-dirty.json"
+    assert run._baseline_path(tmp_path, "main-dirty") == tmp_path / "abc123-dirty.json"
+
+    (tmp_path / "abc123.json").write_text("{}")
+    assert run._baseline_path(tmp_path, "main") == tmp_path / "abc123.json"
+    assert run._baseline_path(tmp_path, "main-dirty") == tmp_path / "abc123-dirty.json"
+
+
+def test_tile_claims_runs(capsys):
+    assert tile_claims(["--tiles", "400", "--claimers", "2", "--claims", "3"]) == 0
+    assert "duplicates 0  errors 0" in capsys.readouterr().out
+
+
+def test_duckdb_lookups_runs(capsys):
+    assert duckdb_lookups(["--services", "5", "--lookups", "10", "--threads", "2"]) == 0
+    output = capsys.readouterr().out
+    assert "get_service" in output and "pooled" in output
+
+
+def test_local_writes_runs(capsys):
+    assert local_writes(["--services", "20", "--writes", "10"]) == 0
+    output = capsys.readouterr().out
+    assert "journal" in output and "load" in output
+
+
+def test_service_listing_runs(capsys):
+    assert service_listing(["--services", "20", "--limit", "5"]) == 0
+    output = capsys.readouterr().out
+    assert "middle page" in output and "local" in output
+
+
+def test_metatiles_render_every_tile(tiny_catalogue):
+    catalogue, registry = tiny_catalogue
+    metatile = block_within(catalogue["optical_bbox"], 2)
+    rendered = {
+        name: render()
+        for name, render in renderers(ndvi_tile(catalogue), registry, metatile).items()
+    }
+    assert rendered == {"tile by tile": 4, "metatile": 4}
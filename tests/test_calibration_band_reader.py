@@ -14,12 +14,14 @@ measurement asset header-only, for GCPs -- never its pixels).
 
 from datetime import datetime
 from pathlib import Path
+from threading import Condition
 from typing import Dict, List, Optional
 
 import numpy as np
 import pystac
 import pytest
 import rasterio
+from cachetools import LRUCache, cached
 from rasterio.control import GroundControlPoint
 from rasterio.crs import CRS
 
@@ -260,6 +262,87 @@ def test_inverse_map_cache_does_not_leak_across_items(tmp_path, monkeypatch):
     assert len(calls) == 2
 
 
+@pytest.fixture
+def process_inverse_map_cache(monkeypatch):
+    """Enable a fresh process-wide inverse-map cache of 64 KiB."""
+    cache = LRUCache(maxsize=64 * 1024, getsizeof=geocode._inverse_map_nbytes)
+    monkeypatch.setattr(geocode._settings, "inverse_map_cache_bytes", cache.maxsize)
+    monkeypatch.setattr(
+        geocode,
+        "_cached_inverse_map",
+        cached(
+            cache,
+            key=geocode._inverse_map_key,
+            condition=Condition(),
+            info=True,
+        )(geocode._cached_inverse_map.__wrapped__),
+    )
+    return cache
+
+
+def test_process_inverse_map_cache_is_shared_across_requests(
+    tmp_path, monkeypatch, process_inverse_map_cache
+):
+    """With the process-wide cache on, repeating a tile (a new SimpleSTACReader
+    per request) reuses the map; another grid or TPS setting does not."""
+    measurement_path = tmp_path / "measurement.tif"
+    _write_measurement_gcp_tiff(measurement_path)
+    item = _s1_item(str(measurement_path))
+    fetcher = _FixtureFetcher({_CALIBRATION_HREF: _CALIBRATION_XML})
+
+    calls = []
+    real_build = geocode.build_inverse_map
+
+    def counting_build(*args, **kwargs):
+        calls.append(1)
+        return real_build(*args, **kwargs)
+
+    monkeypatch.setattr(geocode, "build_inverse_map", counting_build)
+
+    def read(size: int) -> np.ndarray:
+        with SimpleSTACReader(item, band_source_fetcher=fetcher) as src_dst:
+            return src_dst.part(
+                (0.0, 0.0, 1.0, 1.0),
+                assets=["vv_sigma0_lut"],
+                dst_crs=CRS.from_epsg(4326),
+                bounds_crs=CRS.from_epsg(4326),
+                width=size,
+                height=size,
+            ).array
+
+    first = read(4)
+    np.testing.assert_array_equal(read(4), first)
+    assert len(calls) == 1
+
+    read(8)
+    assert len(calls) == 2
+
+    monkeypatch.setattr(geocode._settings, "geocode_tolerance", 0.0)
+    read(4)
+    assert len(calls) == 3
+
+    cached_map = geocode.get_inverse_map(
+        str(measurement_path), 4, 4, (0.0, 0.0, 1.0, 1.0), CRS.from_epsg(4326)
+    )
+    assert len(calls) == 3
+    assert not cached_map.line.flags.writeable
+
+
+def test_process_inverse_map_cache_is_bounded_in_bytes(
+    tmp_path, process_inverse_map_cache
+):
+    measurement_path = tmp_path / "measurement.tif"
+    _write_measurement_gcp_tiff(measurement_path)
+
+    # 2 x 64 x 64 float64 = 64 KiB: each map fills the cache on its own.
+    for bounds in ((0.0, 0.0, 1.0, 1.0), (0.0, 0.0, 0.5, 0.5)):
+        geocode.get_inverse_map(
+            str(measurement_path), 64, 64, bounds, CRS.from_epsg(4326)
+        )
+    assert len(process_inverse_map_cache) == 1
+    assert process_inverse_map_cache.currsize == 64 * 1024
+
+
 # --------------------------------------------------------------------------- wiring
 
 
@@ -0,0 +1,144 @@
+"""Tests for request capture and offline replay."""
+
+import json
+import shutil
+
+import pytest
+from openeo_pg_parser_networkx.pg_schema import BoundingBox
+from openeo_pg_parser_networkx.process_registry import Process
+
+from tests.benchmarks.catalogue import SCALES, generate_catalogue
+from tests.benchmarks.scenarios import SCENARIOS, build_registry, run_graph
+from tests.benchmarks.stac_server import StacServer
+from titiler.openeo import capture
+from titiler.openeo.capture import (
+    CAPTURE_HEADER,
+    CAPTURE_ID_HEADER,
+    Capture,
+    Replay,
+    ReplayMiss,
+    replay,
+    request_capture,
+)
+from titiler.openeo.models.auth import User
+from titiler.openeo.models.openapi import ResultRequest
+from titiler.openeo.processes.implementations.core import process
+from titiler.openeo.processes.implementations.io import SaveResultData
+
+
+@pytest.fixture
+def capture_dir(tmp_path, monkeypatch):
+    """Enable captures, written under a temporary directory."""
+    directory = tmp_path / "captures"
+    monkeypatch.setattr(capture._settings, "dir", str(directory))
+    return directory
+
+
+@pytest.mark.parametrize("name", ["ndvi_tile", "sar_backscatter"])
+def test_captured_request_replays_offline(tmp_path, capture_dir, name):
+    root = tmp_path / "catalogue"
+    catalogue = generate_catalogue(root, SCALES["tiny"])
+    graph = SCENARIOS[name](catalogue)
+
+    with StacServer(root) as server:
+        with request_capture(True, "/result", {"process_graph": graph}, {}) as rec:
+            captured = run_graph(graph, build_registry(server.url))
+
+    # Neither the STAC API nor the assets are reachable any more.
+    shutil.rmtree(root)
+
+    with replay(rec.path):
+        replayed = run_graph(graph, build_registry("http://replay.invalid"))
+    assert replayed.data == captured.data
+
+
+def test_replay_fails_on_uncaptured_search(tmp_path, capture_dir):
+    root = tmp_path / "catalogue"
+    catalogue = generate_catalogue(root, SCALES["tiny"])
+    graph = SCENARIOS["ndvi_tile"](catalogue)
+
+    with StacServer(root) as server:
+        with request_capture(True, "/result", {"process_graph": graph}, {}) as rec:
+            run_graph(graph, build_registry(server.url))
+
+    graph["load"]["arguments"]["temporal_extent"] = ["2023-06-01", "2023-06-02"]
+    with replay(rec.path), pytest.raises(ReplayMiss):
+        run_graph(graph, build_registry("http://replay.invalid"))
+
+
+def test_asset_reads_are_recorded_by_block(tmp_path):
+    path = tmp_path / "asset.bin"
+    path.write_bytes(bytes(range(256)) * 40)
+    session = Capture(str(tmp_path / "captures"), block_size=1000)
+
+    opened = session.opener(str(path))(str(path), "rb")
+    opened.seek(1990)
+    assert opened.read(20) == path.read_bytes()[1990:2010]
+    opened.seek(-10, 2)
+    assert opened.read() == path.read_bytes()[-10:]
+    with pytest.raises(FileNotFoundError):
+        session.opener(str(path))(f"{path}.aux.xml", "rb")
+
+    # Only the blocks read are kept, and served back on replay.
+    bundle = Replay(session.write())
+    assert bundle.block(str(path), 1) == path.read_bytes()[1000:2000]
+    assert bundle.block(str(path), 10) == path.read_bytes()[10000:]
+    with pytest.raises(ReplayMiss):
+        bundle.block(str(path), 5)
+
+
+def test_parameters_round_trip(tmp_path):
+    bbox = BoundingBox(west=0, south=0, east=1, north=1, crs=4326)
+    parameters = {
+        "bounding_box": bbox,
+        "_openeo_user": User(user_id="alice"),
+        "tile_z": 3,
+        "_openeo_tile_store": object(),
+    }
+    session = Capture(str(tmp_path), block_size=1024)
+    session.record_request("/result", {"process_graph": {}}, parameters)
+
+    bundle = Replay(session.write())
+    assert bundle.request["skipped_parameters"] == ["_openeo_tile_store"]
+    assert bundle.parameters == {
+        "bounding_box": bbox,
+        "_openeo_user": User(user_id="alice"),
+        "tile_z": 3,
+    }
+
+
+def test_capture_is_off_without_directory(monkeypatch):
+    monkeypatch.setattr(capture._settings, "dir", None)
+    with request_capture(True, "/result", {}, {}) as rec:
+        assert rec is None
+
+
+def test_result_is_captured_on_request(app_with_auth, capture_dir):
+    @process
+    def captured_result() -> SaveResultData:
+        return SaveResultData(data=b"ok", media_type="text/plain")
+
+    app_with_auth.app.endpoints.process_registry[None]["captured_result"] = Process(
+        implementation=captured_result,
+        spec={"id": "captured_result", "description": "test", "parameters": []},
+    )
+    body = ResultRequest(
+        process={
+            "process_graph": {
+                "r": {"process_id": "captured_result", "arguments": {}, "result": True}
+            }
+        }
+    ).model_dump(exclude_none=True)
+
+    response = app_with_auth.post("/result", json=body)
+    assert response.status_code == 200
+    assert CAPTURE_ID_HEADER not in response.headers
+    assert not capture_dir.exists()
+
+    response = app_with_auth.post("/result", json=body, headers={CAPTURE_HEADER: "1"})
+    assert response.status_code == 200
+    bundle = capture_dir / response.headers[CAPTURE_ID_HEADER]
+    request = json.loads((bundle / "request.json").read_text())
+    assert request["endpoint"] == "/result"
+    assert request["process"]["process_graph"]["r"]["process_id"] == "captured_result"
+    assert request["parameters"]["_openeo_user"]["__type__"] == "User"
@@ -0,0 +1,187 @@
+"""Test coalescing of identical concurrent requests."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import pytest
+from openeo_pg_parser_networkx.process_registry import Process
+
+from titiler.openeo.coalesce import (
+    PUBLIC_SCOPE,
+    SingleFlight,
+    coalesce,
+    request_digest,
+    result_scope,
+)
+from titiler.openeo.models.auth import User
+from titiler.openeo.models.openapi import ResultRequest
+from titiler.openeo.processes.implementations.core import process
+from titiler.openeo.processes.implementations.io import SaveResultData
+
+GRAPH: Dict[str, Any] = {
+    "process_graph": {
+        "node": {"process_id": "constant", "arguments": {"x": 1}, "result": True}
+    }
+}
+
+
+def test_single_flight_shares_one_call():
+    """Callers arriving while a call runs get its result."""
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"tile"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flights.run, "key", compute)
+        assert started.wait(5)
+        followers = [pool.submit(flights.run, "key", compute) for _ in range(3)]
+        time.sleep(0.1)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == [b"tile"] * 4
+    assert len(calls) == 1
+
+    # Nothing is kept once the call is done
+    assert flights.run("key", lambda: b"other") == b"other"
+
+
+def test_single_flight_shares_errors():
+    """Callers waiting on a failing call get its error."""
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.run, "key", compute)
+        assert started.wait(5)
+        follower = pool.submit(flights.run, "key", compute)
+        time.sleep(0.1)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+
+def test_single_flight_keys_apart():
+    """Calls with different keys run on their own."""
+    flights = SingleFlight()
+    assert flights.run("a", lambda: 1) == 1
+    assert flights.run("b", lambda: 2) == 2
+
+
+def test_coalesce_without_key_or_disabled(monkeypatch):
+    """Requests without a key, or with coalescing off, evaluate alone."""
+    assert coalesce(None, lambda: 1) == 1
+    monkeypatch.setenv("TITILER_OPENEO_PROCESSING_COALESCE_REQUESTS", "false")
+    assert coalesce("key", lambda: 2) == 2
+
+
+def test_request_digest():
+    """The digest covers the graph, parameters, kind and scope."""
+    parameters = {"tile_x": 1, "tile_y": 2, "tile_z": 3}
+    digest = request_digest("tile:a", GRAPH, parameters, PUBLIC_SCOPE)
+
+    assert digest == request_digest("tile:a", GRAPH, dict(parameters), "public")
+    assert digest != request_digest(
+        "tile:a", GRAPH, {**parameters, "tile_x": 2}, PUBLIC_SCOPE
+    )
+    assert digest != request_digest("tile:b", GRAPH, parameters, PUBLIC_SCOPE)
+    assert digest != request_digest("tile:a", GRAPH, parameters, "user:a")
+    other = {"process_graph": {"node": {**GRAPH["process_graph"]["node"]}}}
+    other["process_graph"]["node"]["arguments"] = {"x": 2}
+    assert digest != request_digest("tile:a", other, parameters, PUBLIC_SCOPE)
+
+    # Per-request parameters are left out
+    user = User(user_id="a", name="a")
+    assert digest == request_digest(
+        "tile:a", GRAPH, {**parameters, "_openeo_user": user}, PUBLIC_SCOPE
+    )
+
+
+def test_result_scope():
+    """Only public graphs not reading per-request parameters are shared."""
+    user = User(user_id="a", name="a")
+    assert result_scope(GRAPH, user, public=True) == PUBLIC_SCOPE
+    assert result_scope(GRAPH, user) == "user:a"
+    assert result_scope(GRAPH, None) == "anonymous"
+
+    reads_user = {
+        "process_graph": {
+            "node": {
+                "process_id": "p",
+                "arguments": {"user": {"from_parameter": "_openeo_user"}},
+                "result": True,
+            }
+        }
+    }
+    assert result_scope(reads_user, user, public=True) == "user:a"
+
+
+def test_result_requests_coalesced(app_with_auth):
+    """Identical concurrent /result requests evaluate their graph once."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @process
+    def slow_constant(x: Any = None) -> SaveResultData:
+        """A process waiting to be released."""
+        calls.append(x)
+        started.set()
+        release.wait(5)
+        return SaveResultData(data=b"result", media_type="text/plain")
+
+    app_with_auth.app.endpoints.process_registry[None]["slow_constant"] = Process(
+        implementation=slow_constant,
+        spec={
+            "id": "slow_constant",
+            "description": "A slow process",
+            "parameters": [
+                {
+                    "name": "x",
+                    "description": "Any value",
+                    "optional": True,
+                    "schema": {},
+                }
+            ],
+        },
+    )
+    graph = {
+        "process_graph": {
+            "node": {
+                "process_id": "slow_constant",
+                "arguments": {"x": "coalesce"},
+                "result": True,
+            }
+        }
+    }
+    body = ResultRequest(process=graph).model_dump(exclude_none=True)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(app_with_auth.post, "/result", json=body)
+        assert started.wait(5)
+        followers = [
+            pool.submit(app_with_auth.post, "/result", json=body) for _ in range(2)
+        ]
+        time.sleep(0.2)
+        release.set()
+        responses = [leader.result()] + [f.result() for f in followers]
+
+    assert [r.status_code for r in responses] == [200] * 3
+    assert all(r.content == b"result" for r in responses)
+    assert len(calls) == 1
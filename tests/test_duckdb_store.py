@@ -0,0 +1,98 @@
+"""Tests for the DuckDB services store and its connections."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from titiler.openeo.models.auth import User
+from titiler.openeo.services.duckdb import DuckDBConnections, DuckDBStore
+
+
+@pytest.fixture(params=[True, False], ids=["keep_open", "per_call"])
+def store(request, tmp_path: Path) -> DuckDBStore:
+    """Create a DuckDB services store backed by a temp file."""
+    return DuckDBStore(store=str(tmp_path / "services.db"), keep_open=request.param)
+
+
+def test_services_round_trip(store: DuckDBStore):
+    """Services read back as they were written, in both connection modes."""
+    service = {"title": "NDVI", "configuration": {"tile_size": 256}}
+    service_id = store.add_service("user", service)
+
+    assert store.get_service(service_id) == {"id": service_id, **service}
+    assert store.get_service("missing") is None
+    assert store.get_user_services("user") == [{"id": service_id, **service}]
+
+    store.update_service("user", service_id, {"title": "EVI"})
+    assert store.get_service(service_id)["title"] == "EVI"
+    assert store.get_services()[0]["configuration"] == {"tile_size": 256}
+
+
+def test_track_user_login_counts_concurrent_logins(store: DuckDBStore):
+    """Concurrent logins of one user are all counted."""
+    user = User(user_id="user", email="user@example.com", name="User")
+
+    def login():
+        for _ in range(10):
+            store.track_user_login(user, "basic")
+
+    threads = [threading.Thread(target=login) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tracking = store.get_user_tracking("user", "basic")
+    assert tracking["login_count"] == 40
+    assert tracking["email"] == "user@example.com"
+
+
+def test_connections_give_each_thread_its_own_cursor(tmp_path: Path):
+    """A thread reuses its cursor; other threads get their own."""
+    connections = DuckDBConnections(str(tmp_path / "db.db"))
+    with connections.cursor() as first, connections.cursor() as second:
+        assert first is second
+
+    cursors = []
+
+    def open_cursor():
+        with connections.cursor() as con:
+            cursors.append(con)
+
+    thread = threading.Thread(target=open_cursor)
+    thread.start()
+    thread.join()
+    assert cursors[0] is not first
+
+
+def test_connections_parse_statements_once(tmp_path: Path):
+    """Statements are parsed once per cursor, and run with new parameters."""
+    connections = DuckDBConnections(str(tmp_path / "db.db"))
+    with connections.cursor() as con:
+        statement = connections.prepare(con, "SELECT ? + 1")
+        assert connections.prepare(con, "SELECT ? + 1") is statement
+        assert con.execute(statement, [1]).fetchone() == (2,)
+        assert con.execute(statement, [41]).fetchone() == (42,)
+
+    per_call = DuckDBConnections(str(tmp_path / "db.db"), keep_open=False)
+    with per_call.cursor() as con:
+        assert per_call.prepare(con, "SELECT 1") == "SELECT 1"
+
+
+def test_connections_reopen_after_close_and_fork(tmp_path: Path):
+    """The database is reopened after close(), and in a forked child."""
+    connections = DuckDBConnections(str(tmp_path / "db.db"))
+    with connections.cursor() as con:
+        con.execute("CREATE TABLE t (v INTEGER)")
+        con.execute("INSERT INTO t VALUES (1)")
+
+    connections.close()
+    with connections.cursor() as con:
+        assert con.execute("SELECT v FROM t").fetchone() == (1,)
+
+    # As seen from a child process: the handle belongs to another pid
+    connections._pid = -1
+    with connections.cursor() as reopened:
+        assert reopened is not con
+        assert reopened.execute("SELECT v FROM t").fetchone() == (1,)
@@ -0,0 +1,168 @@
+"""Test incremental tile invalidation."""
+
+from datetime import datetime, timezone
+
+import morecantile
+import pytest
+
+from tests.benchmarks.catalogue import OPTICAL_COLLECTION, SCALES, generate_catalogue
+from tests.benchmarks.stac_server import StacServer
+from titiler.openeo.invalidate import (
+    Watermark,
+    invalidate,
+    main,
+    poll_items,
+    service_collections,
+)
+from titiler.openeo.seed import DirectoryWriter, MBTilesWriter
+
+TMS = morecantile.tms.get("WebMercatorQuad")
+
+# Each tile's body is its column
+SERVICE = {
+    "id": "seeded",
+    "user_id": "owner",
+    "type": "XYZ",
+    "configuration": {"scope": "private"},
+    "process": {
+        "process_graph": {
+            "x": {
+                "process_id": "constant",
+                "arguments": {"x": {"from_parameter": "tile_x"}},
+            },
+            "save": {
+                "process_id": "save_result",
+                "arguments": {"data": {"from_node": "x"}, "format": "txt"},
+                "result": True,
+            },
+        }
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def catalogue(tmp_path_factory):
+    root = tmp_path_factory.mktemp("catalogue")
+    catalogue = generate_catalogue(root, SCALES["tiny"])
+    with StacServer(root) as server:
+        yield catalogue, server.url
+
+
+def _items(catalogue, suffix):
+    return [i for i in catalogue["items"] if i["id"].endswith(suffix)]
+
+
+def _key(item, z):
+    west, south, east, north = item["bbox"]
+    tile = TMS.tile((west + east) / 2, (south + north) / 2, z)
+    return (tile.z, tile.x, tile.y)
+
+
+def test_poll_items(catalogue):
+    """Items past the watermark are returned once, and it moves past them."""
+    from titiler.openeo.stacapi import stacApiBackend
+
+    catalogue, url = catalogue
+    client = stacApiBackend(url).client
+    watermark = Watermark(
+        value=datetime(2023, 5, 2, 10, 30, tzinfo=timezone.utc),
+        seen={"S2_T0_20230502"},
+    )
+
+    items = poll_items(client, {OPTICAL_COLLECTION}, watermark)
+    assert [i["id"] for i in items] == [
+        "S2_T1_20230502",
+        "S2_T0_20230901",
+        "S2_T1_20230901",
+    ]
+    assert watermark.value == datetime(2023, 9, 1, 10, 30, tzinfo=timezone.utc)
+    assert watermark.seen == {"S2_T0_20230901", "S2_T1_20230901"}
+
+    assert poll_items(client, {OPTICAL_COLLECTION}, watermark) == []
+
+
+def test_watermark_state(tmp_path):
+    """The watermark survives a restart."""
+    path = tmp_path / "state.json"
+    assert Watermark.load(path) == Watermark()
+
+    watermark = Watermark(
+        value=datetime(2023, 9, 1, 10, 30, tzinfo=timezone.utc), seen={"a", "b"}
+    )
+    watermark.save(path)
+    assert Watermark.load(path) == watermark
+
+
+def test_service_collections():
+    """Collections are read from the load_collection nodes."""
+    service = {
+        "process": {
+            "process_graph": {
+                "load": {
+                    "process_id": "load_collection",
+                    "arguments": {"id": OPTICAL_COLLECTION},
+                },
+                "save": {
+                    "process_id": "save_result",
+                    "arguments": {"data": {"from_node": "load"}, "format": "PNG"},
+                    "result": True,
+                },
+            }
+        }
+    }
+    assert service_collections(service) == {OPTICAL_COLLECTION}
+    assert service_collections(SERVICE) == set()
+
+
+@pytest.mark.parametrize("mbtiles", [False, True])
+def test_invalidate(catalogue, tmp_path, mbtiles):
+    """Only tiles covered by the new items are deleted."""
+    catalogue, _ = catalogue
+    items = _items(catalogue, "_20230901")
+    covered = _key(items[0], 12)
+    elsewhere = (12, 0, 0)
+
+    if mbtiles:
+        writer = MBTilesWriter(tmp_path / "tiles.mbtiles")
+    else:
+        writer = DirectoryWriter(tmp_path / "tiles", "txt")
+    writer.write(covered, b"old")
+    writer.write(elsewhere, b"old")
+    writer.close()
+
+    if mbtiles:
+        writer = MBTilesWriter(tmp_path / "tiles.mbtiles")
+    report = invalidate(SERVICE, items, writer)
+    assert (report.items, report.invalidated, report.rendered) == (2, 1, 0)
+
+    if mbtiles:
+        writer = MBTilesWriter(tmp_path / "tiles.mbtiles")
+    assert not writer.exists(covered)
+    assert writer.exists(elsewhere)
+    writer.close()
+
+
+def test_invalidate_render(catalogue, tmp_path, monkeypatch):
+    """Invalidated tiles are rendered again."""
+    monkeypatch.setenv("TITILER_OPENEO_STAC_API_URL", "https://stac.eoapi.dev")
+    monkeypatch.setenv("TITILER_OPENEO_STORE_URL", str(tmp_path / "services.db"))
+    catalogue, _ = catalogue
+    items = _items(catalogue, "_20230901")
+    covered = _key(items[0], 12)
+    writer = DirectoryWriter(tmp_path / "tiles", "txt")
+    writer.write(covered, b"old")
+
+    report = invalidate(SERVICE, items, writer, render=True, workers=0)
+    assert (report.invalidated, report.rendered, report.errors) == (1, 1, 0)
+    z, x, y = covered
+    tile = tmp_path / "tiles" / str(z) / str(x) / f"{y}.txt"
+    assert tile.read_bytes() == str(x).encode()
+
+
+def test_main_unknown_service(tmp_path, monkeypatch, capsys):
+    """An unknown service id is a usage error."""
+    monkeypatch.setenv("TITILER_OPENEO_STAC_API_URL", "https://stac.eoapi.dev")
+    monkeypatch.setenv("TITILER_OPENEO_STORE_URL", str(tmp_path / "services.db"))
+    with pytest.raises(SystemExit):
+        main(["--target", "missing", "tiles", "--state", str(tmp_path / "s.json")])
+    assert "Could not find service: missing" in capsys.readouterr().err
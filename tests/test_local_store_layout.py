@@ -1,9 +1,11 @@
 """Tests for local JSON store namespace separation and compatibility."""
 
 import json
+import multiprocessing
 from pathlib import Path
 
 from titiler.openeo.services import get_store, get_udp_store
+from titiler.openeo.services.local import load_local_store_data
 
 
 def test_structured_layout_read_and_preserve(tmp_path: Path):
@@ -32,9 +34,9 @@ def test_structured_layout_read_and_preserve(tmp_path: Path):
     assert udp_store.get_udp(user_id="u2", udp_id="udp") is not None
 
     new_service_id = service_store.add_service(user_id="u3", service={"n": 2})
-    data = json.loads(path.read_text())
-    assert "udp" in data["udp_definitions"]  # preserved
-    assert new_service_id in data["services"]
+    services, udp_definitions = load_local_store_data(str(path))
+    assert "udp" in udp_definitions  # preserved
+    assert new_service_id in services
 
 
 def test_ids_can_collide_across_namespaces(tmp_path: Path):
@@ -47,9 +49,9 @@ def test_ids_can_collide_across_namespaces(tmp_path: Path):
     udp_store = get_udp_store(str(path))
     udp_store.upsert_udp(user_id="user", udp_id=service_id, process_graph={"p": 1})
 
-    data = json.loads(path.read_text())
-    assert service_id in data["services"]
-    assert service_id in data["udp_definitions"]
+    services, udp_definitions = load_local_store_data(str(path))
+    assert service_id in services
+    assert service_id in udp_definitions
 
 
 def test_each_store_only_sees_its_namespace(tmp_path: Path):
@@ -79,3 +81,124 @@ def test_each_store_only_sees_its_namespace(tmp_path: Path):
 
     assert udp_store.get_udp(user_id="u1", udp_id="udp") is not None
     assert udp_store.get_udp(user_id="u1", udp_id="svc") is None
+
+
+def test_changes_are_appended_to_the_journal(tmp_path: Path):
+    """Changes go to the journal, leaving the snapshot as it was."""
+    path = tmp_path / "store.json"
+    path.write_text(json.dumps({"services": {}, "udp_definitions": {}}))
+    snapshot = path.read_text()
+
+    service_store = get_store(str(path))
+    service_id = service_store.add_service(user_id="u1", service={"n": 1})
+    service_store.update_service("u1", service_id, {"n": 2})
+    udp_store = get_udp_store(str(path))
+    udp_store.upsert_udp(user_id="u1", udp_id="udp", process_graph={"p": 1})
+    udp_store.delete_udp(user_id="u1", udp_id="udp")
+
+    assert path.read_text() == snapshot
+    lines = (tmp_path / "store.json.journal").read_text().splitlines()
+    assert len(lines) == 5  # header and one line per change
+
+    services, udp_definitions = load_local_store_data(str(path))
+    assert services[service_id]["service"] == {"n": 2}
+    assert udp_definitions == {}
+
+    # A new store replays the journal
+    assert get_store(str(path)).get_service(service_id)["n"] == 2
+
+
+def test_journal_is_compacted(tmp_path: Path):
+    """Every `compact_every` changes the journal is folded into the snapshot."""
+    path = tmp_path / "store.json"
+    path.write_text(
+        json.dumps(
+            {
+                "services": {},
+                "udp_definitions": {"udp": {"user_id": "u1", "process_graph": {}}},
+                "other": 1,
+            }
+        )
+    )
+
+    service_store = get_store(str(path))
+    service_store._journal.compact_every = 3
+    ids = [service_store.add_service(user_id="u1", service={"n": i}) for i in range(4)]
+
+    data = json.loads(path.read_text())
+    assert sorted(data["services"]) == sorted(ids[:3])
+    assert "udp" in data["udp_definitions"]
+    assert data["other"] == 1
+    lines = (tmp_path / "store.json.journal").read_text().splitlines()
+    assert len(lines) == 2
+
+    services, _ = load_local_store_data(str(path))
+    assert sorted(services) == sorted(ids)
+
+
+def test_replaced_snapshot_discards_journal(tmp_path: Path):
+    """A journal is not replayed on a snapshot it was not written for."""
+    path = tmp_path / "store.json"
+    service_store = get_store(str(path))
+    service_store.add_service(user_id="u1", service={"n": 1})
+
+    path.write_text(json.dumps({"services": {}, "udp_definitions": {}}))
+    assert load_local_store_data(str(path)) == ({}, {})
+    assert get_store(str(path)).get_services() == []
+
+    # The existing store picks the new snapshot up on its next change
+    service_id = service_store.add_service(user_id="u1", service={"n": 2})
+    services, _ = load_local_store_data(str(path))
+    assert list(services) == [service_id]
+
+
+def test_torn_journal_line_is_ignored(tmp_path: Path):
+    """A last line cut short by a crash is not replayed."""
+    path = tmp_path / "store.json"
+    service_id = get_store(str(path)).add_service(user_id="u1", service={"n": 1})
+    with open(tmp_path / "store.json.journal", "a") as f:
+        f.write('{"ns": "services", "id": "torn", "val')
+
+    services, _ = load_local_store_data(str(path))
+    assert list(services) == [service_id]
+
+
+def test_stores_sharing_a_file_see_each_other(tmp_path: Path):
+    """A store replays other stores' changes before making its own."""
+    path = tmp_path / "store.json"
+    first = get_store(str(path))
+    second = get_store(str(path))
+
+    service_id = first.add_service(user_id="u1", service={"n": 1})
+    second.update_service("u1", service_id, {"n": 2})
+    second.delete_service(service_id)
+    other_id = first.add_service(user_id="u1", service={"n": 3})
+
+    assert first.get_service(service_id) is None
+    services, _ = load_local_store_data(str(path))
+    assert list(services) == [other_id]
+
+
+def _add_services(path: str, count: int) -> None:
+    """Add `count` services to the store at `path`, compacting often."""
+    store = get_store(path)
+    store._journal.compact_every = 7
+    for i in range(count):
+        store.add_service(user_id="u1", service={"n": i})
+
+
+def test_concurrent_processes(tmp_path: Path):
+    """Processes writing to the same file lose none of each other's changes."""
+    path = str(tmp_path / "store.json")
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_add_services, args=(path, 25)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    services, _ = load_local_store_data(path)
+    assert len(services) == 100
@@ -0,0 +1,236 @@
+"""Tests for per-request memory accounting (titiler.openeo.memory_budget)."""
+
+import gc
+import time
+from datetime import datetime
+from typing import Any
+
+import numpy
+import pytest
+from openeo_pg_parser_networkx.process_registry import Process
+from rio_tiler.models import ImageData
+
+from titiler.openeo import memory_budget as memory_budget_module
+from titiler.openeo.errors import MemoryLimitExceeded
+from titiler.openeo.memory_budget import (
+    PEAK_MEMORY_HEADER,
+    MemoryBudget,
+    get_current_budget,
+    image_nbytes,
+    memory_budget,
+)
+from titiler.openeo.models.openapi import ResultRequest
+from titiler.openeo.processes.implementations.core import process
+from titiler.openeo.processes.implementations.data_model import RasterStack
+from titiler.openeo.processes.implementations.io import SaveResultData
+
+SIZE = 8
+# uint16 data + bool mask for a 1-band SIZE x SIZE image
+SLICE_BYTES = SIZE * SIZE * 2 + SIZE * SIZE
+
+
+def _image(value: int = 1) -> ImageData:
+    arr = numpy.ma.MaskedArray(
+        numpy.full((1, SIZE, SIZE), value, dtype="uint16"),
+        mask=numpy.zeros((1, SIZE, SIZE), dtype=bool),
+    )
+    return ImageData(arr, bounds=(0, 0, 1, 1))
+
+
+def _lazy_stack(n: int) -> RasterStack:
+    tasks = [
+        ((lambda i=i: _image(i)), {"datetime": datetime(2020, 1, i + 1)})
+        for i in range(n)
+    ]
+    return RasterStack(
+        tasks=tasks,
+        timestamp_fn=lambda asset: asset["datetime"],
+        allowed_exceptions=(),
+        width=SIZE,
+        height=SIZE,
+        bounds=(0, 0, 1, 1),
+        band_names=["b1"],
+    )
+
+
+def test_image_nbytes_counts_data_and_mask():
+    assert image_nbytes(_image()) == SLICE_BYTES
+
+
+def test_no_budget_outside_context():
+    assert get_current_budget() is None
+    stack = _lazy_stack(2)
+    _ = stack.values()
+    assert stack._budget is None
+
+
+def test_realized_slices_are_accounted_and_released():
+    with memory_budget() as budget:
+        stack = _lazy_stack(3)
+        _ = stack.values()
+        assert budget.current == 3 * SLICE_BYTES
+
+        stack.release(stack.timestamps()[0])
+        assert budget.current == 2 * SLICE_BYTES
+
+        stack.release()
+        assert budget.current == 0
+
+    assert budget.peak == 3 * SLICE_BYTES
+
+
+def test_shared_arrays_are_counted_once():
+    with memory_budget() as budget:
+        stack = _lazy_stack(2)
+        _ = stack.values()
+        subset = stack.filter_keys(stack.timestamps())
+        assert budget.current == 2 * SLICE_BYTES
+
+        # The subset still holds the arrays after the source lets go.
+        stack.release()
+        assert budget.current == 2 * SLICE_BYTES
+        subset.release()
+        assert budget.current == 0
+
+
+def test_collected_stack_returns_its_bytes():
+    with memory_budget() as budget:
+        stack = _lazy_stack(2)
+        _ = stack.values()
+        assert budget.current == 2 * SLICE_BYTES
+
+        del stack
+        gc.collect()
+        assert budget.current == 0
+
+
+def test_limit_exceeded_aborts_and_releases():
+    with pytest.raises(MemoryLimitExceeded):
+        with memory_budget(limit=2 * SLICE_BYTES) as budget:
+            first = RasterStack.from_images({datetime(2020, 1, 1): _image()})
+            second = _lazy_stack(3)
+            _ = second.values()
+
+    # Everything the request realized was released on abort.
+    assert budget.current == 0
+    assert budget.peak == 2 * SLICE_BYTES
+    assert first._data_cache == {}
+    assert second._data_cache == {}
+
+
+def test_limit_exceeded_cancels_pending_reads():
+    ran = []
+
+    def task(i):
+        ran.append(i)
+        time.sleep(0.01)
+        return _image(i)
+
+    with pytest.raises(MemoryLimitExceeded):
+        with memory_budget(limit=2 * SLICE_BYTES):
+            stack = RasterStack(
+                tasks=[
+                    ((lambda i=i: task(i)), {"datetime": datetime(2020, 1, i + 1)})
+                    for i in range(20)
+                ],
+                timestamp_fn=lambda asset: asset["datetime"],
+                allowed_exceptions=(),
+                width=SIZE,
+                height=SIZE,
+                bounds=(0, 0, 1, 1),
+                band_names=["b1"],
+                max_workers=2,
+            )
+            _ = stack.values()
+
+    # The third slice crosses the limit. Only reads the two workers had
+    # already picked up (allowing for ones started while the abort is being
+    # raised) run after it, not the remaining queue.
+    assert 3 <= len(ran) <= 3 + 2 * 2
+
+
+def test_track_refuses_without_charging():
+    budget = MemoryBudget(limit=SLICE_BYTES)
+    holder = _lazy_stack(0)
+    budget.attach(holder)
+    first, second = _image(), _image()
+    budget.track(holder, "a", first)
+    with pytest.raises(MemoryLimitExceeded):
+        budget.track(holder, "b", second)
+    assert budget.current == SLICE_BYTES
+
+
+def test_reused_array_id_is_charged_again():
+    budget = MemoryBudget()
+    holder = _lazy_stack(0)
+    budget.attach(holder)
+    budget.track(holder, "a", _image())
+    assert budget.current == SLICE_BYTES
+
+    # The first image is gone, but still held for "a" (as between release()
+    # and untrack()). A new array, possibly at the same address, is new bytes.
+    image = _image()
+    budget.track(holder, "b", image)
+    assert budget.current == 2 * SLICE_BYTES
+
+    budget.untrack(holder)
+    assert budget.current == 0
+
+
+@pytest.fixture
+def stack_process(app_with_auth):
+    """Register a process that realizes ``count`` slices and returns bytes."""
+
+    @process
+    def make_slices(count: Any = 1) -> SaveResultData:
+        stack = RasterStack.from_images(
+            {datetime(2020, 1, i + 1): _image(i) for i in range(int(count))}
+        )
+        return SaveResultData(data=str(len(stack)).encode(), media_type="text/plain")
+
+    app_with_auth.app.endpoints.process_registry[None]["make_slices"] = Process(
+        implementation=make_slices,
+        spec={
+            "id": "make_slices",
+            "description": "Realize a number of raster slices",
+            "parameters": [
+                {
+                    "name": "count",
+                    "description": "Number of slices",
+                    "schema": {"type": "integer"},
+                }
+            ],
+        },
+    )
+    return app_with_auth
+
+
+def _request(count: int):
+    return ResultRequest(
+        process={
+            "process_graph": {
+                "s": {
+                    "process_id": "make_slices",
+                    "arguments": {"count": count},
+                    "result": True,
+                }
+            }
+        }
+    ).model_dump(exclude_none=True)
+
+
+def test_result_reports_peak_memory(stack_process):
+    response = stack_process.post("/result", json=_request(3))
+    assert response.status_code == 200
+    assert int(response.headers[PEAK_MEMORY_HEADER]) == 3 * SLICE_BYTES
+
+
+def test_result_aborts_over_limit(stack_process, monkeypatch):
+    monkeypatch.setattr(
+        memory_budget_module.processing_settings,
+        "max_request_memory",
+        2 * SLICE_BYTES,
+    )
+    response = stack_process.post("/result", json=_request(3))
+    assert response.status_code == 400
+    assert response.json()["code"] == "MemoryLimitExceeded"
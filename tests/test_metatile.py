@@ -0,0 +1,165 @@
+"""Test metatile rendering of XYZ services."""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import morecantile
+import numpy
+import pytest
+from openeo_pg_parser_networkx.process_registry import Process
+from rio_tiler.models import ImageData
+
+from titiler.openeo.metatile import Metatile, metatile_size, siblings
+from titiler.openeo.processes.implementations.core import process
+from titiler.openeo.processes.implementations.data_model import RasterStack
+
+WEB_MERCATOR = morecantile.tms.get("WebMercatorQuad")
+
+
+def test_metatile_around():
+    """Blocks are aligned on their size and clipped to the tile matrix."""
+    metatile = Metatile.around(WEB_MERCATOR, morecantile.Tile(5, 2, 3), 4, 256)
+    assert (metatile.x, metatile.y, metatile.cols, metatile.rows) == (4, 0, 4, 4)
+    assert (metatile.width, metatile.height) == (1024, 1024)
+    assert len(metatile.tiles) == 16
+
+    # Fewer tiles across than the block size
+    metatile = Metatile.around(WEB_MERCATOR, morecantile.Tile(0, 0, 0), 4, 256)
+    assert (metatile.cols, metatile.rows) == (1, 1)
+    assert metatile.bounds == pytest.approx(
+        tuple(WEB_MERCATOR.xy_bounds(morecantile.Tile(0, 0, 0)))
+    )
+
+    # Edge of the matrix: 8 tiles across in blocks of 3
+    metatile = Metatile.around(WEB_MERCATOR, morecantile.Tile(7, 7, 3), 3, 256)
+    assert (metatile.x, metatile.y, metatile.cols, metatile.rows) == (6, 6, 2, 2)
+
+
+def test_metatile_windows():
+    """Each tile gets its own window of the block's image."""
+    metatile = Metatile.around(WEB_MERCATOR, morecantile.Tile(1, 0, 1), 2, 256)
+    windows = {
+        (tile.x, tile.y): (rows.start, cols.start)
+        for tile, rows, cols in metatile.windows(512, 512)
+    }
+    assert windows == {
+        (0, 0): (0, 0),
+        (1, 0): (0, 256),
+        (0, 1): (256, 0),
+        (1, 1): (256, 256),
+    }
+
+
+def test_metatile_size():
+    """Only image services not reading per-tile parameters use blocks."""
+    graph = {"process_graph": {}}
+    assert metatile_size({}, graph, "image/png") == 1
+    assert metatile_size({"metatile": 2}, graph, "image/png") == 2
+    assert metatile_size({"metatile": 2}, graph, "application/json") == 1
+
+    reads_tile = {
+        "process_graph": {"n": {"arguments": {"x": {"from_parameter": "tile_x"}}}}
+    }
+    assert metatile_size({"metatile": 2}, reads_tile, "image/png") == 1
+
+
+@pytest.fixture
+def fake_load_collection(app_with_auth, monkeypatch):
+    """Replace load_collection with one rendering the global pixel grid."""
+    calls = []
+
+    @process
+    def load_collection(
+        id: str,
+        spatial_extent: Any = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> RasterStack:
+        """Pixel values follow the pixel's position on the map."""
+        calls.append((width, height))
+        west, south, east, north = (
+            spatial_extent.west,
+            spatial_extent.south,
+            spatial_extent.east,
+            spatial_extent.north,
+        )
+        resolution = (east - west) / width
+        col = round((west - WEB_MERCATOR.bbox.left) / resolution)
+        row = round((WEB_MERCATOR.bbox.top - north) / resolution)
+        cols = col + numpy.arange(width)
+        rows = row + numpy.arange(height)
+        array = ((cols[None, :] * 7 + rows[:, None] * 3) % 251).astype("uint8")
+        image = ImageData(
+            numpy.ma.MaskedArray(array[None]),
+            bounds=(west, south, east, north),
+            crs=WEB_MERCATOR.crs._pyproj_crs,
+        )
+        return RasterStack.from_images({datetime(2024, 1, 1): image})
+
+    registry = app_with_auth.app.endpoints.process_registry
+    spec = dict(registry["load_collection"].spec)
+    monkeypatch.setitem(
+        registry[None],
+        "load_collection",
+        Process(spec=spec, implementation=load_collection),
+    )
+    siblings.clear()
+    yield calls
+    siblings.clear()
+
+
+def _service(app_with_auth, configuration: Dict[str, Any]) -> str:
+    """Create an XYZ service over the fake collection."""
+    response = app_with_auth.post(
+        "/services",
+        json={
+            "type": "XYZ",
+            "title": "metatile",
+            "configuration": configuration,
+            "process": {
+                "process_graph": {
+                    "load": {
+                        "process_id": "load_collection",
+                        "arguments": {
+                            "id": "fake",
+                            "spatial_extent": {"from_parameter": "bounding_box"},
+                        },
+                    },
+                    "save": {
+                        "process_id": "save_result",
+                        "arguments": {"data": {"from_node": "load"}, "format": "PNG"},
+                        "result": True,
+                    },
+                }
+            },
+        },
+    )
+    assert response.status_code == 201
+    return response.headers["location"].split("/")[-1]
+
+
+def test_metatile_service(app_with_auth, fake_load_collection):
+    """A block is rendered once and its tiles match per-tile renders."""
+    tiled = _service(app_with_auth, {})
+    blocked = _service(app_with_auth, {"metatile": 2})
+
+    expected = {}
+    for x, y in ((2, 0), (3, 0), (2, 1), (3, 1)):
+        response = app_with_auth.get(f"/services/xyz/{tiled}/tiles/2/{x}/{y}")
+        assert response.status_code == 200
+        expected[(x, y)] = response.content
+    assert fake_load_collection == [(256, 256)] * 4
+    assert len(set(expected.values())) == 4
+    fake_load_collection.clear()
+
+    for x, y in ((3, 1), (2, 0), (3, 0), (2, 1)):
+        response = app_with_auth.get(f"/services/xyz/{blocked}/tiles/2/{x}/{y}")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content == expected[(x, y)]
+    assert fake_load_collection == [(512, 512)]
+
+    # The requested tile itself is not kept
+    response = app_with_auth.get(f"/services/xyz/{blocked}/tiles/2/3/1")
+    assert response.content == expected[(3, 1)]
+    assert fake_load_collection == [(512, 512)] * 2
@@ -0,0 +1,134 @@
+"""Tests for the Prometheus metrics (titiler.openeo.metrics)."""
+
+import gc
+from datetime import datetime
+
+import numpy
+import rasterio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from rasterio.control import GroundControlPoint
+from rasterio.crs import CRS
+from rio_tiler.models import ImageData
+
+from titiler.openeo import metrics
+from titiler.openeo.metrics import register_metrics_endpoint
+from titiler.openeo.processes.implementations.data_model import RasterStack
+from titiler.openeo.processes.implementations.io import save_result
+from titiler.openeo.sar import geocode
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def _stack(n: int) -> RasterStack:
+    def image(i):
+        return ImageData(
+            numpy.ma.MaskedArray(numpy.full((1, 4, 4), i, dtype="uint8")),
+            bounds=(0, 0, 1, 1),
+        )
+
+    return RasterStack(
+        tasks=[
+            ((lambda i=i: image(i)), {"datetime": datetime(2020, 1, i + 1)})
+            for i in range(n)
+        ],
+        timestamp_fn=lambda asset: asset["datetime"],
+        allowed_exceptions=(),
+        width=4,
+        height=4,
+        bounds=(0, 0, 1, 1),
+        band_names=["b1"],
+    )
+
+
+def test_metrics_endpoint():
+    app = FastAPI()
+    register_metrics_endpoint(app)
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "titiler_openeo_stac_search_seconds" in response.text
+    assert 'titiler_openeo_cache_hits_total{cache="sar_gcps"}' in response.text
+
+
+def test_rasterstack_slices_resident_and_evicted():
+    resident = "titiler_openeo_rasterstack_slices_resident"
+    evicted = "titiler_openeo_rasterstack_slices_evicted_total"
+    before_resident = _sample(resident)
+    before_evicted = _sample(evicted)
+
+    stack = _stack(3)
+    for key in stack.keys():
+        stack[key]
+    assert _sample(resident) == before_resident + 3
+
+    stack.release(next(iter(stack.keys())))
+    assert _sample(resident) == before_resident + 2
+    assert _sample(evicted) == before_evicted + 1
+
+    # Releasing an unrealized key is not an eviction.
+    stack.release(next(iter(stack.keys())))
+    assert _sample(evicted) == before_evicted + 1
+
+    del stack
+    assert _sample(resident) == before_resident
+
+
+def test_collected_stacks_leave_the_resident_gauge():
+    resident = "titiler_openeo_rasterstack_slices_resident"
+    before = _sample(resident)
+
+    stack = _stack(2)
+    _ = stack.values()
+    assert _sample(resident) == before + 2
+    assert id(stack) in metrics._live_stacks
+
+    stack_id = id(stack)
+    del stack
+    gc.collect()
+    assert stack_id not in metrics._live_stacks
+    assert _sample(resident) == before
+
+
+def _gcp_tiff(path):
+    gcps = [
+        GroundControlPoint(row=r, col=c, x=10 + c / 10, y=50 - r / 10)
+        for r in (0, 9)
+        for c in (0, 9)
+    ]
+    with rasterio.open(
+        path, "w", driver="GTiff", width=10, height=10, count=1, dtype="uint8"
+    ) as dst:
+        dst.write(numpy.ones((10, 10), dtype="uint8"), 1)
+        dst.gcps = (gcps, CRS.from_epsg(4326))
+    return str(path)
+
+
+def test_cache_hits_and_misses(tmp_path):
+    a = _gcp_tiff(tmp_path / "a.tif")
+    b = _gcp_tiff(tmp_path / "b.tif")
+    labels = {"cache": "sar_gcps"}
+
+    geocode.get_gcps.cache_clear()
+    geocode.get_gcps(a)
+    geocode.get_gcps(a)
+    geocode.get_gcps(b)
+
+    assert _sample("titiler_openeo_cache_hits_total", labels) == 1
+    assert _sample("titiler_openeo_cache_misses_total", labels) == 2
+    assert _sample("titiler_openeo_cache_entries", labels) == 2
+    geocode.get_gcps.cache_clear()
+
+
+def test_save_result_encode_time_observed():
+    name = "titiler_openeo_save_result_encode_seconds_count"
+    before = _sample(name)
+    img = ImageData(
+        numpy.ma.MaskedArray(numpy.zeros((1, 4, 4), dtype="uint8")),
+        bounds=(0, 0, 1, 1),
+    )
+    save_result(img, "png")
+    assert _sample(name) == before + 1
@@ -38,7 +38,7 @@ import pytest
 import rasterio
 from rasterio.control import GroundControlPoint
 from rasterio.crs import CRS
-from rasterio.enums import ColorInterp
+from rasterio.enums import ColorInterp, Resampling
 from rasterio.io import MemoryFile
 from rasterio.transform import from_gcps
 from rasterio.vrt import WarpedVRT
@@ -249,3 +249,49 @@ def test_does_not_double_up_an_existing_alpha_band(tmp_path, polar_gcps):
     path = _write_gcp_tif(tmp_path / "alpha.tif", polar_gcps, alpha=True)
     with OpenEOReader(str(path)) as reader:
         assert reader.dataset.count == 2  # unchanged, not 3
+
+
+def test_low_resolution_reads_come_from_source_overviews(tmp_path):
+    """A zoomed-out read decimates through the source's overviews.
+
+    GDAL picks a source overview for the GCP warp when the destination is
+    coarse enough, so a low-zoom tile of a large measurement reads its DN
+    from the overview rather than the full-resolution raster. Overviews are
+    written holding 100 and the full resolution rewritten to 200, so the value
+    read tells which level served it.
+    """
+    size = 2048
+    path = tmp_path / "overviews.tif"
+    rows = cols = np.linspace(0, size, 5)
+    gcps = [
+        GroundControlPoint(
+            row=r, col=c, x=10 + c / size + 0.05 * r / size, y=46 - 0.8 * r / size
+        )
+        for r in rows
+        for c in cols
+    ]
+    profile = {
+        "driver": "GTiff",
+        "width": size,
+        "height": size,
+        "count": 1,
+        "dtype": "uint16",
+        "tiled": True,
+        "blockxsize": 256,
+        "blockysize": 256,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(np.full((size, size), 100, "uint16"), 1)
+        dst.gcps = (gcps, CRS.from_epsg(4326))
+    with rasterio.open(path, "r+") as dst:
+        dst.build_overviews([2, 4, 8, 16], Resampling.average)
+        dst.write(np.full((size, size), 200, "uint16"), 1)
+
+    bbox = (10.2, 45.4, 10.8, 45.9)
+    crs = CRS.from_epsg(4326)
+    with OpenEOReader(str(path)) as reader:
+        coarse = reader.part(bbox, dst_crs=crs, bounds_crs=crs, width=64, height=64)
+        fine = reader.part(bbox, dst_crs=crs, bounds_crs=crs, width=1024, height=1024)
+
+    assert np.unique(coarse.array.data).tolist() == [100]
+    assert np.unique(fine.array.data).tolist() == [200]
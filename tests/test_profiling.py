@@ -0,0 +1,204 @@
+"""Tests for opt-in per-request profiling (titiler.openeo.profiling)."""
+
+import time
+from datetime import datetime
+
+import numpy
+from fastapi import FastAPI, Header
+from fastapi.testclient import TestClient
+from openeo_pg_parser_networkx.process_registry import Process
+from rasterio.crs import CRS
+from rio_tiler.models import ImageData
+
+from titiler.openeo import profiling
+from titiler.openeo.models.auth import User
+from titiler.openeo.models.openapi import ResultRequest
+from titiler.openeo.processes import process_registry
+from titiler.openeo.processes.implementations.core import process
+from titiler.openeo.processes.implementations.data_model import RasterStack
+from titiler.openeo.processes.implementations.io import SaveResultData
+from titiler.openeo.processes.implementations.spatial import resample_spatial
+from titiler.openeo.profiling import (
+    IO_COG_READ,
+    IO_WARP,
+    TRACE_ID_HEADER,
+    get_current_profile,
+    get_trace,
+    profile_io,
+    profiling_headers,
+    register_profiling_endpoints,
+    render_trace,
+    request_profile,
+)
+
+
+@process
+def _inner(x: int) -> int:
+    time.sleep(0.01)
+    return x + 1
+
+
+@process
+def _outer(x: int) -> int:
+    time.sleep(0.01)
+    return _inner(x) * 2
+
+
+def _node(trace, name):
+    return next(node for node in trace["nodes"] if node["process_id"] == name)
+
+
+def test_disabled_by_default():
+    with request_profile() as profile:
+        assert profile is None
+        assert get_current_profile() is None
+        assert _outer(1) == 4
+    assert profiling_headers(profile) == {}
+
+
+def test_process_calls_are_recorded_with_self_time():
+    with request_profile(enabled=True) as profile:
+        assert _outer(1) == 4
+        assert _outer(2) == 6
+
+    trace = profile.to_dict()
+    outer = _node(trace, "outer")
+    inner = _node(trace, "inner")
+    assert outer["calls"] == 2
+    assert inner["calls"] == 2
+    # Outer wall time includes inner; its self time does not.
+    assert outer["wall_ms"] >= inner["wall_ms"] + outer["self_ms"] - 1
+    assert outer["self_ms"] < outer["wall_ms"]
+    assert trace["total_ms"] >= outer["wall_ms"]
+    assert get_trace(profile.trace_id) == trace
+
+
+def test_io_categories_are_exclusive():
+    with request_profile(enabled=True) as profile:
+        with profile_io(IO_COG_READ):
+            time.sleep(0.01)
+            with profile_io(IO_WARP):
+                time.sleep(0.02)
+
+    io = profile.to_dict()["io"]
+    assert io[IO_WARP]["wall_ms"] >= 20
+    assert io[IO_COG_READ]["wall_ms"] < io[IO_WARP]["wall_ms"]
+
+
+def test_resample_spatial_is_recorded_as_warp():
+    image = ImageData(
+        numpy.ma.MaskedArray(numpy.ones((1, 16, 16), dtype="float32")),
+        bounds=(10, 45, 11, 46),
+        crs=CRS.from_epsg(4326),
+    )
+    stack = RasterStack.from_images({datetime(2020, 1, 1): image})
+    with request_profile(enabled=True) as profile:
+        resampled = resample_spatial(stack, projection=3857)
+        _ = resampled.values()
+
+    io = profile.to_dict()["io"]
+    assert io[IO_WARP]["calls"] == 1
+    assert IO_COG_READ not in io
+
+
+def test_allocations_tracked_when_enabled(monkeypatch):
+    monkeypatch.setattr(profiling._settings, "track_allocations", True)
+
+    @process
+    def allocate() -> bytearray:
+        return bytearray(2_000_000)
+
+    with request_profile(enabled=True) as profile:
+        kept = allocate()
+
+    assert len(kept) == 2_000_000
+    assert _node(profile.to_dict(), "allocate")["alloc_bytes"] >= 2_000_000
+
+
+def test_server_timing_and_render():
+    with request_profile(enabled=True) as profile:
+        _outer(1)
+        with profile_io(IO_COG_READ):
+            pass
+
+    headers = profiling_headers(profile)
+    assert headers[TRACE_ID_HEADER] == profile.trace_id
+    timing = headers["Server-Timing"]
+    assert timing.startswith("outer;dur=")
+    assert "io_cog_read;dur=" in timing
+    assert "total;dur=" in timing
+
+    text = render_trace(profile.to_dict())
+    assert "outer" in text
+    assert "cog_read" in text
+
+
+class _HeaderAuth:
+    """Authenticates the user named in the Authorization header."""
+
+    def validate(self, authorization: str = Header()) -> User:
+        return User(user_id=authorization)
+
+
+def test_trace_endpoint():
+    with request_profile(enabled=True, user_id="alice") as profile:
+        _inner(1)
+    with request_profile(enabled=True) as anonymous:
+        _inner(1)
+
+    app = FastAPI()
+    register_profiling_endpoints(app, _HeaderAuth())
+    client = TestClient(app)
+    url = f"/debug/traces/{profile.trace_id}"
+
+    response = client.get(url, headers={"Authorization": "alice"})
+    assert response.status_code == 200
+    assert response.json()["trace_id"] == profile.trace_id
+    assert response.json()["user_id"] == "alice"
+
+    # Authentication is required, and other users' traces are not found.
+    assert client.get(url).status_code == 422
+    assert client.get(url, headers={"Authorization": "bob"}).status_code == 404
+
+    # Anonymous (public service) traces are readable by any user.
+    response = client.get(
+        f"/debug/traces/{anonymous.trace_id}", headers={"Authorization": "bob"}
+    )
+    assert response.status_code == 200
+
+    unknown = client.get("/debug/traces/unknown", headers={"Authorization": "bob"})
+    assert unknown.status_code == 404
+
+
+def test_result_emits_server_timing(app_with_auth, monkeypatch):
+    monkeypatch.setattr(profiling._settings, "enabled", True)
+
+    @process
+    def profiled_result() -> SaveResultData:
+        return SaveResultData(data=b"ok", media_type="text/plain")
+
+    app_with_auth.app.endpoints.process_registry[None]["profiled_result"] = Process(
+        implementation=profiled_result,
+        spec={"id": "profiled_result", "description": "test", "parameters": []},
+    )
+    body = ResultRequest(
+        process={
+            "process_graph": {
+                "r": {"process_id": "profiled_result", "arguments": {}, "result": True}
+            }
+        }
+    ).model_dump(exclude_none=True)
+
+    response = app_with_auth.post("/result", json=body)
+    assert response.status_code == 200
+    assert "profiled_result;dur=" in response.headers["Server-Timing"]
+    trace = get_trace(response.headers[TRACE_ID_HEADER])
+    assert _node(trace, "profiled_result")["calls"] == 1
+
+
+def test_nodes_are_named_by_process_id():
+    and_ = process_registry["and"].implementation
+    with request_profile(enabled=True) as profile:
+        and_(x=True, y=False)
+
+    assert [node["process_id"] for node in profile.to_dict()["nodes"]] == ["and"]
@@ -7,8 +7,17 @@ from pathlib import Path
 import numpy as np
 import pytest
 
+from tests.benchmarks.kernels import (
+    calibration_grid,
+    inverse_map,
+    noise_lut,
+    reference_interp,
+    reference_noise,
+)
 from titiler.openeo.sar.annotation import (
     Grid2D,
+    NoiseLUT,
+    _AzimuthBlock,
     get_calibration,
     get_noise,
     parse_calibration,
@@ -78,6 +87,38 @@ def test_grid2d_clamps_outside_grid():
     assert above == pytest.approx(30.0)
 
 
+def test_grid2d_matches_reference_blend():
+    """The fused interpolation gives the plain four-corner blend's values,
+    including outside the grid, exactly on knots and at NaN coordinates."""
+    grid = calibration_grid()
+    rng = np.random.default_rng(1)
+    line = rng.uniform(-500, 17500, (64, 64))
+    pixel = rng.uniform(-500, 25500, (64, 64))
+    line[0, :8] = grid.lines[:8]
+    pixel[1, :8] = grid.pixels[:8]
+    line[2, 0] = np.nan
+
+    expected = reference_interp(grid, "sigmaNought", line, pixel)
+    got = grid.interp("sigmaNought", line, pixel)
+    assert got.dtype == np.float64
+    np.testing.assert_allclose(got, expected, rtol=1e-12)
+    assert np.isnan(got[2, 0])
+
+
+def test_grid2d_float32_coordinates_interpolate_in_float32():
+    """float32 coordinates stay within 1e-6 relative of the float64 result
+    over a whole scene's extent."""
+    grid = calibration_grid()
+    coords = inverse_map(256)
+    expected = grid.interp("sigmaNought", **coords)
+
+    got = grid.interp(
+        "sigmaNought", coords["line"].astype("f4"), coords["pixel"].astype("f4")
+    )
+    assert got.dtype == np.float32
+    np.testing.assert_allclose(got, expected, rtol=1e-6)
+
+
 # --------------------------------------------------------------------------- calibration
 
 
@@ -329,6 +370,56 @@ def test_noise_azimuth_scaling_actually_applied():
         assert scaled != pytest.approx(unscaled)
 
 
+def _noise_query_points(noise, n=200, seed=0):
+    """Random points over and around the blocks, plus every block's edges."""
+    rng = np.random.default_rng(seed)
+    line = list(rng.uniform(-1000, 23000, n))
+    pixel = list(rng.uniform(-1000, 27000, n))
+    for blk in noise.azimuth_blocks:
+        for dl in (0.0, -1e-6, 1e-6, 0.5):
+            for dp in (0.0, -1e-6, 1e-6):
+                for ln in (blk.first_line - dl, blk.last_line + dl):
+                    for px in (blk.first_sample - dp, blk.last_sample + dp):
+                        line.append(ln)
+                        pixel.append(px)
+    line += [np.nan, 100.0]
+    pixel += [100.0, np.nan]
+    return np.array(line), np.array(pixel)
+
+
+@pytest.mark.parametrize(
+    "noise",
+    [
+        parse_noise((FIXTURES / "noise_ipf290.xml").read_bytes()),
+        noise_lut(swaths=5, bursts=10),
+    ],
+    ids=["ipf290", "50-blocks"],
+)
+def test_noise_evaluate_matches_per_block_evaluation(noise):
+    """All blocks at once give the per-block loop's values: on, just inside
+    and just outside every block edge, where blocks overlap, and outside all
+    of them."""
+    line, pixel = _noise_query_points(noise)
+    np.testing.assert_allclose(
+        noise.evaluate(line, pixel), reference_noise(noise, line, pixel), rtol=1e-12
+    )
+
+
+def test_noise_evaluate_later_block_wins_overlaps():
+    grid = Grid2D(
+        lines=np.array([0.0, 100.0]),
+        pixels=np.array([0.0, 100.0]),
+        values={"noiseRangeLut": np.full((2, 2), 10.0)},
+    )
+    blocks = [
+        _AzimuthBlock(0, 100, 0, 100, np.array([0.0, 100.0]), np.array([2.0, 2.0])),
+        _AzimuthBlock(50, 60, 50, 60, np.array([50.0, 60.0]), np.array([3.0, 5.0])),
+    ]
+    noise = NoiseLUT(grid, blocks)
+    got = noise.evaluate(np.array([10.0, 55.0, 55.0, 60.0]), np.array([10, 55, 49, 60]))
+    np.testing.assert_allclose(got, [20.0, 40.0, 20.0, 50.0])
+
+
 def test_parse_noise_unrecognised_schema_raises():
     """An annotation with neither known noise list raises a clear error."""
     with pytest.raises(ValueError, match="noiseRangeVectorList|noiseVectorList"):
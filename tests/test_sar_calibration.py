@@ -6,7 +6,10 @@ pass hand-picked constants directly, independent of how a real `a`/`eta`
 array would have been produced.
 """
 
+import tracemalloc
+
 import numpy as np
+import pytest
 
 from titiler.openeo.sar.calibration import calibrate
 
@@ -59,3 +62,79 @@ def test_calibrate_without_noise_skips_subtraction():
 
     np.testing.assert_allclose(result.value, [[100.0, 0.0]])
     assert result.negative_count == 0
+
+
+def test_calibrate_rejects_an_integer_dtype():
+    with pytest.raises(ValueError, match="floating-point"):
+        calibrate(np.array([[10]]), dtype="i4")
+
+
+# --------------------------------------------------------------------------- float32 path
+
+
+def _scene(shape=(512, 512), noise=(0.0, 0.25), seed=0):
+    """Random GRD-like inputs: uint16 DN, float32 A and eta bands.
+
+    `noise` is eta's range as a fraction of DN^2.
+    """
+    rng = np.random.default_rng(seed)
+    dn = rng.integers(0, 65535, shape, dtype="uint16")
+    dn[:, :16] = 0  # a no-data border
+    a = rng.uniform(200, 700, shape).astype("f4")
+    eta = (rng.uniform(*noise, shape) * dn.astype("f8") ** 2).astype("f4")
+    return dn, a, eta
+
+
+def test_float32_calibrate_hand_computed():
+    dn = np.array([[np.sqrt(200.0), 0.0, np.sqrt(50.0)]])
+    a = np.full_like(dn, SIGMA_NOUGHT)
+    eta = np.full_like(dn, 80.0)
+    result = calibrate(dn, a=a, eta=eta, dtype="f4")
+
+    assert result.value.dtype == np.float32
+    np.testing.assert_allclose(result.value, [[120.0 / 4, 0.0, 0.0]], rtol=1e-6)
+    assert result.negative_count == 1
+
+
+def test_float32_calibrate_is_within_two_ulps_of_float64():
+    # Light noise: the error relative to the value itself.
+    dn, a, eta = _scene()
+    f8 = calibrate(dn, a=a, eta=eta)
+    f4 = calibrate(dn, a=a, eta=eta, dtype="f4")
+
+    valid = f8.value > 0
+    relative = np.abs(f4.value[valid] - f8.value[valid]) / f8.value[valid]
+    eps = np.finfo("f4").eps
+    assert relative.max() <= 2 * eps
+    assert np.median(relative) <= eps / 2
+    np.testing.assert_array_equal(f4.valid_mask, f8.valid_mask)
+    assert f4.negative_count == f8.negative_count
+
+
+def test_float32_calibrate_error_is_bounded_by_the_uncancelled_value():
+    # Noise about as large as DN^2: subtraction cancels, so the error is
+    # relative to (DN^2 + eta) / A^2 rather than to the result.
+    dn, a, eta = _scene(noise=(0.5, 1.5), seed=1)
+    f8 = calibrate(dn, a=a, eta=eta)
+    f4 = calibrate(dn, a=a, eta=eta, dtype="f4")
+
+    scale = (dn.astype("f8") ** 2 + eta) / a.astype("f8") ** 2
+    valid = scale > 0
+    error = np.abs(f4.value - f8.value)[valid] / scale[valid]
+    assert error.max() <= 2 * np.finfo("f4").eps
+    # Pixels within rounding of DN^2 == eta may clamp differently.
+    assert abs(f4.negative_count - f8.negative_count) <= dn.size * 1e-4
+
+
+def test_float32_calibrate_allocates_one_output_buffer():
+    dn, a, eta = _scene(shape=(1024, 1024))
+    tracemalloc.start()
+    try:
+        result = calibrate(dn, a=a, eta=eta, dtype="f4")
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # The float32 output, the validity mask and the negative-noise mask.
+    assert result.value.nbytes == dn.size * 4
+    assert peak <= dn.size * (4 + 1 + 1) * 1.05
@@ -0,0 +1,147 @@
+"""Tests for titiler.openeo.sar.diskcache, the on-disk annotation/GCP cache."""
+
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tests.test_sar_geocode import _write_gcp_geotiff
+from titiler.openeo.sar import annotation, diskcache, geocode
+
+FIXTURES = Path(__file__).parent / "fixtures" / "sar"
+
+
+class _EtagFetcher:
+    """A fake AssetFetcher with an ETag per href and a fetch count."""
+
+    def __init__(self, payload: bytes, etag: str = '"v1"'):
+        self.payload = payload
+        self.etag_value = etag
+        self.calls = 0
+
+    def fetch(self, href: str) -> bytes:
+        self.calls += 1
+        return self.payload
+
+    def etag(self, href: str) -> str:
+        return self.etag_value
+
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    """Enable the disk cache under a temporary directory."""
+    directory = tmp_path / "sar-cache"
+    monkeypatch.setattr(diskcache._settings, "disk_cache_dir", str(directory))
+    return directory
+
+
+def _restart():
+    """Forget the in-memory tier, as a new worker process would."""
+    annotation.get_calibration.cache_clear()
+    annotation.get_noise.cache_clear()
+    geocode.get_gcps.cache_clear()
+
+
+def _href(name: str) -> str:
+    return f"s3://bucket/{uuid.uuid4()}/{name}"
+
+
+def test_calibration_survives_a_restart(disk_cache):
+    href = _href("calibration.xml")
+    fetcher = _EtagFetcher((FIXTURES / "calibration_ipf290.xml").read_bytes())
+    line = np.array([[0.0, 500.0], [1200.0, 3000.0]])
+    pixel = np.array([[0.0, 4000.0], [9000.0, 20000.0]])
+
+    expected = annotation.get_calibration(href, fetcher=fetcher)
+    _restart()
+    cached = annotation.get_calibration(href, fetcher=fetcher)
+
+    assert fetcher.calls == 1
+    assert len(list(disk_cache.glob("*.npz"))) == 1
+    for quantity in ("sigma_nought", "beta_nought", "gamma", "dn"):
+        np.testing.assert_array_equal(
+            getattr(cached, quantity)(line, pixel),
+            getattr(expected, quantity)(line, pixel),
+        )
+
+
+@pytest.mark.parametrize("fixture_name", ["noise_ipf290.xml", "noise_legacy.xml"])
+def test_noise_survives_a_restart(disk_cache, fixture_name):
+    href = _href(fixture_name)
+    fetcher = _EtagFetcher((FIXTURES / fixture_name).read_bytes())
+
+    expected = annotation.get_noise(href, fetcher=fetcher)
+    _restart()
+    cached = annotation.get_noise(href, fetcher=fetcher)
+
+    assert fetcher.calls == 1
+    assert len(cached.azimuth_blocks) == len(expected.azimuth_blocks)
+    rows, cols = np.mgrid[0:16000:500, 0:25000:700].astype("f8")
+    np.testing.assert_array_equal(
+        cached.evaluate(rows, cols), expected.evaluate(rows, cols)
+    )
+
+
+def test_changed_etag_is_refetched(disk_cache):
+    href = _href("calibration.xml")
+    fetcher = _EtagFetcher((FIXTURES / "calibration_ipf290.xml").read_bytes())
+
+    annotation.get_calibration(href, fetcher=fetcher)
+    _restart()
+    fetcher.etag_value = '"v2"'
+    annotation.get_calibration(href, fetcher=fetcher)
+
+    assert fetcher.calls == 2
+
+
+def test_gcps_survive_a_restart_until_the_file_changes(disk_cache, tmp_path):
+    path = tmp_path / f"{uuid.uuid4()}.tif"
+    written = _write_gcp_geotiff(path)
+
+    expected = geocode.get_gcps(str(path))
+    _restart()
+    gcps, crs = geocode.get_gcps(str(path))
+
+    assert crs == expected[1]
+    np.testing.assert_array_equal(
+        [(g.row, g.col, g.x, g.y, g.z) for g in gcps],
+        [(g.row, g.col, g.x, g.y, g.z) for g in written],
+    )
+    assert len(list(disk_cache.glob("*.npz"))) == 1
+
+    # Rewriting the file changes its size/mtime validator: a new entry.
+    mtime = path.stat().st_mtime
+    path.unlink()
+    _write_gcp_geotiff(path)
+    os.utime(path, (mtime + 1, mtime + 1))
+    _restart()
+    geocode.get_gcps(str(path))
+    assert len(list(disk_cache.glob("*.npz"))) == 2
+
+
+def test_corrupt_entry_is_rebuilt(disk_cache):
+    href = _href("calibration.xml")
+    fetcher = _EtagFetcher((FIXTURES / "calibration_ipf290.xml").read_bytes())
+
+    annotation.get_calibration(href, fetcher=fetcher)
+    (entry,) = disk_cache.glob("*.npz")
+    entry.write_bytes(b"not an npz")
+    _restart()
+    annotation.get_calibration(href, fetcher=fetcher)
+    _restart()
+    annotation.get_calibration(href, fetcher=fetcher)
+
+    assert fetcher.calls == 2
+
+
+def test_disabled_without_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(diskcache._settings, "disk_cache_dir", None)
+    calls = []
+    result = diskcache.read_through(
+        "test", _href("x"), lambda: calls.append(1) or 1, dict, dict
+    )
+    assert result == 1
+    assert calls == [1]
+    assert not list(tmp_path.iterdir())
@@ -1,10 +1,22 @@
 """Tests for titiler.openeo.sar.fetcher."""
 
+import hashlib
 import sys
+import threading
+import urllib.error
+from email.message import Message
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
 
 import pytest
 
-from titiler.openeo.sar.fetcher import ObstoreFetcher, get_default_fetcher
+from titiler.openeo.sar.fetcher import (
+    ObstoreFetcher,
+    _http_get,
+    _http_head,
+    get_default_fetcher,
+)
 
 # --------------------------------------------------------------------------- dispatch
 
@@ -44,6 +56,28 @@ def test_fetch_dispatches_s3_to_fetch_s3(monkeypatch):
     assert seen == {"bucket": "eodata", "key": "Sentinel-1/foo/bar.xml"}
 
 
+def test_fetch_range_sends_an_http_range_request(monkeypatch):
+    """Byte ranges over HTTP are an inclusive `Range` header."""
+    calls = []
+    monkeypatch.setattr(
+        "titiler.openeo.sar.fetcher._http_get",
+        lambda url, headers=None: calls.append((url, headers)) or b"x",
+    )
+    fetcher = ObstoreFetcher()
+    assert fetcher.fetch_range("https://example.com/a.tif", 100, 50) == b"x"
+    assert calls == [("https://example.com/a.tif", {"Range": "bytes=100-149"})]
+
+
+def test_etag_comes_from_an_http_head_request(monkeypatch):
+    headers = Message()
+    headers["ETag"] = '"abc"'
+    monkeypatch.setattr("titiler.openeo.sar.fetcher._http_head", lambda url: headers)
+    assert ObstoreFetcher().etag("https://example.com/a.xml") == '"abc"'
+
+    monkeypatch.setattr("titiler.openeo.sar.fetcher._http_head", lambda url: Message())
+    assert ObstoreFetcher().etag("https://example.com/a.xml") is None
+
+
 def test_fetch_unsupported_scheme_raises():
     """A scheme that is neither http(s) nor s3 raises a clear ValueError."""
     fetcher = ObstoreFetcher()
@@ -68,6 +102,7 @@ def _clean_aws_env(monkeypatch):
         "AWS_VIRTUAL_HOSTING",
         "AWS_ENDPOINT_URL",
         "AWS_S3_ENDPOINT",
+        "AWS_HTTPS",
         "AWS_NO_SIGN_REQUEST",
         "AWS_PROFILE",
         "AWS_ACCESS_KEY_ID",
@@ -213,3 +248,125 @@ def test_s3_store_options_profile_without_boto3_raises_clear_error(monkeypatch):
 
     with pytest.raises(ImportError, match=r"titiler-openeo\[boto3\]"):
         ObstoreFetcher()._s3_store_options()
+
+
+def test_s3_store_options_plain_http_endpoint(monkeypatch):
+    """GDAL's AWS_HTTPS=NO serves a bare AWS_S3_ENDPOINT over plain HTTP."""
+    monkeypatch.setenv("AWS_S3_ENDPOINT", "minio:9000")
+    monkeypatch.setenv("AWS_HTTPS", "NO")
+    opts = ObstoreFetcher()._s3_store_options()
+    assert opts["endpoint"] == "http://minio:9000"
+    assert opts["client_options"] == {"allow_http": True}
+
+
+# --------------------------------------------------------------------------- connection reuse
+
+
+class _S3StandIn(BaseHTTPRequestHandler):
+    """A path-style, unsigned S3 endpoint serving `objects`, over keep-alive
+    HTTP/1.1, counting the connections it accepts."""
+
+    protocol_version = "HTTP/1.1"
+    objects: Dict[str, bytes] = {}
+    connections: List[Tuple[str, int]] = []
+
+    def setup(self):
+        self.connections.append(self.client_address)
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def _send_headers(
+        self, status: int, body: bytes, content_range: Optional[str] = None
+    ) -> None:
+        self.send_response(status)
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", f'"{hashlib.md5(body).hexdigest()}"')  # noqa: S324
+        self.send_header("Last-Modified", formatdate(usegmt=True))
+        self.end_headers()
+
+    def do_HEAD(self):
+        body = self.objects.get(self.path.lstrip("/"))
+        if body is None:
+            self._send_headers(404, b"")
+        else:
+            self._send_headers(200, body)
+
+    def do_GET(self):
+        body = self.objects.get(self.path.lstrip("/"))
+        if body is None:
+            self._send_headers(404, b"")
+            return
+        if self.headers.get("Range"):
+            start, end = self.headers["Range"].split("=")[1].split("-")
+            content_range = f"bytes {start}-{end}/{len(body)}"
+            body = body[int(start) : int(end) + 1]
+            self._send_headers(206, body, content_range)
+        else:
+            self._send_headers(200, body)
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def s3_stand_in(monkeypatch):
+    """Serve `bucket/annotation/calibration.xml` from a local S3 stand-in."""
+    _S3StandIn.objects = {"bucket/annotation/calibration.xml": b"<calibration/>"}
+    _S3StandIn.connections = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _S3StandIn)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setenv("AWS_ENDPOINT_URL", endpoint)
+    monkeypatch.setenv("AWS_NO_SIGN_REQUEST", "YES")
+    yield endpoint
+    server.shutdown()
+    server.server_close()
+
+
+def test_s3_fetcher_against_a_local_stand_in(s3_stand_in):
+    href = "s3://bucket/annotation/calibration.xml"
+    fetcher = ObstoreFetcher()
+    assert fetcher.fetch(href) == b"<calibration/>"
+    assert fetcher.fetch_range(href, 1, 11) == b"calibration"
+    assert fetcher.size(href) == 14
+    assert fetcher.etag(href) == f'"{hashlib.md5(b"<calibration/>").hexdigest()}"'  # noqa: S324
+
+
+def test_s3_stores_are_pooled_per_bucket(s3_stand_in):
+    fetcher = ObstoreFetcher()
+    store = fetcher._s3_store("bucket")
+    assert fetcher._s3_store("bucket") is store
+    assert fetcher._s3_store("other") is not store
+
+    for _ in range(20):
+        fetcher.fetch("s3://bucket/annotation/calibration.xml")
+    # A fresh store per fetch opened one connection each; the pooled one
+    # keeps its connections alive. (Not exactly one: the client may open a
+    # new connection before an idle one is handed back to its pool.)
+    assert len(_S3StandIn.connections) < 10
+
+
+def test_s3_store_is_rebuilt_when_credentials_change(s3_stand_in, monkeypatch):
+    fetcher = ObstoreFetcher()
+    store = fetcher._s3_store("bucket")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDROTATED")
+    assert fetcher._s3_store("bucket") is not store
+
+
+def test_http_connections_are_kept_alive(s3_stand_in):
+    url = f"{s3_stand_in}/bucket/annotation/calibration.xml"
+    for _ in range(5):
+        assert _http_get(url) == b"<calibration/>"
+    assert _http_head(url)["Content-Length"] == "14"
+    assert len(_S3StandIn.connections) == 1
+
+
+def test_http_errors_raise(s3_stand_in):
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _http_get(f"{s3_stand_in}/bucket/missing.xml")
+    assert excinfo.value.code == 404
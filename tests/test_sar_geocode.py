@@ -16,8 +16,12 @@ import pytest
 import rasterio
 from rasterio.control import GroundControlPoint
 from rasterio.crs import CRS
+from rasterio.transform import GCPTransformer
 from rasterio.warp import transform as warp_transform
+from rasterio.warp import transform_bounds
 
+from titiler.openeo.sar import geocode
+from titiler.openeo.sar.annotation import parse_calibration, parse_noise
 from titiler.openeo.sar.geocode import _gdal_path, build_inverse_map, get_gcps
 
 FIXTURE = Path(__file__).parent / "fixtures" / "sar" / "gcps_ew_grdm_polar.json"
@@ -139,6 +143,117 @@ def test_tps_round_trip_on_real_polar_gcps_sub_metre():
     assert rms_m < 1.0, f"RMS residual {rms_m:.4f} m (>= 1 m)"
 
 
+def _polar_gcps():
+    raw = json.loads(FIXTURE.read_text())
+    gcps = [
+        GroundControlPoint(row=g["row"], col=g["col"], x=g["x"], y=g["y"], z=0)
+        for g in raw["gcps"]
+    ]
+    return gcps, CRS.from_string(raw["gcp_crs"])
+
+
+@pytest.mark.parametrize(
+    "lonlat_bounds",
+    [
+        (0.0, 83.0, 5.0, 84.0),  # tile-sized: settles on the coarse grid
+        (-19.0, 81.2, 28.0, 86.5),  # whole scene: refines heavily
+    ],
+)
+def test_refined_inverse_map_is_within_tolerance(monkeypatch, lonlat_bounds):
+    """The coarse-grid map stays within the tolerance of the exact TPS map."""
+    gcps, gcp_crs = _polar_gcps()
+    dst_crs = CRS.from_epsg(3857)
+    bounds = transform_bounds(gcp_crs, dst_crs, *lonlat_bounds)
+
+    monkeypatch.setattr(geocode._settings, "geocode_tolerance", 0.0)
+    exact = build_inverse_map(gcps, gcp_crs, 256, 256, bounds, dst_crs)
+    monkeypatch.setattr(geocode._settings, "geocode_tolerance", 0.1)
+    refined = build_inverse_map(gcps, gcp_crs, 256, 256, bounds, dst_crs)
+
+    np.testing.assert_allclose(refined.line, exact.line, rtol=0, atol=0.1)
+    np.testing.assert_allclose(refined.pixel, exact.pixel, rtol=0, atol=0.1)
+
+
+def test_refined_inverse_map_evaluates_a_fraction_of_the_pixels(monkeypatch):
+    gcps, gcp_crs = _polar_gcps()
+    dst_crs = CRS.from_epsg(3857)
+    bounds = transform_bounds(gcp_crs, dst_crs, 0.0, 83.0, 5.0, 84.0)
+
+    evaluated = []
+
+    class CountingTransformer(GCPTransformer):
+        def rowcol(self, xs, ys, *args, **kwargs):
+            evaluated.append(len(xs))
+            return super().rowcol(xs, ys, *args, **kwargs)
+
+    monkeypatch.setattr(geocode, "GCPTransformer", CountingTransformer)
+    build_inverse_map(gcps, gcp_crs, 1024, 1024, bounds, dst_crs)
+    assert sum(evaluated) < 0.02 * 1024 * 1024
+
+
+def test_low_zoom_geocoding_holds_tolerance_in_destination_pixels(monkeypatch):
+    """A whole-scene tile spans ~36 source pixels per pixel: low-zoom mode
+    holds it to 0.1 of those, at a fraction of the exact evaluations."""
+    gcps, gcp_crs = _polar_gcps()
+    dst_crs = CRS.from_epsg(3857)
+    bounds = transform_bounds(gcp_crs, dst_crs, -19.0, 81.2, 28.0, 86.5)
+
+    monkeypatch.setattr(geocode._settings, "geocode_tolerance", 0.0)
+    exact = build_inverse_map(gcps, gcp_crs, 256, 256, bounds, dst_crs)
+    span = min(
+        np.hypot(np.diff(exact.line, axis=1), np.diff(exact.pixel, axis=1)).mean(),
+        np.hypot(np.diff(exact.line, axis=0), np.diff(exact.pixel, axis=0)).mean(),
+    )
+    assert span > 30
+
+    evaluated = []
+
+    class CountingTransformer(GCPTransformer):
+        def rowcol(self, xs, ys, *args, **kwargs):
+            evaluated.append(len(xs))
+            return super().rowcol(xs, ys, *args, **kwargs)
+
+    monkeypatch.setattr(geocode, "GCPTransformer", CountingTransformer)
+    monkeypatch.setattr(geocode._settings, "geocode_tolerance", 0.1)
+    monkeypatch.setattr(geocode._settings, "low_zoom_geocoding", True)
+    low_zoom = build_inverse_map(gcps, gcp_crs, 256, 256, bounds, dst_crs)
+
+    np.testing.assert_allclose(low_zoom.line, exact.line, rtol=0, atol=0.1 * span)
+    np.testing.assert_allclose(low_zoom.pixel, exact.pixel, rtol=0, atol=0.1 * span)
+    # Without low-zoom mode, every one of the 256 x 256 pixels is evaluated.
+    assert sum(evaluated) < 0.3 * 256 * 256
+
+    # What that costs the LUT bands sampled through it: calibration LUTs are
+    # smooth; the noise LUT steps at burst edges, so a handful of pixels next
+    # to one pick up the neighbouring burst's value.
+    fixtures = FIXTURE.parent
+    calibration = parse_calibration((fixtures / "calibration_ipf290.xml").read_bytes())
+    noise = parse_noise((fixtures / "noise_ipf290.xml").read_bytes())
+    for lut, rtol, share in (
+        (calibration.sigma_nought, 1e-4, 1.0),
+        (noise.evaluate, 1e-3, 0.99),
+    ):
+        want = lut(exact.line, exact.pixel)
+        got = lut(low_zoom.line, low_zoom.pixel)
+        assert np.mean(np.abs(got - want) <= rtol * np.abs(want)) >= share
+
+
+def test_low_zoom_geocoding_is_exact_where_pixels_are_finer(monkeypatch):
+    """Destination pixels smaller than the measurement's keep the source-pixel
+    tolerance: low-zoom mode changes nothing there."""
+    gcps, gcp_crs = _polar_gcps()
+    dst_crs = CRS.from_epsg(3857)
+    bounds = transform_bounds(gcp_crs, dst_crs, 2.0, 83.5, 2.05, 83.52)
+
+    monkeypatch.setattr(geocode._settings, "geocode_tolerance", 0.1)
+    default = build_inverse_map(gcps, gcp_crs, 256, 256, bounds, dst_crs)
+    monkeypatch.setattr(geocode._settings, "low_zoom_geocoding", True)
+    low_zoom = build_inverse_map(gcps, gcp_crs, 256, 256, bounds, dst_crs)
+
+    np.testing.assert_array_equal(low_zoom.line, default.line)
+    np.testing.assert_array_equal(low_zoom.pixel, default.pixel)
+
+
 # --------------------------------------------------------------------------- _gdal_path
 
 
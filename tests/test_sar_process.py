@@ -392,6 +392,31 @@ def test_noise_removal_agrees_at_high_backscatter():
     assert on_value == pytest.approx(off_value, rel=1e-2)
 
 
+def test_float32_calibration_setting_matches_float64(monkeypatch):
+    rng = np.random.default_rng(0)
+    dn = {"vv": rng.integers(1, 4000, (8, 8)), "vh": rng.integers(1, 4000, (8, 8))}
+    extra_bands = {
+        f"{pol}_{band}": rng.uniform(*bounds, (8, 8))
+        for pol in dn
+        for band, bounds in (("sigma0_lut", (200, 700)), ("noise_lut", (0, 1e5)))
+    }
+
+    def run() -> ImageData:
+        stack = _make_stack(dn, width=8, height=8, extra_bands=extra_bands)
+        return _only_image(sar_backscatter(stack, coefficient="sigma0-ellipsoid"))
+
+    f8 = run()
+    monkeypatch.setattr(
+        "titiler.openeo.processes.implementations.sar._settings.float32_calibration",
+        True,
+    )
+    f4 = run()
+
+    assert f4.array.dtype == np.float32
+    assert not np.array_equal(f4.array.data, f8.array.data)
+    np.testing.assert_allclose(f4.array.data, f8.array.data, rtol=5e-7, atol=1e-6)
+
+
 def test_mask_band_reflects_dn_zero_border():
     stack = _make_stack(
         {"vv": np.array([[0, 500]])},
@@ -0,0 +1,152 @@
+"""Test tile pre-seeding."""
+
+import sqlite3
+
+import pytest
+
+from titiler.openeo.seed import (
+    DirectoryWriter,
+    MBTilesWriter,
+    main,
+    seed,
+    service_tiles,
+)
+
+# Each tile's body is its column
+SERVICE = {
+    "id": "seeded",
+    "user_id": "owner",
+    "type": "XYZ",
+    "configuration": {"scope": "private"},
+    "process": {
+        "process_graph": {
+            "x": {
+                "process_id": "constant",
+                "arguments": {"x": {"from_parameter": "tile_x"}},
+            },
+            "save": {
+                "process_id": "save_result",
+                "arguments": {"data": {"from_node": "x"}, "format": "txt"},
+                "result": True,
+            },
+        }
+    },
+}
+
+
+def _keys(blocks):
+    return [(t.z, t.x, t.y) for block in blocks for t in block]
+
+
+def test_service_tiles():
+    """Tiles are clipped to the zoom range, the extent and the bbox."""
+    assert _keys(service_tiles(SERVICE, 0, 1)) == [
+        (0, 0, 0),
+        (1, 0, 0),
+        (1, 1, 0),
+        (1, 0, 1),
+        (1, 1, 1),
+    ]
+
+    # North-east quarter of the world
+    assert _keys(service_tiles(SERVICE, 1, 1, bbox=[10, 10, 170, 80])) == [(1, 1, 0)]
+
+    service = {**SERVICE, "configuration": {"extent": [-170, -80, -10, -10]}}
+    assert _keys(service_tiles(service, 0, 1)) == [(0, 0, 0), (1, 0, 1)]
+
+    service = {**SERVICE, "configuration": {"minzoom": 2, "maxzoom": 3}}
+    assert {z for z, _, _ in _keys(service_tiles(service, 0, 10))} == {2, 3}
+
+
+def test_service_tiles_metatile_blocks():
+    """Tiles of one metatile come in one block."""
+    service = {**SERVICE, "configuration": {"metatile": 2}}
+    blocks = list(service_tiles(service, 2, 2))
+    assert len(blocks) == 4
+    assert all(len(block) == 4 for block in blocks)
+    assert {(t.x // 2, t.y // 2) for t in blocks[1]} == {(1, 0)}
+
+
+def test_service_tiles_geometry():
+    """Tiles must intersect the geometry."""
+    pytest.importorskip("shapely")
+    triangle = {
+        "type": "Polygon",
+        "coordinates": [[[1, 1], [170, 1], [1, 80], [1, 1]]],
+    }
+    keys = _keys(service_tiles(SERVICE, 2, 2, geometry=triangle))
+    assert (2, 2, 1) in keys and (2, 3, 0) not in keys
+
+
+def test_directory_writer(tmp_path):
+    """Tiles are files under {z}/{x}/{y}.{ext}."""
+    writer = DirectoryWriter(tmp_path, "png")
+    assert not writer.exists((3, 1, 2))
+    writer.write((3, 1, 2), b"tile")
+    assert writer.exists((3, 1, 2))
+    assert (tmp_path / "3" / "1" / "2.png").read_bytes() == b"tile"
+
+
+def test_mbtiles_writer(tmp_path):
+    """Rows are numbered from the south, and tiles are found again."""
+    path = tmp_path / "tiles.mbtiles"
+    writer = MBTilesWriter(path, metadata={"format": "png"})
+    writer.write((3, 1, 2), b"tile")
+    writer.close()
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT * FROM tiles").fetchall() == [(3, 1, 5, b"tile")]
+        assert db.execute("SELECT * FROM metadata").fetchall() == [("format", "png")]
+
+    writer = MBTilesWriter(path)
+    assert writer.exists((3, 1, 2))
+    writer.close()
+
+
+def test_seed_resumes(tmp_path, monkeypatch):
+    """Tiles are rendered by worker processes, and seeded tiles skipped."""
+    monkeypatch.setenv("TITILER_OPENEO_STAC_API_URL", "https://stac.eoapi.dev")
+    monkeypatch.setenv("TITILER_OPENEO_STORE_URL", str(tmp_path / "services.db"))
+    output = tmp_path / "tiles"
+
+    writer = DirectoryWriter(output, "txt")
+    writer.write((1, 0, 0), b"seeded")
+    report = seed(SERVICE, service_tiles(SERVICE, 1, 1), writer, workers=2)
+
+    assert (report.total, report.rendered, report.skipped) == (3, 3, 1)
+    assert report.errors == 0
+    assert (output / "1" / "0" / "0.txt").read_bytes() == b"seeded"
+    assert (output / "1" / "1" / "1.txt").read_bytes() == b"1"
+
+    report = seed(SERVICE, service_tiles(SERVICE, 1, 1), writer, workers=0)
+    assert (report.total, report.rendered, report.skipped) == (0, 0, 4)
+
+
+def test_seed_reports_errors(tmp_path, capsys):
+    """Failing tiles are reported and do not stop the run."""
+    service = {
+        **SERVICE,
+        "process": {
+            "process_graph": {
+                "save": {
+                    "process_id": "save_result",
+                    "arguments": {"data": None, "format": "PNG"},
+                    "result": True,
+                }
+            }
+        },
+    }
+    report = seed(
+        service, service_tiles(service, 0, 0), DirectoryWriter(tmp_path, "png"), 0
+    )
+    assert (report.rendered, report.errors) == (0, 1)
+    assert "tile (0, 0, 0)" in capsys.readouterr().err
+
+
+def test_main_unknown_service(tmp_path, monkeypatch, capsys):
+    """An unknown service id is a usage error."""
+    monkeypatch.setenv("TITILER_OPENEO_STAC_API_URL", "https://stac.eoapi.dev")
+    monkeypatch.setenv("TITILER_OPENEO_STORE_URL", str(tmp_path / "services.db"))
+    with pytest.raises(SystemExit):
+        main(["missing", "--zoom", "0", "1", "--output", str(tmp_path / "tiles")])
+    assert "Could not find service: missing" in capsys.readouterr().err
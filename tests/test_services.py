@@ -731,3 +731,60 @@ def test_xyz_service_query_parameters(app_with_auth):
     # Check that we get a proper error message about invalid JSON
     error_msg = str(invalid_response.content)
     assert "Invalid JSON in query parameter" in error_msg
+
+
+def test_list_services_pages(store_path):
+    """Service listings are ordered by id and paged with a token."""
+    store = get_store(str(store_path))
+    service = {"type": "XYZ", "title": "NDVI", "process": {"process_graph": {}}}
+    ids = sorted(store.add_service("user", service) for _ in range(5))
+    store.add_service("other", service)
+
+    assert [s["id"] for s in store.get_user_services("user")] == ids
+    assert store.get_user_services("user")[0]["process"] == {"process_graph": {}}
+    assert len(store.get_services()) == 6
+
+    first = store.get_user_services("user", limit=2, summary=True)
+    assert [s["id"] for s in first] == ids[:2]
+    assert "process" not in first[0] and first[0]["title"] == "NDVI"
+
+    rest = store.get_user_services("user", after=store.page_token(first[-1]))
+    assert [s["id"] for s in rest] == ids[2:]
+
+
+def test_get_services_pagination(app_with_auth):
+    """`limit` pages the listing, with a `next` link to the following page."""
+    service_input = {
+        "process": {
+            "process_graph": {
+                "save1": {
+                    "process_id": "save_result",
+                    "arguments": {"data": {}, "format": "png"},
+                    "result": True,
+                },
+            }
+        },
+        "type": "xyz",
+        "title": "Test Service",
+    }
+    created = set()
+    for _ in range(3):
+        response = app_with_auth.post("/services", json=service_input)
+        assert response.status_code == 201
+        created.add(response.headers["OpenEO-Identifier"])
+
+    seen = []
+    url, params = "/services", {"limit": 2}
+    while url:
+        page = app_with_auth.get(url, params=params).json()
+        assert len(page["services"]) <= 2
+        assert all("process" not in service for service in page["services"])
+        seen += [service["id"] for service in page["services"]]
+        next_links = [link["href"] for link in page["links"] if link["rel"] == "next"]
+        url, params = (next_links[0] if next_links else None), None
+
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+
+    response = app_with_auth.get("/services", params={"next": "not-a-token"})
+    assert response.status_code == 400
@@ -0,0 +1,118 @@
+"""Tests for titiler.openeo.services.cache, the service definition cache."""
+
+import pytest
+
+from titiler.openeo.services import get_store
+from titiler.openeo.services.cache import CachedServicesStore
+from titiler.openeo.services.duckdb import DuckDBStore
+from titiler.openeo.services.local import LocalServiceStore
+from titiler.openeo.services.sqlalchemy import SQLAlchemyStore
+
+
+class _CountingStore(LocalServiceStore):
+    """A LocalServiceStore counting its get_service calls."""
+
+    def get_service(self, service_id):
+        self.calls = getattr(self, "calls", 0) + 1
+        return super().get_service(service_id)
+
+
+@pytest.fixture
+def counting():
+    """A counting store holding one service, and a cache in front of it."""
+    inner = _CountingStore(store={})
+    service_id = inner.add_service("user", {"title": "A", "process": {"n": 1}})
+    return inner, CachedServicesStore(store=inner), service_id
+
+
+def test_repeated_reads_hit_the_store_once(counting):
+    inner, cached, service_id = counting
+    for _ in range(100):
+        assert cached.get_service(service_id)["title"] == "A"
+    assert inner.calls == 1
+
+
+def test_missing_services_are_not_cached(counting):
+    inner, cached, _ = counting
+    assert cached.get_service("nope") is None
+    assert cached.get_service("nope") is None
+    assert inner.calls == 2
+
+
+def test_callers_get_their_own_copy(counting):
+    _, cached, service_id = counting
+    service = cached.get_service(service_id)
+    del service["id"]
+    service["title"] = "changed"
+    assert cached.get_service(service_id)["title"] == "A"
+
+
+def test_writes_invalidate(counting):
+    inner, cached, service_id = counting
+    cached.get_service(service_id)
+
+    cached.update_service("user", service_id, {"title": "B"})
+    assert cached.get_service(service_id)["title"] == "B"
+
+    cached.delete_service(service_id)
+    assert cached.get_service(service_id) is None
+    assert inner.calls == 3
+
+
+def test_entries_expire():
+    inner = _CountingStore(store={})
+    service_id = inner.add_service("user", {"title": "A"})
+    cached = CachedServicesStore(store=inner, ttl=1e-9)
+    cached.get_service(service_id)
+    cached.get_service(service_id)
+    assert inner.calls == 2
+
+
+def test_passes_other_attributes_through(tmp_path):
+    path = tmp_path / "services.json"
+    path.write_text('{"services": {}, "udp_definitions": {}}')
+    cached = get_store(str(path))
+    assert isinstance(cached, CachedServicesStore)
+    assert cached.path == str(path)
+    cached.ping()
+
+
+def test_disabled_with_zero_ttl(tmp_path, monkeypatch):
+    monkeypatch.setenv("TITILER_OPENEO_SERVICES_CACHE_TTL", "0")
+    assert isinstance(get_store(str(tmp_path / "services.db")), DuckDBStore)
+
+
+@pytest.mark.parametrize(
+    "make_store",
+    [
+        lambda tmp_path: SQLAlchemyStore(store=f"sqlite:///{tmp_path}/services.sqlite"),
+        lambda tmp_path: DuckDBStore(store=str(tmp_path / "services.db")),
+    ],
+    ids=["sqlalchemy", "duckdb"],
+)
+def test_writes_from_another_replica_are_seen(tmp_path, make_store):
+    """A write through one replica's store clears the other's cache.
+
+    Until the other replica next checks the revision, it keeps serving what
+    it has cached.
+    """
+    writer = CachedServicesStore(store=make_store(tmp_path))
+    reader = CachedServicesStore(store=make_store(tmp_path), revalidate_interval=3600)
+    service_id = writer.add_service("user", {"title": "A"})
+    assert reader.get_service(service_id)["title"] == "A"
+
+    revision = writer.services_revision()
+    writer.update_service("user", service_id, {"title": "B"})
+    assert writer.services_revision() == revision + 1
+    assert reader.get_service(service_id)["title"] == "A"
+
+    reader.revalidate_interval = 0
+    assert reader.get_service(service_id)["title"] == "B"
+
+    writer.delete_service(service_id)
+    assert reader.get_service(service_id) is None
+
+
+def test_local_store_keeps_no_revision(counting):
+    _, cached, _ = counting
+    assert cached.services_revision() is None
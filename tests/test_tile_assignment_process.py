@@ -6,6 +6,7 @@ import pytest
 
 from titiler.openeo.processes.implementations.tile_assignment import (
     tile_assignment,
+    tiles_counts,
     tiles_summary,
 )
 from titiler.openeo.services.base import (
@@ -525,3 +526,52 @@ def test_tiles_summary_with_tiles(store):
     assert summary[1]["z"] == tile2["z"]
     assert summary[1]["user_id"] == "user2"
     assert summary[1]["stage"] == "submitted"
+
+
+def test_tiles_summary_pages(store):
+    """Test listing a page of projected tiles."""
+    for user in ("user1", "user2", "user3"):
+        tile_assignment(
+            zoom=12,
+            x_range=(0, 2),
+            y_range=(0, 2),
+            stage="claim",
+            store=store,
+            service_id="test_service",
+            user_id=user,
+        )
+
+    summary = tiles_summary(
+        store=store, service_id="test_service", fields=["user_id"], limit=2, offset=1
+    )
+    assert summary == [{"user_id": "user2"}, {"user_id": "user3"}]
+
+
+def test_tiles_counts(store):
+    """Test counting tiles by stage."""
+    for user in ("user1", "user2"):
+        tile_assignment(
+            zoom=12,
+            x_range=(0, 2),
+            y_range=(0, 2),
+            stage="claim",
+            store=store,
+            service_id="test_service",
+            user_id=user,
+        )
+    tile_assignment(
+        zoom=12,
+        x_range=(0, 2),
+        y_range=(0, 2),
+        stage="submit",
+        store=store,
+        service_id="test_service",
+        user_id="user2",
+    )
+
+    counts = tiles_counts(store=store, service_id="test_service")
+    assert counts["stages"] == {"claimed": 1, "submitted": 1}
+    assert counts["total"] == 2
+
+    counts = tiles_counts(store=store, service_id="test_service", user_id="user2")
+    assert counts["stages"] == {"submitted": 1}
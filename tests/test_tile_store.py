@@ -1,13 +1,22 @@
 """Test tile store implementations."""
 
+import threading
+
 import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
 
 from titiler.openeo.services.base import (
     NoTileAvailableError,
     TileAlreadyLockedError,
     TileNotAssignedError,
 )
-from titiler.openeo.services.sqlalchemy_tile import SQLAlchemyTileStore
+from titiler.openeo.services.sqlalchemy_tile import (
+    SQLAlchemyTileStore,
+    TileAssignment,
+    TileStageCount,
+    TileUserCount,
+)
 
 
 @pytest.fixture
@@ -486,3 +495,167 @@ def test_get_all_tiles_with_data(tile_store):
     assert tiles[0]["user_id"] == "test_user"
     assert tiles[0]["data"]["progress"] == 75
     assert tiles[0]["data"]["metadata"]["timestamp"] == "2025-06-02T12:00:00Z"
+
+
+def test_concurrent_claims_get_distinct_tiles(tmp_path):
+    """Concurrent claimers each get a different tile."""
+    store = SQLAlchemyTileStore(f"sqlite:///{tmp_path / 'tiles.db'}")
+    claimed = []
+    errors = []
+
+    def claimer(index):
+        for i in range(5):
+            try:
+                tile = store.claim_tile(
+                    "service", f"user-{index}-{i}", 10, (0, 9), (0, 9)
+                )
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+            else:
+                claimed.append((tile["x"], tile["y"]))
+
+    threads = [threading.Thread(target=claimer, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(claimed) == 40
+    assert len(set(claimed)) == 40
+
+
+def test_inventory_skips_tiles_assigned_before_it(tile_store):
+    """Tiles assigned before the range was inventoried are not handed out."""
+    with Session(tile_store._engine) as session:
+        session.add(
+            TileAssignment(
+                service_id="service", user_id="old", x=0, y=0, z=10, stage="submitted"
+            )
+        )
+        session.commit()
+
+    tile = tile_store.claim_tile("service", "user", 10, (0, 1), (0, 0))
+    assert (tile["x"], tile["y"]) == (1, 0)
+    with pytest.raises(NoTileAvailableError):
+        tile_store.claim_tile("service", "other", 10, (0, 1), (0, 0))
+
+
+def test_released_tiles_return_to_the_inventory(tile_store):
+    """Released and force-released tiles can be claimed again."""
+    tile = tile_store.claim_tile("service", "user1", 10, (0, 0), (0, 0))
+    tile_store.release_tile("service", "user1")
+    assert tile_store.claim_tile("service", "user2", 10, (0, 0), (0, 0))["x"] == 0
+
+    tile_store.submit_tile("service", "user2")
+    with pytest.raises(NoTileAvailableError):
+        tile_store.claim_tile("service", "user3", 10, (0, 0), (0, 0))
+
+    tile_store.force_release_tile("service", tile["x"], tile["y"], 10)
+    assert tile_store.claim_tile("service", "user3", 10, (0, 0), (0, 0))["x"] == 0
+
+
+def test_overlapping_ranges_share_the_inventory(tile_store):
+    """A tile claimed through one range is not free in an overlapping one."""
+    first = tile_store.claim_tile("service", "user1", 10, (0, 1), (0, 0))
+    second = tile_store.claim_tile("service", "user2", 10, (0, 1), (0, 0))
+    assert {first["x"], second["x"]} == {0, 1}
+    assert tile_store.claim_tile("service", "user3", 10, (0, 2), (0, 0))["x"] == 2
+    with pytest.raises(NoTileAvailableError):
+        tile_store.claim_tile("service", "user4", 10, (0, 2), (0, 0))
+
+
+def test_claim_uses_skip_locked_on_postgresql(tile_store):
+    """On PostgreSQL the free tile is selected FOR UPDATE SKIP LOCKED."""
+    statement = tile_store._claim_statement("service", 10, (0, 9), (0, 9))
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING" in sql
+
+
+def test_tiles_summary_counts_follow_tile_operations(tile_store):
+    """Tile counters are kept up to date by every tile operation."""
+    for user in ("user1", "user2", "user3"):
+        tile_store.claim_tile("service", user, 10, (0, 9), (0, 9))
+    tile_store.submit_tile("service", "user1")
+    tile_store.update_tile("service", "user1", {"score": 1})
+    tile_store.update_tile("service", "user2", {"score": 2})
+    tile_store.update_tile("service", "user2", {})
+    tile = tile_store.get_user_tile("service", "user3")
+    tile_store.force_release_tile("service", tile["x"], tile["y"], tile["z"])
+    tile_store.claim_tile("service", "user4", 10, (0, 9), (0, 9))
+    tile_store.release_tile("service", "user4")
+
+    assert tile_store.get_tiles_summary("service") == {
+        "service_id": "service",
+        "stages": {"claimed": 1, "submitted": 1},
+        "total": 2,
+        "with_data": 1,
+    }
+    assert tile_store.get_tiles_summary("service", user_id="user1") == {
+        "service_id": "service",
+        "user_id": "user1",
+        "stages": {"submitted": 1},
+        "total": 1,
+        "with_data": 1,
+    }
+    assert tile_store.get_tiles_summary("other")["total"] == 0
+
+    # The counters agree with a recount of the assignments
+    summary = tile_store.get_tiles_summary("service")
+    tile_store.rebuild_tile_counts()
+    assert tile_store.get_tiles_summary("service") == summary
+
+
+def test_tile_counts_are_rebuilt_for_existing_assignments(tmp_path):
+    """Assignments made before the counters existed are counted on startup."""
+    url = f"sqlite:///{tmp_path / 'tiles.db'}"
+    store = SQLAlchemyTileStore(url)
+    store.claim_tile("service", "user1", 10, (0, 9), (0, 9))
+    store.claim_tile("service", "user2", 10, (0, 9), (0, 9))
+    store.submit_tile("service", "user2")
+    with Session(store._engine) as session:
+        session.query(TileStageCount).delete()
+        session.query(TileUserCount).delete()
+        session.commit()
+    store._engine.dispose()
+
+    store = SQLAlchemyTileStore(url)
+    assert store.get_tiles_summary("service")["stages"] == {
+        "claimed": 1,
+        "submitted": 1,
+    }
+    assert store.get_tiles_summary("service", user_id="user2")["total"] == 1
+    store._engine.dispose()
+
+
+def test_list_tiles_pages_and_projects(tile_store):
+    """list_tiles returns pages of the requested fields, in assignment order."""
+    claimed = [
+        tile_store.claim_tile("service", f"user{i}", 10, (0, 9), (0, 9))
+        for i in range(5)
+    ]
+    tile_store.submit_tile("service", "user1")
+    tile_store.update_tile("service", "user2", {"score": 2})
+
+    tiles = tile_store.list_tiles("service", fields=["x", "y", "user_id"])
+    assert tiles == [
+        {"x": tile["x"], "y": tile["y"], "user_id": tile["user_id"]} for tile in claimed
+    ]
+    assert (
+        tile_store.list_tiles("service", limit=2, offset=3)
+        == (tile_store.get_all_tiles("service")[3:5])
+    )
+    assert tile_store.list_tiles("service", stage="submitted", fields=["user_id"]) == [
+        {"user_id": "user1"}
+    ]
+    assert tile_store.list_tiles("service", fields=["data"], limit=3) == [
+        {"data": None},
+        {"data": None},
+        {"data": {"score": 2}},
+    ]
+
+    with pytest.raises(ValueError):
+        tile_store.list_tiles("service", fields=["x", "secret"])
+    with pytest.raises(ValueError):
+        tile_store.list_tiles("service", offset=-1)
@@ -37,7 +37,7 @@ def test_udp_list_pagination_omits_large_fields(app_with_auth, store_path, store
         udp_store.upsert_udp(
             user_id="test_user",
             udp_id=f"udp-{idx}",
-            process_graph={"i": idx},
+            process_graph={"node": {"process_id": "constant", "arguments": {"x": idx}}},
             exceptions={"err": {"message": "nope"}},
             examples=[{"title": "sample"}],
             links=[{"href": "https://example.com"}],
@@ -47,7 +47,7 @@ def test_udp_list_pagination_omits_large_fields(app_with_auth, store_path, store
     udp_store.upsert_udp(
         user_id="other_user",
         udp_id="udp-other",
-        process_graph={"i": 99},
+        process_graph={"node": {"process_id": "constant", "arguments": {"x": 99}}},
     )
 
     resp = client.get("/process_graphs", params={"limit": 2, "offset": 1})
@@ -71,6 +71,43 @@ def test_udp_list_pagination_omits_large_fields(app_with_auth, store_path, store
     assert "udp-other" not in ids
 
 
+def test_udp_list_next_link(app_with_auth, store_path, store_type):
+    """Following `next` links lists every UDP once."""
+    client = app_with_auth
+    udp_store = client.app.endpoints.udp_store
+    for idx in range(3):
+        udp_store.upsert_udp(
+            user_id="test_user",
+            udp_id=f"udp-next-{idx}",
+            process_graph={
+                "node": {
+                    "process_id": "constant",
+                    "arguments": {"x": idx},
+                    "result": True,
+                }
+            },
+        )
+
+    seen = []
+    url, params = "/process_graphs", {"limit": 2}
+    while url:
+        page = client.get(url, params=params).json()
+        assert len(page["processes"]) <= 2
+        seen += [p["id"] for p in page["processes"]]
+        next_links = [link["href"] for link in page["links"] if link["rel"] == "next"]
+        url, params = (next_links[0] if next_links else None), None
+
+    assert len(seen) == len(set(seen))
+    assert {f"udp-next-{i}" for i in range(3)} <= set(seen)
+
+    resp = client.get("/process_graphs", params={"next": "not-a-token"})
+    assert resp.status_code == 400
+    assert resp.json()["code"] == "InvalidPageToken"
+
+    for idx in range(3):
+        udp_store.delete_udp(user_id="test_user", udp_id=f"udp-next-{idx}")
+
+
 def test_udp_list_handles_mixed_created_at_types(app_with_auth, store_path, store_type):
     """List should not crash when created_at mixes datetime and string."""
     from titiler.openeo.services.local import LocalUdpStore
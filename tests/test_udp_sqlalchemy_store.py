@@ -131,3 +131,20 @@ def test_list_with_pagination(udp_store):
     all_user1 = udp_store.list_udps(user_id="user1", limit=10, offset=0)
     assert all(item["user_id"] == "user1" for item in all_user1)
     assert not any(item["id"] == "udp-other" for item in all_user1)
+
+
+def test_list_with_keyset_pagination(udp_store):
+    """Pages following a page token cover every UDP once, newest first."""
+    for idx in range(5):
+        udp_store.upsert_udp(
+            user_id="user1", udp_id=f"udp-{idx}", process_graph={"i": idx}
+        )
+
+    pages = [udp_store.list_udps(user_id="user1", limit=2)]
+    while len(pages[-1]) == 2:
+        token = udp_store.page_token(pages[-1][-1])
+        pages.append(udp_store.list_udps(user_id="user1", limit=2, after=token))
+
+    ids = [udp["id"] for page in pages for udp in page]
+    assert ids == [udp["id"] for udp in udp_store.list_udps(user_id="user1")]
+    assert sorted(ids) == [f"udp-{i}" for i in range(5)]
@@ -1,6 +1,13 @@
 """Test user tracking functionality."""
 
-from titiler.openeo.auth import User
+import base64
+import threading
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from titiler.openeo.auth import User, get_auth
+from titiler.openeo.services.tracking import LoginBatch, LoginTracker
+from titiler.openeo.settings import AuthSettings
 
 
 def test_user_tracking_first_login(store_path):
@@ -100,3 +107,133 @@ def test_get_user_tracking_nonexistent(store_path):
     store = get_store(f"{store_path}")
     tracking = store.get_user_tracking(user_id="nonexistent", provider="basic")
     assert tracking is None
+
+
+def test_login_batches_add_to_existing_records(store_path):
+    """A batch of logins adds its count and moves the last login."""
+    from titiler.openeo.services import get_store
+
+    store = get_store(f"{store_path}")
+    user = User(user_id="test_user", email="test@example.com", name="Test User")
+    store.track_user_login(user=user, provider="basic")
+    first_login = store.get_user_tracking("test_user", "basic")["first_login"]
+
+    later = datetime(2099, 1, 2, tzinfo=timezone.utc)
+    store.track_user_logins(
+        [
+            LoginBatch(
+                user_id="test_user",
+                provider="basic",
+                first_login=datetime(2099, 1, 1, tzinfo=timezone.utc),
+                last_login=later,
+                count=41,
+                email="new@example.com",
+                name="New Name",
+            ),
+            LoginBatch(
+                user_id="other_user",
+                provider="oidc",
+                first_login=datetime(2099, 1, 1, tzinfo=timezone.utc),
+                last_login=later,
+                count=3,
+            ),
+        ]
+    )
+
+    tracking = store.get_user_tracking("test_user", "basic")
+    assert tracking["login_count"] == 42
+    assert tracking["first_login"] == first_login
+    assert tracking["last_login"].replace(tzinfo=None) == later.replace(tzinfo=None)
+    assert tracking["email"] == "new@example.com"
+    assert tracking["name"] == "New Name"
+
+    tracking = store.get_user_tracking("other_user", "oidc")
+    assert tracking["login_count"] == 3
+    assert tracking["first_login"].year == 2099
+
+
+def test_login_tracker_coalesces_and_keeps_counts(store_path):
+    """Logins are written in one batch per (user, provider), counts intact."""
+    from titiler.openeo.services import get_store
+
+    store = get_store(f"{store_path}")
+    tracker = LoginTracker(store=store, interval=3600)
+    users = [User(user_id=f"user{i}") for i in range(4)]
+
+    def login(user):
+        for _ in range(250):
+            tracker.record(user, "basic")
+
+    threads = [threading.Thread(target=login, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tracker.pending()) == 4
+    assert store.get_user_tracking("user0", "basic") is None
+    tracker.close()
+
+    assert tracker.pending() == []
+    for user in users:
+        assert store.get_user_tracking(user.user_id, "basic")["login_count"] == 250
+
+
+def test_login_tracker_retries_failed_batches():
+    """A batch the store rejects is merged into the next one."""
+    store = Mock()
+    store.track_user_logins.side_effect = [OSError("store down"), None]
+    tracker = LoginTracker(store=store, interval=3600)
+    user = User(user_id="test_user")
+
+    tracker.record(user, "basic")
+    tracker.record(user, "basic")
+    tracker.flush()
+    tracker.record(user, "basic")
+    tracker.flush()
+
+    (batch,) = store.track_user_logins.call_args.args[0]
+    assert batch.count == 3
+    assert tracker.pending() == []
+    tracker.close()
+
+
+def test_login_tracker_flushes_on_interval():
+    """The background thread flushes without being asked."""
+    store = Mock()
+    flushed = threading.Event()
+    store.track_user_logins.side_effect = lambda logins: flushed.set()
+    tracker = LoginTracker(store=store, interval=0.01)
+
+    tracker.record(User(user_id="test_user"), "oidc")
+
+    assert flushed.wait(5)
+    tracker.close()
+
+
+def test_auth_records_logins_through_the_tracker():
+    """Authentication buffers logins rather than writing each one."""
+    store = Mock()
+    settings = AuthSettings(login_flush_interval=3600)
+    auth = get_auth(settings, store=store)
+    token = base64.b64encode(b"test:test").decode()
+
+    for _ in range(3):
+        auth.validate(f"Bearer basic//{token}")
+
+    store.track_user_login.assert_not_called()
+    auth.login_tracker.close()
+    (batch,) = store.track_user_logins.call_args.args[0]
+    assert (batch.user_id, batch.provider, batch.count) == ("test", "basic", 3)
+
+
+def test_auth_writes_each_login_without_interval():
+    """With a zero interval every login is written as it happens."""
+    store = Mock()
+    auth = get_auth(AuthSettings(login_flush_interval=0), store=store)
+    token = base64.b64encode(b"test:test").decode()
+
+    auth.validate(f"Bearer basic//{token}")
+
+    assert auth.login_tracker is None
+    store.track_user_login.assert_called_once()
@@ -2,13 +2,16 @@
 
 import abc
 import base64
+import hashlib
 import json
+import threading
 import time
 from base64 import b64decode
 from enum import Enum
 from typing import Any, Dict, Literal, Optional
 
 from attrs import define, field
+from cachetools import TLRUCache
 from fastapi import Header
 from fastapi.exceptions import HTTPException
 from fastapi.security.utils import get_authorization_scheme_param
@@ -18,6 +21,7 @@ from typing_extensions import Self
 
 from .models.auth import BasicAuthUser, User
 from .services.base import ServicesStore
+from .services.tracking import LoginTracker
 from .settings import AuthSettings, OIDCConfig
 
 try:
@@ -53,6 +57,7 @@ class Auth(metaclass=abc.ABCMeta):
 
     method: AuthMethod = field(init=False)
     store: ServicesStore = field()
+    login_tracker: Optional[LoginTracker] = field(default=None)
 
     @abc.abstractmethod
     def login(self, authorization: str = Header()) -> Any:
@@ -72,15 +77,27 @@ class Auth(metaclass=abc.ABCMeta):
             return None
         return self.validate(authorization)
 
+    def track_login(self, user: User, provider: str) -> None:
+        """Record a login, through the login tracker if there is one."""
+        if self.login_tracker is not None:
+            self.login_tracker.record(user, provider)
+        else:
+            self.store.track_user_login(user=user, provider=provider)
+
 
 def get_auth(settings: AuthSettings, store: ServicesStore) -> "Auth":
     """Get Auth instance."""
+    login_tracker = (
+        LoginTracker(store=store, interval=settings.login_flush_interval)
+        if settings.login_flush_interval
+        else None
+    )
     if settings.method == AuthMethod.basic.value:
-        return BasicAuth(settings=settings, store=store)
+        return BasicAuth(settings=settings, store=store, login_tracker=login_tracker)
     elif settings.method == AuthMethod.oidc.value:
         if not settings.oidc:
             raise ValueError("OIDC configuration required")
-        return OIDCAuth(settings=settings, store=store)
+        return OIDCAuth(settings=settings, store=store, login_tracker=login_tracker)
     else:
         raise NotImplementedError(f"Auth method {settings.method} not implemented")
 
@@ -93,6 +110,13 @@ class OIDCAuth(Auth):
     settings: AuthSettings = field(default=AuthSettings())
     _config_cache: Optional[Dict] = field(default=None, init=False)
     _jwks_cache: Optional[Dict] = field(default=None, init=False)
+    _jwks_fetched_at: float = field(default=float("-inf"), init=False)
+    # Public key, or the unsupported key type, per key id of the JWKS
+    _keys: Dict[str, Any] = field(factory=dict, init=False)
+    _keys_lock: threading.Lock = field(factory=threading.Lock, init=False)
+    # Verified claims per token digest, each kept until the token's `exp`
+    _token_cache: TLRUCache = field(init=False)
+    _token_cache_lock: threading.Lock = field(factory=threading.Lock, init=False)
     _oidc_config: OIDCConfig = field(init=False)
 
     def __attrs_post_init__(self):
@@ -106,6 +130,11 @@ class OIDCAuth(Auth):
             raise ValueError("OIDC configuration required")
 
         self._oidc_config = self.settings.oidc
+        self._token_cache = TLRUCache(
+            maxsize=self._oidc_config.token_cache_maxsize,
+            ttu=lambda _digest, payload, _now: payload["exp"],
+            timer=time.time,
+        )
 
     @property
     def config(self) -> Dict:
@@ -126,38 +155,71 @@ class OIDCAuth(Auth):
 
     def get_jwks(self) -> Dict:
         """Get JSON Web Key Set."""
-        if self._jwks_cache is None:
-            with httpx.Client() as client:
-                response = client.get(self.config["jwks_uri"])
-                response.raise_for_status()
-                self._jwks_cache = response.json()
-        return self._jwks_cache
+        with self._keys_lock:
+            if self._jwks_cache is None:
+                self._refresh_keys()
+            return self._jwks_cache  # type: ignore[return-value]
+
+    def _fetch_jwks(self) -> Dict:
+        """Fetch the provider's JSON Web Key Set."""
+        with httpx.Client() as client:
+            response = client.get(self.config["jwks_uri"])
+            response.raise_for_status()
+            return response.json()
 
-    def _get_key(self, kid: str):
-        """Get public key from JWKS."""
-        jwks = self.get_jwks()
+    def _refresh_keys(self) -> None:
+        """Fetch the JWKS and parse its keys. Call with `_keys_lock` held."""
+        # Set first, so that a failing provider is not retried on every request
+        self._jwks_fetched_at = time.monotonic()
+        jwks = self._fetch_jwks()
+
+        keys: Dict[str, Any] = {}
         for jwk in jwks["keys"]:
-            if jwk["kid"] == kid:
-                if jwk["kty"] != "RSA":
-                    raise ValueError(f"Unsupported key type: {jwk['kty']}")
-
-                # Convert JWK to public key
-                numbers = RSAPublicNumbers(
-                    e=int.from_bytes(
-                        base64.urlsafe_b64decode(jwk["e"] + "=" * (-len(jwk["e"]) % 4)),
-                        byteorder="big",
-                    ),
-                    n=int.from_bytes(
-                        base64.urlsafe_b64decode(jwk["n"] + "=" * (-len(jwk["n"]) % 4)),
-                        byteorder="big",
-                    ),
-                )
-                return numbers.public_key()
+            if "kid" not in jwk:
+                continue
+            if jwk["kty"] != "RSA":
+                keys[jwk["kid"]] = jwk["kty"]
+                continue
+
+            # Convert JWK to public key
+            numbers = RSAPublicNumbers(
+                e=int.from_bytes(
+                    base64.urlsafe_b64decode(jwk["e"] + "=" * (-len(jwk["e"]) % 4)),
+                    byteorder="big",
+                ),
+                n=int.from_bytes(
+                    base64.urlsafe_b64decode(jwk["n"] + "=" * (-len(jwk["n"]) % 4)),
+                    byteorder="big",
+                ),
+            )
+            keys[jwk["kid"]] = numbers.public_key()
 
-        raise HTTPException(
-            status_code=HTTP_401_UNAUTHORIZED,
-            detail="Unable to find appropriate key",
-        )
+        self._jwks_cache = jwks
+        self._keys = keys
+
+    def _get_key(self, kid: str):
+        """Get public key from JWKS.
+
+        A key id missing from the JWKS fetches it again, at most once every
+        `jwks_refresh_interval` seconds, to pick up rotated keys.
+        """
+        with self._keys_lock:
+            if self._jwks_cache is None or (
+                kid not in self._keys
+                and time.monotonic() - self._jwks_fetched_at
+                >= self._oidc_config.jwks_refresh_interval
+            ):
+                self._refresh_keys()
+            key = self._keys.get(kid)
+
+        if key is None:
+            raise HTTPException(
+                status_code=HTTP_401_UNAUTHORIZED,
+                detail="Unable to find appropriate key",
+            )
+        if isinstance(key, str):
+            raise ValueError(f"Unsupported key type: {key}")
+        return key
 
     def _verify_token(self, token: str, key) -> Dict:
         """Verify JWT token signature and return payload."""
@@ -205,6 +267,30 @@ class OIDCAuth(Auth):
                 detail=str(err),
             ) from err
 
+    def _verified_claims(self, token: str) -> Dict:
+        """Return the claims of `token`, verifying it unless it was already."""
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._token_cache_lock:
+            payload = self._token_cache.get(digest)
+        if payload is not None:
+            return payload
+
+        # Get the key id from token header
+        header_b64 = token.split(".")[0]
+        header = json.loads(
+            base64.urlsafe_b64decode(header_b64 + "=" * (-len(header_b64) % 4))
+        )
+        key = self._get_key(header["kid"])
+
+        # Verify token and get payload
+        payload = self._verify_token(token, key)
+
+        # Tokens without an expiry are verified every time
+        if isinstance(payload.get("exp"), (int, float)) and self._token_cache.maxsize:
+            with self._token_cache_lock:
+                self._token_cache[digest] = payload
+        return payload
+
     def login(self, authorization: str = Header()) -> Any:
         """OIDC doesn't support direct login - must be done through provider."""
         raise HTTPException(
@@ -238,15 +324,7 @@ class OIDCAuth(Auth):
             )
 
         try:
-            # Get the key id from token header
-            header_b64 = parsed_token.token.split(".")[0]
-            header = json.loads(
-                base64.urlsafe_b64decode(header_b64 + "=" * (-len(header_b64) % 4))
-            )
-            key = self._get_key(header["kid"])
-
-            # Verify token and get payload
-            payload = self._verify_token(parsed_token.token, key)
+            payload = self._verified_claims(parsed_token.token)
 
             # Create user from payload
             name_claim = None
@@ -260,7 +338,7 @@ class OIDCAuth(Auth):
             )
 
             # Track user login
-            self.store.track_user_login(user=user, provider="oidc")
+            self.track_login(user, "oidc")
 
             return user
 
@@ -380,6 +458,6 @@ class BasicAuth(Auth):
         user = User(user_id=base_user.user_id)
 
         # Track user login
-        self.store.track_user_login(user=user, provider="basic")
+        self.track_login(user, "basic")
 
         return user
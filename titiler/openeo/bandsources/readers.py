@@ -59,12 +59,11 @@ class BandReader(BaseReader):
     grid and one measurement asset's GCPs by construction, so the fit is
     identical and only needs computing once, however many bands from that
     asset are requested together. Scoped to one item-read (the dict dies with
-    the `SimpleSTACReader` instance that created it) -- deliberately not a
-    module-global cache, which would have no natural eviction and no
-    correctly-sized key space (unlike `annotation`/`geocode`'s own
-    href-keyed caches, whose key space is bounded by distinct assets, this
-    would be keyed additionally by bbox/width/height/dst_crs, i.e.
-    effectively per-request).
+    the `SimpleSTACReader` instance that created it). Reuse *across* requests
+    is `geocode.get_inverse_map`'s job, behind its own opt-in, byte-bounded
+    LRU (`SARSettings.inverse_map_cache_bytes`): that key space grows with
+    every distinct bbox/width/height/dst_crs requested, so it needs an
+    explicit budget and eviction that this dict does not.
 
     `inverse_map_lock` (required whenever `inverse_map_cache` is given) is
     the same `threading.Lock` shared the same way. `RasterStack` reads
@@ -155,10 +154,19 @@ class BandReader(BaseReader):
         )
         return ImageData(array, crs=dst_crs, bounds=tuple(bbox))
 
+    @classmethod
+    def prefetch(cls, href: str, fetcher: Optional[AssetFetcher] = None) -> None:
+        """Fetch and parse the annotation at `href` into its process-wide cache.
+
+        Called ahead of any `part()` (`reader.prefetch_band_sources`), so the
+        reads that follow find it cached.
+        """
+        raise NotImplementedError
+
     def _get_inverse_map(
         self, bbox: BBox, width: int, height: int, dst_crs: CRS
     ) -> InverseMap:
-        """`geocode.build_inverse_map`, memoized per `inverse_map_cache` if given.
+        """`geocode.get_inverse_map`, memoized per `inverse_map_cache` if given.
 
         Holds `inverse_map_lock` for the whole check-then-build-then-store
         section, not just the dict access: `RasterStack` reads assets via a
@@ -171,9 +179,8 @@ class BandReader(BaseReader):
         one entry) that per-key granularity buys nothing.
         """
         if self.inverse_map_cache is None:
-            gcps, gcp_crs = geocode.get_gcps(self.sibling_href)
-            return geocode.build_inverse_map(
-                gcps, gcp_crs, width, height, bbox, dst_crs
+            return geocode.get_inverse_map(
+                self.sibling_href, width, height, bbox, dst_crs
             )
 
         key: _InverseMapKey = (
@@ -189,9 +196,8 @@ class BandReader(BaseReader):
             if cached is not None:
                 return cached
 
-            gcps, gcp_crs = geocode.get_gcps(self.sibling_href)
-            inverse = geocode.build_inverse_map(
-                gcps, gcp_crs, width, height, bbox, dst_crs
+            inverse = geocode.get_inverse_map(
+                self.sibling_href, width, height, bbox, dst_crs
             )
             self.inverse_map_cache[key] = inverse
             return inverse
@@ -235,6 +241,11 @@ class BandReader(BaseReader):
 class NoiseBandReader(BandReader):
     """Sentinel-1 GRD thermal-noise LUT (`<pol>_noise_lut`), in DN^2."""
 
+    @classmethod
+    def prefetch(cls, href: str, fetcher: Optional[AssetFetcher] = None) -> None:
+        """Fetch and parse the noise annotation at `href`."""
+        annotation.get_noise(href, fetcher=fetcher)
+
     def _evaluate(self, line: numpy.ndarray, pixel: numpy.ndarray) -> numpy.ndarray:
         return annotation.get_noise(self.input, fetcher=self.fetcher).evaluate(
             line, pixel
@@ -253,6 +264,11 @@ class CalibrationBandReader(BandReader):
     subclass per quantity.
     """
 
+    @classmethod
+    def prefetch(cls, href: str, fetcher: Optional[AssetFetcher] = None) -> None:
+        """Fetch and parse the calibration annotation at `href`."""
+        annotation.get_calibration(href, fetcher=fetcher)
+
     def _evaluate(self, line: numpy.ndarray, pixel: numpy.ndarray) -> numpy.ndarray:
         if self.quantity is None:
             raise ValueError(
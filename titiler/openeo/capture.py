@@ -0,0 +1,507 @@
+"""Record-and-replay of single requests.
+
+With ``TITILER_OPENEO_CAPTURE_DIR`` set, a ``/result`` or XYZ tile request sent
+with the ``X-OpenEO-Capture`` header is recorded into a bundle directory:
+
+* the process graph and the resolved named parameters,
+* every STAC API item search and its response,
+* the byte ranges GDAL read from each raster asset, rounded up to blocks of
+  ``TITILER_OPENEO_CAPTURE_BLOCK_SIZE`` bytes,
+* the files fetched whole, i.e. Sentinel-1 calibration/noise annotations.
+
+The bundle id is returned in the ``X-OpenEO-Capture-Id`` response header.
+``scripts/debug_graph.py --replay <bundle>`` re-executes the request offline
+against the recorded data, with profiling on. A replayed request that reads
+anything the bundle does not hold fails with :class:`ReplayMiss` instead of
+going to the network.
+
+While a capture or a replay is active, the process-wide SAR caches are scoped
+to it (see :func:`cache_scope`): every fetch the request makes goes through
+the capture instead of being served from a cache warmed by earlier requests.
+
+Not recorded: ``load_stac`` catalogue fetches and request-scoped objects that
+cannot be serialized (e.g. the tile assignment store); the parameters skipped
+are listed in the bundle's ``request.json``.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import rasterio
+from openeo_pg_parser_networkx.pg_schema import BoundingBox
+from pystac import Item
+
+from .models.auth import User
+from .settings import CaptureSettings
+
+logger = logging.getLogger(__name__)
+
+# Request header opting a request into capture, and the response header
+# returning the bundle id.
+CAPTURE_HEADER = "X-OpenEO-Capture"
+CAPTURE_ID_HEADER = "X-OpenEO-Capture-Id"
+
+BUNDLE_VERSION = 1
+
+_settings = CaptureSettings()
+
+_current_session: ContextVar[Optional["_Session"]] = ContextVar(
+    "titiler_openeo_capture", default=None
+)
+
+# Parameter types recorded as tagged JSON and rebuilt on replay.
+_PARAMETER_MODELS = {"BoundingBox": BoundingBox, "User": User}
+
+# Schemes whose bytes the capture can fetch itself ("" is a local path).
+_CAPTURABLE_SCHEMES = ("", "file", "http", "https", "s3")
+
+
+class ReplayMiss(LookupError):
+    """A replayed request read something its bundle does not hold."""
+
+
+class _Session:
+    """What a capture and a replay have in common: the I/O hooks."""
+
+    def __init__(self, capture_id: str, block_size: int):
+        """Initialize the session."""
+        self.capture_id = capture_id
+        self.block_size = block_size
+        # Unique per session, so that two sessions over the same bundle never
+        # share cache entries (see `cache_scope`).
+        self.scope = uuid.uuid4().hex
+
+    def stac_search(
+        self, params: Dict[str, Any], search: Callable[[], List[Item]]
+    ) -> List[Item]:
+        """Return the items of the STAC search described by ``params``."""
+        raise NotImplementedError
+
+    def fetch(self, href: str, fetch: Callable[[str], bytes]) -> bytes:
+        """Return the whole content of ``href``."""
+        raise NotImplementedError
+
+    def size(self, href: str) -> int:
+        """Return the size in bytes of asset ``href``."""
+        raise NotImplementedError
+
+    def block(self, href: str, index: int) -> bytes:
+        """Return block ``index`` of asset ``href``."""
+        raise NotImplementedError
+
+    def opener(self, href: str) -> Callable[[str, str], io.RawIOBase]:
+        """Return a ``rasterio.open`` opener serving ``href`` through the session."""
+
+        def _open(path: str, mode: str = "rb") -> io.RawIOBase:
+            # GDAL also probes for sidecar files (.aux.xml, .msk, ...); only
+            # the asset itself is captured.
+            if path != href:
+                raise FileNotFoundError(path)
+            return _BlockFile(self, href)
+
+        return _open
+
+
+class _BlockFile(io.RawIOBase):
+    """Read-only file over an asset's blocks, as served by a session."""
+
+    def __init__(self, session: _Session, href: str):
+        """Open ``href``."""
+        self._session = session
+        self._href = href
+        self._size = session.size(href)
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Return True."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True."""
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to ``offset``, relative to ``whence``."""
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._position
+
+    def readinto(self, buffer: Any) -> int:
+        """Read into ``buffer`` from the current position."""
+        view = memoryview(buffer).cast("B")
+        end = min(self._position + len(view), self._size)
+        count = 0
+        while self._position < end:
+            index, offset = divmod(self._position, self._session.block_size)
+            chunk = self._session.block(self._href, index)[
+                offset : offset + end - self._position
+            ]
+            if not chunk:
+                break
+            view[count : count + len(chunk)] = chunk
+            count += len(chunk)
+            self._position += len(chunk)
+        return count
+
+
+class Capture(_Session):
+    """Records one request's inputs and I/O, written out as a bundle."""
+
+    def __init__(self, directory: str, block_size: int):
+        """Initialize an empty capture, to be written under ``directory``."""
+        super().__init__(uuid.uuid4().hex, block_size)
+        self.directory = directory
+        self.request: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._searches: Dict[str, Dict[str, Any]] = {}
+        self._objects: Dict[str, bytes] = {}
+        self._sizes: Dict[str, int] = {}
+        self._blocks: Dict[str, Dict[int, bytes]] = {}
+
+    @property
+    def path(self) -> str:
+        """The bundle directory."""
+        return os.path.join(self.directory, self.capture_id)
+
+    def record_request(
+        self,
+        endpoint: str,
+        process: Dict[str, Any],
+        parameters: Dict[str, Any],
+        user_id: Optional[str] = None,
+    ) -> None:
+        """Record the request's process graph and resolved parameters."""
+        encoded, skipped = _encode_parameters(parameters)
+        self.request = {
+            "version": BUNDLE_VERSION,
+            "capture_id": self.capture_id,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "endpoint": endpoint,
+            "user_id": user_id,
+            "process": process,
+            "parameters": encoded,
+            "skipped_parameters": skipped,
+        }
+
+    def stac_search(
+        self, params: Dict[str, Any], search: Callable[[], List[Item]]
+    ) -> List[Item]:
+        """Run the search and record its response."""
+        items = search()
+        with self._lock:
+            self._searches[_search_key(params)] = {
+                "params": params,
+                "items": [item.to_dict() for item in items],
+            }
+        return items
+
+    def fetch(self, href: str, fetch: Callable[[str], bytes]) -> bytes:
+        """Fetch ``href`` and record its content."""
+        data = fetch(href)
+        with self._lock:
+            self._objects[href] = data
+        return data
+
+    def size(self, href: str) -> int:
+        """Return (and record) the size of asset ``href``."""
+        with self._lock:
+            if href in self._sizes:
+                return self._sizes[href]
+        size = _source_size(href)
+        with self._lock:
+            self._sizes[href] = size
+        return size
+
+    def block(self, href: str, index: int) -> bytes:
+        """Fetch (and record) block ``index`` of asset ``href``."""
+        with self._lock:
+            block = self._blocks.get(href, {}).get(index)
+        if block is not None:
+            return block
+        start = index * self.block_size
+        length = min(self.block_size, self.size(href) - start)
+        block = _source_range(href, start, length) if length > 0 else b""
+        with self._lock:
+            self._blocks.setdefault(href, {})[index] = block
+        return block
+
+    def write(self) -> str:
+        """Write the bundle; returns its directory."""
+        staging = f"{self.path}.tmp"
+        os.makedirs(os.path.join(staging, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(staging, "assets"), exist_ok=True)
+
+        with self._lock:
+            objects = {}
+            for n, (href, data) in enumerate(sorted(self._objects.items())):
+                name = f"objects/{n}"
+                with open(os.path.join(staging, name), "wb") as f:
+                    f.write(data)
+                objects[href] = name
+
+            assets = {}
+            for n, href in enumerate(sorted(self._sizes)):
+                name = f"assets/{n}.bin"
+                offsets = {}
+                with open(os.path.join(staging, name), "wb") as f:
+                    for index, block in sorted(self._blocks.get(href, {}).items()):
+                        offsets[str(index)] = f.tell()
+                        f.write(block)
+                assets[href] = {
+                    "size": self._sizes[href],
+                    "file": name,
+                    "blocks": offsets,
+                }
+
+            manifest = {
+                "version": BUNDLE_VERSION,
+                "capture_id": self.capture_id,
+                "block_size": self.block_size,
+                "searches": list(self._searches.values()),
+                "objects": objects,
+                "assets": assets,
+            }
+
+        _write_json(os.path.join(staging, "request.json"), self.request)
+        _write_json(os.path.join(staging, "manifest.json"), manifest)
+        os.replace(staging, self.path)
+        return self.path
+
+
+class Replay(_Session):
+    """Serves a request's I/O from a capture bundle."""
+
+    def __init__(self, path: str):
+        """Load the bundle at ``path``."""
+        self.path = path
+        with open(os.path.join(path, "request.json")) as f:
+            self.request = json.load(f)
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        super().__init__(manifest["capture_id"], manifest["block_size"])
+        self._searches = {
+            _search_key(search["params"]): search["items"]
+            for search in manifest["searches"]
+        }
+        self._objects: Dict[str, str] = manifest["objects"]
+        self._assets: Dict[str, Dict[str, Any]] = manifest["assets"]
+
+    @property
+    def process(self) -> Dict[str, Any]:
+        """The captured process (``process_graph`` and ``parameters``)."""
+        return self.request["process"]
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """The captured named parameters."""
+        return _decode_parameters(self.request["parameters"])
+
+    def stac_search(
+        self, params: Dict[str, Any], search: Callable[[], List[Item]]
+    ) -> List[Item]:
+        """Return the recorded response of the search."""
+        items = self._searches.get(_search_key(params))
+        if items is None:
+            raise ReplayMiss(f"STAC search not captured: {params}")
+        return [Item.from_dict(item) for item in items]
+
+    def fetch(self, href: str, fetch: Callable[[str], bytes]) -> bytes:
+        """Return the recorded content of ``href``."""
+        name = self._objects.get(href)
+        if name is None:
+            raise ReplayMiss(f"Object not captured: {href}")
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def size(self, href: str) -> int:
+        """Return the recorded size of asset ``href``."""
+        return self._asset(href)["size"]
+
+    def block(self, href: str, index: int) -> bytes:
+        """Return the recorded block ``index`` of asset ``href``."""
+        asset = self._asset(href)
+        offset = asset["blocks"].get(str(index))
+        if offset is None:
+            # GDAL reports read errors without the Python exception, so log
+            # what was missing.
+            logger.error("Byte range not captured: %s block %d", href, index)
+            raise ReplayMiss(f"Byte range not captured: {href} block {index}")
+        length = min(self.block_size, asset["size"] - index * self.block_size)
+        with open(os.path.join(self.path, asset["file"]), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _asset(self, href: str) -> Dict[str, Any]:
+        asset = self._assets.get(href)
+        if asset is None:
+            raise ReplayMiss(f"Asset not captured: {href}")
+        return asset
+
+
+def get_session() -> Optional[_Session]:
+    """Return the active capture or replay, if any."""
+    return _current_session.get()
+
+
+def cache_scope() -> Tuple[str, ...]:
+    """Extra cache-key components isolating the active capture or replay.
+
+    Process-wide caches that sit in front of captured I/O add this to their
+    keys, so a captured request fetches (and records) everything it needs and a
+    replayed one is served from its bundle only.
+    """
+    session = _current_session.get()
+    return () if session is None else (session.scope,)
+
+
+def open_dataset(href: str, path: Optional[str] = None):
+    """``rasterio.open`` asset ``href`` through the active capture or replay.
+
+    ``path`` is what to open instead of ``href`` outside of a capture (e.g. a
+    ``/vsis3/`` path).
+    """
+    session = _current_session.get()
+    if session is None or urlparse(href).scheme not in _CAPTURABLE_SCHEMES:
+        return rasterio.open(path or href)
+    return rasterio.open(href, opener=session.opener(href))
+
+
+def fetch(href: str, fetcher: Any) -> bytes:
+    """Fetch ``href`` with ``fetcher`` (an ``AssetFetcher``), through the session."""
+    session = _current_session.get()
+    if session is None:
+        return fetcher.fetch(href)
+    return session.fetch(href, fetcher.fetch)
+
+
+@contextlib.contextmanager
+def request_capture(
+    requested: bool,
+    endpoint: str,
+    process: Dict[str, Any],
+    parameters: Dict[str, Any],
+    user_id: Optional[str] = None,
+) -> Iterator[Optional[Capture]]:
+    """Capture the request evaluated inside the block, when requested.
+
+    Yields ``None`` unless ``TITILER_OPENEO_CAPTURE_DIR`` is set and
+    ``requested`` (the request carried the ``X-OpenEO-Capture`` header). The
+    bundle is written even when evaluation fails.
+    """
+    if not (requested and _settings.dir):
+        yield None
+        return
+
+    capture = Capture(_settings.dir, _settings.block_size)
+    capture.record_request(endpoint, process, parameters, user_id=user_id)
+    token = _current_session.set(capture)
+    try:
+        yield capture
+    finally:
+        _current_session.reset(token)
+        try:
+            path = capture.write()
+            logger.info("Request captured to %s", path)
+        except OSError:
+            logger.exception("Could not write capture %s", capture.capture_id)
+
+
+@contextlib.contextmanager
+def replay(path: str) -> Iterator[Replay]:
+    """Serve the I/O of the block from the capture bundle at ``path``."""
+    session = Replay(path)
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def capture_headers(capture: Optional[Capture]) -> Dict[str, str]:
+    """Response headers for ``capture`` (none when not capturing)."""
+    if capture is None:
+        return {}
+    return {CAPTURE_ID_HEADER: capture.capture_id}
+
+
+def _search_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _encode_parameters(parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    encoded: Dict[str, Any] = {}
+    skipped: List[str] = []
+    for name, value in parameters.items():
+        model = next(
+            (key for key, cls in _PARAMETER_MODELS.items() if isinstance(value, cls)),
+            None,
+        )
+        if model is not None:
+            encoded[name] = {"__type__": model, "value": value.model_dump(mode="json")}
+            continue
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            skipped.append(name)
+            continue
+        encoded[name] = value
+    return encoded, skipped
+
+
+def _decode_parameters(encoded: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = {}
+    for name, value in encoded.items():
+        if isinstance(value, dict) and value.get("__type__") in _PARAMETER_MODELS:
+            value = _PARAMETER_MODELS[value["__type__"]].model_validate(value["value"])
+        parameters[name] = value
+    return parameters
+
+
+def _local_path(href: str) -> Optional[str]:
+    parsed = urlparse(href)
+    if parsed.scheme == "":
+        return href
+    if parsed.scheme == "file":
+        return parsed.path
+    return None
+
+
+def _source_size(href: str) -> int:
+    path = _local_path(href)
+    if path is not None:
+        return os.path.getsize(path)
+    from .sar.fetcher import ObstoreFetcher
+
+    return ObstoreFetcher().size(href)
+
+
+def _source_range(href: str, start: int, length: int) -> bytes:
+    path = _local_path(href)
+    if path is not None:
+        with open(path, "rb") as f:
+            f.seek(start)
+            return f.read(length)
+    from .sar.fetcher import ObstoreFetcher
+
+    return ObstoreFetcher().fetch_range(href, start, length)
+
+
+def _write_json(path: str, data: Any) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, default=str)
@@ -0,0 +1,163 @@
+"""Coalescing of identical concurrent tile and ``/result`` requests.
+
+A map view, several clients looking at the same place or one client
+retrying, often request the same XYZ tile at once, and each request used to
+evaluate the whole process graph. Requests are now keyed on a digest of what
+determines their response: the service, the process graph, the parameters
+(tile bounds, query parameters, defaults) and who may see the result. While
+one request with a given digest is evaluating its graph, identical requests
+wait for it and answer with its bytes (and its error, if it fails) instead
+of evaluating the graph again. Nothing is kept once the evaluation is done:
+this is not a cache.
+
+Results are shared between users only for public services whose graph does
+not read a per-request parameter (``_openeo_user``, ``_openeo_tile_store``);
+otherwise the digest includes the user id. ``/result`` requests, which carry
+their own graph, are never shared between users.
+
+Requests asking for a capture (``X-OpenEO-Capture``) always evaluate their
+graph. ``TITILER_OPENEO_PROCESSING_COALESCE_REQUESTS=false`` turns
+coalescing off.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Set, TypeVar
+
+from attrs import define, field
+from pydantic import BaseModel
+
+from .metrics import REQUESTS_COALESCED
+from .models.auth import User
+from .settings import ProcessingSettings
+
+T = TypeVar("T")
+
+# Scope of results any user may be given
+PUBLIC_SCOPE = "public"
+
+
+@define
+class _Flight:
+    """One evaluation in progress, and its outcome once done."""
+
+    done: threading.Event = field(factory=threading.Event)
+    result: Any = field(default=None)
+    error: Optional[BaseException] = field(default=None)
+
+
+@define
+class SingleFlight:
+    """Run one call at a time per key, sharing its outcome with callers
+    arriving while it runs."""
+
+    _flights: Dict[str, _Flight] = field(init=False, factory=dict)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+
+    def run(self, key: str, compute: Callable[[], T]) -> T:
+        """Return `compute()`, or the outcome of the running call for `key`."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            REQUESTS_COALESCED.inc()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+
+_flights = SingleFlight()
+
+
+def coalesce(key: Optional[str], compute: Callable[[], T]) -> T:
+    """Return `compute()`, shared with identical requests running at once.
+
+    `key` is the request's `request_digest`; None evaluates alone.
+    """
+    if key is None or not ProcessingSettings().coalesce_requests:
+        return compute()
+    return _flights.run(key, compute)
+
+
+def result_scope(
+    process: Dict[str, Any], user: Optional[User], public: bool = False
+) -> str:
+    """Who the result of `process` may be shared with.
+
+    Args:
+        process: The process graph, with its parameters
+        user: The user making the request, if authenticated
+        public: Whether the graph is a public service's
+    """
+    reads_request_parameters = any(
+        name.startswith("_openeo_") for name in parameter_references(process)
+    )
+    if public and not reads_request_parameters:
+        return PUBLIC_SCOPE
+    return f"user:{user.user_id}" if user else "anonymous"
+
+
+def request_digest(
+    kind: str, process: Dict[str, Any], parameters: Dict[str, Any], scope: str
+) -> str:
+    """Digest of everything determining a request's response.
+
+    Per-request parameters (``_openeo_*``) are left out: the `scope` stands
+    for the user, and the tile store is the same for every request.
+    """
+    canonical = {
+        "kind": kind,
+        "process": process,
+        "parameters": {
+            name: value
+            for name, value in parameters.items()
+            if not name.startswith("_openeo_")
+        },
+        "scope": scope,
+    }
+    content = json.dumps(
+        canonical, sort_keys=True, separators=(",", ":"), default=_canonical
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _canonical(value: Any) -> Any:
+    """JSON form of the parameter values json does not know."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    # Unknown objects: their repr often holds an address, which at worst
+    # keeps identical requests apart.
+    return repr(value)
+
+
+def parameter_references(value: Any) -> Set[str]:
+    """Names of the parameters a process graph reads (``from_parameter``)."""
+    if isinstance(value, dict):
+        names = set()
+        reference = value.get("from_parameter")
+        if isinstance(reference, str):
+            names.add(reference)
+        for v in value.values():
+            names |= parameter_references(v)
+        return names
+    if isinstance(value, list):
+        return set().union(*(parameter_references(v) for v in value))
+    return set()
@@ -348,3 +348,18 @@ class STACLoadError(OpenEOException):
             code="STACLoadError",
             status_code=status.HTTP_400_BAD_REQUEST,
         )
+
+
+class MemoryLimitExceeded(OpenEOException):
+    """The request realized more raster data than the per-request limit."""
+
+    def __init__(self, requested: int, limit: int):
+        """Initialize error with memory limit exceeded."""
+        super().__init__(
+            message=(
+                f"Raster data held by the request would reach {requested:,} bytes "
+                f"(max allowed: {limit:,} bytes). Reduce the spatial or temporal extent."
+            ),
+            code="MemoryLimitExceeded",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
@@ -2,7 +2,8 @@
 
 import json
 from copy import deepcopy
-from typing import Annotated, Any, Dict, List, Optional
+from typing import Annotated, Any, Callable, Dict, List, Optional
+from urllib.parse import urlencode
 
 import morecantile
 import pyproj
@@ -20,10 +21,16 @@ from titiler.core.factory import BaseFactory
 
 from . import __version__ as titiler_version
 from .auth import Auth, CredentialsBasic, OIDCAuth
+from .capture import CAPTURE_HEADER, capture_headers, request_capture
+from .coalesce import coalesce, request_digest, result_scope
 from .errors import InvalidProcessGraph
+from .memory_budget import peak_memory_headers, request_memory_budget
+from .metatile import Metatile, metatile_size, siblings, split_registry
+from .metrics import GRAPH_PLANNING_SECONDS
 from .models import openapi
 from .models import udp as udp_models
 from .models.auth import User
+from .profiling import profiling_headers, request_profile
 from .reader_requirements import plan_process_registry
 from .results_cache import make_results_cache
 from .services import ServicesStore, TileAssignmentStore, UdpStore
@@ -45,7 +52,8 @@ class EndpointsFactory(BaseFactory):
     default_services_file: Optional[str] = None
     load_nodes_ids: List[str] = field(factory=lambda: ["load_collection"])
 
-    def _get_media_type(self, process_graph: Dict[str, Any]) -> str:
+    @staticmethod
+    def _get_media_type(process_graph: Dict[str, Any]) -> str:
         for _, node in process_graph.items():
             if node["process_id"] == "save_result":
                 if node["arguments"]["format"] == "PNG":
@@ -132,6 +140,226 @@ class EndpointsFactory(BaseFactory):
                     f"Tile(x={x}, y={y}, z={z}) is outside bounds defined by the Service Configuration"
                 )
 
+    def _coalesced_response(
+        self, key: Optional[str], evaluate: Callable[[], Response]
+    ) -> Response:
+        """Response of `evaluate`, shared with identical requests (`key`)."""
+        return self._copy_response(coalesce(key, evaluate))
+
+    def _copy_response(self, response: Response) -> Response:
+        """A new Response around the body of a shared one."""
+        return Response(
+            response.body,
+            status_code=response.status_code,
+            headers={
+                name: value
+                for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            },
+            media_type=response.media_type,
+        )
+
+    def render_tile(  # noqa: C901
+        self,
+        service: Dict[str, Any],
+        z: int,
+        x: int,
+        y: int,
+        user: Optional[User] = None,
+        query_params: Optional[Dict[str, Any]] = None,
+        capture_path: Optional[str] = None,
+    ) -> Response:
+        """Render tile `z`/`x`/`y` of an XYZ service.
+
+        Args:
+            service: The service, as returned by the services store
+            z: Zoom level of the tile
+            x: Column of the tile
+            y: Row of the tile
+            user: The user the tile is rendered for
+            query_params: Values of the graph's parameters
+            capture_path: Path of the request, when it asks for a capture
+        """
+        service_id = service["id"]
+
+        # Get service configuration
+        configuration = service.get("configuration") or {}
+        tilematrixset = configuration.get("tilematrixset", "WebMercatorQuad")
+        tilesize = configuration.get("tile_size", 256)
+        tms = morecantile.tms.get(tilematrixset)
+
+        minzoom = configuration.get("minzoom") or tms.minzoom
+        maxzoom = configuration.get("maxzoom") or tms.maxzoom
+        if z < minzoom or z > maxzoom:
+            raise HTTPException(
+                400,
+                f"Invalid ZOOM level {z}. Should be between {minzoom} and {maxzoom}",
+            )
+
+        process = deepcopy(service["process"])
+
+        load_nodes = self.get_load_nodes(process["process_graph"])
+
+        # Check that nodes have spatial-extent
+        assert all(
+            node["arguments"].get("spatial_extent") for node in load_nodes
+        ), "Invalid `load` process, Missing spatial_extent"
+        # Force size to tile size
+        for node in load_nodes:
+            node["arguments"]["width"] = tilesize
+            node["arguments"]["height"] = tilesize
+
+        tile_bounds = list(tms.xy_bounds(morecantile.Tile(x=x, y=y, z=z)))
+
+        query_params = dict(query_params or {})
+        if self.tile_store:
+            query_params["_openeo_tile_store"] = self.tile_store
+
+        query_params["_openeo_user"] = user
+
+        def tile_parameters(bounds, tile_x, tile_y) -> Dict[str, Any]:
+            parameters = {
+                "spatial_extent_west": bounds[0],
+                "spatial_extent_south": bounds[1],
+                "spatial_extent_east": bounds[2],
+                "spatial_extent_north": bounds[3],
+                "spatial_extent_crs": tms.crs.to_epsg() or tms.crs.to_wkt(),
+                "target_crs": tms.crs.to_epsg() or tms.crs.to_wkt(),
+                "bounding_box": BoundingBox(
+                    west=bounds[0],
+                    east=bounds[2],
+                    south=bounds[1],
+                    north=bounds[3],
+                    crs=tms.crs.to_epsg(),
+                ),
+                "tile_x": tile_x,
+                "tile_y": tile_y,
+                "tile_z": z,
+                **query_params,  # Merge query parameters, they override tile params if same name
+            }
+
+            # now,with the default parameters from the service configuration, We will fill the default values
+            for param in process.get("parameters") or []:
+                param_name = param.get("name")
+                if param_name and param_name not in parameters:
+                    default_value = param.get("default")
+                    if default_value is not None:
+                        parameters[param_name] = default_value
+
+            return parameters
+
+        parameters = tile_parameters(tile_bounds, x, y)
+
+        # Validate tile bounds against service extent
+        service_extent = configuration.get("extent")
+        self._validate_tile_bounds(tile_bounds, service_extent, tms, x, y, z)
+
+        media_type = self._get_media_type(process["process_graph"])
+
+        def evaluate(
+            process: Dict[str, Any],
+            parameters: Dict[str, Any],
+            metatile: Optional[Metatile] = None,
+        ) -> Any:
+            with (
+                request_memory_budget() as budget,
+                request_profile(user_id=user.user_id if user else None) as profile,
+                request_capture(
+                    capture_path is not None,
+                    capture_path or "",
+                    process,
+                    parameters,
+                    user_id=user.user_id if user else None,
+                ) as capture,
+            ):
+                with GRAPH_PLANNING_SECONDS.time():
+                    parsed_graph = OpenEOProcessGraph(pg_data=process)
+                    results_cache = make_results_cache(parsed_graph)
+                    process_registry = plan_process_registry(
+                        parsed_graph, self.process_registry
+                    )
+                    if metatile:
+                        process_registry = split_registry(process_registry, metatile)
+                    pg_callable = parsed_graph.to_callable(
+                        process_registry=process_registry,
+                        parameters=process.get("parameters"),
+                        results_cache=results_cache,
+                        # parameters=args,  # Use built-in parameter substitution instead of manual
+                    )
+
+                img = pg_callable(named_parameters=parameters)
+
+            headers = {
+                **peak_memory_headers(budget),
+                **profiling_headers(profile),
+                **capture_headers(capture),
+            }
+            if metatile:
+                return {
+                    (tile.x, tile.y): Response(
+                        result.data, media_type=media_type, headers=headers
+                    )
+                    for tile, result in img.items()
+                }
+            return Response(img.data, media_type=media_type, headers=headers)
+
+        if capture_path is not None:
+            return evaluate(process, parameters)
+
+        # Identical requests running at once share one evaluation: of any
+        # user for public services, of the same user otherwise
+        public = configuration.get("scope", "public") == "public"
+        scope = result_scope(process, user, public=public)
+        key = request_digest(f"tile:{service_id}", process, parameters, scope)
+
+        size = metatile_size(configuration, process, media_type)
+        if size == 1:
+            return self._coalesced_response(key, lambda: evaluate(process, parameters))
+
+        cached = siblings.get(key)
+        if cached is not None:
+            return self._copy_response(cached)
+
+        # Render the block of tiles holding this one at once, and keep
+        # the others for the requests that follow
+        metatile = Metatile.around(
+            tms, morecantile.Tile(x=x, y=y, z=z), size, int(tilesize)
+        )
+        metatile_process = deepcopy(process)
+        for node in self.get_load_nodes(metatile_process["process_graph"]):
+            node["arguments"]["width"] = metatile.width
+            node["arguments"]["height"] = metatile.height
+        metatile_parameters = tile_parameters(metatile.bounds, x, y)
+
+        def evaluate_metatile() -> Dict[Any, Response]:
+            tiles = evaluate(metatile_process, metatile_parameters, metatile)
+            siblings.put(
+                {
+                    request_digest(
+                        f"tile:{service_id}",
+                        process,
+                        tile_parameters(tms.xy_bounds(tile), tile.x, tile.y),
+                        scope,
+                    ): tiles[(tile.x, tile.y)]
+                    for tile in metatile.tiles
+                    if (tile.x, tile.y) != (x, y)
+                }
+            )
+            return tiles
+
+        metatile_key = request_digest(
+            f"metatile:{service_id}", metatile_process, metatile_parameters, scope
+        )
+        tiles = coalesce(metatile_key, evaluate_metatile)
+        return self._copy_response(tiles[(x, y)])
+
+    def _next_link(
+        self, request: Request, name: str, limit: int, token: str
+    ) -> Dict[str, str]:
+        """Link to the page of listing `name` after the one with `token`."""
+        query = urlencode({"limit": limit, "next": token})
+        return {"href": f"{self.url_for(request, name)}?{query}", "rel": "next"}
+
     def register_routes(self):  # noqa: C901
         """Register Routes."""
 
@@ -533,12 +761,28 @@ class EndpointsFactory(BaseFactory):
             },
             tags=["Secondary Services"],
         )
-        def openeo_services(request: Request, user=Depends(self.auth.validate)):
+        def openeo_services(
+            request: Request,
+            limit: Optional[int] = Query(
+                None, ge=1, description="Maximum number of services to return"
+            ),
+            next_page: Optional[str] = Query(
+                None,
+                alias="next",
+                description="Token of the page to return, from a `next` link",
+            ),
+            user=Depends(self.auth.validate),
+        ):
             """Lists all secondary web services."""
-            services = self.services_store.get_user_services(user.user_id)
+            services = self.services_store.get_user_services(
+                user.user_id,
+                limit=limit + 1 if limit else None,
+                after=next_page,
+                summary=True,
+            )
 
             # If services list is empty and default_services_file is configured, load default services
-            if not services and self.default_services_file:
+            if not services and not next_page and self.default_services_file:
                 try:
                     import json
                     import os
@@ -566,13 +810,29 @@ class EndpointsFactory(BaseFactory):
                             )
 
                         # Reload services after adding defaults
-                        services = self.services_store.get_user_services(user.user_id)
+                        services = self.services_store.get_user_services(
+                            user.user_id,
+                            limit=limit + 1 if limit else None,
+                            summary=True,
+                        )
                 except Exception as e:
                     # Log the error but continue without default services
                     import logging
 
                     logging.error(f"Failed to load default services: {str(e)}")
 
+            links = []
+            if limit and len(services) > limit:
+                services = services[:limit]
+                links.append(
+                    self._next_link(
+                        request,
+                        "openeo_services",
+                        limit,
+                        self.services_store.page_token(services[-1]),
+                    )
+                )
+
             return {
                 "services": [
                     {
@@ -588,7 +848,8 @@ class EndpointsFactory(BaseFactory):
                     }
                     for service in services
                 ],
-                "links": [
+                "links": links
+                + [
                     {
                         "href": self.url_for(
                             request, "openeo_service", service_id=service["id"]
@@ -670,12 +931,26 @@ class EndpointsFactory(BaseFactory):
                 100, ge=0, description="Maximum number of UDPs to return"
             ),
             offset: int = Query(0, ge=0, description="Offset for pagination"),
+            next_page: Optional[str] = Query(
+                None,
+                alias="next",
+                description="Token of the page to return, from a `next` link",
+            ),
             user=Depends(self.auth.validate),
         ):
             """List UDPs for the authenticated user."""
             udps = self.udp_store.list_udps(
-                user_id=user.user_id, limit=limit, offset=offset
+                user_id=user.user_id, limit=limit + 1, offset=offset, after=next_page
             )
+            next_link = None
+            if limit and len(udps) > limit:
+                next_link = self._next_link(
+                    request,
+                    "list_udps",
+                    limit,
+                    self.udp_store.page_token(udps[limit - 1]),
+                )
+            udps = udps[:limit]
 
             processes = []
             for udp in udps:
@@ -699,6 +974,8 @@ class EndpointsFactory(BaseFactory):
                     "rel": "self",
                 }
             ]
+            if next_link:
+                links.append(next_link)
 
             return {"processes": processes, "links": links}
 
@@ -1206,6 +1483,11 @@ class EndpointsFactory(BaseFactory):
                             "description": "Tile size in pixels.",
                             "type": "number",
                         },
+                        "metatile": {
+                            "default": 1,
+                            "description": "Render tiles in blocks of `metatile` x `metatile` tiles, evaluating the process graph once per block. 1 renders each tile on its own.",
+                            "type": "number",
+                        },
                         "extent": {
                             "description": "Limits the XYZ service to the specified bounding box. In form of `[West, South, East, North]` in EPSG:4326 CRS.",
                             "type": "object",
@@ -1339,31 +1621,63 @@ class EndpointsFactory(BaseFactory):
                     if default_value is not None:
                         parameters[param_name] = default_value
 
-            parsed_graph = OpenEOProcessGraph(pg_data=process)
-            results_cache = make_results_cache(parsed_graph)
-            process_registry = plan_process_registry(
-                parsed_graph, self.process_registry
-            )
-            pg_callable = parsed_graph.to_callable(
-                process_registry=process_registry,
-                parameters=process.get("parameters"),
-                results_cache=results_cache,
-            )
-            result = pg_callable(named_parameters=parameters)
-
-            media_type = result.media_type if hasattr(result, "media_type") else None
-            if not media_type and isinstance(result, str):
-                media_type = "text/plain"
-            elif not media_type:
-                media_type = "application/octet-stream"
-
-            data = result.data if hasattr(result, "data") else result
+            def evaluate() -> Response:
+                with (
+                    request_memory_budget() as budget,
+                    request_profile(user_id=user.user_id) as profile,
+                    request_capture(
+                        CAPTURE_HEADER in request.headers,
+                        request.url.path,
+                        process,
+                        parameters,
+                        user_id=user.user_id,
+                    ) as capture,
+                ):
+                    with GRAPH_PLANNING_SECONDS.time():
+                        parsed_graph = OpenEOProcessGraph(pg_data=process)
+                        results_cache = make_results_cache(parsed_graph)
+                        process_registry = plan_process_registry(
+                            parsed_graph, self.process_registry
+                        )
+                        pg_callable = parsed_graph.to_callable(
+                            process_registry=process_registry,
+                            parameters=process.get("parameters"),
+                            results_cache=results_cache,
+                        )
+                    result = pg_callable(named_parameters=parameters)
 
-            # if the result is not a SaveResultData object, convert it to one
-            # if not isinstance(result, SaveResultData):
-            #     result = save_result(result, "GTiff")
+                media_type = (
+                    result.media_type if hasattr(result, "media_type") else None
+                )
+                if not media_type and isinstance(result, str):
+                    media_type = "text/plain"
+                elif not media_type:
+                    media_type = "application/octet-stream"
+
+                data = result.data if hasattr(result, "data") else result
+
+                # if the result is not a SaveResultData object, convert it to one
+                # if not isinstance(result, SaveResultData):
+                #     result = save_result(result, "GTiff")
+
+                return Response(
+                    data,
+                    media_type=media_type,
+                    headers={
+                        **peak_memory_headers(budget),
+                        **profiling_headers(profile),
+                        **capture_headers(capture),
+                    },
+                )
 
-            return Response(data, media_type=media_type)
+            # Identical requests of the same user running at once share one
+            # evaluation, except captures
+            key = None
+            if CAPTURE_HEADER not in request.headers:
+                key = request_digest(
+                    "result", process, parameters, result_scope(process, user)
+                )
+            return self._coalesced_response(key, evaluate)
 
         @self.router.get(
             "/services/xyz/{service_id}/tiles/{z}/{x}/{y}",
@@ -1420,87 +1734,15 @@ class EndpointsFactory(BaseFactory):
             auth_manager = ServiceAuthorizationManager()
             auth_manager.authorize(service, user)
 
-            # Get service configuration
-            configuration = service.get("configuration") or {}
-            tilematrixset = configuration.get("tilematrixset", "WebMercatorQuad")
-            tilesize = configuration.get("tile_size", 256)
-            tms = morecantile.tms.get(tilematrixset)
-
-            minzoom = configuration.get("minzoom") or tms.minzoom
-            maxzoom = configuration.get("maxzoom") or tms.maxzoom
-            if z < minzoom or z > maxzoom:
-                raise HTTPException(
-                    400,
-                    f"Invalid ZOOM level {z}. Should be between {minzoom} and {maxzoom}",
-                )
-
-            process = deepcopy(service["process"])
-
-            load_nodes = self.get_load_nodes(process["process_graph"])
-
-            # Check that nodes have spatial-extent
-            assert all(
-                node["arguments"].get("spatial_extent") for node in load_nodes
-            ), "Invalid `load` process, Missing spatial_extent"
-            # Force size to tile size
-            for node in load_nodes:
-                node["arguments"]["width"] = tilesize
-                node["arguments"]["height"] = tilesize
-
-            tile_bounds = list(tms.xy_bounds(morecantile.Tile(x=x, y=y, z=z)))
-
             # Parse query parameters for dynamic parameter substitution
-            query_params = self._parse_query_parameters(request)
-            if self.tile_store:
-                query_params["_openeo_tile_store"] = self.tile_store
-
-            query_params["_openeo_user"] = user
-
-            parameters = {
-                "spatial_extent_west": tile_bounds[0],
-                "spatial_extent_south": tile_bounds[1],
-                "spatial_extent_east": tile_bounds[2],
-                "spatial_extent_north": tile_bounds[3],
-                "spatial_extent_crs": tms.crs.to_epsg() or tms.crs.to_wkt(),
-                "target_crs": tms.crs.to_epsg() or tms.crs.to_wkt(),
-                "bounding_box": BoundingBox(
-                    west=tile_bounds[0],
-                    east=tile_bounds[2],
-                    south=tile_bounds[1],
-                    north=tile_bounds[3],
-                    crs=tms.crs.to_epsg(),
+            return self.render_tile(
+                service,
+                z,
+                x,
+                y,
+                user=user,
+                query_params=self._parse_query_parameters(request),
+                capture_path=(
+                    request.url.path if CAPTURE_HEADER in request.headers else None
                 ),
-                "tile_x": x,
-                "tile_y": y,
-                "tile_z": z,
-                **query_params,  # Merge query parameters, they override tile params if same name
-            }
-
-            # now,with the default parameters from the service configuration, We will fill the default values
-            for param in process.get("parameters") or []:
-                param_name = param.get("name")
-                if param_name and param_name not in parameters:
-                    default_value = param.get("default")
-                    if default_value is not None:
-                        parameters[param_name] = default_value
-
-            # Validate tile bounds against service extent
-            service_extent = configuration.get("extent")
-            self._validate_tile_bounds(tile_bounds, service_extent, tms, x, y, z)
-
-            media_type = self._get_media_type(process["process_graph"])
-
-            parsed_graph = OpenEOProcessGraph(pg_data=process)
-            results_cache = make_results_cache(parsed_graph)
-            process_registry = plan_process_registry(
-                parsed_graph, self.process_registry
-            )
-            pg_callable = parsed_graph.to_callable(
-                process_registry=process_registry,
-                parameters=process.get("parameters"),
-                results_cache=results_cache,
-                # parameters=args,  # Use built-in parameter substitution instead of manual
             )
-
-            img = pg_callable(named_parameters=parameters)
-            return Response(img.data, media_type=media_type)
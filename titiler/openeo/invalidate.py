@@ -0,0 +1,294 @@
+"""Incremental invalidation of seeded tiles when new STAC items arrive.
+
+Tiles seeded by ``titiler-openeo-seed`` go stale when a collection a
+service loads receives a new acquisition, and nothing used to say which
+ones, so a seeded pyramid could only be thrown away and seeded again. The
+poller here searches the STAC API for items newer than a watermark, works
+out which tiles of each service's tile matrix each new item's footprint
+covers, at the zoom levels the output holds, and deletes only those, or
+renders them again with ``--render``::
+
+    titiler-openeo-invalidate --target SERVICE_ID tiles/ \\
+        --target OTHER_ID other.mbtiles --state watermark.json --interval 300
+
+The watermark is an item property (``datetime`` by default, or e.g.
+``updated`` for catalogues that ingest old acquisitions late, which needs
+CQL2 filtering). It is saved to ``--state`` once a batch of items has been
+handled, so a poller that stops handles the batch again when restarted.
+Without a saved watermark, polling starts from ``--since``, or from now.
+
+Footprints are matched against tile bounds exactly when shapely is installed
+(``pip install titiler-openeo[seed]``), against the items' bounding boxes
+otherwise, which invalidates a few more tiles.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import morecantile
+from attrs import define, field
+
+from .seed import TileKey, _writer, seed, service_tiles
+from .seed import shape as _shape
+
+
+@define
+class Watermark:
+    """How far the poller has read the item stream."""
+
+    # Value of the watermark property of the latest item handled
+    value: Optional[datetime] = None
+
+    # Ids of the items handled with exactly that value
+    seen: Set[str] = field(factory=set)
+
+    @classmethod
+    def load(cls, path: Path) -> "Watermark":
+        """The watermark saved at `path`; an empty one if there is none."""
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        value = data.get("value")
+        return cls(
+            value=_parse_timestamp(value) if value else None,
+            seen=set(data.get("seen") or []),
+        )
+
+    def save(self, path: Path) -> None:
+        """Save the watermark to `path`, atomically."""
+        data = {
+            "value": self.value.isoformat() if self.value else None,
+            "seen": sorted(self.seen),
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent or ".", prefix=f".{path.name}.")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+@define
+class InvalidationReport:
+    """Outcome of invalidating a service's tiles."""
+
+    items: int = 0
+    invalidated: int = 0
+    rendered: int = 0
+    errors: int = 0
+
+    def __str__(self) -> str:
+        """One summary line."""
+        return (
+            f"{self.items} new items  {self.invalidated} tiles invalidated  "
+            f"{self.rendered} rendered  {self.errors} errors"
+        )
+
+
+def poll_items(
+    client: Any,
+    collections: Set[str],
+    watermark: Watermark,
+    property: str = "datetime",
+) -> List[Dict[str, Any]]:
+    """Items of `collections` past `watermark`, oldest first; advances it.
+
+    Args:
+        client: A ``pystac_client.Client``
+        collections: Collections to search
+        watermark: Where the previous poll stopped
+        property: Item property the watermark is on
+    """
+    search: Dict[str, Any] = {"collections": sorted(collections), "limit": 100}
+    if watermark.value:
+        since = watermark.value.isoformat().replace("+00:00", "Z")
+        if property == "datetime":
+            search["datetime"] = f"{since}/.."
+        else:
+            search["filter"] = {
+                "op": ">=",
+                "args": [{"property": property}, {"timestamp": since}],
+            }
+            search["filter_lang"] = "cql2-json"
+
+    # Filtered again here: not every API supports `filter`, and `datetime`
+    # also matches items ranging over the watermark
+    found: List[Tuple[datetime, Dict[str, Any]]] = []
+    for item in client.search(**search).items_as_dicts():
+        value = _item_timestamp(item, property)
+        if value is None:
+            continue
+        if watermark.value and (
+            value < watermark.value
+            or (value == watermark.value and item["id"] in watermark.seen)
+        ):
+            continue
+        found.append((value, item))
+    if not found:
+        return []
+
+    found.sort(key=lambda entry: (entry[0], entry[1]["id"]))
+    latest = found[-1][0]
+    seen = {item["id"] for value, item in found if value == latest}
+    if latest == watermark.value:
+        seen |= watermark.seen
+    watermark.value, watermark.seen = latest, seen
+    return [item for _, item in found]
+
+
+def service_collections(service: Dict[str, Any]) -> Set[str]:
+    """Collections the graph of `service` loads."""
+    return {
+        node["arguments"]["id"]
+        for node in service["process"]["process_graph"].values()
+        if node.get("process_id") == "load_collection"
+        and isinstance((node.get("arguments") or {}).get("id"), str)
+    }
+
+
+def affected_blocks(
+    service: Dict[str, Any], items: List[Dict[str, Any]], zooms: Set[int]
+) -> List[List[morecantile.Tile]]:
+    """Tiles of `service` at `zooms` covered by the footprint of `items`, in
+    the blocks the service is rendered in."""
+    blocks: Dict[Tuple[int, ...], Dict[TileKey, morecantile.Tile]] = {}
+    for item in items:
+        geometry = item.get("geometry") if _shape is not None else None
+        for z in sorted(zooms):
+            for block in service_tiles(
+                service, z, z, bbox=item.get("bbox"), geometry=geometry
+            ):
+                first = min(block)
+                tiles = blocks.setdefault((first.z, first.x, first.y), {})
+                tiles.update({(t.z, t.x, t.y): t for t in block})
+    return [list(tiles.values()) for _, tiles in sorted(blocks.items())]
+
+
+def invalidate(
+    service: Dict[str, Any],
+    items: List[Dict[str, Any]],
+    writer: Any,
+    render: bool = False,
+    **seed_options: Any,
+) -> InvalidationReport:
+    """Delete, or render again, the tiles of `service` in `writer` covered by
+    `items`. The writer is closed.
+
+    Args:
+        service: The service, as returned by the services store
+        items: New STAC items of collections the service loads
+        writer: A seeded `DirectoryWriter` or `MBTilesWriter`
+        render: Render the deleted tiles again
+        seed_options: Options of `seed` for rendering
+    """
+    report = InvalidationReport(items=len(items))
+    stale: List[List[morecantile.Tile]] = []
+    for block in affected_blocks(service, items, writer.zooms()):
+        deleted = [t for t in block if writer.delete((t.z, t.x, t.y))]
+        report.invalidated += len(deleted)
+        if deleted:
+            stale.append(deleted)
+
+    if not (render and stale):
+        writer.close()
+        return report
+
+    seeded = seed(service, iter(stale), writer, **seed_options)
+    report.rendered, report.errors = seeded.rendered, seeded.errors
+    return report
+
+
+def _item_timestamp(item: Dict[str, Any], property: str) -> Optional[datetime]:
+    """The watermark property of an item."""
+    properties = item.get("properties") or {}
+    value = properties.get(property)
+    if value is None and property == "datetime":
+        value = properties.get("end_datetime")
+    return _parse_timestamp(value) if value else None
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """An RFC 3339 timestamp, as an aware datetime."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="titiler-openeo-invalidate",
+        description="Invalidate seeded tiles covered by new STAC items.",
+    )
+    parser.add_argument(
+        "--target",
+        nargs=2,
+        action="append",
+        required=True,
+        metavar=("SERVICE_ID", "OUTPUT"),
+        help="A service and the directory or MBTiles file it was seeded into",
+    )
+    parser.add_argument("--state", type=Path, required=True)
+    parser.add_argument("--since", help="Watermark to start from (RFC 3339)")
+    parser.add_argument("--property", default="datetime")
+    parser.add_argument("--render", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--interval", type=float, default=0, help="Seconds between polls; 0 polls once"
+    )
+    args = parser.parse_args(argv)
+
+    from .factory import EndpointsFactory
+    from .services import get_store
+    from .settings import BackendSettings
+    from .stacapi import stacApiBackend
+
+    settings = BackendSettings()  # type: ignore[call-arg]
+    store = get_store(str(settings.store_url))
+    targets = []
+    for service_id, output in args.target:
+        service = store.get_service(service_id)
+        if service is None:
+            parser.error(f"Could not find service: {service_id}")
+        targets.append((service, Path(output)))
+    collections = set().union(*(service_collections(s) for s, _ in targets))
+    client = stacApiBackend(str(settings.stac_api_url)).client
+
+    watermark = Watermark.load(args.state)
+    if watermark.value is None:
+        since = args.since
+        watermark.value = (
+            _parse_timestamp(since) if since else datetime.now(timezone.utc)
+        )
+        watermark.save(args.state)
+
+    errors = 0
+    while True:
+        items = poll_items(client, collections, watermark, args.property)
+        for service, output in targets:
+            loaded = service_collections(service)
+            media_type = EndpointsFactory._get_media_type(
+                service["process"]["process_graph"]
+            )
+            report = invalidate(
+                service,
+                [item for item in items if item.get("collection") in loaded],
+                _writer(output, service, media_type),
+                render=args.render,
+                workers=args.workers,
+            )
+            errors += report.errors
+            print(f"{service['id']}: {report}", flush=True)
+        watermark.save(args.state)
+
+        if not args.interval:
+            return 1 if errors else 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """titiler-openeo app."""
 
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
@@ -15,10 +16,12 @@ from .auth import get_auth
 from .errors import ExceptionHandler, OpenEOException
 from .factory import EndpointsFactory
 from .health import register_health_endpoints
+from .metrics import prometheus_client, register_metrics_endpoint
 from .middleware import DynamicCacheControlMiddleware
 from .processes import PROCESS_SPECIFICATIONS, process_registry
+from .profiling import register_profiling_endpoints
 from .services import get_store, get_tile_store, get_udp_store
-from .settings import ApiSettings, AuthSettings, BackendSettings
+from .settings import ApiSettings, AuthSettings, BackendSettings, ProfilingSettings
 from .stacapi import LoadCollection, LoadStac, stacApiBackend
 
 STAC_VERSION = "1.0.0"
@@ -49,6 +52,14 @@ tile_store = (
 auth = get_auth(auth_settings, store=service_store)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Flush buffered login activity at shutdown."""
+    yield
+    if auth.login_tracker is not None:
+        auth.login_tracker.close()
+
+
 def create_app():
     app = FastAPI(
         title=api_settings.name,
@@ -64,6 +75,7 @@ def create_app():
         version=titiler_version,
         root_path=api_settings.root_path,
         debug=api_settings.debug,
+        lifespan=lifespan,
     )
 
     # Set all CORS enabled origins
@@ -142,6 +154,14 @@ def create_app():
         auth=auth,
     )
 
+    # Prometheus metrics (GET /metrics), when prometheus-client is installed.
+    if prometheus_client is not None:
+        register_metrics_endpoint(app)
+
+    # Opt-in profiling trace lookup (GET /debug/traces/{trace_id}).
+    if ProfilingSettings().enabled:
+        register_profiling_endpoints(app, auth)
+
     # Create exception handler instance
     exception_handler = ExceptionHandler(logger=logging.getLogger(__name__))
 
@@ -0,0 +1,229 @@
+"""Per-request accounting of the bytes held by realized raster slices.
+
+:class:`~titiler.openeo.results_cache.EvictingResultsCache` keeps peak memory
+close to the working set, but nothing bounds the working set itself: a wide
+spatial/temporal extent can still realize more arrays than the container can
+hold, and the OOM killer then takes every other in-flight request down with it.
+
+:class:`MemoryBudget` keeps a live tally of the bytes held by every
+``RasterStack`` slice realized during one request (load results and the
+intermediates processes wrap back into stacks alike). When a configurable
+ceiling would be crossed, the slice is refused with :class:`MemoryLimitExceeded`
+and the endpoint releases every stack the request realized, so the request fails
+cleanly with an openEO error instead of the process dying.
+
+Accounting rules:
+
+* **Count arrays, not slices.** The same ``ImageData`` array is often held by
+  several stacks (``filter_keys`` carries its cache over, processes return
+  their input unchanged). Each array is counted once, and only freed from the
+  tally when the last stack holding it drops it. Arrays are matched by a weak
+  reference, not just ``id()``: a freed array's id can be reused by a new one,
+  which must still be charged.
+* **Follow the stack's lifetime.** A stack that is garbage collected without
+  being released gives its bytes back through a ``weakref.finalize`` hook, so
+  throw-away stacks built inside a process never inflate the tally.
+* **Bind at construction.** A stack picks up the budget active when it is
+  created (a ``ContextVar`` set by the endpoint), so slices realized later on
+  worker threads are still charged to the right request.
+"""
+
+import contextlib
+import logging
+import threading
+import weakref
+from contextvars import ContextVar
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+import numpy
+
+from .errors import MemoryLimitExceeded
+from .settings import ProcessingSettings
+
+logger = logging.getLogger(__name__)
+
+processing_settings = ProcessingSettings()
+
+# Response header carrying the request's peak accounted bytes.
+PEAK_MEMORY_HEADER = "X-OpenEO-Peak-Memory"
+
+_current_budget: ContextVar[Optional["MemoryBudget"]] = ContextVar(
+    "titiler_openeo_memory_budget", default=None
+)
+
+
+def image_nbytes(image: Any) -> int:
+    """Return the bytes held by an ``ImageData`` array (data plus mask)."""
+    array = getattr(image, "array", None)
+    if array is None:
+        return 0
+    nbytes = int(numpy.ma.getdata(array).nbytes)
+    mask = numpy.ma.getmask(array)
+    if mask is not numpy.ma.nomask:
+        nbytes += int(mask.nbytes)
+    return nbytes
+
+
+class _ArrayEntry:
+    """Bytes and holder count of one accounted array."""
+
+    __slots__ = ("array_id", "array_ref", "holders", "nbytes")
+
+    def __init__(self, array: Any, nbytes: int):
+        self.array_id = id(array)
+        self.array_ref = weakref.ref(array)
+        self.nbytes = nbytes
+        self.holders = 0
+
+    def holds(self, array: Any) -> bool:
+        """Whether this entry accounts for ``array`` (and not a dead namesake)."""
+        return self.array_ref() is array
+
+
+class MemoryBudget:
+    """Live byte tally for the raster slices realized by one request.
+
+    Args:
+        limit: Ceiling in bytes. ``None`` disables the abort but keeps
+            accounting (so the peak is still reported).
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        """Initialize an empty budget."""
+        self.limit = limit
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        # id(array) -> entry of the live array with that id
+        self._arrays: Dict[int, _ArrayEntry] = {}
+        # id(stack) -> {key: entry}
+        self._holdings: Dict[int, Dict[Any, _ArrayEntry]] = {}
+        # id(stack) -> weak reference, so release_all() can reach live stacks
+        self._stacks: Dict[int, weakref.ref] = {}
+
+    def attach(self, stack: Any) -> None:
+        """Start tracking ``stack``; its bytes are returned when it is collected."""
+        stack_id = id(stack)
+        with self._lock:
+            if stack_id in self._stacks:
+                return
+            self._stacks[stack_id] = weakref.ref(stack)
+            self._holdings[stack_id] = {}
+        weakref.finalize(stack, self._forget, stack_id)
+
+    def track(self, stack: Any, key: Any, image: Any) -> None:
+        """Charge ``image`` to ``stack[key]``.
+
+        Raises:
+            MemoryLimitExceeded: When holding the image would cross the limit.
+                Nothing is charged in that case.
+        """
+        array = getattr(image, "array", None)
+        if array is None:
+            return
+        stack_id = id(stack)
+        with self._lock:
+            holdings = self._holdings.setdefault(stack_id, {})
+            previous = holdings.get(key)
+            if previous is not None and previous.holds(array):
+                return
+
+            entry = self._arrays.get(id(array))
+            if entry is not None and not entry.holds(array):
+                # A dead array with the same id: left to its holders to drop.
+                entry = None
+            added = 0 if entry is not None else image_nbytes(image)
+            if self.limit is not None and added and self.current + added > self.limit:
+                raise MemoryLimitExceeded(self.current + added, self.limit)
+
+            if previous is not None:
+                self._drop(previous)
+
+            if entry is None:
+                entry = _ArrayEntry(array, added)
+                self._arrays[entry.array_id] = entry
+                self.current += added
+                self.peak = max(self.peak, self.current)
+            entry.holders += 1
+            holdings[key] = entry
+
+    def untrack(self, stack: Any, *keys: Any) -> None:
+        """Return the bytes ``stack`` held for ``keys`` (all keys when none given)."""
+        with self._lock:
+            holdings = self._holdings.get(id(stack))
+            if not holdings:
+                return
+            for key in keys or tuple(holdings):
+                entry = holdings.pop(key, None)
+                if entry is not None:
+                    self._drop(entry)
+
+    def release_all(self) -> None:
+        """Release every live stack charged to this budget."""
+        with self._lock:
+            refs = list(self._stacks.values())
+        for ref in refs:
+            stack = ref()
+            if stack is None:
+                continue
+            try:
+                stack.release()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.debug("memory_budget: release() failed: %s", exc)
+
+    def _forget(self, stack_id: int) -> None:
+        with self._lock:
+            self._stacks.pop(stack_id, None)
+            for entry in self._holdings.pop(stack_id, {}).values():
+                self._drop(entry)
+
+    def _drop(self, entry: _ArrayEntry) -> None:
+        # Caller holds self._lock.
+        entry.holders -= 1
+        if entry.holders <= 0:
+            if self._arrays.get(entry.array_id) is entry:
+                del self._arrays[entry.array_id]
+            self.current -= entry.nbytes
+
+
+def get_current_budget() -> Optional[MemoryBudget]:
+    """Return the budget of the request being evaluated, if any."""
+    return _current_budget.get()
+
+
+@contextlib.contextmanager
+def memory_budget(limit: Optional[int] = None) -> Iterator[MemoryBudget]:
+    """Account for raster slices realized inside the block.
+
+    On :class:`MemoryLimitExceeded` every stack realized inside the block is
+    released before the error propagates, so the request frees its cubes right
+    away instead of waiting for the response to be torn down.
+    """
+    budget = MemoryBudget(limit=limit)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+        logger.info("Request peak raster memory: %s bytes", budget.peak)
+    except MemoryLimitExceeded:
+        budget.release_all()
+        logger.warning(
+            "Request aborted: memory limit of %s bytes exceeded (peak %s bytes)",
+            limit,
+            budget.peak,
+        )
+        raise
+    finally:
+        _current_budget.reset(token)
+
+
+def request_memory_budget() -> ContextManager[MemoryBudget]:
+    """:func:`memory_budget` with the configured per-request ceiling.
+
+    See ``ProcessingSettings.max_request_memory``.
+    """
+    return memory_budget(processing_settings.max_request_memory)
+
+
+def peak_memory_headers(budget: MemoryBudget) -> Dict[str, str]:
+    """Response headers reporting ``budget``'s peak."""
+    return {PEAK_MEMORY_HEADER: str(budget.peak)}
@@ -0,0 +1,246 @@
+"""Metatile rendering for XYZ services.
+
+Each XYZ tile used to pay its own STAC search, COG header opens and window
+reads, although neighbouring tiles share most of that work. A service whose
+configuration sets ``metatile`` to N (2 for 2x2, 4 for 4x4) instead evaluates
+its graph once over the N x N block of tiles holding the requested one, with
+the load nodes' ``width``/``height`` set to the block's size in pixels.
+``save_result`` is given each tile's slice of the block and encodes it on
+its own, so the tiles are the ones a per-tile evaluation would have rendered
+on the same pixel grid. The requested tile is returned and its siblings are
+kept in a short-lived in-memory cache, keyed like coalesced requests (see
+`titiler.openeo.coalesce`), for the client's next requests.
+
+Blocks are aligned on multiples of N and clipped to the tile matrix, so
+tiles on the edge of the matrix, and every tile at zooms with fewer than N
+tiles across, belong to smaller blocks. Graphs reading ``tile_x``,
+``tile_y``, ``tile_z`` or a per-request ``_openeo_*`` parameter, and
+services returning something else than an image, are rendered tile by tile.
+"""
+
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import attrs
+import morecantile
+import numpy
+from attrs import define
+from cachetools import TTLCache
+from openeo_pg_parser_networkx.process_registry import Process, ProcessRegistry
+from rio_tiler.models import ImageData
+from starlette.responses import Response
+
+from .coalesce import parameter_references
+from .metrics import METATILE_SIBLING_HITS
+from .processes.implementations.data_model import RasterStack
+from .reader_requirements import _isolated_copy
+from .settings import MetatileSettings
+
+# Parameters whose value differs between the tiles of a block
+TILE_PARAMETERS = frozenset({"tile_x", "tile_y", "tile_z"})
+
+
+@define(frozen=True)
+class Metatile:
+    """A block of tiles of one zoom level, rendered as one image."""
+
+    tms: morecantile.TileMatrixSet
+    z: int
+    x: int
+    y: int
+    cols: int
+    rows: int
+    tilesize: int
+
+    @classmethod
+    def around(
+        cls,
+        tms: morecantile.TileMatrixSet,
+        tile: morecantile.Tile,
+        size: int,
+        tilesize: int,
+    ) -> "Metatile":
+        """The block of at most `size` x `size` tiles holding `tile`."""
+        matrix = tms.matrix(tile.z)
+        x = tile.x - tile.x % size
+        y = tile.y - tile.y % size
+        return cls(
+            tms=tms,
+            z=tile.z,
+            x=x,
+            y=y,
+            cols=max(1, min(size, matrix.matrixWidth - x)),
+            rows=max(1, min(size, matrix.matrixHeight - y)),
+            tilesize=tilesize,
+        )
+
+    @property
+    def tiles(self) -> List[morecantile.Tile]:
+        """The block's tiles, row by row."""
+        return [
+            morecantile.Tile(x=self.x + col, y=self.y + row, z=self.z)
+            for row in range(self.rows)
+            for col in range(self.cols)
+        ]
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """The block's (west, south, east, north) in the TMS CRS."""
+        first = self.tms.xy_bounds(morecantile.Tile(x=self.x, y=self.y, z=self.z))
+        last = self.tms.xy_bounds(
+            morecantile.Tile(
+                x=self.x + self.cols - 1, y=self.y + self.rows - 1, z=self.z
+            )
+        )
+        return (
+            min(first.left, last.left),
+            min(first.bottom, last.bottom),
+            max(first.right, last.right),
+            max(first.top, last.top),
+        )
+
+    @property
+    def width(self) -> int:
+        """The block's width in pixels."""
+        return self.cols * self.tilesize
+
+    @property
+    def height(self) -> int:
+        """The block's height in pixels."""
+        return self.rows * self.tilesize
+
+    def windows(
+        self, width: int, height: int
+    ) -> Iterator[Tuple[morecantile.Tile, slice, slice]]:
+        """Each tile with its rows and columns in a `width` x `height` image
+        of the block."""
+        west, _, _, north = self.bounds
+        tile_width = width // self.cols
+        tile_height = height // self.rows
+        for tile in self.tiles:
+            bounds = self.tms.xy_bounds(tile)
+            col = round((bounds.left - west) / (bounds.right - bounds.left))
+            row = round((north - bounds.top) / (bounds.top - bounds.bottom))
+            yield (
+                tile,
+                slice(row * tile_height, (row + 1) * tile_height),
+                slice(col * tile_width, (col + 1) * tile_width),
+            )
+
+
+def metatile_size(
+    configuration: Dict[str, Any], process: Dict[str, Any], media_type: str
+) -> int:
+    """Tiles across the blocks a service is rendered in; 1 for tile by tile."""
+    size = int(configuration.get("metatile") or 1)
+    if size <= 1 or not media_type.startswith("image/"):
+        return 1
+    for name in parameter_references(process):
+        if name in TILE_PARAMETERS or name.startswith("_openeo_"):
+            return 1
+    return size
+
+
+def split_registry(registry: ProcessRegistry, metatile: Metatile) -> ProcessRegistry:
+    """A copy of `registry` whose ``save_result`` encodes each tile of
+    `metatile` on its own, returning them by tile."""
+    original = registry["save_result"].implementation
+
+    def split_save_result(data, format, options=None):
+        width, height = _shape(data)
+        if width % metatile.cols or height % metatile.rows:
+            raise ValueError(
+                f"Cannot split a {width}x{height} result into "
+                f"{metatile.cols}x{metatile.rows} tiles"
+            )
+        return {
+            tile: original(data=_crop(data, rows, cols), format=format, options=options)
+            for tile, rows, cols in metatile.windows(width, height)
+        }
+
+    per_request = _isolated_copy(registry)
+    per_request["save_result"] = Process(
+        spec=registry["save_result"].spec,
+        implementation=split_save_result,
+    )
+    return per_request
+
+
+def _shape(data: Any) -> Tuple[int, int]:
+    """Width and height of an image result."""
+    if isinstance(data, RasterStack):
+        data = data.first
+    if isinstance(data, ImageData):
+        return data.width, data.height
+    if isinstance(data, numpy.ndarray):
+        return data.shape[-1], data.shape[-2]
+    raise TypeError(f"Cannot split a {type(data).__name__} result into tiles")
+
+
+def _crop(data: Any, rows: slice, cols: slice) -> Any:
+    """The `rows` x `cols` window of an image result."""
+    if isinstance(data, RasterStack):
+        return RasterStack.from_images(
+            {key: _crop(image, rows, cols) for key, image in data.items()}
+        )
+    if isinstance(data, numpy.ndarray):
+        return data[..., rows, cols]
+
+    image: ImageData = data
+    west, south, east, north = image.bounds
+    x_res = (east - west) / image.width
+    y_res = (north - south) / image.height
+    return attrs.evolve(
+        image,
+        array=image.array[:, rows, cols],
+        bounds=(
+            west + cols.start * x_res,
+            north - rows.stop * y_res,
+            west + cols.stop * x_res,
+            north - rows.start * y_res,
+        ),
+        cutline_mask=(
+            image.cutline_mask[rows, cols] if image.cutline_mask is not None else None
+        ),
+        alpha_mask=(
+            image.alpha_mask[rows, cols] if image.alpha_mask is not None else None
+        ),
+    )
+
+
+@define
+class SiblingCache:
+    """Rendered tiles of a block, kept for the requests that follow."""
+
+    _cache: TTLCache = attrs.field(init=False)
+    _lock: threading.Lock = attrs.field(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        """Size the cache from the settings."""
+        settings = MetatileSettings()
+        self._cache = TTLCache(
+            maxsize=max(settings.cache_maxsize, 1), ttl=settings.cache_ttl
+        )
+
+    def get(self, key: str) -> Optional[Response]:
+        """The cached tile for `key`."""
+        with self._lock:
+            response = self._cache.get(key)
+        if response is not None:
+            METATILE_SIBLING_HITS.inc()
+        return response
+
+    def put(self, responses: Dict[str, Response]) -> None:
+        """Keep rendered tiles by key."""
+        if not MetatileSettings().cache_maxsize:
+            return
+        with self._lock:
+            self._cache.update(responses)
+
+    def clear(self) -> None:
+        """Drop every cached tile."""
+        with self._lock:
+            self._cache.clear()
+
+
+siblings = SiblingCache()
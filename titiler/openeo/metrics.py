@@ -0,0 +1,227 @@
+"""Prometheus metrics for the processing hot paths.
+
+Exposed on ``GET /metrics`` when the optional ``prometheus-client`` dependency is
+installed (``pip install titiler-openeo[metrics]``). Without it, every metric
+below is a no-op, so call sites never need to check.
+
+Hot-path metrics are recorded where the work happens:
+
+* ``titiler_openeo_stac_search_seconds``: STAC API item search latency.
+* ``titiler_openeo_asset_read_seconds`` / ``titiler_openeo_asset_read_bytes``:
+  per-asset ``part()`` read latency and decoded array size.
+* ``titiler_openeo_mosaic_items_read``: items actually read per date group by
+  ``load_collection``'s mosaic (after first-method early termination).
+* ``titiler_openeo_graph_planning_seconds``: process graph parsing, reader
+  requirement planning and compilation.
+* ``titiler_openeo_save_result_encode_seconds``: ``save_result`` encoding.
+* ``titiler_openeo_requests_coalesced_total``: tile and ``/result`` requests
+  answered by an identical concurrent request (``coalesce.py``).
+* ``titiler_openeo_metatile_sibling_hits_total``: XYZ tiles served from a
+  metatile rendered for a neighbouring tile (``metatile.py``).
+
+Cache and ``RasterStack`` state is read at scrape time instead, so it costs
+nothing per request:
+
+* ``titiler_openeo_cache_hits_total`` / ``_misses_total`` / ``_entries``, per
+  cache: STAC ``collections``/``collection`` and the SAR ``calibration``,
+  ``noise`` and ``gcps`` LRUs.
+* ``titiler_openeo_rasterstack_slices_resident``: realized slices currently
+  held by live stacks.
+* ``titiler_openeo_rasterstack_slices_evicted_total``: slices dropped by
+  ``RasterStack.release()`` (results-cache eviction, streaming, aborts).
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import APIRouter, FastAPI
+from starlette.responses import Response
+
+try:
+    import prometheus_client
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # pragma: nocover
+    prometheus_client = None  # type: ignore
+    CounterMetricFamily = None  # type: ignore
+    GaugeMetricFamily = None  # type: ignore
+
+
+class _NoopTimer:
+    """Stand-in for ``Histogram.time()`` without prometheus-client."""
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def __call__(self, f: Callable) -> Callable:
+        return f
+
+
+class _NoopMetric:
+    """Stand-in for a prometheus-client metric without prometheus-client."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        return None
+
+    def inc(self, amount: float = 1) -> None:
+        return None
+
+    def time(self) -> _NoopTimer:
+        return _NoopTimer()
+
+
+def _histogram(name: str, documentation: str, buckets: Iterable[float]) -> Any:
+    if prometheus_client is None:
+        return _NoopMetric()
+    return prometheus_client.Histogram(name, documentation, buckets=tuple(buckets))
+
+
+def _counter(name: str, documentation: str) -> Any:
+    if prometheus_client is None:
+        return _NoopMetric()
+    return prometheus_client.Counter(name, documentation)
+
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAC_SEARCH_SECONDS = _histogram(
+    "titiler_openeo_stac_search_seconds",
+    "STAC API item search latency.",
+    _LATENCY_BUCKETS,
+)
+ASSET_READ_SECONDS = _histogram(
+    "titiler_openeo_asset_read_seconds",
+    "Per-asset part() read latency.",
+    _LATENCY_BUCKETS,
+)
+ASSET_READ_BYTES = _histogram(
+    "titiler_openeo_asset_read_bytes",
+    "Decoded size of each per-asset part() read.",
+    (2**16, 2**18, 2**20, 2**22, 2**24, 2**26, 2**28),
+)
+MOSAIC_ITEMS_READ = _histogram(
+    "titiler_openeo_mosaic_items_read",
+    "STAC items read to build one date group's mosaic.",
+    (1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+GRAPH_PLANNING_SECONDS = _histogram(
+    "titiler_openeo_graph_planning_seconds",
+    "Process graph parsing, requirement planning and compilation time.",
+    _LATENCY_BUCKETS,
+)
+SAVE_RESULT_ENCODE_SECONDS = _histogram(
+    "titiler_openeo_save_result_encode_seconds",
+    "save_result encoding time.",
+    _LATENCY_BUCKETS,
+)
+SLICES_EVICTED = _counter(
+    "titiler_openeo_rasterstack_slices_evicted",
+    "RasterStack slices dropped by release().",
+)
+REQUESTS_COALESCED = _counter(
+    "titiler_openeo_requests_coalesced",
+    "Tile and /result requests answered by an identical request's evaluation.",
+)
+METATILE_SIBLING_HITS = _counter(
+    "titiler_openeo_metatile_sibling_hits",
+    "XYZ tiles served from a metatile rendered for a neighbouring tile.",
+)
+
+# Live stacks, for the resident-slices gauge. Keyed by id() because RasterStack
+# is a dict subclass (unhashable); entries vanish with their stack.
+_live_stacks: "weakref.WeakValueDictionary[int, Any]" = weakref.WeakValueDictionary()
+_live_stacks_lock = threading.Lock()
+
+
+def track_raster_stack(stack: Any) -> None:
+    """Count ``stack``'s realized slices in the resident-slices gauge."""
+    if prometheus_client is None:
+        return
+    with _live_stacks_lock:
+        _live_stacks[id(stack)] = stack
+
+
+def _cached_functions() -> Dict[str, Any]:
+    """The ``cachetools.cached(info=True)`` functions reported per cache."""
+    from .sar import annotation, geocode
+    from .stacapi import stacApiBackend
+
+    return {
+        "collections": stacApiBackend.get_collections,
+        "collection": stacApiBackend.get_collection,
+        "sar_calibration": annotation.get_calibration,
+        "sar_noise": annotation.get_noise,
+        "sar_gcps": geocode.get_gcps,
+        "sar_inverse_maps": geocode._cached_inverse_map,
+    }
+
+
+class _StateCollector:
+    """Report cache statistics and resident slices at scrape time."""
+
+    def describe(self) -> Iterable[Any]:
+        # Without `describe`, registering would run `collect` at import time,
+        # before the cached functions' modules are importable.
+        return self._families()
+
+    def collect(self) -> Iterable[Any]:
+        hits, misses, entries, resident = self._families()
+        for name, func in _cached_functions().items():
+            info = func.cache_info()
+            hits.add_metric([name], info.hits)
+            misses.add_metric([name], info.misses)
+            entries.add_metric([name], info.currsize)
+
+        with _live_stacks_lock:
+            stacks = list(_live_stacks.values())
+        resident.add_metric([], sum(len(stack._data_cache) for stack in stacks))
+        return [hits, misses, entries, resident]
+
+    @staticmethod
+    def _families() -> List[Any]:
+        return [
+            CounterMetricFamily(
+                "titiler_openeo_cache_hits", "Cache hits.", labels=["cache"]
+            ),
+            CounterMetricFamily(
+                "titiler_openeo_cache_misses", "Cache misses.", labels=["cache"]
+            ),
+            GaugeMetricFamily(
+                "titiler_openeo_cache_entries", "Cached entries.", labels=["cache"]
+            ),
+            GaugeMetricFamily(
+                "titiler_openeo_rasterstack_slices_resident",
+                "Realized slices held by live RasterStacks.",
+                labels=[],
+            ),
+        ]
+
+
+_collector: Optional[_StateCollector] = None
+if prometheus_client is not None:
+    _collector = _StateCollector()
+    prometheus_client.REGISTRY.register(_collector)
+
+
+def register_metrics_endpoint(app: FastAPI) -> None:
+    """Register ``GET /metrics`` (Prometheus text format)."""
+    assert (
+        prometheus_client
+    ), "`prometheus-client` module must be installed to expose /metrics"
+
+    router = APIRouter(tags=["metrics"], include_in_schema=False)
+
+    @router.get("/metrics")
+    def metrics() -> Response:
+        return Response(
+            prometheus_client.generate_latest(prometheus_client.REGISTRY),
+            media_type=prometheus_client.CONTENT_TYPE_LATEST,
+        )
+
+    app.include_router(router)
@@ -40,6 +40,7 @@ from openeo_pg_parser_networkx.pg_schema import (
 from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from ...errors import ProcessParameterInvalid, ProcessParameterRequired
+from ...profiling import get_current_profile
 from .data_model import RasterStack
 
 # Union of all GeoJSON types for validation
@@ -594,6 +595,10 @@ def process(f):
     The decorator is idempotent - nested @process calls won't re-resolve already-resolved values.
     """
 
+    # The openEO process id, as ProcessRegistry derives it from the name
+    # (`and_` -> `and`).
+    process_id = f.__name__.strip("_")
+
     @wraps(f)
     def wrapper(
         *args,
@@ -637,6 +642,10 @@ def process(f):
 
         logger.debug(f"Running {f.__name__} with: {list(resolved_kwargs.keys())}")
 
-        return f(**resolved_kwargs)
+        profile = get_current_profile()
+        if profile is None:
+            return f(**resolved_kwargs)
+        with profile.node(process_id):
+            return f(**resolved_kwargs)
 
     return wrapper
@@ -1,8 +1,9 @@
 """TiTiler.openeo data models."""
 
+import contextvars
 import logging
 import threading
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import (
@@ -30,6 +31,10 @@ from rio_tiler.models import ImageData
 from rio_tiler.tasks import TaskType, filter_tasks
 from rio_tiler.types import BBox
 
+from ...errors import MemoryLimitExceeded
+from ...memory_budget import get_current_budget
+from ...metrics import SLICES_EVICTED, track_raster_stack
+
 # https://openeo.org/documentation/1.0/developers/backends/performance.html#datacube-processing
 # Here it is important to note that openEO does not enforce or define how the datacube should look like on the backend.
 # The datacube can be a set of files, or arrays in memory distributed over a cluster.
@@ -357,6 +362,14 @@ class RasterStack(Dict[datetime, ImageData]):
         # ImageRef instances for deferred cutline computation
         self._image_refs: Dict[datetime, ImageRef] = {}
 
+        # Per-request byte accounting of realized slices (see
+        # titiler.openeo.memory_budget). Bound here so slices realized later on
+        # worker threads are still charged to the request that built the stack.
+        self._budget = get_current_budget()
+        if self._budget is not None:
+            self._budget.attach(self)
+        track_raster_stack(self)
+
         self._compute_metadata()
 
     @property
@@ -511,27 +524,41 @@ class RasterStack(Dict[datetime, ImageData]):
         # Execute tasks concurrently
         with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
             # Submit all tasks
-            key_to_future = {
-                key: executor.submit(self._execute_task, key, task_func)
+            # Run each task in a copy of the caller's context, so per-request
+            # state (profiling, see titiler.openeo.profiling) follows the work.
+            future_to_key = {
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._execute_task,
+                    key,
+                    task_func,
+                ): key
                 for key, (task_func, _asset) in key_task_pairs
             }
 
             # Collect results as they complete
-            for key, future in key_to_future.items():
-                try:
-                    data = future.result()
-                    with self._cache_lock:
-                        self._data_cache[key] = data
-                except self._allowed_exceptions as e:
-                    # Log task failures for visibility in production scenarios
-                    logging.warning(
-                        "Task execution failed for key '%s' during concurrent execution: %s. "
-                        "This item will be skipped, which may result in incomplete data.",
-                        key,
-                        str(e),
-                    )
-                    # Skip failed tasks, don't cache them
-                    continue
+            try:
+                for future in as_completed(future_to_key):
+                    key = future_to_key[future]
+                    try:
+                        data = future.result()
+                        self._cache_store(key, data)
+                    except self._allowed_exceptions as e:
+                        # Log task failures for visibility in production scenarios
+                        logging.warning(
+                            "Task execution failed for key '%s' during concurrent execution: %s. "
+                            "This item will be skipped, which may result in incomplete data.",
+                            key,
+                            str(e),
+                        )
+                        # Skip failed tasks, don't cache them
+                        continue
+            except MemoryLimitExceeded:
+                # Leaving the executor waits for every submitted task: cancel
+                # the ones not started yet so no further slices are read.
+                for future in future_to_key:
+                    future.cancel()
+                raise
 
     def _execute_all_tasks(self) -> None:
         """Execute all tasks and populate the cache (for backward compatibility)."""
@@ -539,8 +566,19 @@ class RasterStack(Dict[datetime, ImageData]):
             self._tasks, allowed_exceptions=self._allowed_exceptions
         ):
             timestamp = self._timestamp_fn(asset)
-            with self._cache_lock:
-                self._data_cache[timestamp] = data
+            self._cache_store(timestamp, data)
+
+    def _cache_store(self, key: datetime, data: ImageData) -> None:
+        """Cache a realized slice, charging it to the request's memory budget.
+
+        Raises:
+            MemoryLimitExceeded: When the slice would push the request past its
+                memory limit. The slice is not cached in that case.
+        """
+        if self._budget is not None:
+            self._budget.track(self, key, data)
+        with self._cache_lock:
+            self._data_cache[key] = data
 
     def timestamps(self) -> List[datetime]:
         """Return list of timestamps in the stack (keys are timestamps)."""
@@ -589,8 +627,7 @@ class RasterStack(Dict[datetime, ImageData]):
 
         try:
             data = self._execute_task(key, task_func)
-            with self._cache_lock:
-                self._data_cache[key] = data
+            self._cache_store(key, data)
             return data
         except self._allowed_exceptions as err:
             raise KeyError(f"Task execution failed for key '{key}'") from err
@@ -711,12 +748,18 @@ class RasterStack(Dict[datetime, ImageData]):
             keys: Keys to evict. If none are given, all cached slices are evicted.
         """
         target = keys if keys else tuple(self._keys)
+        evicted = 0
         with self._cache_lock:
             for key in target:
-                self._data_cache.pop(key, None)
+                if self._data_cache.pop(key, None) is not None:
+                    evicted += 1
                 ref = self._image_refs.get(key)
                 if ref is not None:
                     ref._image = None
+        if evicted:
+            SLICES_EVICTED.inc(evicted)
+        if self._budget is not None:
+            self._budget.untrack(self, *target)
 
     def clear(self) -> None:
         """Evict all realized slices. See :meth:`release`."""
@@ -762,7 +805,8 @@ class RasterStack(Dict[datetime, ImageData]):
                 k: self._data_cache[k] for k in ordered_keys if k in self._data_cache
             }
         if preserved:
-            instance._data_cache.update(preserved)
+            for k, img in preserved.items():
+                instance._cache_store(k, img)
 
             # Cache the already-computed image directly on each ImageRef (same as
             # from_images), instead of wrapping it in a task closure. Storing it on
@@ -933,7 +977,8 @@ class RasterStack(Dict[datetime, ImageData]):
         )
 
         # Pre-populate the cache with the provided images
-        instance._data_cache = dict(images)
+        for dt, img in images.items():
+            instance._cache_store(dt, img)
 
         # Replace the lazy ImageRefs with eager ones (already realized)
         instance._image_refs = {
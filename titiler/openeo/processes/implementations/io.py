@@ -13,7 +13,9 @@ from rio_tiler.io import COGReader
 from rio_tiler.models import ImageData
 from rio_tiler.tasks import create_tasks
 
-from ...reader import _reader
+from ...capture import open_dataset
+from ...metrics import SAVE_RESULT_ENCODE_SECONDS
+from ...reader import _reader, bind_context
 from .data_model import RasterStack
 
 __all__ = ["save_result", "SaveResultData", "load_url"]
@@ -49,7 +51,7 @@ def load_url(
     }
 
     # Get metadata from COG to set bbox, dimensions, and CRS
-    with COGReader(url) as cog:
+    with open_dataset(url) as dataset, COGReader(url, dataset=dataset) as cog:
         item["bbox"] = [float(x) for x in cog.bounds]
         cog_width = cog.dataset.width
         cog_height = cog.dataset.height
@@ -58,7 +60,7 @@ def load_url(
 
     # Create the tasks
     tasks = create_tasks(
-        _reader,
+        bind_context(_reader),
         [item],
         MAX_THREADS,
         item["bbox"],
@@ -163,6 +165,7 @@ def _save_feature_collection(data: Dict, format: str) -> SaveResultData:
     )
 
 
+@SAVE_RESULT_ENCODE_SECONDS.time()
 def _save_single_result(
     data: Union[ImageData, numpy.ndarray, numpy.ma.MaskedArray, dict],
     format: str,
@@ -22,10 +22,13 @@ from ...errors import (
 )
 from ...reader_requirements import Requirement, register_requirement_provider
 from ...sar import calibration
+from ...settings import SARSettings
 from .data_model import RasterStack
 
 __all__ = ["sar_backscatter"]
 
+_settings = SARSettings()
+
 #: Rejected explicitly per ADR S7.4 -- Phase 1 is ellipsoid-only.
 _UNSUPPORTED_COEFFICIENTS = {"sigma0-terrain", "gamma0-terrain"}
 
@@ -219,6 +222,7 @@ def sar_backscatter(
     # slice, since it depends only on the stack's declared band names.
     band_index = {name: idx for idx, name in enumerate(data.band_names)}
     suffix = _COEFFICIENT_BAND_SUFFIX.get(coefficient) if coefficient else None
+    dtype = "f4" if _settings.float32_calibration else "f8"
 
     new_band_names = list(polarisations)
     if ellipsoid_incidence_angle:
@@ -252,7 +256,7 @@ def sar_backscatter(
                 else None
             )
 
-            result = calibration.calibrate(dn, a=a, eta=eta)
+            result = calibration.calibrate(dn, a=a, eta=eta, dtype=dtype)
 
             pol_invalid = ~result.valid_mask | data_mask[idx]
             combined_invalid = (
@@ -260,7 +264,7 @@ def sar_backscatter(
                 if combined_invalid is None
                 else combined_invalid | pol_invalid
             )
-            band_values.append(result.value.astype("float32"))
+            band_values.append(result.value.astype("float32", copy=False))
 
             if ellipsoid_incidence_angle and incidence_angle is None:
                 incidence_angle = _band(
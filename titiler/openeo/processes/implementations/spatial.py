@@ -12,6 +12,7 @@ from rasterio.warp import calculate_default_transform
 from rasterio.warp import reproject as rio_reproject
 from rio_tiler.utils import resize_array
 
+from ...profiling import IO_WARP, profile_io
 from .data_model import ImageData, RasterStack, compute_cutline_mask
 
 __all__ = [
@@ -71,30 +72,31 @@ def _warp_image_to_grid(
     out_crs = RioCRS.from_user_input(dst_crs)
     src_transform = transform_from_bounds(*img.bounds, img.width, img.height)
 
-    dst_data = numpy.zeros((bands, dst_height, dst_width), dtype=dtype)
-    rio_reproject(
-        numpy.ascontiguousarray(src.data),
-        dst_data,
-        src_transform=src_transform,
-        src_crs=src_crs,
-        dst_transform=dst_transform,
-        dst_crs=out_crs,
-        resampling=resampling,
-    )
+    with profile_io(IO_WARP):
+        dst_data = numpy.zeros((bands, dst_height, dst_width), dtype=dtype)
+        rio_reproject(
+            numpy.ascontiguousarray(src.data),
+            dst_data,
+            src_transform=src_transform,
+            src_crs=src_crs,
+            dst_transform=dst_transform,
+            dst_crs=out_crs,
+            resampling=resampling,
+        )
 
-    src_mask = numpy.ma.getmaskarray(src).astype("uint8")
-    dst_mask = numpy.ones((bands, dst_height, dst_width), dtype="uint8")
-    rio_reproject(
-        numpy.ascontiguousarray(src_mask),
-        dst_mask,
-        src_transform=src_transform,
-        src_crs=src_crs,
-        dst_transform=dst_transform,
-        dst_crs=out_crs,
-        resampling=Resampling.nearest,
-        src_nodata=1,
-        dst_nodata=1,
-    )
+        src_mask = numpy.ma.getmaskarray(src).astype("uint8")
+        dst_mask = numpy.ones((bands, dst_height, dst_width), dtype="uint8")
+        rio_reproject(
+            numpy.ascontiguousarray(src_mask),
+            dst_mask,
+            src_transform=src_transform,
+            src_crs=src_crs,
+            dst_transform=dst_transform,
+            dst_crs=out_crs,
+            resampling=Resampling.nearest,
+            src_nodata=1,
+            dst_nodata=1,
+        )
 
     out = numpy.ma.masked_array(dst_data, mask=dst_mask.astype(bool))
     west, south, east, north = array_bounds(dst_height, dst_width, dst_transform)
@@ -7,7 +7,7 @@ from rio_tiler.models import ImageData
 from ...services.base import TileAssignmentStore, TileNotAssignedError
 from .core import process
 
-__all__ = ["tile_assignment", "tiles_summary"]
+__all__ = ["tile_assignment", "tiles_summary", "tiles_counts"]
 
 
 @process
@@ -80,16 +80,47 @@ def tile_assignment(
 def tiles_summary(
     store: TileAssignmentStore,
     service_id: str,
+    stage: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> List[Dict[str, Any]]:
     """Get a summary of all tiles information.
 
     Args:
         store: Tile assignment store instance
         service_id: Current service ID
+        stage: Only list tiles in this stage
+        fields: Only include these tile fields, default all
+        limit: Maximum number of tiles to return, default all
+        offset: Number of tiles to skip
 
     Returns:
-        Dict containing information about all tiles including:
-        - claimed: Dict[str, Dict] mapping user_ids to their assigned tile info
-        - submitted: List[Dict] of submitted tiles with their metadata
+        List of the service's tiles, in assignment order, with their x, y, z
+        coordinates, stage, user_id and data
     """
-    return store.get_all_tiles(service_id)
+    if stage is None and fields is None and limit is None and not offset:
+        return store.get_all_tiles(service_id)
+    return store.list_tiles(
+        service_id, stage=stage, fields=fields, limit=limit, offset=offset
+    )
+
+
+@process
+def tiles_counts(
+    store: TileAssignmentStore,
+    service_id: str,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Count the tiles of a service by stage.
+
+    Args:
+        store: Tile assignment store instance
+        service_id: Current service ID
+        user_id: Only count this user's tiles
+
+    Returns:
+        Dict with the tile count per stage ("stages"), their "total", and the
+        number of tiles with data ("with_data")
+    """
+    return store.get_tiles_summary(service_id, user_id=user_id)
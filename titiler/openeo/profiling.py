@@ -0,0 +1,326 @@
+"""Opt-in per-request profiling of process graph evaluation.
+
+When ``TITILER_OPENEO_PROFILING_ENABLED`` is set, every ``/result`` and XYZ
+tile request records, per process id:
+
+* wall time (inclusive, and *self* time excluding nested process calls),
+* CPU time of the evaluating thread,
+* bytes allocated (net, via ``tracemalloc``; only with
+  ``TITILER_OPENEO_PROFILING_TRACK_ALLOCATIONS``),
+
+plus the wall time spent in I/O and data movement, split into:
+
+* ``stac_search``: STAC API item searches,
+* ``cog_read``: asset reads. This includes the reprojection rio-tiler performs
+  while reading (a ``WarpedVRT`` onto the requested grid), which cannot be
+  separated from the read itself,
+* ``warp``: explicit reprojection of realized arrays (``resample_spatial``,
+  ``resample_cube_spatial``),
+* ``sar_geocode``: building the SAR GCP/TPS destination-to-source inverse map.
+
+The timings are returned as ``Server-Timing`` response headers (shown by the
+browser devtools) and the full trace is kept in a small in-memory cache,
+retrievable as JSON from ``GET /debug/traces/{trace_id}`` (the id is returned in
+the ``X-OpenEO-Trace-Id`` header). ``scripts/debug_graph.py --render-trace``
+prints it as a table.
+
+Processes are recorded by process id, not graph node id: the graph engine does
+not tell a process implementation which node it runs for. Several nodes using
+the same process are aggregated (see the ``calls`` column).
+
+``RasterStack`` is lazy, so most reading happens when a downstream process (often
+``save_result``) realizes the slices; that I/O is attributed to the process that
+triggered it, and is visible regardless in the I/O breakdown.
+"""
+
+import contextlib
+import threading
+import time
+import tracemalloc
+import uuid
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from cachetools import LRUCache
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+
+from .settings import ProfilingSettings
+
+if TYPE_CHECKING:
+    from .auth import Auth
+
+# I/O categories recorded with `profile_io`.
+IO_STAC_SEARCH = "stac_search"
+IO_COG_READ = "cog_read"
+IO_WARP = "warp"
+IO_SAR_GEOCODE = "sar_geocode"
+
+TRACE_ID_HEADER = "X-OpenEO-Trace-Id"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "titiler_openeo_profile", default=None
+)
+
+_settings = ProfilingSettings()
+_traces: LRUCache = LRUCache(maxsize=_settings.trace_cache_maxsize)
+_traces_lock = threading.Lock()
+
+# tracemalloc is process-global: reference-count the requests that need it so
+# one finishing request does not stop tracing under another.
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+_tracemalloc_lock = threading.Lock()
+
+
+class RequestProfile:
+    """Timings recorded while evaluating one request's process graph."""
+
+    def __init__(self, track_allocations: bool = False, user_id: Optional[str] = None):
+        """Initialize an empty profile."""
+        self.trace_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.track_allocations = track_allocations
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, Dict[str, float]] = {}
+        self._io: Dict[str, Dict[str, float]] = {}
+        # Per-thread stack of child wall-time accumulators, for self time.
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def node(self, process_id: str) -> Iterator[None]:
+        """Time one call of ``process_id``."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+
+        alloc_start = self._traced_bytes()
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            alloc = self._traced_bytes() - alloc_start
+            children = stack.pop()
+            if stack:
+                stack[-1] += wall
+
+            with self._lock:
+                entry = self._nodes.setdefault(
+                    process_id,
+                    {"calls": 0, "wall": 0.0, "self": 0.0, "cpu": 0.0, "alloc": 0},
+                )
+                entry["calls"] += 1
+                entry["wall"] += wall
+                entry["self"] += max(wall - children, 0.0)
+                entry["cpu"] += cpu
+                entry["alloc"] += alloc
+
+    def add_io(self, category: str, seconds: float) -> None:
+        """Add ``seconds`` of wall time to the ``category`` I/O bucket."""
+        with self._lock:
+            entry = self._io.setdefault(category, {"calls": 0, "wall": 0.0})
+            entry["calls"] += 1
+            entry["wall"] += seconds
+
+    def finish(self) -> None:
+        """Freeze the total request time."""
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Render the profile as a ``Server-Timing`` header value."""
+        with self._lock:
+            nodes = sorted(self._nodes.items(), key=lambda kv: -kv[1]["wall"])
+            io = sorted(self._io.items())
+        metrics = [
+            f'{name};dur={entry["wall"] * 1000:.1f};desc="calls={entry["calls"]}"'
+            for name, entry in nodes
+        ]
+        metrics += [
+            f'io_{name};dur={entry["wall"] * 1000:.1f};desc="calls={entry["calls"]}"'
+            for name, entry in io
+        ]
+        metrics.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON trace."""
+        with self._lock:
+            nodes: List[Dict[str, Any]] = [
+                {
+                    "process_id": name,
+                    "calls": int(entry["calls"]),
+                    "wall_ms": round(entry["wall"] * 1000, 3),
+                    "self_ms": round(entry["self"] * 1000, 3),
+                    "cpu_ms": round(entry["cpu"] * 1000, 3),
+                    "alloc_bytes": int(entry["alloc"])
+                    if self.track_allocations
+                    else None,
+                }
+                for name, entry in self._nodes.items()
+            ]
+            io = {
+                name: {
+                    "calls": int(entry["calls"]),
+                    "wall_ms": round(entry["wall"] * 1000, 3),
+                }
+                for name, entry in self._io.items()
+            }
+        nodes.sort(key=lambda node: -node["wall_ms"])
+        return {
+            "trace_id": self.trace_id,
+            "user_id": self.user_id,
+            "total_ms": round(self.total * 1000, 3),
+            "nodes": nodes,
+            "io": io,
+        }
+
+    def _traced_bytes(self) -> int:
+        if not self.track_allocations:
+            return 0
+        return tracemalloc.get_traced_memory()[0]
+
+
+def get_current_profile() -> Optional[RequestProfile]:
+    """Return the profile of the request being evaluated, if profiling is on."""
+    return _current_profile.get()
+
+
+@contextlib.contextmanager
+def profile_io(category: str) -> Iterator[None]:
+    """Charge the wall time of the block to an I/O ``category``.
+
+    Categories are exclusive: time spent in a nested ``profile_io`` block (e.g.
+    a SAR warp inside a COG read) is charged to the inner category only.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    stack = getattr(profile._local, "io_stack", None)
+    if stack is None:
+        stack = profile._local.io_stack = []
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        profile.add_io(category, max(elapsed - nested, 0.0))
+
+
+@contextlib.contextmanager
+def request_profile(
+    enabled: Optional[bool] = None,
+    user_id: Optional[str] = None,
+) -> Iterator[Optional[RequestProfile]]:
+    """Profile the graph evaluation inside the block, when profiling is enabled.
+
+    Yields ``None`` when ``ProfilingSettings.enabled`` is off, so callers can
+    unconditionally pass the result to :func:`profiling_headers`. ``enabled``
+    overrides the setting (used by ``scripts/debug_graph.py --profile``).
+    ``user_id`` owns the trace: only that user can read it back (see
+    :func:`register_profiling_endpoints`).
+    """
+    if not (_settings.enabled if enabled is None else enabled):
+        yield None
+        return
+
+    profile = RequestProfile(
+        track_allocations=_settings.track_allocations, user_id=user_id
+    )
+    if profile.track_allocations:
+        _start_tracemalloc()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        if profile.track_allocations:
+            _stop_tracemalloc()
+        profile.finish()
+        with _traces_lock:
+            _traces[profile.trace_id] = profile.to_dict()
+
+
+def profiling_headers(profile: Optional[RequestProfile]) -> Dict[str, str]:
+    """Response headers for ``profile`` (none when profiling is off)."""
+    if profile is None:
+        return {}
+    return {
+        "Server-Timing": profile.server_timing(),
+        TRACE_ID_HEADER: profile.trace_id,
+    }
+
+
+def get_trace(trace_id: str) -> Optional[Dict[str, Any]]:
+    """Return a recorded trace by id, if still cached."""
+    with _traces_lock:
+        return _traces.get(trace_id)
+
+
+def register_profiling_endpoints(app: FastAPI, auth: "Auth") -> None:
+    """Register ``GET /debug/traces/{trace_id}``, behind ``auth``.
+
+    A trace is only returned to the user whose request recorded it. Traces of
+    anonymous requests (public XYZ services) are readable by any authenticated
+    user.
+    """
+    router = APIRouter(tags=["debug"], include_in_schema=False)
+
+    @router.get("/debug/traces/{trace_id}")
+    def debug_trace(trace_id: str, user=Depends(auth.validate)) -> Dict[str, Any]:
+        trace = get_trace(trace_id)
+        if trace is None or trace.get("user_id") not in (None, user.user_id):
+            raise HTTPException(404, f"Could not find trace: {trace_id}")
+        return trace
+
+    app.include_router(router)
+
+
+def render_trace(trace: Dict[str, Any]) -> str:
+    """Render a JSON trace as a plain-text table, slowest process first."""
+    lines = [
+        f"trace {trace.get('trace_id', '?')}: total {trace.get('total_ms', 0):.1f} ms",
+        f"{'process':<28}{'calls':>7}{'wall ms':>11}{'self ms':>11}"
+        f"{'cpu ms':>11}{'alloc MB':>11}",
+    ]
+    for node in trace.get("nodes", []):
+        alloc = node.get("alloc_bytes")
+        alloc_str = f"{alloc / 1e6:.1f}" if alloc is not None else "-"
+        lines.append(
+            f"{node['process_id']:<28}{node['calls']:>7}{node['wall_ms']:>11.1f}"
+            f"{node['self_ms']:>11.1f}{node['cpu_ms']:>11.1f}{alloc_str:>11}"
+        )
+    io = trace.get("io") or {}
+    if io:
+        lines.append("I/O:")
+        for name, entry in sorted(io.items()):
+            lines.append(f"  {name:<26}{entry['calls']:>7}{entry['wall_ms']:>11.1f}")
+    return "\n".join(lines)
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        # Leave tracing alone if someone else (e.g. a test harness) started it.
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
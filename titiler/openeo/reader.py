@@ -1,10 +1,28 @@
 """titiler-openeo custom reader."""
 
+import contextlib
+import contextvars
+import functools
 import logging
 import time
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from threading import Lock
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import attr
 import numpy
@@ -30,12 +48,28 @@ from rio_tiler.utils import cast_to_sequence, has_alpha_band, inherit_rasterio_e
 from typing_extensions import TypedDict
 
 from .bandsources import BAND_SOURCES, ResolvedBand, derive_bands, resolve_band
+from .capture import open_dataset
 from .errors import OutputLimitExceeded
-from .settings import ProcessingSettings
+from .memory_budget import image_nbytes
+from .metrics import ASSET_READ_BYTES, ASSET_READ_SECONDS
+from .profiling import IO_COG_READ, profile_io
+from .settings import ProcessingSettings, SARSettings
 
 logger = logging.getLogger(__name__)
 
 processing_settings = ProcessingSettings()
+sar_settings = SARSettings()
+
+# Shared by every request: prefetches are short network waits, so a small
+# pool keeps the number of concurrent annotation fetches per worker bounded.
+_prefetch_executor = (
+    ThreadPoolExecutor(
+        max_workers=sar_settings.prefetch_workers,
+        thread_name_prefix="band-source-prefetch",
+    )
+    if sar_settings.prefetch_workers
+    else None
+)
 
 
 class Dims(TypedDict):
@@ -90,12 +124,15 @@ class OpenEOReader(Reader):
     https://github.com/cogeotiff/rio-tiler/issues/977 -- this mirrors the fix
     proposed there by rio-tiler's maintainer. When it ships upstream, drop the
     GCP override and keep the class as the customisation point.
+
+    **Read metrics.** ``part()`` records its latency and decoded size in the
+    per-asset read histograms (see titiler.openeo.metrics).
     """
 
     def __attrs_post_init__(self):
         """Open the dataset, warping from real GCPs when the dataset has them."""
         if not self.dataset:
-            self.dataset = self._ctx_stack.enter_context(rasterio.open(self.input))
+            self.dataset = self._ctx_stack.enter_context(open_dataset(self.input))
 
         if self.dataset.gcps[0]:
             vrt_options: Dict[str, Any] = {
@@ -127,6 +164,57 @@ class OpenEOReader(Reader):
         # rio-tiler version.
         super().__attrs_post_init__()
 
+    def part(self, *args: Any, **kwargs: Any) -> ImageData:
+        """Read part of the asset, recording the per-asset read metrics."""
+        start = time.perf_counter()
+        img = super().part(*args, **kwargs)
+        ASSET_READ_SECONDS.observe(time.perf_counter() - start)
+        ASSET_READ_BYTES.observe(image_nbytes(img))
+        return img
+
+
+T = TypeVar("T")
+
+
+def bind_context(func: Callable[..., T]) -> Callable[..., T]:
+    """Make ``func`` run in (a copy of) the calling context, from any thread.
+
+    rio-tiler reads items and assets on its own thread pools (``mosaic_reader``,
+    ``create_tasks``, ``multi_arrays``), which do not carry ``contextvars``
+    over. Readers handed to them are wrapped with this so per-request state --
+    the profile, the capture -- reaches the reads.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def run(*args: Any, **kwargs: Any) -> T:
+        # A context can only be entered by one thread at a time.
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+def _request_env() -> Callable[..., ContextManager[None]]:
+    """``rasterio.Env``, also re-entering the context it was created in.
+
+    The ``ctx`` of :class:`SimpleSTACReader`: rio-tiler enters it around each
+    asset read of a multi-asset ``part()``, on a worker thread -- see
+    :func:`bind_context`.
+    """
+    context = contextvars.copy_context()
+
+    @contextlib.contextmanager
+    def env(**options: Any) -> Iterator[None]:
+        tokens = [(var, var.set(value)) for var, value in context.items()]
+        try:
+            with rasterio.Env(**options):
+                yield
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+
+    return env
+
 
 #: Extensions that are never the measurement raster itself (annotation XML,
 #: STAC-API tilejson, manifests, ...). Used only to skip pointless header
@@ -158,7 +246,7 @@ def _is_asset_gcp_referenced(href: str) -> bool:
     `sar/geocode.get_gcps` already rely on elsewhere in this codebase.
     """
     try:
-        with rasterio.open(href) as dataset:
+        with open_dataset(href) as dataset:
             return dataset.crs is None and bool(dataset.gcps[0])
     except Exception:
         logger.debug(
@@ -223,7 +311,7 @@ class SimpleSTACReader(MultiBaseReader):
     reader: Type[BaseReader] = attr.ib(default=OpenEOReader)
     reader_options: Dict = attr.ib(factory=dict)
 
-    ctx: Any = attr.ib(default=rasterio.Env)
+    ctx: Any = attr.ib(factory=_request_env)
 
     #: Optional AssetFetcher override for derived (band-source) assets' own
     #: non-raster fetches (e.g. Sentinel-1 annotation XML) -- a test/deployment
@@ -567,6 +655,59 @@ class SimpleSTACReader(MultiBaseReader):
         return img
 
 
+def prefetch_band_sources(stack: Any, fetcher: Any = None) -> List[Future]:
+    """Start fetching the annotations behind `stack`'s derived bands.
+
+    For every source item of every slice (`stack.get_source_items`), each
+    requested band that resolves to a band source (e.g. `vv_noise_lut` to
+    the item's `schema-noise-vv`) has its annotation fetched and parsed on a
+    background pool, into the same process-wide caches the band readers
+    read from. Slices are read one item at a time, so without this those
+    fetches are made one after another, as each read first needs one.
+
+    Nothing waits on the returned futures: a failed prefetch is retried,
+    and reported, by the read that needs it. `SARSettings.prefetch_workers`
+    of 0 disables prefetching.
+    """
+    if _prefetch_executor is None or not stack.band_names:
+        return []
+
+    futures: List[Future] = []
+    seen = set()
+    for key in stack.keys():
+        for item in stack.get_source_items(key):
+            if isinstance(item, dict):
+                item = pystac.Item.from_dict(item)
+            item_asset_facts = [
+                (k, asset.media_type, asset.roles or [])
+                for k, asset in item.assets.items()
+            ]
+            for band in stack.band_names:
+                resolved = resolve_band(
+                    item.collection_id or "", band, item_asset_facts, BAND_SOURCES
+                )
+                if resolved is None:
+                    continue
+                href = _resolve_asset_href(item.assets[resolved.asset_key])
+                if (resolved.reader, href) in seen:
+                    continue
+                seen.add((resolved.reader, href))
+                future = _prefetch_executor.submit(
+                    contextvars.copy_context().run,
+                    resolved.reader.prefetch,
+                    href,
+                    fetcher,
+                )
+                future.add_done_callback(_log_prefetch_failure)
+                futures.append(future)
+    return futures
+
+
+def _log_prefetch_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug("Band-source prefetch failed: %s", future.exception())
+
+
 def _get_asset_crs(
     item: pystac.Item,
     asset: pystac.Asset,
@@ -1209,7 +1350,7 @@ def _reader(item: Dict[str, Any], bbox: BBox, **kwargs: Any) -> ImageData:
 
     while True:
         try:
-            with SimpleSTACReader(item) as src_dst:
+            with profile_io(IO_COG_READ), SimpleSTACReader(item) as src_dst:
                 img = src_dst.part(bbox, **kwargs)
 
                 requested = kwargs.get("assets")
@@ -13,7 +13,7 @@ from .annotation import (  # noqa
 )
 from .calibration import CalibrationResult, calibrate  # noqa
 from .fetcher import AssetFetcher, ObstoreFetcher, get_default_fetcher  # noqa
-from .geocode import InverseMap, build_inverse_map, get_gcps  # noqa
+from .geocode import InverseMap, build_inverse_map, get_gcps, get_inverse_map  # noqa
 
 __all__ = [
     "AssetFetcher",
@@ -28,6 +28,7 @@ __all__ = [
     "InverseMap",
     "build_inverse_map",
     "get_gcps",
+    "get_inverse_map",
     "CalibrationResult",
     "calibrate",
 ]
@@ -25,8 +25,9 @@ measured expanding a billion-laughs payload on Python 3.13.1 (ADR S9.2).
 """
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from threading import Condition
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from xml.etree.ElementTree import Element
 
 import numpy as np
@@ -34,7 +35,9 @@ from cachetools import LRUCache, cached
 from cachetools.keys import hashkey
 from defusedxml import ElementTree as ET
 
+from ..capture import cache_scope, fetch
 from ..settings import SARSettings
+from . import diskcache
 from .fetcher import AssetFetcher, get_default_fetcher
 
 __all__ = [
@@ -91,26 +94,74 @@ class Grid2D:
     lines: np.ndarray
     pixels: np.ndarray
     values: Dict[str, np.ndarray]
+    # Per-cell blend coefficients, per (LUT name, dtype), built on first use.
+    _cells: Dict[Tuple[str, np.dtype], Tuple[np.ndarray, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def interp(self, name: str, line: np.ndarray, pixel: np.ndarray) -> np.ndarray:
-        """Bilinear interpolation at arbitrary (line, pixel), clamped at the edges."""
-        v = self.values[name]
-        li = np.clip(np.searchsorted(self.lines, line) - 1, 0, len(self.lines) - 2)
-        pi = np.clip(np.searchsorted(self.pixels, pixel) - 1, 0, len(self.pixels) - 2)
-
-        l0, l1 = self.lines[li], self.lines[li + 1]
-        p0, p1 = self.pixels[pi], self.pixels[pi + 1]
-        tl = np.clip((line - l0) / np.maximum(l1 - l0, 1e-9), 0, 1)
-        tp = np.clip((pixel - p0) / np.maximum(p1 - p0, 1e-9), 0, 1)
-
-        v00, v01 = v[li, pi], v[li, pi + 1]
-        v10, v11 = v[li + 1, pi], v[li + 1, pi + 1]
-        return (
-            v00 * (1 - tl) * (1 - tp)
-            + v01 * (1 - tl) * tp
-            + v10 * tl * (1 - tp)
-            + v11 * tl * tp
-        )
+        """Bilinear interpolation at arbitrary (line, pixel), clamped at the edges.
+
+        Computed in the floating dtype of `line`/`pixel` (float64 for integer
+        coordinates): float32 coordinates, good to ~0.002 pixel across a
+        whole GRD scene, halve the memory traffic of the blend.
+        """
+        line = np.asarray(line)
+        pixel = np.asarray(pixel)
+        dtype = np.result_type(line, pixel, np.float32)
+
+        li, tl = _locate(self.lines, line, dtype)
+        pi, tp = _locate(self.pixels, pixel, dtype)
+        cell = li
+        cell *= len(self.pixels) - 1
+        cell += pi
+
+        # v00 + tp * (v01 - v00) + tl * ((v10 - v00) + tp * (v11 - v10 - v01 + v00)),
+        # per cell, accumulated in place: one gather and no full-size
+        # temporary per term.
+        v00, dp, dl, dlp = self._cell_coefficients(name, dtype)
+        out = np.take(dlp, cell)
+        out *= tp
+        out += np.take(dl, cell)
+        out *= tl
+        tp *= np.take(dp, cell)
+        out += tp
+        out += np.take(v00, cell)
+        return out
+
+    def _cell_coefficients(self, name: str, dtype: np.dtype) -> Tuple[np.ndarray, ...]:
+        """Each grid cell's bilinear coefficients, flattened in (line, pixel) order."""
+        key = (name, np.dtype(dtype))
+        coefficients = self._cells.get(key)
+        if coefficients is None:
+            v = self.values[name]
+            v00, v01 = v[:-1, :-1], v[:-1, 1:]
+            v10, v11 = v[1:, :-1], v[1:, 1:]
+            coefficients = tuple(
+                np.ascontiguousarray(c, dtype=dtype).ravel()
+                for c in (v00, v01 - v00, v10 - v00, v11 - v10 - v01 + v00)
+            )
+            self._cells[key] = coefficients
+        return coefficients
+
+
+def _locate(
+    knots: np.ndarray, x: np.ndarray, dtype: np.dtype
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The grid cell each `x` falls in and its fractional position in it.
+
+    `np.interp` against the knot indices yields both in one pass, already
+    clamped to the grid, about twice as fast as `searchsorted` plus a lookup
+    of the cell's bounds.
+    """
+    position = np.interp(x, knots, np.arange(len(knots), dtype="f8"))
+    # NaN coordinates cast to an arbitrary index, clipped into range below;
+    # their fraction stays NaN, and so does the interpolated value.
+    with np.errstate(invalid="ignore"):
+        index = position.astype(np.intp)
+    np.clip(index, 0, len(knots) - 2, out=index)
+    position -= index
+    return index, position.astype(dtype, copy=False)
 
 
 @dataclass(frozen=True)
@@ -209,24 +260,102 @@ class NoiseLUT:
         """Full thermal noise in DN^2: range LUT scaled by the per-swath azimuth LUT.
 
         Legacy (IPF < 2.90) products have no azimuth blocks; the range LUT is
-        the complete noise estimate in that case.
+        the complete noise estimate in that case. Otherwise each pixel takes
+        the azimuth LUT of the block containing it (the last one listed, where
+        blocks overlap), and a scale of 1 outside every block.
         """
         noise = self.range_grid.interp("noiseRangeLut", line, pixel)
         if not self.azimuth_blocks:
             return noise
 
-        scale = np.ones_like(noise)
-        for blk in self.azimuth_blocks:
-            sel = (
-                (line >= blk.first_line)
-                & (line <= blk.last_line)
-                & (pixel >= blk.first_sample)
-                & (pixel <= blk.last_sample)
-            )
-            if not sel.any():
-                continue
-            scale[sel] = np.interp(line[sel], blk.lines, blk.lut)
-        return noise * scale
+        noise *= self._azimuth_scale(np.asarray(line), np.asarray(pixel))
+        return noise
+
+    def _azimuth_scale(self, line: np.ndarray, pixel: np.ndarray) -> np.ndarray:
+        """The azimuth LUT value at every pixel, all blocks in one pass.
+
+        See `_azimuth_profiles`: the pixel's sample range selects a profile,
+        and one `np.interp` over all profiles laid end to end evaluates it at
+        the pixel's line.
+        """
+        sample_edges, offsets, knots, values, bounds = self._azimuth_profiles
+        shifted = np.clip(line, *bounds)
+        shifted += np.take(offsets, np.searchsorted(sample_edges, pixel, side="right"))
+        return np.interp(shifted, knots, values)
+
+    @cached_property
+    def _azimuth_profiles(self) -> Tuple[np.ndarray, ...]:
+        """The azimuth scale as one piecewise-linear function of line per
+        sample range.
+
+        Block bounds are inclusive, so each block covers [first, next float
+        after last) on both axes. Cut at every block's sample bounds, the
+        sample axis falls into ranges over which the blocks covering each
+        line do not change. For each range, the line axis is cut the same way
+        into segments owned by the last block listed that covers them (the
+        order the per-block evaluation painted them in) -- or by none, with a
+        scale of 1. Each segment's profile is its block's LUT, sampled at the
+        LUT's own knots and at the segment ends, so linear interpolation
+        between them reproduces `np.interp` on the block alone.
+
+        Profiles are laid end to end, range `c` shifted by `offsets[c]`;
+        lines are clamped to `bounds` first, where every profile is 1, so
+        that no line reaches into a neighbouring profile. Lines exactly on a
+        block's first or last line keep to that block; shifting rounds lines
+        to ~1e-11, so one closer than that to a block edge, on the outside,
+        may still be given the block's value.
+        """
+        blocks = self.azimuth_blocks
+        line_lo = np.array([b.first_line for b in blocks])
+        line_hi = np.nextafter([b.last_line for b in blocks], np.inf)
+        sample_lo = np.array([b.first_sample for b in blocks])
+        sample_hi = np.nextafter([b.last_sample for b in blocks], np.inf)
+        line_edges = np.unique(np.r_[line_lo, line_hi])
+        sample_edges = np.unique(np.r_[sample_lo, sample_hi])
+        bounds = (line_edges[0] - 1.0, line_edges[-1] + 1.0)
+        span = bounds[1] - bounds[0] + 1.0
+
+        # Segment/range 0 lies before the first edge and -1 after the last.
+        line_cuts = np.r_[bounds[0], line_edges, bounds[1]]
+        offsets = np.arange(len(sample_edges) + 1) * span - bounds[0]
+        # A cut at a block's first line starts the next segment exactly there;
+        # one just after a block's (inclusive) last line ends the previous
+        # segment exactly at that line. Shifted, the two sides of a cut can
+        # round together, so the other side is placed one float away from
+        # the exact one in shifted coordinates.
+        starts_exactly = ~np.isin(line_cuts, line_hi)
+        knots, values = [], []
+        for c, sample in enumerate(np.r_[bounds[0], sample_edges]):
+            owner = [-1] * (len(line_cuts) - 1)
+            for b in range(len(blocks)):
+                if sample_lo[b] <= sample < sample_hi[b]:
+                    for r in range(len(owner)):
+                        if line_lo[b] <= line_cuts[r] < line_hi[b]:
+                            owner[r] = b
+            offset = offsets[c]
+            for r, b in enumerate(owner):
+                first, last = line_cuts[r], np.nextafter(line_cuts[r + 1], -np.inf)
+                if starts_exactly[r]:
+                    start = first + offset
+                else:
+                    start = np.nextafter(np.nextafter(first, -np.inf) + offset, np.inf)
+                if starts_exactly[r + 1]:
+                    end = np.nextafter(line_cuts[r + 1] + offset, -np.inf)
+                else:
+                    end = last + offset
+                if b < 0:
+                    inner, lut = np.empty(0), np.ones(2)
+                else:
+                    inner = blocks[b].lines
+                    inner = inner[(inner > first) & (inner < last)]
+                    lut = np.interp(
+                        np.r_[first, inner, last], blocks[b].lines, blocks[b].lut
+                    )
+                knots.append(np.r_[start, inner + offset, end])
+                values.append(lut)
+
+        knots = np.concatenate(knots)
+        return sample_edges, offsets, knots, np.concatenate(values), bounds
 
 
 def parse_noise(xml: bytes) -> NoiseLUT:
@@ -294,23 +423,99 @@ _noise_cache_condition = Condition()
 
 @cached(
     _calibration_cache,
-    key=lambda href, fetcher=None: hashkey(href),
+    key=lambda href, fetcher=None: hashkey(href, *cache_scope()),
     condition=_calibration_cache_condition,
+    info=True,
 )
 def get_calibration(
     href: str, fetcher: Optional[AssetFetcher] = None
 ) -> CalibrationLUT:
-    """Fetch and parse a calibration annotation, cached by href."""
+    """Fetch and parse a calibration annotation, cached by href.
+
+    Misses go through the on-disk cache (`diskcache`) when one is configured.
+    """
     fetcher = fetcher or get_default_fetcher()
-    return parse_calibration(fetcher.fetch(href))
+    return diskcache.read_through(
+        "calibration",
+        href,
+        lambda: parse_calibration(fetch(href, fetcher)),
+        _dump_calibration,
+        _load_calibration,
+        fetcher=fetcher,
+    )
 
 
 @cached(
     _noise_cache,
-    key=lambda href, fetcher=None: hashkey(href),
+    key=lambda href, fetcher=None: hashkey(href, *cache_scope()),
     condition=_noise_cache_condition,
+    info=True,
 )
 def get_noise(href: str, fetcher: Optional[AssetFetcher] = None) -> NoiseLUT:
-    """Fetch and parse a noise annotation, cached by href."""
+    """Fetch and parse a noise annotation, cached by href.
+
+    Misses go through the on-disk cache (`diskcache`) when one is configured.
+    """
     fetcher = fetcher or get_default_fetcher()
-    return parse_noise(fetcher.fetch(href))
+    return diskcache.read_through(
+        "noise",
+        href,
+        lambda: parse_noise(fetch(href, fetcher)),
+        _dump_noise,
+        _load_noise,
+        fetcher=fetcher,
+    )
+
+
+# Flat array layouts for `diskcache`: `np.savez` stores named arrays only.
+
+
+def _dump_grid(grid: Grid2D) -> Dict[str, np.ndarray]:
+    arrays = {"lines": grid.lines, "pixels": grid.pixels}
+    arrays.update({f"values.{name}": v for name, v in grid.values.items()})
+    return arrays
+
+
+def _load_grid(arrays: Dict[str, np.ndarray]) -> Grid2D:
+    values = {
+        name[len("values.") :]: v
+        for name, v in arrays.items()
+        if name.startswith("values.")
+    }
+    return Grid2D(arrays["lines"], arrays["pixels"], values)
+
+
+def _dump_calibration(lut: CalibrationLUT) -> Dict[str, np.ndarray]:
+    return _dump_grid(lut.grid)
+
+
+def _load_calibration(arrays: Dict[str, np.ndarray]) -> CalibrationLUT:
+    return CalibrationLUT(_load_grid(arrays))
+
+
+def _dump_noise(lut: NoiseLUT) -> Dict[str, np.ndarray]:
+    blocks = lut.azimuth_blocks
+    arrays = _dump_grid(lut.range_grid)
+    arrays["blocks.extent"] = np.array(
+        [[b.first_line, b.last_line, b.first_sample, b.last_sample] for b in blocks],
+        dtype="f8",
+    ).reshape(len(blocks), 4)
+    arrays["blocks.size"] = np.array([len(b.lines) for b in blocks], dtype="i8")
+    arrays["blocks.lines"] = np.concatenate([b.lines for b in blocks] or [[]])
+    arrays["blocks.lut"] = np.concatenate([b.lut for b in blocks] or [[]])
+    return arrays
+
+
+def _load_noise(arrays: Dict[str, np.ndarray]) -> NoiseLUT:
+    grid_arrays = {k: v for k, v in arrays.items() if not k.startswith("blocks.")}
+    ends = np.cumsum(arrays["blocks.size"])
+    starts = ends - arrays["blocks.size"]
+    blocks = [
+        _AzimuthBlock(
+            *(float(e) for e in extent),
+            lines=arrays["blocks.lines"][start:end],
+            lut=arrays["blocks.lut"][start:end],
+        )
+        for extent, start, end in zip(arrays["blocks.extent"], starts, ends)
+    ]
+    return NoiseLUT(_load_grid(grid_arrays), blocks)
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 import numpy as np
+from numpy.typing import DTypeLike
 
 __all__ = ["CalibrationResult", "calibrate"]
 
@@ -19,7 +20,8 @@ __all__ = ["CalibrationResult", "calibrate"]
 class CalibrationResult:
     """The calibrated backscatter value plus the diagnostics callers need."""
 
-    #: Linear-scale backscatter (or DN^2 if `a` is None), float64, HxW.
+    #: Linear-scale backscatter (or DN^2 if `a` is None), HxW, in the
+    #: `dtype` `calibrate` was called with.
     value: np.ndarray
     #: True where source DN > 0, i.e. not border/no-data, HxW.
     valid_mask: np.ndarray
@@ -31,6 +33,7 @@ def calibrate(
     dn: np.ndarray,
     a: Optional[np.ndarray] = None,
     eta: Optional[np.ndarray] = None,
+    dtype: DTypeLike = "f8",
 ) -> CalibrationResult:
     """Compute `(DN^2 - eta) / A^2`.
 
@@ -45,17 +48,34 @@ def calibrate(
     Noise subtraction can drive values negative in low-backscatter areas;
     those are clamped to 0 and counted (SNAP does the same) rather than
     emitted as negative backscatter.
+
+    The result is computed in `dtype`, in place in one output buffer (plus
+    two boolean masks), whatever the dtypes of `dn`, `a` and `eta`. `"f4"`
+    halves that buffer, and keeps the result within 2 float32 ulps (2.4e-7)
+    of `(DN^2 + eta) / A^2` -- a relative error of that size wherever noise
+    removal takes off little of `DN^2`, and larger only where it cancels
+    most of it (tests/test_sar_calibration.py measures both).
     """
+    dtype = np.dtype(dtype)
+    if dtype.kind != "f":
+        raise ValueError(f"calibrate needs a floating-point dtype, not {dtype}")
+
     valid_mask = dn > 0
-    power = dn.astype("f8") ** 2
+    value = dn.astype(dtype)
+    np.square(value, out=value)
 
     negative_count = 0
     if eta is not None:
-        negative = (power - eta) < 0
-        power = np.maximum(power - eta, 0.0)
-        negative_count = int(np.count_nonzero(negative & valid_mask))
+        np.subtract(value, eta, out=value)
+        negative = np.less(value, 0)
+        np.logical_and(negative, valid_mask, out=negative)
+        negative_count = int(np.count_nonzero(negative))
+        np.maximum(value, 0, out=value)
 
-    value = power if a is None else power / (a.astype("f8") ** 2)
+    if a is not None:
+        # Dividing twice, rather than by `a**2`, saves a full-size temporary.
+        np.divide(value, a, out=value)
+        np.divide(value, a, out=value)
 
     return CalibrationResult(
         value=value, valid_mask=valid_mask, negative_count=negative_count
@@ -0,0 +1,117 @@
+"""On-disk second tier for the parsed Sentinel-1 annotation and GCP caches.
+
+`annotation.get_calibration`/`get_noise` and `geocode.get_gcps` keep their
+parsed results in per-process LRUs, which every restart, every extra worker
+and every cold start begins empty. With `SARSettings.disk_cache_dir` set, a
+miss in those LRUs first looks here: the parsed arrays are stored as `.npz`
+files in a directory that every worker on the node can share, so only the
+first of them fetches and parses a given annotation.
+
+Entries are keyed on the href plus a validator -- the object's ETag for
+remote hrefs when the fetcher can provide one, the size and mtime for local
+files -- so a republished object is never served stale. Files are written
+to a temporary name and renamed into place, so concurrent workers never
+read a partial entry; a corrupt or unreadable entry is rebuilt rather than
+failing the request.
+
+The disk tier is bypassed while a request is captured or replayed
+(titiler.openeo.capture): a capture must record the real fetches, and a
+replay must not look anything up on the network.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+import numpy as np
+
+from ..capture import cache_scope
+from ..settings import SARSettings
+
+__all__ = ["read_through"]
+
+logger = logging.getLogger(__name__)
+
+_settings = SARSettings()
+
+#: Bumped whenever a stored layout changes, orphaning older entries.
+_FORMAT_VERSION = 1
+
+T = TypeVar("T")
+
+
+def read_through(
+    kind: str,
+    href: str,
+    build: Callable[[], T],
+    dump: Callable[[T], Dict[str, np.ndarray]],
+    load: Callable[[Dict[str, np.ndarray]], T],
+    fetcher: Any = None,
+) -> T:
+    """Return `build()`'s result for `href`, through the disk cache if enabled.
+
+    `dump` turns the result into named arrays for `np.savez`, and `load`
+    rebuilds it from them. `kind` separates the entries of different parsers
+    for one href. `fetcher` is asked for the ETag of remote hrefs, if it has
+    an `etag(href)` method.
+    """
+    directory = _settings.disk_cache_dir
+    if not directory or cache_scope():
+        return build()
+
+    path = os.path.join(directory, f"{_entry_name(kind, href, fetcher)}.npz")
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            return load(dict(arrays))
+    except FileNotFoundError:
+        pass
+    except Exception as exc:  # noqa: BLE001 - any unreadable entry is rebuilt
+        logger.warning("Ignoring unreadable SAR cache entry %s: %s", path, exc)
+
+    value = build()
+    try:
+        _write(path, dump(value))
+    except OSError as exc:
+        logger.warning("Could not write SAR cache entry %s: %s", path, exc)
+    return value
+
+
+def _entry_name(kind: str, href: str, fetcher: Any) -> str:
+    key = "\n".join([str(_FORMAT_VERSION), kind, href, _validator(href, fetcher) or ""])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _validator(href: str, fetcher: Any) -> Optional[str]:
+    """A token that changes whenever `href`'s content does, if one is known."""
+    parsed = urlparse(href)
+    if parsed.scheme in ("", "file"):
+        try:
+            stat = os.stat(parsed.path if parsed.scheme else href)
+        except OSError:
+            return None
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    etag = getattr(fetcher, "etag", None)
+    if etag is None:
+        return None
+    try:
+        return etag(href)
+    except Exception as exc:  # noqa: BLE001 - hrefs are immutable in practice
+        logger.debug("No ETag for %s: %s", href, exc)
+        return None
+
+
+def _write(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
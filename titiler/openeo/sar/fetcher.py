@@ -8,10 +8,14 @@ testable -- see docs/adr/0001-sar-backscatter.md S7.6.
 """
 
 import os
+import urllib.error
 import urllib.request
-from typing import Optional, Protocol
+from threading import Lock
+from typing import Any, Dict, Mapping, Optional, Protocol, Tuple
 from urllib.parse import urlparse
 
+import urllib3
+
 __all__ = ["AssetFetcher", "ObstoreFetcher", "get_default_fetcher"]
 
 
@@ -23,9 +27,58 @@ class AssetFetcher(Protocol):
         ...
 
 
-def _http_get(url: str) -> bytes:
-    with urllib.request.urlopen(url, timeout=60) as resp:  # noqa: S310
-        return resp.read()
+#: Environment variables `_s3_store_options` reads. A pooled store is
+#: rebuilt when any of them changes, e.g. after a credential rotation.
+_S3_ENV = (
+    "AWS_REGION",
+    "AWS_REQUEST_PAYER",
+    "AWS_VIRTUAL_HOSTING",
+    "AWS_ENDPOINT_URL",
+    "AWS_S3_ENDPOINT",
+    "AWS_HTTPS",
+    "AWS_PROFILE",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "AWS_SESSION_TOKEN",
+    "AWS_NO_SIGN_REQUEST",
+)
+
+# One connection pool per proxy (None: direct), shared by every thread:
+# urllib3 keeps connections to each host alive between requests, where
+# `urllib.request` opened and closed one per request.
+_http_pools: Dict[Optional[str], urllib3.PoolManager] = {}
+_http_pools_lock = Lock()
+
+
+def _http_pool(url: str) -> urllib3.PoolManager:
+    """The pool for `url`, through the proxy `urllib.request` would use."""
+    parsed = urlparse(url)
+    proxy = None
+    if not urllib.request.proxy_bypass(parsed.hostname or ""):
+        proxy = urllib.request.getproxies().get(parsed.scheme)
+    with _http_pools_lock:
+        pool = _http_pools.get(proxy)
+        if pool is None:
+            pool = urllib3.ProxyManager(proxy) if proxy else urllib3.PoolManager()
+            _http_pools[proxy] = pool
+    return pool
+
+
+def _http_request(
+    method: str, url: str, headers: Optional[dict] = None
+) -> urllib3.BaseHTTPResponse:
+    resp = _http_pool(url).request(method, url, headers=headers, timeout=60.0)
+    if resp.status >= 400:
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    return resp
+
+
+def _http_get(url: str, headers: Optional[dict] = None) -> bytes:
+    return _http_request("GET", url, headers=headers).data
+
+
+def _http_head(url: str) -> Mapping[str, str]:
+    return _http_request("HEAD", url).headers
 
 
 def _env_true(name: str) -> bool:
@@ -59,8 +112,18 @@ class ObstoreFetcher:
     is set this falls back to `obstore.auth.boto3.Boto3CredentialProvider`,
     which needs the optional `boto3` extra
     (https://github.com/developmentseed/obstore/issues/571).
+
+    One `S3Store` is kept per bucket and reused, so its connections stay
+    alive across fetches and credentials are resolved once rather than per
+    fetch. A store is rebuilt when the AWS variables it was built from
+    change.
     """
 
+    def __init__(self) -> None:
+        """Start with an empty store pool."""
+        self._stores: Dict[str, Tuple[Tuple[Optional[str], ...], Any]] = {}
+        self._stores_lock = Lock()
+
     def fetch(self, href: str) -> bytes:
         """Fetch `href`, dispatching on URL scheme."""
         parsed = urlparse(href)
@@ -70,12 +133,71 @@ class ObstoreFetcher:
             return self._fetch_s3(parsed.netloc, parsed.path.lstrip("/"))
         raise ValueError(f"Unsupported asset href scheme: {href!r}")
 
+    def fetch_range(self, href: str, start: int, length: int) -> bytes:
+        """Fetch `length` bytes of `href` from offset `start`.
+
+        Used by the request capture (titiler.openeo.capture) to record the
+        byte ranges GDAL reads from a raster asset.
+        """
+        parsed = urlparse(href)
+        if parsed.scheme in ("http", "https"):
+            end = start + length - 1
+            return _http_get(href, headers={"Range": f"bytes={start}-{end}"})
+        if parsed.scheme == "s3":
+            import obstore
+
+            store = self._s3_store(parsed.netloc)
+            return bytes(
+                obstore.get_range(
+                    store, parsed.path.lstrip("/"), start=start, length=length
+                )
+            )
+        raise ValueError(f"Unsupported asset href scheme: {href!r}")
+
+    def size(self, href: str) -> int:
+        """Return the size in bytes of `href`."""
+        parsed = urlparse(href)
+        if parsed.scheme in ("http", "https"):
+            return int(_http_head(href)["Content-Length"])
+        if parsed.scheme == "s3":
+            import obstore
+
+            store = self._s3_store(parsed.netloc)
+            return int(obstore.head(store, parsed.path.lstrip("/"))["size"])
+        raise ValueError(f"Unsupported asset href scheme: {href!r}")
+
+    def etag(self, href: str) -> Optional[str]:
+        """Return the ETag of `href`, or None if the server sends none.
+
+        Used by the on-disk annotation cache (`diskcache`) to tell a
+        republished object from the one it cached.
+        """
+        parsed = urlparse(href)
+        if parsed.scheme in ("http", "https"):
+            return _http_head(href).get("ETag")
+        if parsed.scheme == "s3":
+            import obstore
+
+            store = self._s3_store(parsed.netloc)
+            return obstore.head(store, parsed.path.lstrip("/")).get("e_tag")
+        raise ValueError(f"Unsupported asset href scheme: {href!r}")
+
+    def _s3_store(self, bucket: str):
+        """The pooled `S3Store` for `bucket`, built on first use."""
+        from obstore.store import S3Store
+
+        env = tuple(os.environ.get(name) for name in _S3_ENV)
+        with self._stores_lock:
+            pooled = self._stores.get(bucket)
+            if pooled is None or pooled[0] != env:
+                pooled = (env, S3Store(bucket, **self._s3_store_options()))
+                self._stores[bucket] = pooled
+        return pooled[1]
+
     def _fetch_s3(self, bucket: str, key: str) -> bytes:
         import obstore
-        from obstore.store import S3Store
 
-        store = S3Store(bucket, **self._s3_store_options())
-        return bytes(obstore.get(store, key).bytes())
+        return bytes(obstore.get(self._s3_store(bucket), key).bytes())
 
     def _s3_store_options(self) -> dict:
         """Build S3Store kwargs from the environment."""
@@ -87,15 +209,20 @@ class ObstoreFetcher:
         }
 
         # obstore reads its own AWS_ENDPOINT_URL; fall back to GDAL's
-        # AWS_S3_ENDPOINT (a bare host, not a URL) for parity with the
-        # rasterio read path.
+        # AWS_S3_ENDPOINT (a bare host, not a URL, served over plain HTTP
+        # when AWS_HTTPS=NO) for parity with the rasterio read path.
         endpoint = os.environ.get("AWS_ENDPOINT_URL") or os.environ.get(
             "AWS_S3_ENDPOINT"
         )
         if endpoint and not endpoint.startswith("http"):
-            endpoint = f"https://{endpoint}"
+            https = os.environ.get("AWS_HTTPS", "YES").strip().upper()
+            scheme = "http" if https in ("NO", "FALSE", "0", "OFF") else "https"
+            endpoint = f"{scheme}://{endpoint}"
         if endpoint:
             opts["endpoint"] = endpoint  # obstore rejects endpoint=None
+            if endpoint.startswith("http://"):
+                # e.g. a local MinIO; obstore refuses plain HTTP otherwise.
+                opts["client_options"] = {"allow_http": True}
 
         if os.environ.get("AWS_PROFILE"):
             # obstore's native auth does not read ~/.aws/credentials or
@@ -21,11 +21,10 @@ source product, each destination pixel's radiometry LUTs live.
 
 from dataclasses import dataclass
 from threading import Condition
-from typing import Sequence, Tuple
+from typing import Callable, Dict, Sequence, Tuple
 from urllib.parse import urlparse
 
 import numpy as np
-import rasterio
 from cachetools import LRUCache, cached
 from cachetools.keys import hashkey
 from rasterio.control import GroundControlPoint
@@ -34,9 +33,13 @@ from rasterio.transform import GCPTransformer, from_bounds, xy
 from rasterio.warp import transform as warp_transform
 from rio_tiler.types import BBox
 
+from ..capture import cache_scope, open_dataset
+from ..profiling import IO_SAR_GEOCODE, profile_io
 from ..settings import SARSettings
+from . import diskcache
+from .fetcher import get_default_fetcher
 
-__all__ = ["InverseMap", "build_inverse_map", "get_gcps"]
+__all__ = ["InverseMap", "build_inverse_map", "get_gcps", "get_inverse_map"]
 
 _settings = SARSettings()
 
@@ -73,30 +76,209 @@ def build_inverse_map(
     Destination pixel centres are computed in `dst_crs` (typically Web Mercator for a
     tile server) and reprojected into `gcp_crs` (typically EPSG:4326) before the GCP
     transform, since `GCPTransformer` expects coordinates in the GCPs' own CRS.
+
+    The TPS is evaluated exactly on a coarse grid and bilinearly upsampled, to
+    within `SARSettings.geocode_tolerance` source pixels (see
+    `_refined_inverse_map`); a tolerance of 0 evaluates every pixel. With
+    `SARSettings.low_zoom_geocoding`, the tolerance is in destination pixels
+    wherever those are the larger.
     """
-    dst_transform = from_bounds(*bounds, width, height)
-    rows, cols = np.mgrid[0:height, 0:width]
-    xs, ys = xy(dst_transform, rows.ravel(), cols.ravel())
-    xs = np.asarray(xs, dtype="f8")
-    ys = np.asarray(ys, dtype="f8")
+    with profile_io(IO_SAR_GEOCODE):
+        return _build_inverse_map(gcps, gcp_crs, width, height, bounds, dst_crs)
 
-    if dst_crs != gcp_crs:
-        xs, ys = warp_transform(dst_crs, gcp_crs, xs, ys)
-        xs = np.asarray(xs, dtype="f8")
-        ys = np.asarray(ys, dtype="f8")
+
+def _build_inverse_map(
+    gcps: Sequence[GroundControlPoint],
+    gcp_crs: CRS,
+    width: int,
+    height: int,
+    bounds: BBox,
+    dst_crs: CRS,
+) -> InverseMap:
+    dst_transform = from_bounds(*bounds, width, height)
 
     with GCPTransformer(gcps, tps=True) as transformer:
-        # op=lambda v: v keeps fractional coordinates; the default (floor)
-        # would throw away exactly the sub-pixel precision bilinear LUT
-        # interpolation needs.
-        line, pixel = transformer.rowcol(xs, ys, op=lambda v: v)
+
+        def exact(rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, ...]:
+            """The TPS inverse map at destination pixel centres (rows, cols)."""
+            xs, ys = xy(dst_transform, rows, cols)
+            xs = np.asarray(xs, dtype="f8")
+            ys = np.asarray(ys, dtype="f8")
+
+            if dst_crs != gcp_crs:
+                xs, ys = warp_transform(dst_crs, gcp_crs, xs, ys)
+                xs = np.asarray(xs, dtype="f8")
+                ys = np.asarray(ys, dtype="f8")
+
+            # op=lambda v: v keeps fractional coordinates; the default (floor)
+            # would throw away exactly the sub-pixel precision bilinear LUT
+            # interpolation needs.
+            line, pixel = transformer.rowcol(xs, ys, op=lambda v: v)
+            return np.asarray(line, dtype="f8"), np.asarray(pixel, dtype="f8")
+
+        step = _settings.geocode_grid_step
+        tolerance = _settings.geocode_tolerance
+        if tolerance > 0 and _settings.low_zoom_geocoding:
+            tolerance *= _source_pixels_per_pixel(exact, width, height)
+        if tolerance > 0 and min(width, height) > step:
+            line, pixel = _refined_inverse_map(exact, width, height, step, tolerance)
+        else:
+            rows, cols = np.mgrid[0:height, 0:width]
+            line, pixel = exact(rows.ravel(), cols.ravel())
 
     return InverseMap(
-        line=np.asarray(line, dtype="f8").reshape(height, width),
-        pixel=np.asarray(pixel, dtype="f8").reshape(height, width),
+        line=line.reshape(height, width),
+        pixel=pixel.reshape(height, width),
     )
 
 
+def _source_pixels_per_pixel(
+    exact: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, ...]],
+    width: int,
+    height: int,
+) -> float:
+    """How many source pixels one destination pixel spans, at least 1.
+
+    Measured along the grid's top and left edges, taking the smaller of the
+    two so an anisotropic grid keeps the finer tolerance.
+    """
+    line, pixel = exact(np.array([0, 0, height - 1]), np.array([0, width - 1, 0]))
+    across = np.hypot(line[1] - line[0], pixel[1] - pixel[0]) / max(width - 1, 1)
+    down = np.hypot(line[2] - line[0], pixel[2] - pixel[0]) / max(height - 1, 1)
+    span = min(across, down)
+    return float(span) if np.isfinite(span) and span > 1 else 1.0
+
+
+def _refined_inverse_map(
+    exact: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, ...]],
+    width: int,
+    height: int,
+    step: int,
+    tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The inverse map, bilinearly upsampled from an adaptively refined grid.
+
+    The destination grid is cut into cells about `step` pixels wide whose
+    corners are evaluated exactly. Each cell is checked at its centre and edge
+    midpoints: if bilinear interpolation of the corners is off by more than
+    half of `tolerance` source pixels at any of them (the margin covers error
+    between the checks), the cell is split in four and checked again;
+    otherwise its pixels are interpolated. Cells that would still fail when a
+    few pixels wide are evaluated exactly. The TPS is smooth over a tile, so most
+    of it settles on the first grid: a 1024x1024 tile costs a few thousand TPS
+    evaluations instead of a million.
+    """
+    line = np.empty((height, width), dtype="f8")
+    pixel = np.empty((height, width), dtype="f8")
+    evaluated = np.zeros((height, width), dtype=bool)
+
+    def evaluate(rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, ...]:
+        flat = np.unique(np.ravel_multi_index((rows, cols), (height, width)))
+        flat = flat[~evaluated.flat[flat]]
+        if flat.size:
+            mr, mc = np.unravel_index(flat, (height, width))
+            line[mr, mc], pixel[mr, mc] = exact(mr, mc)
+            evaluated[mr, mc] = True
+        return line[rows, cols], pixel[rows, cols]
+
+    row_knots = np.unique(np.r_[0 : height - 1 : step, height - 1])
+    col_knots = np.unique(np.r_[0 : width - 1 : step, width - 1])
+    r0, c0 = (
+        a.ravel() for a in np.meshgrid(row_knots[:-1], col_knots[:-1], indexing="ij")
+    )
+    r1, c1 = (
+        a.ravel() for a in np.meshgrid(row_knots[1:], col_knots[1:], indexing="ij")
+    )
+
+    while r0.size:
+        corners = [evaluate(r, c) for r, c in ((r0, c0), (r0, c1), (r1, c0), (r1, c1))]
+        rm = (r0 + r1) // 2
+        cm = (c0 + c1) // 2
+
+        residual = np.zeros(r0.size)
+        for r, c in ((rm, cm), (r0, cm), (r1, cm), (rm, c0), (rm, c1)):
+            checks = evaluate(r, c)
+            predicted = _bilinear(corners, r0, c0, r1, c1, r, c)
+            for k in (0, 1):
+                # np.maximum, not fmax: a NaN (TPS blew up) must refine.
+                residual = np.maximum(residual, np.abs(predicted[k] - checks[k]))
+
+        ok = residual <= tolerance / 2
+        # Bilinear error shrinks about fourfold per split: a cell that cannot
+        # get within tolerance before it is a few pixels wide is evaluated
+        # exactly right away.
+        size = np.maximum(r1 - r0, c1 - c0)
+        splits_left = np.log2(np.maximum(size, 4) / 4)
+        small = (size <= 4) | (residual > tolerance / 2 * 4**splits_left)
+
+        rows, cols, cell = _cell_pixels(r0[ok], c0[ok], r1[ok], c1[ok])
+        todo = ~evaluated[rows, cols]
+        rows, cols = rows[todo], cols[todo]
+        cell = np.flatnonzero(ok)[cell[todo]]
+        line[rows, cols], pixel[rows, cols] = _bilinear(
+            [(corner[0][cell], corner[1][cell]) for corner in corners],
+            r0[cell],
+            c0[cell],
+            r1[cell],
+            c1[cell],
+            rows,
+            cols,
+        )
+
+        rest = ~ok & small
+        rows, cols, _ = _cell_pixels(r0[rest], c0[rest], r1[rest], c1[rest])
+        evaluate(rows, cols)
+
+        split = ~ok & ~small
+        r0, c0, r1, c1, rm, cm = (a[split] for a in (r0, c0, r1, c1, rm, cm))
+        r0, c0, r1, c1 = (
+            np.concatenate(parts)
+            for parts in zip(
+                (r0, c0, rm, cm),
+                (r0, cm, rm, c1),
+                (rm, c0, r1, cm),
+                (rm, cm, r1, c1),
+            )
+        )
+
+    return line.ravel(), pixel.ravel()
+
+
+def _cell_pixels(
+    r0: np.ndarray, c0: np.ndarray, r1: np.ndarray, c1: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every pixel of the cells [r0, r1] x [c0, c1], and the cell it is in."""
+    heights = r1 - r0 + 1
+    widths = c1 - c0 + 1
+    counts = heights * widths
+    cell = np.repeat(np.arange(counts.size), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = r0[cell] + offset // widths[cell]
+    cols = c0[cell] + offset % widths[cell]
+    return rows, cols, cell
+
+
+def _bilinear(
+    corners: Sequence[Tuple[np.ndarray, np.ndarray]],
+    r0: np.ndarray,
+    c0: np.ndarray,
+    r1: np.ndarray,
+    c1: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Interpolate (line, pixel) at (rows, cols) from cell `corners` (TL, TR, BL, BR)."""
+    fr = (rows - r0) / np.maximum(r1 - r0, 1)
+    fc = (cols - c0) / np.maximum(c1 - c0, 1)
+    (tl, tr, bl, br) = corners
+    result = []
+    for k in (0, 1):
+        top = tl[k] + fc * (tr[k] - tl[k])
+        bottom = bl[k] + fc * (br[k] - bl[k])
+        result.append(top + fr * (bottom - top))
+    return result[0], result[1]
+
+
 def _gdal_path(href: str) -> str:
     """Translate a STAC href into something rasterio/GDAL can open."""
     parsed = urlparse(href)
@@ -115,7 +297,12 @@ _gcp_cache: LRUCache = LRUCache(maxsize=_settings.annotation_cache_maxsize)
 _gcp_cache_condition = Condition()
 
 
-@cached(_gcp_cache, key=lambda href: hashkey(href), condition=_gcp_cache_condition)
+@cached(
+    _gcp_cache,
+    key=lambda href: hashkey(href, *cache_scope()),
+    condition=_gcp_cache_condition,
+    info=True,
+)
 def get_gcps(href: str) -> Tuple[Sequence[GroundControlPoint], CRS]:
     """Fetch a measurement asset's GCPs, header-only, cached by href.
 
@@ -126,9 +313,22 @@ def get_gcps(href: str) -> Tuple[Sequence[GroundControlPoint], CRS]:
     `ImageData`, `src.gcps` on that dataset is already empty. Getting the real
     GCPs back means opening the source file again -- but only its header
     (`rasterio.open` does not read pixel data), and only once per href thanks
-    to the cache above.
+    to the cache above (and, across processes, to the on-disk cache in
+    `diskcache` when one is configured). GCPs from the disk cache keep their
+    coordinates only, not their ids.
     """
-    with rasterio.open(_gdal_path(href)) as src:
+    return diskcache.read_through(
+        "gcps",
+        href,
+        lambda: _read_gcps(href),
+        _dump_gcps,
+        _load_gcps,
+        fetcher=get_default_fetcher(),
+    )
+
+
+def _read_gcps(href: str) -> Tuple[Sequence[GroundControlPoint], CRS]:
+    with open_dataset(href, _gdal_path(href)) as src:
         gcps, gcp_crs = src.gcps
         if not gcps:
             raise ValueError(
@@ -136,3 +336,91 @@ def get_gcps(href: str) -> Tuple[Sequence[GroundControlPoint], CRS]:
                 "Sentinel-1 GRD"
             )
         return gcps, gcp_crs
+
+
+def _dump_gcps(
+    value: Tuple[Sequence[GroundControlPoint], CRS],
+) -> Dict[str, np.ndarray]:
+    gcps, gcp_crs = value
+    return {
+        "gcps": np.array(
+            [[g.row, g.col, g.x, g.y, g.z or 0.0] for g in gcps], dtype="f8"
+        ),
+        "crs": np.array(gcp_crs.to_wkt()),
+    }
+
+
+def _load_gcps(
+    arrays: Dict[str, np.ndarray],
+) -> Tuple[Sequence[GroundControlPoint], CRS]:
+    gcps = [
+        GroundControlPoint(row, col, x, y, z)
+        for row, col, x, y, z in arrays["gcps"].tolist()
+    ]
+    return gcps, CRS.from_wkt(str(arrays["crs"]))
+
+
+def _inverse_map_key(
+    href: str, width: int, height: int, bounds: BBox, dst_crs: CRS
+) -> Tuple:
+    """Everything `get_inverse_map`'s result depends on, TPS settings included."""
+    return hashkey(
+        href,
+        tuple(bounds),
+        width,
+        height,
+        CRS.from_user_input(dst_crs).to_string(),
+        _settings.geocode_tolerance,
+        _settings.geocode_grid_step,
+        _settings.low_zoom_geocoding,
+        *cache_scope(),
+    )
+
+
+def _inverse_map_nbytes(inverse: InverseMap) -> int:
+    return inverse.line.nbytes + inverse.pixel.nbytes
+
+
+# Process-wide cache of inverse maps, bounded in bytes rather than entries
+# since a map's size follows its destination grid. Off (0 bytes) by default:
+# unlike the GCP cache above, its key space grows with every distinct tile
+# requested, so it only pays off where the same grids come back (a viewer
+# panning over one scene). Single-flight for the same reason as `get_gcps`.
+_inverse_map_cache: LRUCache = LRUCache(
+    maxsize=_settings.inverse_map_cache_bytes, getsizeof=_inverse_map_nbytes
+)
+_inverse_map_cache_condition = Condition()
+
+
+@cached(
+    _inverse_map_cache,
+    key=_inverse_map_key,
+    condition=_inverse_map_cache_condition,
+    info=True,
+)
+def _cached_inverse_map(
+    href: str, width: int, height: int, bounds: BBox, dst_crs: CRS
+) -> InverseMap:
+    gcps, gcp_crs = get_gcps(href)
+    inverse = build_inverse_map(gcps, gcp_crs, width, height, bounds, dst_crs)
+    # Shared between requests from now on: no caller may write into it.
+    inverse.line.flags.writeable = False
+    inverse.pixel.flags.writeable = False
+    return inverse
+
+
+def get_inverse_map(
+    href: str, width: int, height: int, bounds: BBox, dst_crs: CRS
+) -> InverseMap:
+    """The inverse map of measurement asset `href` onto a destination grid.
+
+    `build_inverse_map` over `get_gcps(href)`, served from a process-wide LRU
+    of `SARSettings.inverse_map_cache_bytes` bytes when that is set, so the
+    same tile of the same scene is only geocoded once. Cached maps are
+    read-only.
+    """
+    if _settings.inverse_map_cache_bytes:
+        return _cached_inverse_map(href, width, height, bounds, dst_crs)
+
+    gcps, gcp_crs = get_gcps(href)
+    return build_inverse_map(gcps, gcp_crs, width, height, bounds, dst_crs)
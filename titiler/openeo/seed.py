@@ -0,0 +1,471 @@
+"""Pre-seeding of XYZ service tiles.
+
+Renders the tiles of a service over a range of zoom levels, within the
+service's ``configuration.extent`` and an optional bounding box or GeoJSON
+geometry, into a directory (``{z}/{x}/{y}.{ext}``) or an MBTiles file::
+
+    titiler-openeo-seed SERVICE_ID --zoom 8 12 --output tiles/
+    titiler-openeo-seed SERVICE_ID --zoom 8 12 --bbox 5 45 11 48 \\
+        --output tiles.mbtiles --workers 8
+
+Tiles are rendered by `EndpointsFactory.render_tile`, the path of
+``GET /services/xyz/{service_id}/tiles/{z}/{x}/{y}``, as the service's owner,
+in a pool of worker processes configured from the same environment as the
+server (``TITILER_OPENEO_STAC_API_URL``, ``TITILER_OPENEO_STORE_URL``, ...).
+Tiles already in the output are skipped, so an interrupted run resumes where
+it stopped. Services rendered in metatiles are seeded a block at a time.
+
+Each worker renders one tile at a time: ``--max-memory`` caps the raster
+data it may hold (``TITILER_OPENEO_PROCESSING_MAX_REQUEST_MEMORY``), and
+``--tiles-per-worker`` replaces workers after that many blocks.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import morecantile
+from attrs import define, field
+
+try:
+    from shapely.geometry import box, shape
+except ImportError:  # pragma: nocover
+    box = shape = None  # type: ignore
+
+# (z, x, y)
+TileKey = Tuple[int, int, int]
+
+EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/tiff": "tif",
+    "text/plain": "txt",
+    "application/json": "json",
+}
+
+
+def service_tiles(
+    service: Dict[str, Any],
+    minzoom: int,
+    maxzoom: int,
+    bbox: Optional[Sequence[float]] = None,
+    geometry: Optional[Dict[str, Any]] = None,
+) -> Iterator[List[morecantile.Tile]]:
+    """Tiles of `service` to seed, in blocks rendered together.
+
+    Args:
+        service: The service, as returned by the services store
+        minzoom: Lowest zoom level, clipped to the service's
+        maxzoom: Highest zoom level, clipped to the service's
+        bbox: Area to seed, as [West, South, East, North] in EPSG:4326
+        geometry: GeoJSON geometry (EPSG:4326) the tiles must intersect
+    """
+    configuration = service.get("configuration") or {}
+    tms = morecantile.tms.get(configuration.get("tilematrixset", "WebMercatorQuad"))
+    size = max(int(configuration.get("metatile") or 1), 1)
+
+    area = None
+    if geometry:
+        if shape is None:
+            raise ImportError("Seeding within a geometry requires shapely")
+        area = shape(geometry)
+
+    west, south, east, north = tms.bbox
+    for limit in (configuration.get("extent"), bbox, area.bounds if area else None):
+        if limit:
+            west, south = max(west, limit[0]), max(south, limit[1])
+            east, north = min(east, limit[2]), min(north, limit[3])
+    if west >= east or south >= north:
+        return
+
+    minzoom = max(minzoom, configuration.get("minzoom") or tms.minzoom)
+    maxzoom = min(maxzoom, configuration.get("maxzoom") or tms.maxzoom)
+    for z in range(minzoom, maxzoom + 1):
+        corners = [
+            tms.tile(lon, lat, z) for lon in (west, east) for lat in (south, north)
+        ]
+        xs = [tile.x for tile in corners]
+        ys = [tile.y for tile in corners]
+        for y0 in range(min(ys) // size * size, max(ys) + 1, size):
+            for x0 in range(min(xs) // size * size, max(xs) + 1, size):
+                block = []
+                for y in range(y0, y0 + size):
+                    for x in range(x0, x0 + size):
+                        tile = morecantile.Tile(x, y, z)
+                        if _within(tms, tile, (west, south, east, north), area):
+                            block.append(tile)
+                if block:
+                    yield block
+
+
+def _within(
+    tms: morecantile.TileMatrixSet,
+    tile: morecantile.Tile,
+    bbox: Tuple[float, float, float, float],
+    area: Any,
+) -> bool:
+    """Whether `tile` overlaps the area to seed, as the tile endpoint checks."""
+    west, south, east, north = bbox
+    matrix = tms.matrix(tile.z)
+    if not (0 <= tile.x < matrix.matrixWidth and 0 <= tile.y < matrix.matrixHeight):
+        return False
+    bounds = tms.bounds(tile)
+    if not (
+        bounds.left < east
+        and bounds.right > west
+        and bounds.top > south
+        and bounds.bottom < north
+    ):
+        return False
+    return area is None or area.intersects(box(*bounds))
+
+
+@define
+class DirectoryWriter:
+    """Tiles as ``{z}/{x}/{y}.{extension}`` files under `path`."""
+
+    path: Path
+    extension: str
+
+    def exists(self, tile: TileKey) -> bool:
+        """Whether `tile` was already written."""
+        return self._file(tile).exists()
+
+    def write(self, tile: TileKey, data: bytes) -> None:
+        """Write a tile, atomically."""
+        path = self._file(tile)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def delete(self, tile: TileKey) -> bool:
+        """Remove a tile; whether it was there."""
+        try:
+            self._file(tile).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def zooms(self) -> Set[int]:
+        """Zoom levels holding tiles."""
+        if not self.path.is_dir():
+            return set()
+        return {int(p.name) for p in self.path.iterdir() if p.name.isdigit()}
+
+    def close(self) -> None:
+        """Nothing is buffered."""
+
+    def _file(self, tile: TileKey) -> Path:
+        z, x, y = tile
+        return self.path / str(z) / str(x) / f"{y}.{self.extension}"
+
+
+@define
+class MBTilesWriter:
+    """Tiles in an MBTiles file (WebMercatorQuad only).
+
+    Rows are numbered from the south, as MBTiles requires.
+    """
+
+    path: Path
+    metadata: Dict[str, str] = field(factory=dict)
+    commit_every: int = 100
+
+    _db: sqlite3.Connection = field(init=False)
+    _existing: Set[TileKey] = field(init=False)
+    _pending: int = field(init=False, default=0)
+
+    def __attrs_post_init__(self):
+        """Create the schema and read the tiles already written."""
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER,
+                tile_column INTEGER,
+                tile_row INTEGER,
+                tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+            """
+        )
+        self._db.executemany(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?)", self.metadata.items()
+        )
+        self._db.commit()
+        self._existing = {
+            (z, x, (1 << z) - 1 - row)
+            for z, x, row in self._db.execute(
+                "SELECT zoom_level, tile_column, tile_row FROM tiles"
+            )
+        }
+
+    def exists(self, tile: TileKey) -> bool:
+        """Whether `tile` was already written."""
+        return tile in self._existing
+
+    def write(self, tile: TileKey, data: bytes) -> None:
+        """Write a tile; committed every `commit_every` tiles and on close."""
+        z, x, y = tile
+        self._db.execute(
+            "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)",
+            (z, x, (1 << z) - 1 - y, sqlite3.Binary(data)),
+        )
+        self._existing.add(tile)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._db.commit()
+            self._pending = 0
+
+    def delete(self, tile: TileKey) -> bool:
+        """Remove a tile, committed on close; whether it was there."""
+        if tile not in self._existing:
+            return False
+        z, x, y = tile
+        self._db.execute(
+            "DELETE FROM tiles WHERE zoom_level = ? AND tile_column = ? "
+            "AND tile_row = ?",
+            (z, x, (1 << z) - 1 - y),
+        )
+        self._existing.discard(tile)
+        return True
+
+    def zooms(self) -> Set[int]:
+        """Zoom levels holding tiles."""
+        return {z for z, _, _ in self._existing}
+
+    def close(self) -> None:
+        """Commit the last tiles and close the file."""
+        self._db.commit()
+        self._db.close()
+
+
+@define
+class SeedReport:
+    """Outcome of a seeding run."""
+
+    total: int = 0
+    rendered: int = 0
+    skipped: int = 0
+    outside: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Tiles rendered per second."""
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        """One progress line."""
+        done = self.rendered + self.outside + self.errors
+        return (
+            f"{done}/{self.total} tiles  {self.rate:.1f} tiles/s  "
+            f"{self.skipped} already seeded  {self.outside} outside  "
+            f"{self.errors} errors"
+        )
+
+
+# The worker's service and renderer, set by `_init_worker`
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(service: Dict[str, Any], environ: Dict[str, str]) -> None:
+    """Configure a worker process and build its renderer."""
+    os.environ.update(environ)
+    from titiler.openeo.main import app
+
+    _worker["service"] = service
+    _worker["factory"] = app.endpoints
+
+
+def _render_block(block: List[TileKey]) -> List[Tuple[TileKey, str, Any]]:
+    """Render the tiles of a block: (tile, "ok" | "outside" | "error", bytes or
+    message)."""
+    from rio_tiler.errors import TileOutsideBounds
+
+    from titiler.openeo.models.auth import User
+
+    service = _worker["service"]
+    owner = User(user_id=service["user_id"]) if service.get("user_id") else None
+    results: List[Tuple[TileKey, str, Any]] = []
+    for z, x, y in block:
+        try:
+            response = _worker["factory"].render_tile(service, z, x, y, user=owner)
+            results.append(((z, x, y), "ok", bytes(response.body)))
+        except TileOutsideBounds:
+            results.append(((z, x, y), "outside", None))
+        except Exception as e:
+            results.append(((z, x, y), "error", f"{type(e).__name__}: {e}"))
+    return results
+
+
+def seed(
+    service: Dict[str, Any],
+    blocks: Iterator[List[morecantile.Tile]],
+    writer: Any,
+    workers: int = 1,
+    max_memory: Optional[int] = None,
+    tiles_per_worker: Optional[int] = None,
+    report_every: float = 10.0,
+) -> SeedReport:
+    """Render `blocks` of `service` into `writer`, skipping tiles it has.
+
+    Args:
+        service: The service, as returned by the services store
+        blocks: Tiles to seed, in blocks rendered by one worker
+        writer: A `DirectoryWriter` or `MBTilesWriter`
+        workers: Worker processes; 0 renders in this process
+        max_memory: Bytes of raster data a worker may hold per tile
+        tiles_per_worker: Blocks rendered before a worker is replaced
+        report_every: Seconds between progress lines
+    """
+    report = SeedReport()
+    todo: List[List[TileKey]] = []
+    for block in blocks:
+        keys = [(t.z, t.x, t.y) for t in block]
+        report.total += len(keys)
+        pending = [key for key in keys if not writer.exists(key)]
+        report.skipped += len(keys) - len(pending)
+        if pending:
+            todo.append(pending)
+    report.total -= report.skipped
+
+    environ = {
+        # Workers share the store file, see the DuckDB store's keep_open
+        "TITILER_OPENEO_DUCKDB_KEEP_OPEN": "false",
+    }
+    if max_memory:
+        environ["TITILER_OPENEO_PROCESSING_MAX_REQUEST_MEMORY"] = str(max_memory)
+
+    start = last_report = time.perf_counter()
+    pool = None
+    if workers:
+        pool = multiprocessing.get_context("spawn").Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(service, environ),
+            maxtasksperchild=tiles_per_worker,
+        )
+        results = pool.imap_unordered(_render_block, todo)
+    else:
+        _init_worker(service, {})
+        results = map(_render_block, todo)
+
+    try:
+        for block_results in results:
+            for key, status, payload in block_results:
+                if status == "ok":
+                    writer.write(key, payload)
+                    report.rendered += 1
+                elif status == "outside":
+                    report.outside += 1
+                else:
+                    report.errors += 1
+                    print(f"tile {key}: {payload}", file=sys.stderr, flush=True)
+            now = time.perf_counter()
+            report.seconds = now - start
+            if now - last_report >= report_every:
+                print(report, flush=True)
+                last_report = now
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            # Stops the workers at once when interrupted
+            pool.terminate()
+            pool.join()
+        writer.close()
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _writer(output: Path, service: Dict[str, Any], media_type: str) -> Any:
+    """The writer for `output`: MBTiles for ``.mbtiles`` files, else a
+    directory."""
+    configuration = service.get("configuration") or {}
+    extension = EXTENSIONS.get(media_type, "bin")
+    if output.suffix != ".mbtiles":
+        return DirectoryWriter(output, extension)
+
+    if configuration.get("tilematrixset", "WebMercatorQuad") != "WebMercatorQuad":
+        raise ValueError("MBTiles output requires a WebMercatorQuad service")
+    return MBTilesWriter(
+        output,
+        metadata={
+            "name": service.get("title") or service["id"],
+            "format": extension,
+            "type": "overlay",
+            "version": "1.3",
+        },
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="titiler-openeo-seed", description="Pre-render XYZ service tiles."
+    )
+    parser.add_argument("service_id")
+    parser.add_argument(
+        "--zoom", type=int, nargs=2, metavar=("MIN", "MAX"), required=True
+    )
+    parser.add_argument(
+        "--bbox", type=float, nargs=4, metavar=("WEST", "SOUTH", "EAST", "NORTH")
+    )
+    parser.add_argument(
+        "--geometry", type=Path, help="GeoJSON geometry or feature file"
+    )
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-memory", type=int, metavar="BYTES")
+    parser.add_argument("--tiles-per-worker", type=int, metavar="BLOCKS")
+    parser.add_argument("--report-every", type=float, default=10.0, metavar="SECONDS")
+    args = parser.parse_args(argv)
+
+    from titiler.openeo.factory import EndpointsFactory
+    from titiler.openeo.services import get_store
+    from titiler.openeo.settings import BackendSettings
+
+    store = get_store(str(BackendSettings().store_url))  # type: ignore[call-arg]
+    service = store.get_service(args.service_id)
+    if service is None:
+        parser.error(f"Could not find service: {args.service_id}")
+
+    geometry = None
+    if args.geometry:
+        geometry = json.loads(args.geometry.read_text())
+        geometry = geometry.get("geometry", geometry)
+
+    media_type = EndpointsFactory._get_media_type(service["process"]["process_graph"])
+    report = seed(
+        service,
+        service_tiles(service, *args.zoom, bbox=args.bbox, geometry=geometry),
+        _writer(args.output, service, media_type),
+        workers=args.workers,
+        max_memory=args.max_memory,
+        tiles_per_worker=args.tiles_per_worker,
+        report_every=args.report_every,
+    )
+    print(report, f"in {report.seconds:.1f}s", flush=True)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 
 from urllib.parse import urlparse
 
+from ..settings import DuckDBSettings, ServicesCacheSettings
 from .base import ServicesStore, TileAssignmentStore, UdpStore
 
 
@@ -15,19 +16,40 @@ def _is_sqlalchemy_scheme(parsed) -> bool:
 
 
 def get_store(store_uri: str) -> ServicesStore:
-    """Return Service Store."""
+    """Return Service Store.
+
+    Service definitions are cached in front of the store unless
+    `ServicesCacheSettings.ttl` is 0.
+    """
+    store = _get_store(store_uri)
+
+    settings = ServicesCacheSettings()
+    if settings.ttl and settings.maxsize:
+        from .cache import CachedServicesStore  # noqa
+
+        return CachedServicesStore(
+            store=store,
+            ttl=settings.ttl,
+            maxsize=settings.maxsize,
+            revalidate_interval=settings.revalidate_interval,
+        )
+
+    return store
+
+
+def _get_store(store_uri: str) -> ServicesStore:
+    """Return the Service Store backend for `store_uri`."""
     parsed = urlparse(store_uri)
 
     if parsed.path.endswith(".json"):
-        from .local import LocalServiceStore, load_local_store_data  # noqa
+        from .local import LocalServiceStore  # noqa
 
-        services_data, _ = load_local_store_data(store_uri)
-        return LocalServiceStore(store=services_data, path=store_uri)  # type: ignore[arg-type]
+        return LocalServiceStore(store={}, path=store_uri)  # type: ignore[arg-type]
 
     if parsed.path.endswith(".db"):
         from .duckdb import DuckDBStore  # noqa
 
-        return DuckDBStore(store=store_uri)
+        return DuckDBStore(store=store_uri, keep_open=DuckDBSettings().keep_open)
 
     if _is_sqlalchemy_scheme(parsed):
         from .sqlalchemy import SQLAlchemyStore  # noqa
@@ -42,15 +64,14 @@ def get_udp_store(store_uri: str) -> UdpStore:
     parsed = urlparse(store_uri)
 
     if parsed.path.endswith(".json"):
-        from .local import LocalUdpStore, load_local_store_data  # noqa
+        from .local import LocalUdpStore  # noqa
 
-        _, udp_data = load_local_store_data(store_uri)
-        return LocalUdpStore(store=udp_data, path=store_uri)  # type: ignore[arg-type]
+        return LocalUdpStore(store={}, path=store_uri)  # type: ignore[arg-type]
 
     if parsed.path.endswith(".db") or parsed.scheme == "duckdb":
         from .duckdb import DuckDBUdpStore  # noqa
 
-        return DuckDBUdpStore(store=store_uri)
+        return DuckDBUdpStore(store=store_uri, keep_open=DuckDBSettings().keep_open)
 
     if _is_sqlalchemy_scheme(parsed):
         from .sqlalchemy import SQLAlchemyUdpStore  # noqa
@@ -1,7 +1,10 @@
 """ABC Base services Store."""
 
 import abc
-from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from attrs import define, field
 from starlette import status
@@ -9,6 +12,9 @@ from starlette import status
 from ..errors import OpenEOException
 from ..models.auth import User
 
+if TYPE_CHECKING:
+    from .tracking import LoginBatch
+
 
 class TileAssignmentError(OpenEOException):
     """Base class for tile assignment errors."""
@@ -52,6 +58,10 @@ class TileAlreadyLockedError(TileAssignmentError):
         )
 
 
+# Fields of a tile, as returned by `TileAssignmentStore.get_all_tiles`
+TILE_FIELDS = ("service_id", "x", "y", "z", "stage", "user_id", "data")
+
+
 @define()
 class TileAssignmentStore(metaclass=abc.ABCMeta):
     """ABC Class defining Tile Assignment operations."""
@@ -190,6 +200,142 @@ class TileAssignmentStore(metaclass=abc.ABCMeta):
         """
         ...
 
+    def list_tiles(
+        self,
+        service_id: str,
+        stage: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """List a page of a service's tiles, in assignment order.
+
+        This fallback pages through `get_all_tiles`. Stores should override
+        it with a query that only reads the page and the requested fields.
+
+        Args:
+            service_id: The service identifier
+            stage: Only list tiles in this stage (e.g. "claimed", "submitted")
+            fields: Only include these fields (see TILE_FIELDS), default all
+            limit: Maximum number of tiles to return, default all
+            offset: Number of tiles to skip
+
+        Returns:
+            List of dictionaries with the requested tile fields
+
+        Raises:
+            ValueError: When a field is unknown, or limit/offset is negative
+        """
+        fields = check_tile_fields(fields)
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("limit and offset must not be negative")
+        tiles = [
+            tile
+            for tile in self.get_all_tiles(service_id)
+            if stage is None or tile.get("stage") == stage
+        ]
+        end = None if limit is None else offset + limit
+        return [{k: tile.get(k) for k in fields} for tile in tiles[offset:end]]
+
+    def get_tiles_summary(
+        self, service_id: str, user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Count a service's tiles by stage.
+
+        This fallback counts the tiles of `get_all_tiles`. Stores should
+        override it with counters kept up to date by the tile operations.
+
+        Args:
+            service_id: The service identifier
+            user_id: Only count this user's tiles
+
+        Returns:
+            Dict with the tile count per stage ("stages"), their "total", and
+            the number of tiles with data ("with_data")
+        """
+        stages: Dict[str, int] = {}
+        with_data = 0
+        for tile in self.get_all_tiles(service_id):
+            if user_id is not None and tile.get("user_id") != user_id:
+                continue
+            stages[tile["stage"]] = stages.get(tile["stage"], 0) + 1
+            with_data += bool(tile.get("data"))
+        return tiles_summary_response(service_id, user_id, stages, with_data)
+
+
+def check_tile_fields(fields: Optional[List[str]]) -> List[str]:
+    """Validate a tile field projection, defaulting to every field."""
+    if fields is None:
+        return list(TILE_FIELDS)
+    unknown = [field for field in fields if field not in TILE_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown tile fields: {', '.join(unknown)}. "
+            f"Valid fields are: {', '.join(TILE_FIELDS)}"
+        )
+    return list(fields)
+
+
+def tiles_summary_response(
+    service_id: str, user_id: Optional[str], stages: Dict[str, int], with_data: int
+) -> Dict[str, Any]:
+    """Build the response of `TileAssignmentStore.get_tiles_summary`."""
+    summary: Dict[str, Any] = {
+        "service_id": service_id,
+        "stages": {stage: count for stage, count in stages.items() if count},
+        "total": sum(stages.values()),
+        "with_data": with_data,
+    }
+    if user_id is not None:
+        summary["user_id"] = user_id
+    return summary
+
+
+class InvalidPageToken(OpenEOException):
+    """Raised when a listing's `next` token was not made by `page_token`."""
+
+    def __init__(self, token: str):
+        """Initialize error with invalid token message."""
+        super().__init__(
+            message=f"Invalid page token: {token}",
+            code="InvalidPageToken",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+def page_token(*keys: str) -> str:
+    """Encode the sort keys of the last item of a page as a `next` token."""
+    return base64.urlsafe_b64encode(json.dumps(keys).encode()).decode()
+
+
+def parse_page_token(token: str, size: int) -> List[str]:
+    """Decode a token made by `page_token` from `size` sort keys."""
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except ValueError as e:
+        raise InvalidPageToken(token) from e
+    if (
+        not isinstance(keys, list)
+        or len(keys) != size
+        or not all(isinstance(key, str) for key in keys)
+    ):
+        raise InvalidPageToken(token)
+    return keys
+
+
+def parse_udp_page_token(token: str) -> Tuple[datetime, str]:
+    """Decode a token made by `UdpStore.page_token`: creation time and id."""
+    created_at, udp_id = parse_page_token(token, 2)
+    try:
+        return datetime.fromisoformat(created_at), udp_id
+    except ValueError as e:
+        raise InvalidPageToken(token) from e
+
+
+def service_summary(service: Dict[str, Any]) -> Dict[str, Any]:
+    """Leave the process graph out of a service, for listings."""
+    return {key: value for key, value in service.items() if key != "process"}
+
 
 @define
 class UdpStore(metaclass=abc.ABCMeta):
@@ -203,11 +349,30 @@ class UdpStore(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
     def list_udps(
-        self, user_id: str, limit: int = 100, offset: int = 0
+        self,
+        user_id: str,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """List UDP definitions for a user."""
+        """List UDP definitions for a user, most recently created first.
+
+        Args:
+            user_id: The owner of the UDPs
+            limit: Maximum number of UDPs to return
+            offset: Number of UDPs to skip
+            after: `page_token` of the last UDP of the previous page; the
+                list starts with the UDP after it
+        """
         ...
 
+    def page_token(self, udp: Dict[str, Any]) -> str:
+        """Return the `after` token of the page following `udp`."""
+        created_at = udp.get("created_at")
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat()
+        return page_token(str(created_at), udp["id"])
+
     @abc.abstractmethod
     def get_udp(self, user_id: str, udp_id: str) -> Optional[Dict[str, Any]]:
         """Get a single UDP definition."""
@@ -259,15 +424,43 @@ class ServicesStore(metaclass=abc.ABCMeta):
         ...
 
     @abc.abstractmethod
-    def get_services(self, **kwargs) -> List[Dict]:
-        """Return All Services."""
+    def get_services(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
+        """Return All Services, ordered by id.
+
+        Args:
+            limit: Maximum number of services to return
+            after: `page_token` of the last service of the previous page;
+                the list starts with the service after it
+            summary: Leave out the services' `process`, without reading it
+                where the store allows
+        """
         ...
 
     @abc.abstractmethod
-    def get_user_services(self, user_id: str, **kwargs) -> List[Dict]:
-        """Return List Services for a user."""
+    def get_user_services(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
+        """Return List Services for a user, ordered by id.
+
+        See `get_services` for the arguments.
+        """
         ...
 
+    def page_token(self, service: Dict[str, Any]) -> str:
+        """Return the `after` token of the page following `service`."""
+        return page_token(service["id"])
+
     @abc.abstractmethod
     def add_service(self, user_id: str, service: Dict, **kwargs) -> str:
         """Add Service."""
@@ -285,6 +478,15 @@ class ServicesStore(metaclass=abc.ABCMeta):
         """Update Service."""
         ...
 
+    def services_revision(self) -> Optional[int]:
+        """Return a counter bumped by every write to the services.
+
+        Shared by every process using the same store, so that caches of
+        service definitions can tell when another one changed them. None
+        when the store keeps no such counter.
+        """
+        return None
+
     @abc.abstractmethod
     def track_user_login(self, user: User, provider: str) -> None:
         """Track user login activity.
@@ -295,6 +497,25 @@ class ServicesStore(metaclass=abc.ABCMeta):
         """
         ...
 
+    def track_user_logins(self, logins: List["LoginBatch"]) -> None:
+        """Track batches of login activity, as buffered by a LoginTracker.
+
+        Each batch adds `count` logins to its user's tracking record, and
+        sets its last login to `last_login`. A new record starts at
+        `first_login`.
+
+        This fallback replays each batch through `track_user_login`, which
+        keeps the counts but stamps the logins with the time of the write.
+        Stores should override it with a single transaction.
+
+        Args:
+            logins: One batch per (user, provider)
+        """
+        for login in logins:
+            user = User(user_id=login.user_id, email=login.email, name=login.name)
+            for _ in range(login.count):
+                self.track_user_login(user, login.provider)
+
     @abc.abstractmethod
     def get_user_tracking(
         self, user_id: str, provider: str
@@ -0,0 +1,166 @@
+"""titiler.openeo.services cache.
+
+Every XYZ tile request looks its service definition up in the store, and a
+single map view issues hundreds of those for the same service. On DuckDB each
+is a new connection and a JSON parse, on SQLAlchemy a database round trip.
+`CachedServicesStore` keeps the definitions in a bounded TTL cache in front of
+any `ServicesStore`.
+
+Writes through the cached store drop its entry for the service. Writes made
+by other replicas are noticed through the store's `services_revision()`,
+which every write bumps: it is read at most once every `revalidate_interval`
+seconds, and any change clears the whole cache. Stores without a revision
+rely on the TTL alone.
+"""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from attrs import define, field
+from cachetools import TTLCache
+
+from ..models.auth import User
+from .base import ServicesStore
+
+if TYPE_CHECKING:
+    from .tracking import LoginBatch
+
+
+@define(kw_only=True)
+class CachedServicesStore(ServicesStore):
+    """Read-through cache of service definitions in front of another store.
+
+    Every other method, and any attribute the wrapped store has (e.g.
+    `ping`), is passed through. `get_service` returns a shallow copy of the
+    cached definition: callers may add or remove keys, but nested values are
+    shared and must not be modified in place.
+    """
+
+    store: ServicesStore = field()
+    ttl: float = field(default=60.0)
+    maxsize: int = field(default=1024)
+    revalidate_interval: float = field(default=1.0)
+    _cache: TTLCache = field(init=False)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+    _generation: int = field(init=False, default=0)
+    _revision: Optional[int] = field(init=False, default=None)
+    _checked_at: float = field(init=False, default=float("-inf"))
+
+    def __attrs_post_init__(self):
+        """Post init: create the cache."""
+        self._cache = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+
+    def __getattr__(self, name: str) -> Any:
+        """Look attributes this class does not have up on the wrapped store."""
+        if name.startswith("__") or name == "store":
+            raise AttributeError(name)
+        return getattr(self.store, name)
+
+    def get_service(self, service_id: str) -> Optional[Dict]:
+        """Return a specific Service."""
+        self._revalidate()
+        with self._lock:
+            service = self._cache.get(service_id)
+            generation = self._generation
+        if service is None:
+            service = self.store.get_service(service_id)
+            if service is None:
+                return None
+            with self._lock:
+                # Skip storing a definition read while a write was invalidating
+                # it: it may predate the write.
+                if generation == self._generation:
+                    self._cache[service_id] = service
+        return dict(service)
+
+    def get_services(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
+        """Return All Services."""
+        return self.store.get_services(
+            limit=limit, after=after, summary=summary, **kwargs
+        )
+
+    def get_user_services(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
+        """Return List Services for a user."""
+        return self.store.get_user_services(
+            user_id, limit=limit, after=after, summary=summary, **kwargs
+        )
+
+    def add_service(self, user_id: str, service: Dict, **kwargs) -> str:
+        """Add Service."""
+        return self.store.add_service(user_id, service, **kwargs)
+
+    def delete_service(self, service_id: str, **kwargs) -> bool:
+        """Delete Service."""
+        try:
+            return self.store.delete_service(service_id, **kwargs)
+        finally:
+            self.invalidate(service_id)
+
+    def update_service(
+        self, user_id: str, item_id: str, val: Dict[str, Any], **kwargs
+    ) -> str:
+        """Update Service."""
+        try:
+            return self.store.update_service(user_id, item_id, val, **kwargs)
+        finally:
+            self.invalidate(item_id)
+
+    def services_revision(self) -> Optional[int]:
+        """Return the wrapped store's revision."""
+        return self.store.services_revision()
+
+    def track_user_login(self, user: User, provider: str) -> None:
+        """Track user login activity."""
+        self.store.track_user_login(user, provider)
+
+    def track_user_logins(self, logins: List["LoginBatch"]) -> None:
+        """Track batches of login activity."""
+        self.store.track_user_logins(logins)
+
+    def get_user_tracking(
+        self, user_id: str, provider: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get user tracking information."""
+        return self.store.get_user_tracking(user_id, provider)
+
+    def invalidate(self, service_id: Optional[str] = None) -> None:
+        """Drop one service's cached definition, or all of them."""
+        with self._lock:
+            self._generation += 1
+            if service_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(service_id, None)
+
+    def _revalidate(self) -> None:
+        """Clear the cache if the store's revision moved since the last check."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.revalidate_interval:
+                return
+            # Claim this check, so concurrent requests keep using the cache
+            # rather than all querying the revision.
+            self._checked_at = now
+            known = self._revision
+
+        revision = self.store.services_revision()
+        if revision is None or revision == known:
+            return
+        with self._lock:
+            self._revision = revision
+        if known is not None:
+            self.invalidate()
@@ -1,15 +1,148 @@
-"""titiler.openeo.services duckDB."""
+"""titiler.openeo.services duckDB.
+
+Opening a DuckDB database costs milliseconds, paid by every tile request
+that looks its service up. The stores keep one database handle open per
+process instead, and give each thread its own cursor on it (DuckDB
+connections must not be shared between threads). The statements of the hot
+lookups are parsed once per cursor and executed with new parameters after
+that: DuckDB's Python client has no bindable prepared statements, but it runs
+pre-parsed ones.
+
+A DuckDB file can only be opened by one process at a time. With
+`keep_open=False`, the stores open the database for every call instead, as
+several processes sharing one file need.
+"""
 
 import json
+import os
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
 
 import duckdb
 from attrs import define, field
 
 from ..models.auth import User
-from .base import ServicesStore, UdpStore
+from .base import ServicesStore, UdpStore, parse_page_token, parse_udp_page_token
+
+if TYPE_CHECKING:
+    from .tracking import LoginBatch
+
+_GET_SERVICE = """
+SELECT service_id, service
+FROM services
+WHERE service_id = ?
+"""
+
+# A service's definition without `process`, removed inside DuckDB
+_SERVICE_SUMMARY = """json_merge_patch(service, '{"process": null}')"""
+
+_TRACK_USER_LOGINS = """
+INSERT INTO user_tracking
+(user_id, provider, first_login, last_login, login_count, email, name)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, provider) DO UPDATE
+SET last_login = excluded.last_login,
+    login_count = user_tracking.login_count + excluded.login_count,
+    email = excluded.email,
+    name = excluded.name
+"""
+
+_UDP_COLUMNS = """
+id,
+user_id,
+process_graph,
+summary,
+description,
+parameters,
+returns,
+categories,
+deprecated,
+experimental,
+exceptions,
+examples,
+links,
+created_at,
+updated_at
+"""
+
+_GET_UDP = f"""
+SELECT {_UDP_COLUMNS}
+FROM udp_definitions
+WHERE id = ? AND user_id = ?
+"""
+
+
+@define
+class DuckDBConnections:
+    """Per-thread cursors on one long-lived DuckDB database handle.
+
+    Writes are serialised: DuckDB's optimistic concurrency control fails the
+    second of two concurrent writes to a row rather than waiting for the
+    first.
+
+    With `keep_open=False`, `cursor()` opens the database for each call and
+    `prepare()` leaves statements unparsed. Calls are then serialised too, as
+    one file can't be opened by several threads at once.
+    """
+
+    path: str = field()
+    keep_open: bool = field(default=True)
+    _con: Optional[duckdb.DuckDBPyConnection] = field(init=False, default=None)
+    _pid: Optional[int] = field(init=False, default=None)
+    _local: threading.local = field(init=False, factory=threading.local)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+    _write_lock: threading.RLock = field(init=False, factory=threading.RLock)
+
+    @contextmanager
+    def cursor(self, write: bool = False) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Yield a connection for the current thread, to write to if `write`."""
+        if not self.keep_open:
+            with self._write_lock, duckdb.connect(self.path) as con:
+                yield con
+            return
+
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None or self._pid != os.getpid():
+            cursor = self._open_cursor()
+        if write:
+            with self._write_lock:
+                yield cursor
+        else:
+            yield cursor
+
+    def prepare(self, con: duckdb.DuckDBPyConnection, sql: str) -> Union[str, Any]:
+        """Return `sql` parsed once per cursor, to execute with parameters."""
+        if not self.keep_open:
+            return sql
+        statements: Dict[str, Any] = self._local.statements
+        statement = statements.get(sql)
+        if statement is None:
+            statement = statements[sql] = con.extract_statements(sql)[0]
+        return statement
+
+    def close(self) -> None:
+        """Close the database handle, and with it every thread's cursor."""
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+            self._local = threading.local()
+
+    def _open_cursor(self) -> duckdb.DuckDBPyConnection:
+        """Open this thread's cursor, and the database handle if needed."""
+        with self._lock:
+            # A handle inherited through fork() belongs to the parent process
+            if self._con is None or self._pid != os.getpid():
+                self._con = duckdb.connect(self.path)
+                self._pid = os.getpid()
+                self._local = threading.local()
+            cursor = self._con.cursor()
+        self._local.cursor = cursor
+        self._local.statements = {}
+        return cursor
 
 
 @define(kw_only=True)
@@ -17,10 +150,13 @@ class DuckDBStore(ServicesStore):
     """DuckDB Service Store."""
 
     store: str = field()
+    keep_open: bool = field(default=True)
+    _connections: DuckDBConnections = field(init=False)
 
     def __attrs_post_init__(self):
         """Post init: create table if not exists."""
-        with duckdb.connect(self.store) as con:
+        self._connections = DuckDBConnections(self.store, keep_open=self.keep_open)
+        with self._connections.cursor(write=True) as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS services (
@@ -44,22 +180,32 @@ class DuckDBStore(ServicesStore):
                 );
                 """
             )
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS services_revision (
+                    id INTEGER PRIMARY KEY,
+                    revision BIGINT
+                );
+                """
+            )
+            con.execute(
+                """
+                INSERT INTO services_revision (id, revision)
+                VALUES (1, 0)
+                ON CONFLICT DO NOTHING
+                """
+            )
 
     def ping(self) -> None:
         """Verify the DuckDB store is reachable. Raises on failure."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor() as con:
             con.execute("SELECT 1").fetchone()
 
     def get_service(self, service_id: str) -> Optional[Dict]:
         """Return a specific Service."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor() as con:
             result = con.execute(
-                """
-                SELECT service_id, service
-                FROM services
-                WHERE service_id = ?
-                """,
-                [service_id],
+                self._connections.prepare(con, _GET_SERVICE), [service_id]
             ).fetchone()
 
             if not result:
@@ -67,43 +213,55 @@ class DuckDBStore(ServicesStore):
 
             return {
                 "id": result[0],
-                **json.loads(result[1]),
+                **_deserialize_json(result[1]),
             }
 
-    def get_services(self, **kwargs) -> List[Dict]:
+    def get_services(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
         """Return All Services."""
-        with duckdb.connect(self.store) as con:
-            results = con.execute(
-                """
-                SELECT service_id, json(service)
-                FROM services
-                """
-            ).fetchall()
-
-            return [
-                {
-                    "id": result[0],
-                    **json.loads(result[1]),
-                }
-                for result in results
-            ]
+        return self._list_services(None, limit, after, summary)
 
-    def get_user_services(self, user_id: str, **kwargs) -> List[Dict]:
+    def get_user_services(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
         """Return List Services for a user."""
-        with duckdb.connect(self.store) as con:
+        return self._list_services(user_id, limit, after, summary)
+
+    def _list_services(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        after: Optional[str],
+        summary: bool,
+    ) -> List[Dict]:
+        """Return a page of the services, of one user or all of them."""
+        (start,) = parse_page_token(after, 1) if after else ("",)
+        with self._connections.cursor() as con:
             results = con.execute(
-                """
-                SELECT service_id, service::JSON
+                f"""
+                SELECT service_id, {_SERVICE_SUMMARY if summary else "service"}
                 FROM services
-                WHERE user_id = ?
+                WHERE (? IS NULL OR user_id = ?) AND service_id > ?
+                ORDER BY service_id
+                LIMIT ?
                 """,
-                [user_id],
+                [user_id, user_id, start, limit],
             ).fetchall()
 
             return [
                 {
                     "id": result[0],
-                    **json.loads(result[1]),
+                    **_deserialize_json(result[1]),
                 }
                 for result in results
             ]
@@ -111,7 +269,7 @@ class DuckDBStore(ServicesStore):
     def add_service(self, user_id: str, service: Dict, **kwargs) -> str:
         """Add Service."""
         service_id = str(uuid.uuid4())
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor(write=True) as con:
             con.execute(
                 """
                 INSERT INTO services (service_id, user_id, service)
@@ -119,11 +277,12 @@ class DuckDBStore(ServicesStore):
                 """,
                 [service_id, user_id, service],
             )
+            _bump_revision(con)
         return service_id
 
     def delete_service(self, service_id: str, **kwargs) -> bool:
         """Delete Service."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor(write=True) as con:
             result = con.execute(
                 """
                 DELETE FROM services
@@ -135,6 +294,7 @@ class DuckDBStore(ServicesStore):
 
             if not result:
                 raise ValueError(f"Could not find service: {service_id}")
+            _bump_revision(con)
 
         return True
 
@@ -142,7 +302,7 @@ class DuckDBStore(ServicesStore):
         self, user_id: str, item_id: str, val: Dict[str, Any], **kwargs
     ) -> str:
         """Update Service."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor(write=True) as con:
             # Verify service exists and belongs to user
             result = con.execute(
                 """
@@ -160,9 +320,7 @@ class DuckDBStore(ServicesStore):
                 raise ValueError(f"Service {item_id} does not belong to user {user_id}")
 
             # Merge the existing service with updates
-            service = result[1]
-            if isinstance(service, str):
-                service = json.loads(service)
+            service = _deserialize_json(result[1])
             service.update(val)
 
             # Update service
@@ -174,50 +332,51 @@ class DuckDBStore(ServicesStore):
                 """,
                 [service, item_id],
             )
+            _bump_revision(con)
 
         return item_id
 
+    def services_revision(self) -> Optional[int]:
+        """Return the counter bumped by every write to the services."""
+        with self._connections.cursor() as con:
+            result = con.execute(
+                "SELECT revision FROM services_revision WHERE id = 1"
+            ).fetchone()
+            return result[0] if result else None
+
     def track_user_login(self, user: User, provider: str) -> None:
         """Track user login activity."""
         now = datetime.now(timezone.utc)
 
-        with duckdb.connect(self.store) as con:
-            # Begin transaction for atomic operation
+        with self._connections.cursor(write=True) as con:
+            con.execute(
+                self._connections.prepare(con, _TRACK_USER_LOGINS),
+                [user.user_id, provider, now, now, 1, user.email, user.name],
+            )
+
+    def track_user_logins(self, logins: List["LoginBatch"]) -> None:
+        """Track batches of login activity."""
+        if not logins:
+            return
+
+        with self._connections.cursor(write=True) as con:
             con.execute("BEGIN TRANSACTION")
             try:
-                # Check if record exists
-                exists = con.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM user_tracking
-                    WHERE user_id = ? AND provider = ?
-                    """,
-                    [user.user_id, provider],
-                ).fetchone()[0]
-
-                if exists:
-                    # Update existing record
-                    con.execute(
-                        """
-                        UPDATE user_tracking
-                        SET last_login = ?,
-                            login_count = login_count + 1,
-                            email = ?,
-                            name = ?
-                        WHERE user_id = ? AND provider = ?
-                        """,
-                        [now, user.email, user.name, user.user_id, provider],
-                    )
-                else:
-                    # Insert new record if update affected no rows
-                    con.execute(
-                        """
-                        INSERT INTO user_tracking
-                        (user_id, provider, first_login, last_login, login_count, email, name)
-                        VALUES (?, ?, ?, ?, 1, ?, ?)
-                        """,
-                        [user.user_id, provider, now, now, user.email, user.name],
-                    )
+                con.executemany(
+                    _TRACK_USER_LOGINS,
+                    [
+                        [
+                            login.user_id,
+                            login.provider,
+                            login.first_login,
+                            login.last_login,
+                            login.count,
+                            login.email,
+                            login.name,
+                        ]
+                        for login in logins
+                    ],
+                )
                 con.execute("COMMIT")
             except Exception:
                 con.execute("ROLLBACK")
@@ -227,7 +386,7 @@ class DuckDBStore(ServicesStore):
         self, user_id: str, provider: str
     ) -> Optional[Dict[str, Any]]:
         """Get user tracking information."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor() as con:
             result = con.execute(
                 """
                 SELECT user_id, provider, first_login, last_login,
@@ -252,6 +411,11 @@ class DuckDBStore(ServicesStore):
             }
 
 
+def _bump_revision(con: duckdb.DuckDBPyConnection) -> None:
+    """Bump the services revision after a write to the services."""
+    con.execute("UPDATE services_revision SET revision = revision + 1 WHERE id = 1")
+
+
 def _serialize_json(value: Optional[Any]) -> Optional[str]:
     """Serialize JSON-like values for duckdb storage."""
     if value is None:
@@ -273,10 +437,13 @@ class DuckDBUdpStore(UdpStore):
     """DuckDB UDP Store."""
 
     store: str = field()
+    keep_open: bool = field(default=True)
+    _connections: DuckDBConnections = field(init=False)
 
     def __attrs_post_init__(self):
         """Post init: create UDP table if not exists."""
-        with duckdb.connect(self.store) as con:
+        self._connections = DuckDBConnections(self.store, keep_open=self.keep_open)
+        with self._connections.cursor(write=True) as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS udp_definitions (
@@ -300,62 +467,39 @@ class DuckDBUdpStore(UdpStore):
             )
 
     def list_udps(
-        self, user_id: str, limit: int = 100, offset: int = 0
+        self,
+        user_id: str,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """List UDPs for a user."""
-        with duckdb.connect(self.store) as con:
+        start, udp_id = parse_udp_page_token(after) if after else (None, None)
+        with self._connections.cursor() as con:
             results = con.execute(
-                """
-                SELECT id,
-                       user_id,
-                       process_graph,
-                       summary,
-                       description,
-                       parameters,
-                       returns,
-                       categories,
-                       deprecated,
-                       experimental,
-                       exceptions,
-                       examples,
-                       links,
-                       created_at,
-                       updated_at
+                f"""
+                SELECT {_UDP_COLUMNS}
                 FROM udp_definitions
                 WHERE user_id = ?
-                ORDER BY created_at DESC
+                  AND (
+                    ?::TIMESTAMP IS NULL
+                    OR created_at < ?
+                    OR (created_at = ? AND id < ?)
+                  )
+                ORDER BY created_at DESC, id DESC
                 LIMIT ?
                 OFFSET ?
                 """,
-                [user_id, limit, offset],
+                [user_id, start, start, start, udp_id, limit, offset],
             ).fetchall()
 
             return [self._row_to_dict(row) for row in results]
 
     def get_udp(self, user_id: str, udp_id: str) -> Optional[Dict[str, Any]]:
         """Get a single UDP for a user."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor() as con:
             result = con.execute(
-                """
-                SELECT id,
-                       user_id,
-                       process_graph,
-                       summary,
-                       description,
-                       parameters,
-                       returns,
-                       categories,
-                       deprecated,
-                       experimental,
-                       exceptions,
-                       examples,
-                       links,
-                       created_at,
-                       updated_at
-                FROM udp_definitions
-                WHERE id = ? AND user_id = ?
-                """,
-                [udp_id, user_id],
+                self._connections.prepare(con, _GET_UDP), [udp_id, user_id]
             ).fetchone()
 
             if result is None:
@@ -381,7 +525,7 @@ class DuckDBUdpStore(UdpStore):
     ) -> str:
         """Create or replace a UDP for a user."""
         now = datetime.utcnow()
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor(write=True) as con:
             existing = con.execute(
                 """
                 SELECT user_id
@@ -459,7 +603,7 @@ class DuckDBUdpStore(UdpStore):
 
     def delete_udp(self, user_id: str, udp_id: str) -> bool:
         """Delete a UDP for a user."""
-        with duckdb.connect(self.store) as con:
+        with self._connections.cursor(write=True) as con:
             result = con.execute(
                 """
                 DELETE FROM udp_definitions
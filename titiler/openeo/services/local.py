@@ -2,27 +2,277 @@
 
 NOTE: This should be used only for Testing Purposes.
 
+The stores keep their data in memory, backed by a JSON file (the snapshot)
+holding the "services" and "udp_definitions" namespaces. Each change is
+appended as one line to `<path>.journal` rather than rewriting the file, and
+every `COMPACT_EVERY` lines the journal is folded into a new snapshot, written
+to a temporary file and renamed over the old one. Loading reads the snapshot
+and replays the journal.
+
+The journal's first line holds a digest of the snapshot it applies to: a
+snapshot replaced by other means than compaction (e.g. edited by hand)
+discards the journal instead of having it replayed on top.
+
+Writers hold an exclusive lock on `<path>.lock` (where `fcntl` is available),
+so several processes can share one file. Each store replays the lines other
+processes appended before making its own change; it does not see them
+before its next change.
 """
 
+import hashlib
 import json
+import os
+import tempfile
+import threading
 import uuid
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 from attrs import define, field
 
+try:
+    import fcntl
+except ImportError:  # pragma: nocover
+    fcntl = None  # type: ignore
+
 from ..models.auth import User
-from .base import ServicesStore, UdpStore
+from .base import (
+    ServicesStore,
+    UdpStore,
+    parse_page_token,
+    parse_udp_page_token,
+    service_summary,
+)
+
+if TYPE_CHECKING:
+    from .tracking import LoginBatch
+
+
+# Journal lines folded into the snapshot at once
+COMPACT_EVERY = 1000
 
 
 def load_local_store_data(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """Load local store data in the structured layout."""
+    data, _ = _read_snapshot(path)
+    journal = _read_journal(path, _digest(path))
+    if journal is not None:
+        for line in journal[1]:
+            _apply(data, line)
+
+    return data.get("services", {}), data.get("udp_definitions", {})
+
+
+def _digest(path: str) -> str:
+    """Digest of the snapshot at `path`, empty if there is none."""
     try:
-        data = json.load(open(path))
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
     except FileNotFoundError:
-        return {}, {}
+        return ""
 
-    return data.get("services", {}), data.get("udp_definitions", {})
+
+def _read_snapshot(path: str) -> Tuple[Dict[str, Any], str]:
+    """Read the snapshot at `path`, and its digest."""
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return {}, ""
+    return json.loads(content), hashlib.sha256(content).hexdigest()
+
+
+def _read_journal(
+    path: str, digest: str, offset: int = 0
+) -> Optional[Tuple[int, List[Dict[str, Any]], int]]:
+    """Read the journal of the snapshot at `path` from byte `offset`.
+
+    Returns its inode, its complete lines after `offset` and the offset
+    after them, or None if there is no journal for the snapshot with
+    `digest`. A last line without a newline was cut short by a crash, and
+    is left out.
+    """
+    try:
+        f = open(f"{path}.journal", "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        inode = os.fstat(f.fileno()).st_ino
+        header = f.readline()
+        if not header.endswith(b"\n") or json.loads(header) != {"snapshot": digest}:
+            return None
+        f.seek(max(offset, len(header)))
+        lines = []
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            lines.append(json.loads(line))
+            offset = f.tell()
+        return inode, lines, max(offset, len(header))
+
+
+def _apply(data: Dict[str, Any], line: Dict[str, Any]) -> None:
+    """Apply a journal line to the data of every namespace."""
+    namespace = data.setdefault(line["ns"], {})
+    if "value" in line:
+        namespace[line["id"]] = line["value"]
+    else:
+        namespace.pop(line["id"], None)
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    """Replace the file at `path` with `content`, all at once."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@define
+class LocalJournal:
+    """Append-only journal of one namespace of a local JSON store file.
+
+    Keeps `data`, the namespace's content, in step with the file: changes go
+    through `transaction()` and `record()`.
+    """
+
+    path: str = field()
+    namespace: str = field()
+    data: Dict[str, Any] = field()
+    compact_every: int = field(default=COMPACT_EVERY)
+    _snapshot: Optional[Tuple[int, int, int]] = field(init=False, default=None)
+    _inode: Optional[int] = field(init=False, default=None)
+    _offset: int = field(init=False, default=0)
+    _lines: int = field(init=False, default=0)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+
+    def load(self) -> None:
+        """Replace `data` with the namespace's content in the file."""
+        with self._lock, self._file_lock():
+            self._reload()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Lock the file, and bring `data` up to date, for a change."""
+        with self._lock, self._file_lock():
+            self._catch_up()
+            yield
+            if self._lines >= self.compact_every:
+                self._compact()
+
+    def record(self, key: str) -> None:
+        """Append the current value of `key` (or its deletion) to the journal."""
+        line: Dict[str, Any] = {"ns": self.namespace, "id": key}
+        if key in self.data:
+            line["value"] = self.data[key]
+        content = json.dumps(line, default=_json_default).encode() + b"\n"
+        with open(f"{self.path}.journal", "ab") as f:
+            f.write(content)
+        self._offset += len(content)
+        self._lines += 1
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the exclusive lock on the store file, across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _reload(self) -> None:
+        """Read the snapshot and replay the journal into `data`."""
+        self._snapshot = self._snapshot_stat()
+        snapshot, digest = _read_snapshot(self.path)
+        journal = _read_journal(self.path, digest)
+        if journal is None:
+            # No journal yet, or one left over from a replaced snapshot
+            self._start_journal(digest)
+            journal = _read_journal(self.path, digest)
+            assert journal is not None
+        self._inode, lines, self._offset = journal
+        for line in lines:
+            _apply(snapshot, line)
+        self._lines = len(lines)
+        self.data.clear()
+        self.data.update(snapshot.get(self.namespace, {}))
+
+    def _catch_up(self) -> None:
+        """Apply the lines other writers appended since the last read."""
+        try:
+            inode = os.stat(f"{self.path}.journal").st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode != self._inode or self._snapshot_stat() != self._snapshot:
+            # Compacted by another writer, or replaced
+            self._reload()
+            return
+
+        with open(f"{self.path}.journal", "rb") as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                line = json.loads(raw)
+                if line["ns"] == self.namespace:
+                    _apply({self.namespace: self.data}, line)
+                self._offset += len(raw)
+                self._lines += 1
+
+    def _snapshot_stat(self) -> Optional[Tuple[int, int, int]]:
+        """Identify the current snapshot file, to notice it being replaced."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _compact(self) -> None:
+        """Fold the journal into a new snapshot, and start a new journal."""
+        snapshot, digest = _read_snapshot(self.path)
+        journal = _read_journal(self.path, digest)
+        for line in journal[1] if journal else []:
+            _apply(snapshot, line)
+        snapshot.setdefault("services", {})
+        snapshot.setdefault("udp_definitions", {})
+        content = json.dumps(snapshot, default=_json_default).encode()
+        _write_atomic(self.path, content)
+        digest = hashlib.sha256(content).hexdigest()
+        self._start_journal(digest)
+        self._snapshot = self._snapshot_stat()
+        self._inode = os.stat(f"{self.path}.journal").st_ino
+        self._offset = len(self._header(digest))
+        self._lines = 0
+
+    def _start_journal(self, digest: str) -> None:
+        """Replace the journal with an empty one for the snapshot `digest`."""
+        _write_atomic(f"{self.path}.journal", self._header(digest))
+
+    @staticmethod
+    def _header(digest: str) -> bytes:
+        """The first line of the journal of the snapshot `digest`."""
+        return json.dumps({"snapshot": digest}).encode() + b"\n"
 
 
 def _json_default(value: Any) -> Any:
@@ -39,6 +289,13 @@ class LocalServiceStore(ServicesStore):
     store: Dict = field()
     tracking_store: Dict = field(factory=dict)
     path: Optional[str] = field(default=None, kw_only=True)
+    _journal: Optional[LocalJournal] = field(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        """Post init: load the services from `path`, if any."""
+        if self.path:
+            self._journal = LocalJournal(self.path, "services", self.store)
+            self._journal.load()
 
     def get_service(self, service_id: str) -> Optional[Dict]:
         """Return a specific Service."""
@@ -50,58 +307,82 @@ class LocalServiceStore(ServicesStore):
             **self.store[service_id]["service"],
         }
 
-    def get_services(self, **kwargs) -> List[Dict]:
+    def get_services(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
         """Return All Services."""
-        return [
-            {
-                "id": service_id,
-                "user_id": data["user_id"],
-                **data["service"],
-            }
-            for service_id, data in self.store.items()
-        ]
+        return self._list_services(None, limit, after, summary)
 
-    def get_user_services(self, user_id: str, **kwargs) -> List[Dict]:
+    def get_user_services(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
         """Return List Services for a user."""
+        return self._list_services(user_id, limit, after, summary)
+
+    def _list_services(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        after: Optional[str],
+        summary: bool,
+    ) -> List[Dict]:
+        """Return a page of the services, of one user or all of them."""
+        (start,) = parse_page_token(after, 1) if after else ("",)
+        service_ids = sorted(
+            service_id
+            for service_id, data in self.store.items()
+            if service_id > start and user_id in (None, data["user_id"])
+        )
         services = [
             {
                 "id": service_id,
-                "user_id": data["user_id"],
-                **data["service"],
+                "user_id": self.store[service_id]["user_id"],
+                **self.store[service_id]["service"],
             }
-            for service_id, data in self.store.items()
-            if data["user_id"] == user_id
+            for service_id in service_ids[:limit]
         ]
-        return services
+        return [service_summary(s) for s in services] if summary else services
 
     def add_service(self, user_id: str, service: Dict, **kwargs) -> str:
         """Add Service."""
         service_id = str(uuid.uuid4())
-        self.store[service_id] = {
-            "user_id": user_id,
-            "service": service,
-        }
-        self._persist()
+        with self._transaction():
+            self.store[service_id] = {
+                "user_id": user_id,
+                "service": service,
+            }
+            self._persist(service_id)
         return service_id
 
     def delete_service(self, service_id: str, **kwargs) -> bool:
         """Delete Service."""
-        _ = self.store.pop(service_id)
-        self._persist()
+        with self._transaction():
+            _ = self.store.pop(service_id)
+            self._persist(service_id)
         return True
 
     def update_service(
         self, user_id: str, item_id: str, val: Dict[str, Any], **kwargs
     ) -> str:
         """Update Service."""
-        if item_id not in self.store:
-            raise ValueError(f"Could not find service: {item_id}")
+        with self._transaction():
+            if item_id not in self.store:
+                raise ValueError(f"Could not find service: {item_id}")
 
-        if self.store[item_id]["user_id"] != user_id:
-            raise ValueError(f"Service {item_id} does not belong to user {user_id}")
+            if self.store[item_id]["user_id"] != user_id:
+                raise ValueError(f"Service {item_id} does not belong to user {user_id}")
 
-        self.store[item_id]["service"].update(val)
-        self._persist()
+            self.store[item_id]["service"].update(val)
+            self._persist(item_id)
         return item_id
 
     def track_user_login(self, user: User, provider: str) -> None:
@@ -124,7 +405,26 @@ class LocalServiceStore(ServicesStore):
                 "email": user.email,
                 "name": user.name,
             }
-        self._persist()
+
+    def track_user_logins(self, logins: List["LoginBatch"]) -> None:
+        """Track batches of login activity."""
+        for login in logins:
+            key = (login.user_id, login.provider)
+            if key in self.tracking_store:
+                self.tracking_store[key]["last_login"] = login.last_login
+                self.tracking_store[key]["login_count"] += login.count
+                self.tracking_store[key]["email"] = login.email
+                self.tracking_store[key]["name"] = login.name
+            else:
+                self.tracking_store[key] = {
+                    "user_id": login.user_id,
+                    "provider": login.provider,
+                    "first_login": login.first_login,
+                    "last_login": login.last_login,
+                    "login_count": login.count,
+                    "email": login.email,
+                    "name": login.name,
+                }
 
     def get_user_tracking(
         self, user_id: str, provider: str
@@ -132,15 +432,14 @@ class LocalServiceStore(ServicesStore):
         """Get user tracking information."""
         return self.tracking_store.get((user_id, provider))
 
-    def _persist(self) -> None:
-        """Write updated services back to disk while preserving UDP data."""
-        if not self.path:
-            return
+    def _transaction(self) -> ContextManager[None]:
+        """Bring the services up to date with `path` for a change."""
+        return self._journal.transaction() if self._journal else nullcontext()
 
-        _, udp_definitions = load_local_store_data(self.path)
-        data = {"services": self.store, "udp_definitions": udp_definitions}
-        with open(self.path, "w") as f:
-            json.dump(data, f, default=_json_default)
+    def _persist(self, service_id: str) -> None:
+        """Append the change of a service to the journal, if any."""
+        if self._journal:
+            self._journal.record(service_id)
 
     def ping(self) -> None:
         """Verify the backing JSON file is readable. Raises on failure."""
@@ -157,9 +456,20 @@ class LocalUdpStore(UdpStore):
 
     store: Dict[str, Dict[str, Any]] = field(factory=dict)
     path: Optional[str] = field(default=None, kw_only=True)
+    _journal: Optional[LocalJournal] = field(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        """Post init: load the UDPs from `path`, if any."""
+        if self.path:
+            self._journal = LocalJournal(self.path, "udp_definitions", self.store)
+            self._journal.load()
 
     def list_udps(
-        self, user_id: str, limit: int = 100, offset: int = 0
+        self,
+        user_id: str,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """List UDP definitions for a user."""
         udps = [
@@ -167,13 +477,19 @@ class LocalUdpStore(UdpStore):
             for udp_id, data in self.store.items()
             if data["user_id"] == user_id
         ]
+
         # Sort by created_at descending to mirror other stores; tolerate string timestamps
+        def key(created_at: Any, udp_id: str) -> Tuple[datetime, str]:
+            return self._parse_dt(created_at).replace(tzinfo=None), udp_id
+
         udps.sort(
-            key=lambda item: self._parse_dt(item.get("created_at")).replace(
-                tzinfo=None
-            ),
-            reverse=True,
+            key=lambda item: key(item.get("created_at"), item["id"]), reverse=True
         )
+        if after:
+            start = key(*parse_udp_page_token(after))
+            udps = [
+                udp for udp in udps if key(udp.get("created_at"), udp["id"]) < start
+            ]
         return udps[offset : offset + limit]
 
     def get_udp(self, user_id: str, udp_id: str) -> Optional[Dict[str, Any]]:
@@ -201,50 +517,52 @@ class LocalUdpStore(UdpStore):
     ) -> str:
         """Create or replace a UDP for a user."""
         now = datetime.utcnow()
-        existing = self.store.get(udp_id)
-        if existing is not None and existing["user_id"] != user_id:
-            raise ValueError(f"UDP {udp_id} does not belong to user {user_id}")
-
-        if existing is not None:
-            existing["process_graph"] = process_graph
-            existing["parameters"] = parameters
-            existing["summary"] = summary
-            existing["description"] = description
-            existing["returns"] = returns
-            existing["categories"] = categories or []
-            existing["deprecated"] = deprecated
-            existing["experimental"] = experimental
-            existing["exceptions"] = exceptions
-            existing["examples"] = examples
-            existing["links"] = links
-            existing["updated_at"] = now
-        else:
-            self.store[udp_id] = {
-                "user_id": user_id,
-                "process_graph": process_graph,
-                "parameters": parameters,
-                "summary": summary,
-                "description": description,
-                "returns": returns,
-                "categories": categories or [],
-                "deprecated": deprecated,
-                "experimental": experimental,
-                "exceptions": exceptions,
-                "examples": examples,
-                "links": links,
-                "created_at": now,
-                "updated_at": now,
-            }
-        self._persist()
+        with self._transaction():
+            existing = self.store.get(udp_id)
+            if existing is not None and existing["user_id"] != user_id:
+                raise ValueError(f"UDP {udp_id} does not belong to user {user_id}")
+
+            if existing is not None:
+                existing["process_graph"] = process_graph
+                existing["parameters"] = parameters
+                existing["summary"] = summary
+                existing["description"] = description
+                existing["returns"] = returns
+                existing["categories"] = categories or []
+                existing["deprecated"] = deprecated
+                existing["experimental"] = experimental
+                existing["exceptions"] = exceptions
+                existing["examples"] = examples
+                existing["links"] = links
+                existing["updated_at"] = now
+            else:
+                self.store[udp_id] = {
+                    "user_id": user_id,
+                    "process_graph": process_graph,
+                    "parameters": parameters,
+                    "summary": summary,
+                    "description": description,
+                    "returns": returns,
+                    "categories": categories or [],
+                    "deprecated": deprecated,
+                    "experimental": experimental,
+                    "exceptions": exceptions,
+                    "examples": examples,
+                    "links": links,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            self._persist(udp_id)
         return udp_id
 
     def delete_udp(self, user_id: str, udp_id: str) -> bool:
         """Delete a UDP for a user."""
-        existing = self.store.get(udp_id)
-        if existing is None or existing["user_id"] != user_id:
-            raise ValueError(f"Could not find UDP {udp_id} for user {user_id}")
-        self.store.pop(udp_id)
-        self._persist()
+        with self._transaction():
+            existing = self.store.get(udp_id)
+            if existing is None or existing["user_id"] != user_id:
+                raise ValueError(f"Could not find UDP {udp_id} for user {user_id}")
+            self.store.pop(udp_id)
+            self._persist(udp_id)
         return True
 
     def _to_dict(self, udp_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -267,15 +585,14 @@ class LocalUdpStore(UdpStore):
             "updated_at": data.get("updated_at"),
         }
 
-    def _persist(self) -> None:
-        """Write updated UDPs back to disk while preserving services."""
-        if not self.path:
-            return
+    def _transaction(self) -> ContextManager[None]:
+        """Bring the UDPs up to date with `path` for a change."""
+        return self._journal.transaction() if self._journal else nullcontext()
 
-        services, _ = load_local_store_data(self.path)
-        data = {"services": services, "udp_definitions": self.store}
-        with open(self.path, "w") as f:
-            json.dump(data, f, default=_json_default)
+    def _persist(self, udp_id: str) -> None:
+        """Append the change of a UDP to the journal, if any."""
+        if self._journal:
+            self._journal.record(udp_id)
 
     @staticmethod
     def _parse_dt(value: Any) -> datetime:
@@ -2,26 +2,43 @@
 
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from attrs import define, field
 from sqlalchemy import (
     JSON,
     Boolean,
     DateTime,
+    Index,
     Integer,
     StaticPool,
     String,
     Text,
     UniqueConstraint,
+    and_,
+    cast,
     create_engine,
+    func,
+    or_,
     select,
     text,
+    update,
 )
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
 
 from ..models.auth import User
-from .base import ServicesStore, UdpStore
+from .base import (
+    ServicesStore,
+    UdpStore,
+    parse_page_token,
+    parse_udp_page_token,
+    service_summary,
+)
+
+if TYPE_CHECKING:
+    from .tracking import LoginBatch
 
 
 class Base(DeclarativeBase):
@@ -39,6 +56,17 @@ class Service(Base):
     user_id: Mapped[str] = mapped_column(String)
     service: Mapped[Dict[str, Any]] = mapped_column(JSON)
 
+    __table_args__ = (Index("ix_services_user_id", "user_id", "service_id"),)
+
+
+class ServicesRevision(Base):
+    """SQLAlchemy Services Revision Model: one row, bumped by every write."""
+
+    __tablename__ = "services_revision"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
 
 class UserTracking(Base):
     """SQLAlchemy User Tracking Model."""
@@ -87,6 +115,21 @@ class UdpDefinition(Base):
         DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    __table_args__ = (
+        Index("ix_udp_definitions_user_id", "user_id", "created_at", "id"),
+    )
+
+
+def _create_indexes(engine: Any, table: Any) -> None:
+    """Add the indexes of `table` missing from a database created earlier."""
+    for index in table.indexes:
+        try:
+            index.create(engine, checkfirst=True)
+        except DBAPIError:
+            # Created by another replica meanwhile; the indexes only speed
+            # listings up, so no other failure is fatal either.
+            pass
+
 
 @define(kw_only=True)
 class SQLAlchemyStore(ServicesStore):
@@ -113,6 +156,16 @@ class SQLAlchemyStore(ServicesStore):
         # Create tables if they don't exist
 
         Base.metadata.create_all(self._engine)
+        _create_indexes(self._engine, Service.__table__)
+
+        with Session(self._engine) as session:
+            if session.get(ServicesRevision, 1) is None:
+                session.add(ServicesRevision(id=1, revision=0))
+                try:
+                    session.commit()
+                except IntegrityError:
+                    # Another replica created it first
+                    session.rollback()
 
     def ping(self) -> None:
         """Verify the SQLAlchemy store is reachable. Raises on failure."""
@@ -134,35 +187,64 @@ class SQLAlchemyStore(ServicesStore):
                 **result.service,
             }
 
-    def get_services(self, **kwargs) -> List[Dict]:
+    def get_services(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
         """Return All Services."""
-        with Session(self._engine) as session:
-            results = session.execute(select(Service)).scalars().all()
-
-            return [
-                {
-                    "id": result.service_id,
-                    **result.service,
-                }
-                for result in results
-            ]
+        return self._list_services(None, limit, after, summary)
 
-    def get_user_services(self, user_id: str, **kwargs) -> List[Dict]:
+    def get_user_services(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        summary: bool = False,
+        **kwargs,
+    ) -> List[Dict]:
         """Return List Services for a user."""
-        with Session(self._engine) as session:
-            results = (
-                session.execute(select(Service).where(Service.user_id == user_id))
-                .scalars()
-                .all()
-            )
+        return self._list_services(user_id, limit, after, summary)
+
+    def _list_services(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        after: Optional[str],
+        summary: bool,
+    ) -> List[Dict]:
+        """Return a page of the services, of one user or all of them."""
+        column = self._summary_column() if summary else Service.service
+        query = select(Service.service_id, column).order_by(Service.service_id)
+        if user_id is not None:
+            query = query.where(Service.user_id == user_id)
+        if after:
+            (start,) = parse_page_token(after, 1)
+            query = query.where(Service.service_id > start)
+        if limit is not None:
+            query = query.limit(limit)
 
-            return [
-                {
-                    "id": result.service_id,
-                    **result.service,
-                }
-                for result in results
+        with Session(self._engine) as session:
+            services = [
+                {"id": service_id, **service}
+                for service_id, service in session.execute(query)
             ]
+        return [service_summary(s) for s in services] if summary else services
+
+    def _summary_column(self) -> Any:
+        """The services' definitions without `process`, removed by the database.
+
+        Dialects without a JSON key removal return the whole definition, for
+        `service_summary` to trim.
+        """
+        name = self._engine.dialect.name
+        if name in ("sqlite", "mysql", "mariadb"):
+            return func.json_remove(Service.service, "$.process", type_=JSON)
+        if name == "postgresql":
+            return cast(Service.service, JSONB).op("-", return_type=JSONB)("process")
+        return Service.service
 
     def add_service(self, user_id: str, service: Dict, **kwargs) -> str:
         """Add Service."""
@@ -174,6 +256,7 @@ class SQLAlchemyStore(ServicesStore):
                 service=service,
             )
             session.add(new_service)
+            self._bump_revision(session)
             session.commit()
         return service_id
 
@@ -188,6 +271,7 @@ class SQLAlchemyStore(ServicesStore):
                 raise ValueError(f"Could not find service: {service_id}")
 
             session.delete(result)
+            self._bump_revision(session)
             session.commit()
 
         return True
@@ -210,11 +294,27 @@ class SQLAlchemyStore(ServicesStore):
             # Create a new dict to ensure SQLAlchemy detects the change
             service_data = {**result.service, **val}
             result.service = service_data
+            self._bump_revision(session)
 
             session.commit()
 
         return item_id
 
+    def services_revision(self) -> Optional[int]:
+        """Return the counter bumped by every write to the services."""
+        with Session(self._engine) as session:
+            return session.scalar(
+                select(ServicesRevision.revision).where(ServicesRevision.id == 1)
+            )
+
+    def _bump_revision(self, session: Session) -> None:
+        """Bump the services revision, in the same transaction as a write."""
+        session.execute(
+            update(ServicesRevision)
+            .where(ServicesRevision.id == 1)
+            .values(revision=ServicesRevision.revision + 1)
+        )
+
     def track_user_login(self, user: User, provider: str) -> None:
         """Track user login activity."""
         now = datetime.now(timezone.utc)
@@ -248,6 +348,45 @@ class SQLAlchemyStore(ServicesStore):
 
             session.commit()
 
+    def track_user_logins(self, logins: List["LoginBatch"]) -> None:
+        """Track batches of login activity."""
+        if not logins:
+            return
+
+        with Session(self._engine) as session:
+            existing = {
+                (tracking.user_id, tracking.provider): tracking
+                for tracking in session.execute(
+                    select(UserTracking).where(
+                        UserTracking.user_id.in_({login.user_id for login in logins})
+                    )
+                ).scalars()
+            }
+
+            for login in logins:
+                tracking = existing.get((login.user_id, login.provider))
+                if tracking is not None:
+                    tracking.last_login = login.last_login
+                    tracking.login_count += login.count
+                    if login.email:
+                        tracking.email = login.email
+                    if login.name:
+                        tracking.name = login.name
+                else:
+                    session.add(
+                        UserTracking(
+                            user_id=login.user_id,
+                            provider=login.provider,
+                            first_login=login.first_login,
+                            last_login=login.last_login,
+                            login_count=login.count,
+                            email=login.email,
+                            name=login.name,
+                        )
+                    )
+
+            session.commit()
+
     def get_user_tracking(
         self, user_id: str, provider: str
     ) -> Optional[Dict[str, Any]]:
@@ -292,17 +431,31 @@ class SQLAlchemyUdpStore(UdpStore):
         self._engine = create_engine(self.store, **kwargs)
         self._session_factory = sessionmaker(bind=self._engine)
         Base.metadata.create_all(self._engine)
+        _create_indexes(self._engine, UdpDefinition.__table__)
 
     def list_udps(
-        self, user_id: str, limit: int = 100, offset: int = 0
+        self,
+        user_id: str,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """List UDPs for a user."""
+        query = select(UdpDefinition).where(UdpDefinition.user_id == user_id)
+        if after:
+            start, udp_id = parse_udp_page_token(after)
+            query = query.where(
+                or_(
+                    UdpDefinition.created_at < start,
+                    and_(UdpDefinition.created_at == start, UdpDefinition.id < udp_id),
+                )
+            )
         with Session(self._engine) as session:
             results = (
                 session.execute(
-                    select(UdpDefinition)
-                    .where(UdpDefinition.user_id == user_id)
-                    .order_by(UdpDefinition.created_at.desc())
+                    query.order_by(
+                        UdpDefinition.created_at.desc(), UdpDefinition.id.desc()
+                    )
                     .limit(limit)
                     .offset(offset)
                 )
@@ -1,20 +1,44 @@
-"""titiler.openeo.services SQLAlchemy Tile Store."""
-
-import random
+"""titiler.openeo.services SQLAlchemy Tile Store.
+
+Free tiles are claimed in the database rather than in Python. The first claim
+over a (service, zoom, x range, y range) fills `tile_inventory` with one row
+per tile of the range, each with a random rank and a stage mirroring its
+assignment ("free", "claimed" or "submitted"). A claim is then a single
+`UPDATE ... RETURNING` of the lowest-ranked free row, selected through the
+(service_id, z, stage, rank) index. On PostgreSQL the selection takes a
+`FOR UPDATE SKIP LOCKED` lock, so concurrent claimers each get a different
+tile without waiting on one another. SQLite serialises writers, which makes
+the same statement atomic there.
+
+Tile counts per stage, for the whole service and per user, are kept in
+`tile_stage_counts` and `tile_user_counts`, updated in the same transaction as
+the assignment they count, so summaries never scan `tile_assignments`.
+"""
+
+import threading
+from collections import Counter
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from sqlalchemy import (
     JSON,
     Column,
     DateTime,
+    Index,
     Integer,
     String,
     UniqueConstraint,
+    cast,
     create_engine,
+    func,
+    insert,
+    literal,
     select,
     text,
+    true,
+    update,
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
 from .base import (
@@ -22,6 +46,8 @@ from .base import (
     TileAlreadyLockedError,
     TileAssignmentStore,
     TileNotAssignedError,
+    check_tile_fields,
+    tiles_summary_response,
 )
 from .sqlalchemy import Base
 
@@ -46,6 +72,63 @@ class TileAssignment(Base):
     )
 
 
+class TileInventory(Base):
+    """SQLAlchemy Tile Inventory Model: one row per tile of a claimed range."""
+
+    __tablename__ = "tile_inventory"
+
+    id = Column(Integer, primary_key=True)
+    service_id = Column(String, nullable=False)
+    x = Column(Integer, nullable=False)
+    y = Column(Integer, nullable=False)
+    z = Column(Integer, nullable=False)
+    stage = Column(String, nullable=False, default="free")
+    # Random claim order
+    rank = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("service_id", "z", "x", "y", name="unique_inventory_tile"),
+        Index("ix_tile_inventory_stage", "service_id", "z", "stage", "rank"),
+    )
+
+
+class TileInventoryRange(Base):
+    """SQLAlchemy Tile Inventory Range Model: the ranges already inventoried."""
+
+    __tablename__ = "tile_inventory_ranges"
+
+    service_id = Column(String, primary_key=True)
+    z = Column(Integer, primary_key=True)
+    x_min = Column(Integer, primary_key=True)
+    x_max = Column(Integer, primary_key=True)
+    y_min = Column(Integer, primary_key=True)
+    y_max = Column(Integer, primary_key=True)
+
+
+class TileStageCount(Base):
+    """SQLAlchemy Tile Stage Count Model: a service's tiles per stage."""
+
+    __tablename__ = "tile_stage_counts"
+
+    service_id = Column(String, primary_key=True)
+    stage = Column(String, primary_key=True)
+    tiles = Column(Integer, nullable=False, default=0)
+    # Tiles with data set by update_tile
+    with_data = Column(Integer, nullable=False, default=0)
+
+
+class TileUserCount(Base):
+    """SQLAlchemy Tile User Count Model: a user's tiles per stage."""
+
+    __tablename__ = "tile_user_counts"
+
+    service_id = Column(String, primary_key=True)
+    user_id = Column(String, primary_key=True)
+    stage = Column(String, primary_key=True)
+    tiles = Column(Integer, nullable=False, default=0)
+    with_data = Column(Integer, nullable=False, default=0)
+
+
 class SQLAlchemyTileStore(TileAssignmentStore):
     """SQLAlchemy implementation of TileAssignmentStore."""
 
@@ -61,6 +144,19 @@ class SQLAlchemyTileStore(TileAssignmentStore):
         self._session_factory = sessionmaker(bind=self._engine)
         # Ensure tile_assignments table exists
         Base.metadata.create_all(self._engine)
+        # Ranges known to be inventoried, to skip the check on later claims
+        self._inventoried: Set[Tuple[Any, ...]] = set()
+        self._inventoried_lock = threading.Lock()
+        # Count the assignments made before the counters existed
+        with Session(self._engine) as session:
+            assigned = session.scalar(select(TileAssignment.id).limit(1))
+            counted = session.scalar(select(TileStageCount.service_id).limit(1))
+        if assigned is not None and counted is None:
+            try:
+                self.rebuild_tile_counts()
+            except IntegrityError:
+                # Another replica started at the same time and counted them
+                pass
 
     def ping(self) -> None:
         """Verify the tile store is reachable. Raises on failure."""
@@ -106,46 +202,19 @@ class SQLAlchemyTileStore(TileAssignmentStore):
         if existing_tile:
             return existing_tile
 
-        with Session(self._engine) as session:
-            # Get all assigned tiles within the ranges
-            assigned_tiles = (
-                session.execute(
-                    select(TileAssignment).where(
-                        TileAssignment.service_id == service_id,
-                        TileAssignment.z == zoom,
-                        TileAssignment.x >= x_range[0],
-                        TileAssignment.x <= x_range[1],
-                        TileAssignment.y >= y_range[0],
-                        TileAssignment.y <= y_range[1],
-                    )
-                )
-                .scalars()
-                .all()
-            )
-
-            # Create set of assigned coordinates
-            assigned_coords = {(tile.x, tile.y) for tile in assigned_tiles}
+        self._ensure_inventory(service_id, zoom, x_range, y_range)
 
-            # Generate all possible coordinates within ranges
-            all_coords = [
-                (x, y)
-                for x in range(x_range[0], x_range[1] + 1)
-                for y in range(y_range[0], y_range[1] + 1)
-            ]
-
-            # Get available coordinates
-            available_coords = [
-                coord for coord in all_coords if coord not in assigned_coords
-            ]
+        with Session(self._engine) as session:
+            claimed = session.execute(
+                self._claim_statement(service_id, zoom, x_range, y_range),
+                execution_options={"synchronize_session": False},
+            ).one_or_none()
 
-            if not available_coords:
+            if claimed is None:
                 raise NoTileAvailableError(service_id, user_id)
 
-            # Randomly select a coordinate
-            x, y = random.choice(available_coords)
-
-            # Create new tile assignment
-            new_tile = TileAssignment(
+            x, y = claimed
+            tile = TileAssignment(
                 service_id=service_id,
                 user_id=user_id,
                 x=x,
@@ -153,7 +222,8 @@ class SQLAlchemyTileStore(TileAssignmentStore):
                 z=zoom,
                 stage="claimed",
             )
-            session.add(new_tile)
+            session.add(tile)
+            self._count_tile(session, tile, 1)
             session.commit()
 
             return {
@@ -165,6 +235,225 @@ class SQLAlchemyTileStore(TileAssignmentStore):
                 "user_id": user_id,
             }
 
+    def _claim_statement(
+        self,
+        service_id: str,
+        zoom: int,
+        x_range: Tuple[int, int],
+        y_range: Tuple[int, int],
+    ) -> Any:
+        """An UPDATE claiming the range's lowest-ranked free tile.
+
+        Rows other claimers hold are skipped (PostgreSQL) rather than waited
+        for. `x + 0` keeps SQLite's planner off the (service_id, z, x, y)
+        index: a range scan there sorts every tile of the range by rank.
+        """
+        candidate = (
+            select(TileInventory.id)
+            .where(
+                TileInventory.service_id == service_id,
+                TileInventory.z == zoom,
+                TileInventory.stage == "free",
+                (TileInventory.x + 0).between(*x_range),
+                TileInventory.y.between(*y_range),
+            )
+            .order_by(TileInventory.rank)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return (
+            update(TileInventory)
+            .where(TileInventory.id == candidate)
+            .values(stage="claimed")
+            .returning(TileInventory.x, TileInventory.y)
+        )
+
+    def _ensure_inventory(
+        self,
+        service_id: str,
+        zoom: int,
+        x_range: Tuple[int, int],
+        y_range: Tuple[int, int],
+    ) -> None:
+        """Fill the tile inventory for a range, unless it already is."""
+        key = (service_id, zoom, *x_range, *y_range)
+        with self._inventoried_lock:
+            if key in self._inventoried:
+                return
+
+        with Session(self._engine) as session:
+            if session.get(TileInventoryRange, key) is None:
+                self._fill_inventory(session, service_id, zoom, x_range, y_range)
+                session.execute(
+                    self._insert_ignore(TileInventoryRange),
+                    [
+                        {
+                            "service_id": service_id,
+                            "z": zoom,
+                            "x_min": x_range[0],
+                            "x_max": x_range[1],
+                            "y_min": y_range[0],
+                            "y_max": y_range[1],
+                        }
+                    ],
+                )
+                session.commit()
+
+        with self._inventoried_lock:
+            self._inventoried.add(key)
+
+    def _fill_inventory(
+        self,
+        session: Session,
+        service_id: str,
+        zoom: int,
+        x_range: Tuple[int, int],
+        y_range: Tuple[int, int],
+    ) -> None:
+        """Insert the range's missing tiles into the inventory.
+
+        The rows are generated by the database, from a recursive CTE per
+        axis, rather than sent over one by one.
+        """
+        xs = self._axis_cte("inventory_xs", x_range)
+        ys = self._axis_cte("inventory_ys", y_range)
+        session.execute(
+            self._insert_ignore(TileInventory).from_select(
+                ["service_id", "x", "y", "z", "stage", "rank"],
+                select(
+                    literal(service_id),
+                    xs.c.v,
+                    ys.c.v,
+                    literal(zoom),
+                    literal("free"),
+                    self._random_rank(),
+                )
+                .select_from(xs.join(ys, true()))
+                # SQLite needs a WHERE clause to parse INSERT ... SELECT
+                # followed by ON CONFLICT
+                .where(true()),
+            )
+        )
+
+        # Tiles assigned before the range was inventoried
+        assigned = session.execute(
+            select(TileAssignment.x, TileAssignment.y, TileAssignment.stage).where(
+                TileAssignment.service_id == service_id,
+                TileAssignment.z == zoom,
+                TileAssignment.x.between(*x_range),
+                TileAssignment.y.between(*y_range),
+            )
+        ).all()
+        for x, y, stage in assigned:
+            self._set_inventory_stage(session, service_id, x, y, zoom, stage)
+
+    @staticmethod
+    def _axis_cte(name: str, bounds: Tuple[int, int]) -> Any:
+        """A recursive CTE of the integers in `bounds`, as column `v`."""
+        axis = select(literal(bounds[0]).label("v")).cte(name, recursive=True)
+        return axis.union_all(select(axis.c.v + 1).where(axis.c.v < bounds[1]))
+
+    def _random_rank(self) -> Any:
+        """A random non-negative 31 bit integer, computed by the database."""
+        if self._engine.dialect.name == "sqlite":
+            # random() is a signed 64 bit integer there
+            return func.abs(func.random() % 2147483647)
+        return cast(func.floor(func.random() * 2147483647), Integer)
+
+    def _dialect_insert(self, table: Any) -> Optional[Any]:
+        """An INSERT supporting ON CONFLICT clauses, None if unsupported."""
+        dialect = self._engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            return pg_insert(table)
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            return sqlite_insert(table)
+        return None
+
+    def _insert_ignore(self, table: Any) -> Any:
+        """An INSERT skipping rows that already exist, where supported."""
+        statement = self._dialect_insert(table)
+        if statement is None:
+            return insert(table)
+        return statement.on_conflict_do_nothing()
+
+    def _count_tile(self, session: Session, tile: TileAssignment, delta: int) -> None:
+        """Add `delta` to the counts of the tile's stage, service-wide and for its user."""
+        with_data = delta if tile.data else 0
+        self._add_counts(
+            session,
+            TileStageCount,
+            {"service_id": tile.service_id, "stage": tile.stage},
+            delta,
+            with_data,
+        )
+        self._add_counts(
+            session,
+            TileUserCount,
+            {
+                "service_id": tile.service_id,
+                "user_id": tile.user_id,
+                "stage": tile.stage,
+            },
+            delta,
+            with_data,
+        )
+
+    def _add_counts(
+        self,
+        session: Session,
+        table: Any,
+        keys: Dict[str, Any],
+        tiles: int,
+        with_data: int,
+    ) -> None:
+        """Add to a counter row, creating it if needed."""
+        statement = self._dialect_insert(table)
+        if statement is not None:
+            session.execute(
+                statement.values(
+                    **keys, tiles=tiles, with_data=with_data
+                ).on_conflict_do_update(
+                    index_elements=list(keys),
+                    set_={
+                        "tiles": table.tiles + tiles,
+                        "with_data": table.with_data + with_data,
+                    },
+                )
+            )
+            return
+
+        updated = session.execute(
+            update(table)
+            .where(*(getattr(table, key) == value for key, value in keys.items()))
+            .values(tiles=table.tiles + tiles, with_data=table.with_data + with_data),
+            execution_options={"synchronize_session": False},
+        )
+        if not updated.rowcount:
+            session.execute(
+                insert(table).values(**keys, tiles=tiles, with_data=with_data)
+            )
+
+    def _set_inventory_stage(
+        self, session: Session, service_id: str, x: int, y: int, z: int, stage: str
+    ) -> None:
+        """Mirror an assignment's stage in the tile inventory."""
+        session.execute(
+            update(TileInventory)
+            .where(
+                TileInventory.service_id == service_id,
+                TileInventory.x == x,
+                TileInventory.y == y,
+                TileInventory.z == z,
+            )
+            .values(stage=stage),
+            execution_options={"synchronize_session": False},
+        )
+
     def update_tile(
         self,
         service_id: str,
@@ -187,7 +476,12 @@ class SQLAlchemyTileStore(TileAssignmentStore):
                 )
 
             # Update the tile's data
-            tile.data = json_data
+            if bool(tile.data) != bool(json_data):
+                self._count_tile(session, tile, -1)
+                tile.data = json_data
+                self._count_tile(session, tile, 1)
+            else:
+                tile.data = json_data
             session.commit()
 
             # Return updated tile info
@@ -240,6 +534,10 @@ class SQLAlchemyTileStore(TileAssignmentStore):
 
             # Delete the tile assignment
             session.delete(tile)
+            self._set_inventory_stage(
+                session, service_id, tile.x, tile.y, tile.z, "free"
+            )
+            self._count_tile(session, tile, -1)
             session.commit()
 
             return tile_info
@@ -257,9 +555,9 @@ class SQLAlchemyTileStore(TileAssignmentStore):
         with Session(self._engine) as session:
             tiles = (
                 session.execute(
-                    select(TileAssignment).where(
-                        TileAssignment.service_id == service_id
-                    )
+                    select(TileAssignment)
+                    .where(TileAssignment.service_id == service_id)
+                    .order_by(TileAssignment.id)
                 )
                 .scalars()
                 .all()
@@ -278,6 +576,121 @@ class SQLAlchemyTileStore(TileAssignmentStore):
                 for tile in tiles
             ]
 
+    def list_tiles(
+        self,
+        service_id: str,
+        stage: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """List a page of a service's tiles, in assignment order."""
+        fields = check_tile_fields(fields)
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("limit and offset must not be negative")
+
+        query = (
+            select(*(getattr(TileAssignment, field) for field in fields))
+            .where(TileAssignment.service_id == service_id)
+            .order_by(TileAssignment.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        if stage is not None:
+            query = query.where(TileAssignment.stage == stage)
+
+        with Session(self._engine) as session:
+            tiles = [dict(zip(fields, row)) for row in session.execute(query)]
+        for tile in tiles:
+            if "data" in tile and not tile["data"]:
+                tile["data"] = None
+        return tiles
+
+    def get_tiles_summary(
+        self, service_id: str, user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Count a service's tiles by stage, from the tile counters."""
+        if user_id is None:
+            query = select(
+                TileStageCount.stage, TileStageCount.tiles, TileStageCount.with_data
+            ).where(TileStageCount.service_id == service_id)
+        else:
+            query = select(
+                TileUserCount.stage, TileUserCount.tiles, TileUserCount.with_data
+            ).where(
+                TileUserCount.service_id == service_id,
+                TileUserCount.user_id == user_id,
+            )
+
+        with Session(self._engine) as session:
+            rows = session.execute(query).all()
+        stages = {stage: tiles for stage, tiles, _ in rows}
+        with_data = sum(row.with_data for row in rows)
+        return tiles_summary_response(service_id, user_id, stages, with_data)
+
+    def rebuild_tile_counts(self, service_id: Optional[str] = None) -> None:
+        """Recount the tile counters from the tile assignments.
+
+        Run once when the counters are created over existing assignments,
+        and by administrators after assignments were changed by other means
+        than this store.
+
+        Args:
+            service_id: Only recount this service, default all services
+        """
+        with Session(self._engine) as session:
+            assignments = select(
+                TileAssignment.service_id,
+                TileAssignment.user_id,
+                TileAssignment.stage,
+                TileAssignment.data,
+            )
+            if service_id is not None:
+                assignments = assignments.where(TileAssignment.service_id == service_id)
+            stages: Counter = Counter()
+            users: Counter = Counter()
+            for service, user, stage, data in session.execute(
+                assignments.execution_options(yield_per=10_000)
+            ):
+                stages[(service, stage, "tiles")] += 1
+                users[(service, user, stage, "tiles")] += 1
+                if data:
+                    stages[(service, stage, "with_data")] += 1
+                    users[(service, user, stage, "with_data")] += 1
+
+            for table in (TileStageCount, TileUserCount):
+                delete = table.__table__.delete()
+                if service_id is not None:
+                    delete = delete.where(table.service_id == service_id)
+                session.execute(delete)
+
+            stage_rows = [
+                {
+                    "service_id": service,
+                    "stage": stage,
+                    "tiles": count,
+                    "with_data": stages[(service, stage, "with_data")],
+                }
+                for (service, stage, kind), count in list(stages.items())
+                if kind == "tiles"
+            ]
+            user_rows = [
+                {
+                    "service_id": service,
+                    "user_id": user,
+                    "stage": stage,
+                    "tiles": count,
+                    "with_data": users[(service, user, stage, "with_data")],
+                }
+                for (service, user, stage, kind), count in list(users.items())
+                if kind == "tiles"
+            ]
+            if stage_rows:
+                session.execute(insert(TileStageCount), stage_rows)
+            if user_rows:
+                session.execute(insert(TileUserCount), user_rows)
+            session.commit()
+
     def submit_tile(
         self,
         service_id: str,
@@ -304,7 +717,12 @@ class SQLAlchemyTileStore(TileAssignmentStore):
                 )
 
             # Update tile stage
+            self._count_tile(session, tile, -1)
             tile.stage = "submitted"
+            self._count_tile(session, tile, 1)
+            self._set_inventory_stage(
+                session, service_id, tile.x, tile.y, tile.z, "submitted"
+            )
             session.commit()
 
             return {
@@ -350,6 +768,8 @@ class SQLAlchemyTileStore(TileAssignmentStore):
 
             # Delete the tile assignment regardless of its state
             session.delete(tile)
+            self._set_inventory_stage(session, service_id, x, y, z, "free")
+            self._count_tile(session, tile, -1)
             session.commit()
 
             return tile_info
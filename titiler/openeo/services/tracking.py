@@ -0,0 +1,130 @@
+"""titiler.openeo.services login tracking.
+
+Authentication records a login on every authenticated request, tiles
+included. Writing each one to the store is a read-modify-write per request
+(and, for the local JSON store, a rewrite of the whole file), which bounds
+authenticated tile throughput. `LoginTracker` instead coalesces logins in
+memory per (user, provider) and hands them to the store in batches, every
+`interval` seconds from a background thread and once more at shutdown.
+
+Counts are exact: a batch that fails to write is merged back and retried with
+the next one. Only what is still pending when the process dies without
+shutting down is lost.
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from attrs import define, field
+
+from ..models.auth import User
+from .base import ServicesStore
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class LoginBatch:
+    """The logins of one user with one provider since the last flush.
+
+    `email` and `name` are the latest values seen that were not None.
+    """
+
+    user_id: str
+    provider: str
+    first_login: datetime
+    last_login: datetime
+    count: int = 1
+    email: Optional[str] = None
+    name: Optional[str] = None
+
+    def merge(self, newer: "LoginBatch") -> None:
+        """Fold the logins of `newer`, recorded after these, into this batch."""
+        self.first_login = min(self.first_login, newer.first_login)
+        self.last_login = max(self.last_login, newer.last_login)
+        self.count += newer.count
+        self.email = newer.email or self.email
+        self.name = newer.name or self.name
+
+
+@define
+class LoginTracker:
+    """Write-behind buffer of login activity in front of a ServicesStore."""
+
+    store: ServicesStore = field()
+    interval: float = field(default=5.0)
+    _pending: Dict[Tuple[str, str], LoginBatch] = field(init=False, factory=dict)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+    _flush_lock: threading.Lock = field(init=False, factory=threading.Lock)
+    _thread: Optional[threading.Thread] = field(init=False, default=None)
+    _stop: threading.Event = field(init=False, factory=threading.Event)
+
+    def record(self, user: User, provider: str) -> None:
+        """Record one login of `user` with `provider`."""
+        now = datetime.now(timezone.utc)
+        login = LoginBatch(
+            user_id=user.user_id,
+            provider=provider,
+            first_login=now,
+            last_login=now,
+            email=user.email,
+            name=user.name,
+        )
+        with self._lock:
+            key = (user.user_id, provider)
+            if key in self._pending:
+                self._pending[key].merge(login)
+            else:
+                self._pending[key] = login
+            if self._thread is None:
+                self._start()
+
+    def flush(self) -> None:
+        """Write every pending login to the store."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            try:
+                self.store.track_user_logins(list(batch.values()))
+            except Exception as exc:  # noqa: BLE001 - retried with the next batch
+                logger.warning(
+                    "Could not write %d login records, retrying later: %s",
+                    len(batch),
+                    exc,
+                )
+                with self._lock:
+                    for key, newer in self._pending.items():
+                        if key in batch:
+                            batch[key].merge(newer)
+                        else:
+                            batch[key] = newer
+                    self._pending = batch
+
+    def close(self) -> None:
+        """Stop the background thread and flush what is pending."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._stop.clear()
+        self.flush()
+
+    def pending(self) -> List[LoginBatch]:
+        """Return the logins not written to the store yet."""
+        with self._lock:
+            return list(self._pending.values())
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="login-tracker", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
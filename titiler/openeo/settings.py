@@ -19,6 +19,16 @@ class OIDCConfig(BaseSettings):
     title: str = "OIDC"
     description: str = "OpenID Connect (OIDC) Authorization Code Flow with PKCE"
 
+    # Minimum seconds between two fetches of the provider's JWKS, which is
+    # fetched again when a token names a key id it does not hold (key
+    # rotation). Tokens naming unknown keys in between are rejected.
+    jwks_refresh_interval: Annotated[float, Field(ge=0.0)] = 60.0
+
+    # Number of verified tokens whose claims are kept until they expire, so
+    # that a client's repeated requests skip signature verification.
+    # 0 verifies every request.
+    token_cache_maxsize: Annotated[int, Field(ge=0)] = 1024
+
     model_config = SettingsConfigDict(
         env_prefix="TITILER_OPENEO_AUTH_OIDC_",
         env_file=".env",
@@ -109,6 +119,11 @@ class AuthSettings(BaseSettings):
     # Only used if method is set to "oidc"
     oidc: Optional[OIDCConfig] = None
 
+    # Seconds between writes of login activity to the services store. Logins
+    # are counted in memory per user and provider in between, and flushed at
+    # shutdown. 0 writes every login as it happens.
+    login_flush_interval: Annotated[float, Field(ge=0.0)] = 5.0
+
     model_config = SettingsConfigDict(
         env_prefix="TITILER_OPENEO_AUTH_",
         env_file=".env",
@@ -189,6 +204,51 @@ class BackendSettings(BaseSettings):
         return v
 
 
+class ServicesCacheSettings(BaseSettings):
+    """Service definition cache settings.
+
+    See titiler.openeo.services.cache.
+    """
+
+    # Seconds a service definition is served from memory before it is read
+    # from the store again. 0 disables the cache.
+    ttl: Annotated[float, Field(ge=0.0)] = 60.0
+
+    # Maximum number of service definitions kept
+    maxsize: Annotated[int, Field(ge=0)] = 1024
+
+    # Seconds between checks of the store's revision, which every write bumps,
+    # for changes made by other replicas. Bounds how long those stay unseen,
+    # on stores that keep a revision (SQLAlchemy, DuckDB); on others the TTL
+    # does.
+    revalidate_interval: Annotated[float, Field(ge=0.0)] = 1.0
+
+    model_config = SettingsConfigDict(
+        env_prefix="TITILER_OPENEO_SERVICES_CACHE_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+
+class DuckDBSettings(BaseSettings):
+    """DuckDB services and UDP store settings.
+
+    See titiler.openeo.services.duckdb.
+    """
+
+    # Keep one database handle open per process, with a cursor per thread,
+    # instead of opening the database for every call. A DuckDB file can only
+    # be opened by one process at a time: disable when several processes
+    # (e.g. uvicorn workers) share one file.
+    keep_open: bool = True
+
+    model_config = SettingsConfigDict(
+        env_prefix="TITILER_OPENEO_DUCKDB_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+
 class PySTACSettings(BaseSettings):
     """Settings for PySTAC Client"""
 
@@ -223,6 +283,18 @@ class ProcessingSettings(BaseSettings):
     # DN. Disable to keep raw DN (e.g. while migrating graphs that scale manually).
     apply_scale_offset: bool = True
 
+    # Per-request ceiling, in bytes, on the raster data held by realized
+    # RasterStack slices (sources and intermediates). A request crossing it is
+    # aborted with a `MemoryLimitExceeded` error and its cubes released, instead
+    # of taking the whole worker down. None disables the abort; the peak is
+    # still accounted and reported. See titiler.openeo.memory_budget.
+    max_request_memory: Optional[int] = None
+
+    # Let identical tile and /result requests arriving while one of them is
+    # being evaluated share its response instead of evaluating the graph
+    # again. See titiler.openeo.coalesce.
+    coalesce_requests: bool = True
+
     model_config = SettingsConfigDict(
         env_prefix="TITILER_OPENEO_PROCESSING_",
         env_file=".env",
@@ -230,6 +302,28 @@ class ProcessingSettings(BaseSettings):
     )
 
 
+class MetatileSettings(BaseSettings):
+    """Metatile rendering of XYZ services.
+
+    Services opt in with the `metatile` configuration key. See
+    titiler.openeo.metatile.
+    """
+
+    # Seconds the other tiles of a rendered metatile are kept for the
+    # requests that follow
+    cache_ttl: Annotated[float, Field(gt=0.0)] = 60.0
+
+    # Maximum number of tiles kept; 0 keeps none, so every tile of a
+    # metatile not requested while it renders is rendered again
+    cache_maxsize: Annotated[int, Field(ge=0)] = 1024
+
+    model_config = SettingsConfigDict(
+        env_prefix="TITILER_OPENEO_METATILE_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+
 class SARSettings(BaseSettings):
     """Sentinel-1 SAR backscatter settings.
 
@@ -242,6 +336,42 @@ class SARSettings(BaseSettings):
     # rather than the bytes is what keeps this cheap.
     annotation_cache_maxsize: int = 128
 
+    # Calibrate in float32 instead of float64, halving the per-polarisation
+    # working memory of `sar_backscatter`. The output is float32 either way;
+    # this changes results by at most ~2 float32 ulps.
+    float32_calibration: bool = False
+
+    # Threads fetching the annotations behind a stack's derived (band-source)
+    # bands as soon as `load_collection` has found its items, ahead of the
+    # slice reads that need them. 0 leaves each fetch to its first read.
+    prefetch_workers: Annotated[int, Field(ge=0)] = 8
+
+    # Directory for a second, on-disk tier of the parsed annotation and GCP
+    # caches, shared by every worker on a node and kept across restarts.
+    # Unset (the default) keeps them in memory only.
+    disk_cache_dir: Optional[str] = None
+
+    # Geocoding evaluates the exact TPS inverse map on a grid of destination
+    # pixels and bilinearly interpolates in between, refining wherever spot
+    # checks against the exact map are off by more than this many source
+    # pixels. 0 evaluates every destination pixel exactly.
+    geocode_tolerance: Annotated[float, Field(ge=0.0)] = 0.1
+
+    # Spacing, in destination pixels, of the initial geocoding grid.
+    geocode_grid_step: Annotated[int, Field(ge=2)] = 32
+
+    # Low-zoom mode: where destination pixels are larger than the
+    # measurement's, hold geocoding to `geocode_tolerance` destination pixels
+    # rather than source pixels. A zoomed-out tile then settles on the coarse
+    # grid instead of evaluating the TPS at nearly every pixel; LUT bands are
+    # sampled up to that far from their exact position.
+    low_zoom_geocoding: bool = False
+
+    # Bytes of geocoded inverse maps kept across requests, keyed on the
+    # measurement asset and the destination grid. A 256x256 tile's map takes
+    # 1 MiB. 0 (the default) keeps each map for one read only.
+    inverse_map_cache_bytes: Annotated[int, Field(ge=0)] = 0
+
     model_config = SettingsConfigDict(
         env_prefix="TITILER_OPENEO_SAR_",
         env_file=".env",
@@ -262,6 +392,52 @@ class HealthSettings(BaseSettings):
     )
 
 
+class ProfilingSettings(BaseSettings):
+    """Opt-in per-request profiling of process graph evaluation.
+
+    See titiler.openeo.profiling.
+    """
+
+    # Record per-process timings and I/O breakdown for /result and tile
+    # requests, emitted as `Server-Timing` headers and a JSON trace.
+    enabled: bool = False
+
+    # Also record bytes allocated per process, via tracemalloc. Expensive
+    # (roughly doubles allocation cost); only enable while investigating.
+    track_allocations: bool = False
+
+    # Number of recent traces kept in memory for GET /debug/traces/{trace_id}
+    trace_cache_maxsize: Annotated[int, Field(gt=0)] = 100
+
+    model_config = SettingsConfigDict(
+        env_prefix="TITILER_OPENEO_PROFILING_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+
+class CaptureSettings(BaseSettings):
+    """Record-and-replay capture of single requests.
+
+    See titiler.openeo.capture.
+    """
+
+    # Directory capture bundles are written to. Captures are disabled unless
+    # this is set; a request then opts in with the `X-OpenEO-Capture` header.
+    dir: Optional[str] = None
+
+    # Asset bytes are fetched and recorded in blocks of this size. GDAL issues
+    # many small reads per dataset; rounding them up keeps the number of
+    # round trips, and of entries in the bundle index, down.
+    block_size: Annotated[int, Field(gt=0)] = 256 * 1024
+
+    model_config = SettingsConfigDict(
+        env_prefix="TITILER_OPENEO_CAPTURE_",
+        env_file=".env",
+        extra="ignore",
+    )
+
+
 class CacheSettings(BaseSettings):
     """Cache settings"""
 
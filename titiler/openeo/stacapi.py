@@ -28,6 +28,7 @@ from rio_tiler.tasks import create_tasks
 from urllib3 import Retry
 
 from .bandsources import BAND_SOURCES, derive_bands
+from .capture import get_session
 from .errors import (
     ItemsLimitExceeded,
     NoDataAvailable,
@@ -36,9 +37,16 @@ from .errors import (
     TemporalExtentEmpty,
     UnsupportedSTACObject,
 )
+from .metrics import MOSAIC_ITEMS_READ, STAC_SEARCH_SECONDS
 from .processes.implementations.data_model import RasterStack
 from .processes.implementations.utils import _props_to_datetime, to_rasterio_crs
-from .reader import _estimate_output_dimensions, _reader
+from .profiling import IO_STAC_SEARCH, profile_io
+from .reader import (
+    _estimate_output_dimensions,
+    _reader,
+    bind_context,
+    prefetch_band_sources,
+)
 from .settings import CacheSettings, ProcessingSettings, PySTACSettings
 
 pystac_settings = PySTACSettings()
@@ -93,6 +101,7 @@ class stacApiBackend:
         collections_cache,
         key=lambda self, **kwargs: hashkey(self.url, **kwargs),
         lock=Lock(),
+        info=True,
     )
     def get_collections(self, **kwargs) -> List[Dict]:
         """Return List of STAC Collections."""
@@ -306,6 +315,7 @@ class stacApiBackend:
             self.url, collection_id, **kwargs
         ),
         lock=Lock(),
+        info=True,
     )
     def get_collection(self, collection_id: str, **kwargs) -> Dict:
         """Return STAC Collection"""
@@ -338,24 +348,30 @@ class stacApiBackend:
         **kwargs,
     ) -> List[Item]:
         """Return List of STAC Items."""
-        limit = limit or 100
-        max_items = max_items or 100
-
-        items = self.client.search(
-            collections=collections,
-            ids=ids,
-            bbox=bbox,
-            intersects=intersects,
-            datetime=datetime,
-            query=query,
-            filter=filter,
-            filter_lang=filter_lang,
-            sortby=sortby,
-            fields=fields,
-            limit=limit,
-            max_items=max_items,
-        )
-        return list(items.items())
+        search = {
+            "collections": collections,
+            "ids": ids,
+            "bbox": bbox,
+            "intersects": intersects,
+            "datetime": datetime,
+            "query": query,
+            "filter": filter,
+            "filter_lang": filter_lang,
+            "sortby": sortby,
+            "fields": fields,
+            "limit": limit or 100,
+            "max_items": max_items or 100,
+        }
+
+        session = get_session()
+        if session is not None:
+            return session.stac_search(search, lambda: self._search(search))
+        return self._search(search)
+
+    def _search(self, search: Dict[str, Any]) -> List[Item]:
+        with profile_io(IO_STAC_SEARCH), STAC_SEARCH_SECONDS.time():
+            items = self.client.search(**search)
+            return list(items.items())
 
 
 @define
@@ -928,12 +944,13 @@ class LoadCollection:
                     "pixel_selection": PixelSelectionMethod["first"].value(),
                 }
 
-                img, _ = mosaic_reader(
+                img, assets_used = mosaic_reader(
                     date_items,
-                    _reader,
+                    bind_context(_reader),
                     bbox,
                     **mosaic_kwargs,
                 )
+                MOSAIC_ITEMS_READ.observe(len(assets_used))
                 return img
 
             return task
@@ -974,7 +991,7 @@ class LoadCollection:
                 )
             )
 
-        return RasterStack(
+        stack = RasterStack(
             tasks=tasks,
             timestamp_fn=lambda asset: asset["datetime"],
             width=int(width) if width else None,
@@ -983,6 +1000,11 @@ class LoadCollection:
             dst_crs=output_crs,
             band_names=bands if bands else [],
         )
+        # Any annotation LUT bands are known by now (requested, or injected by
+        # the reader-requirement planner): start fetching them while the rest
+        # of the graph is still being set up.
+        prefetch_band_sources(stack)
+        return stack
 
 
 @define
@@ -1149,7 +1171,7 @@ class LoadStac:
         crs = to_rasterio_crs(projcrs)
 
         tasks = create_tasks(
-            _reader,
+            bind_context(_reader),
             items,
             MAX_THREADS,
             bbox,
@@ -1266,7 +1288,7 @@ class LoadStac:
 
         img, _ = mosaic_reader(
             items,
-            _reader,
+            bind_context(_reader),
             bbox,
             bounds_crs=bounds_crs,
             dst_crs=output_crs,